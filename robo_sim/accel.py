@@ -0,0 +1,146 @@
+import heapq
+import math
+import os
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Compiled kernels for inner loops that do not vectorize well. With Numba
+# installed they are compiled on first use and cached on disk, and callers
+# switch to them wherever `ENABLED` is set. Without Numba they stay plain
+# Python, and callers keep their NumPy implementations, which give the same
+# results. Setting ROBO_SIM_JIT=0 disables compilation altogether.
+HAVE_NUMBA = numba is not None
+ENABLED = HAVE_NUMBA and os.environ.get("ROBO_SIM_JIT", "1") != "0"
+# Whether the kernels were compiled, which is decided at import; switching
+# `ENABLED` on later only runs their Python versions.
+COMPILED = ENABLED
+
+
+def jit(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Compile `func` in nopython mode with an on-disk cache, so that other
+    processes load the machine code instead of compiling it again."""
+    if not COMPILED:
+        return func
+    return numba.njit(cache=True, nogil=True)(func)
+
+
+@jit
+def circle_hits(
+    points: np.ndarray, centers: np.ndarray, params: np.ndarray, radius: float
+) -> np.ndarray:
+    """Per point, whether a disc of `radius` touches any circle with the
+    given centers and radii, ``params[:, 0]``."""
+    hit = np.zeros(points.shape[0], dtype=np.bool_)
+    for i in range(points.shape[0]):
+        x, y = points[i, 0], points[i, 1]
+        for k in range(centers.shape[0]):
+            dx = x - centers[k, 0]
+            dy = y - centers[k, 1]
+            reach = params[k, 0] + radius
+            if dx * dx + dy * dy <= reach * reach:
+                hit[i] = True
+                break
+    return hit
+
+
+@jit
+def box_hits(
+    points: np.ndarray, centers: np.ndarray, params: np.ndarray, radius: float
+) -> np.ndarray:
+    """Per point, whether a disc of `radius` touches any axis-aligned box
+    with the given centers and half extents, ``params[:, :2]``, using the
+    same bounding test as `AABB.batch_hits`."""
+    hit = np.zeros(points.shape[0], dtype=np.bool_)
+    for i in range(points.shape[0]):
+        x, y = points[i, 0], points[i, 1]
+        for k in range(centers.shape[0]):
+            if (
+                abs(x - centers[k, 0]) <= params[k, 0] + radius
+                and abs(y - centers[k, 1]) <= params[k, 1] + radius
+            ):
+                hit[i] = True
+                break
+    return hit
+
+
+# Kernels replacing `Shape.batch_hits(...).any(axis=1)`, by shape kind.
+bucket_kernels: dict[str, Callable[..., np.ndarray]] = {
+    "circle": circle_hits,
+    "box": box_hits,
+}
+
+
+@jit
+def grid_distances(
+    blocked: np.ndarray, source: int, moves: np.ndarray
+) -> np.ndarray:
+    """Dijkstra over a grid from the cell `source`.
+
+    Parameters
+    ----------
+    blocked : np.ndarray
+        Boolean grid of shape (rows, cols).
+    source : int
+        Flat index of the start cell.
+    moves : np.ndarray
+        Rows ``(di, dj, cost)`` of the allowed moves. Diagonal moves may not
+        cut the corner of a blocked cell.
+
+    Returns
+    -------
+    np.ndarray
+        Flat array of path costs, inf where unreachable.
+    """
+    rows, cols = blocked.shape
+    flat = blocked.ravel()
+    dist = np.full(rows * cols, math.inf)
+    dist[source] = 0.0
+    queue = [(0.0, source)]
+    while queue:
+        d, idx = heapq.heappop(queue)
+        if d > dist[idx]:
+            continue
+        i, j = divmod(idx, cols)
+        for m in range(moves.shape[0]):
+            di, dj = moves[m, 0], moves[m, 1]
+            ni, nj = i + di, j + dj
+            if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+                continue
+            n = ni * cols + nj
+            if flat[n]:
+                continue
+            if di != 0 and dj != 0 and (flat[n - dj] or flat[n - di * cols]):
+                continue
+            cost = d + moves[m, 2]
+            if cost < dist[n]:
+                dist[n] = cost
+                heapq.heappush(queue, (cost, n))
+    return dist
+
+
+def warmup() -> None:
+    """Compile, or load from the on-disk cache, every kernel ahead of time,
+    so that the first episode of a worker does not pay for it."""
+    if not COMPILED:
+        return
+    start = time.perf_counter()
+    points = np.zeros((1, 2))
+    params = np.ones((1, 2))
+    for kernel in bucket_kernels.values():
+        kernel(points, points, params, 0.5)
+    moves = np.array([(0, 1, 10), (1, 1, 14)], dtype=np.int64)
+    grid_distances(np.zeros((2, 2), dtype=np.bool_), 0, moves)
+    logger.debug(
+        f"Prepared compiled kernels in {time.perf_counter() - start:.2f}s."
+    )
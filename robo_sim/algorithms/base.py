@@ -1,13 +1,48 @@
+import math
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
+import numpy as np
+
+from ..cache import ArtifactCache
 from ..components.env_objects import Target
+from ..logging import get_logger
 from ..utils import Position
+from .smoothing import smooth_path
 
 if TYPE_CHECKING:
     from ..components import Env, Robot
     from ..config import AlgorithmConfig
 
+logger = get_logger(__name__)
+
+
+def advance_along(
+    path: list[Position], idx: int, pos: Position, distance: float
+) -> tuple[Position, int]:
+    """Move from `pos` by `distance` along `path`, starting toward the
+    waypoint at `idx`.
+
+    Returns
+    -------
+    tuple[Position, int]
+        The new position and the index of the next waypoint to reach.
+    """
+    while idx < len(path):
+        waypoint = path[idx]
+        dist = math.hypot(waypoint.x - pos.x, waypoint.y - pos.y)
+        if dist > distance:
+            scale = distance / dist
+            pos = Position(
+                pos.x + (waypoint.x - pos.x) * scale,
+                pos.y + (waypoint.y - pos.y) * scale,
+            )
+            break
+        pos = waypoint
+        distance -= dist
+        idx += 1
+    return pos, idx
+
 
 class Algorithm(ABC):
     def __init__(
@@ -23,6 +58,11 @@ class Algorithm(ABC):
         self.start = start
         self.target = target
         self.params = params
+        self.cache: ArtifactCache | None = None
+        if params.cache_dir is not None:
+            self.cache = ArtifactCache(
+                params.cache_dir, int(params.cache_size_mb * (1 << 20))
+            )
 
     @abstractmethod
     def step(self) -> tuple[Position, float]:
@@ -34,3 +74,145 @@ class Algorithm(ABC):
             The new position and the orientation.
         """
         raise NotImplementedError()
+
+    def in_reach(self, pos: Position) -> bool:
+        """Whether the robot can move straight to `pos` without colliding.
+
+        The way is checked at the sub-steps at which `Robot.drive_towards`
+        checks a step of the robot, or at the same spacing beyond one step,
+        so that the robot does not stop short of a point taken as in reach.
+        """
+        robot = self.robot
+        start = np.array((robot.pos.x, robot.pos.y))
+        delta = np.array((pos.x, pos.y)) - start
+        steps = math.ceil(math.hypot(*delta) / (robot.init_vel * robot.dt))
+        count = robot.substeps * max(1, steps)
+        points = start + delta * np.linspace(0, 1, count + 1)[1:, None]
+        if ((points < 0) | (points > self.env.size)).any():
+            return False
+        if self.env.costmap is not None:
+            return not self.env.costmap.collides(points, robot.radius).any()
+        return not self.env.points_in_collision(points, robot.radius).any()
+
+
+class PathFollowingAlgorithm(Algorithm):
+    """Algorithm that plans a complete path up front and then follows it,
+    advancing the robot by at most `init_vel` along the path each step.
+
+    With `smoothing` configured, the planned path is shortcut, rounded and
+    resampled at `init_vel` spacing before it is followed.
+    """
+
+    def __init__(
+        self,
+        env: "Env",
+        robot: "Robot",
+        start: Position,
+        target: Target,
+        params: "AlgorithmConfig",
+    ) -> None:
+        super().__init__(env, robot, start, target, params)
+        self.path: list[Position] | None = None
+        self.planned = False
+        self.waypoint_idx = 0
+
+    @abstractmethod
+    def plan(self) -> list[Position] | None:
+        """Compute a path from the robot's position to the target.
+
+        Returns
+        -------
+        list[Position] | None
+            Waypoints ending at the target, or None if there is no path.
+        """
+        raise NotImplementedError()
+
+    def smooth(self, path: list[Position]) -> list[Position]:
+        """Post-process a planned path as configured by `smoothing`,
+        checking shortcuts and corners against the environment."""
+        assert self.params.smoothing is not None
+        radius = self.robot.radius
+        points = smooth_path(
+            np.array([(p.x, p.y) for p in path]),
+            self.params.smoothing,
+            lambda starts, ends: self.env.segments_collision_free(
+                starts, ends, radius
+            ),
+            spacing=self.robot.init_vel,
+            step=self.robot.init_vel,
+        )
+        logger.debug(
+            f"Post-processed a path of {len(path)} waypoints into "
+            f"{len(points)}."
+        )
+        return [Position(x, y) for x, y in points.tolist()]
+
+    def rejoin_point(self) -> Position | None:
+        """Point at most `init_vel` toward the closest point of the path
+        segment the robot is following, or None if the robot is on it.
+
+        A robot driven by a kinematic model does not follow the path
+        exactly, and beside the path the way ahead can be blocked.
+        """
+        assert self.path is not None
+        end = self.path[self.waypoint_idx]
+        start = self.path[self.waypoint_idx - 1] if self.waypoint_idx else end
+        dx, dy = end.x - start.x, end.y - start.y
+        length_sq = dx * dx + dy * dy
+        t = 0.0
+        if length_sq > 0:
+            t = (
+                (self.robot.pos.x - start.x) * dx
+                + (self.robot.pos.y - start.y) * dy
+            ) / length_sq
+            t = min(max(t, 0.0), 1.0)
+        closest = Position(start.x + dx * t, start.y + dy * t)
+        if (
+            math.hypot(
+                closest.x - self.robot.pos.x, closest.y - self.robot.pos.y
+            )
+            < 1e-9
+        ):
+            return None
+        # Where the closest point is out of reach, head back to the latest
+        # passed waypoint that is in reach.
+        passed = self.path[: self.waypoint_idx][::-1]
+        for waypoint in [closest, *passed]:
+            if self.in_reach(waypoint):
+                closest = waypoint
+                break
+        pos, _ = advance_along(
+            [closest], 0, self.robot.pos, self.robot.init_vel
+        )
+        return pos
+
+    def step(self) -> tuple[Position | None, float]:
+        if not self.planned:
+            self.path = self.plan()
+            self.planned = True
+            self.waypoint_idx = 0
+            if self.path is None:
+                logger.warning(
+                    f"{self.__class__.__name__} found no path to the target."
+                )
+            elif self.params.smoothing is not None:
+                self.path = self.smooth(self.path)
+        if self.path is None or self.waypoint_idx == len(self.path):
+            return None, self.robot.orientation
+
+        pos, idx = advance_along(
+            self.path, self.waypoint_idx, self.robot.pos, self.robot.init_vel
+        )
+        # Only the way to the first waypoint is straight.
+        ahead = pos if idx == self.waypoint_idx else self.path[idx - 1]
+        rejoin = None
+        if self.robot.kinematics is not None and not self.in_reach(ahead):
+            rejoin = self.rejoin_point()
+        if rejoin is None:
+            self.waypoint_idx = idx
+        else:
+            pos = rejoin
+        orientation = math.degrees(
+            math.atan2(pos.y - self.robot.pos.y, pos.x - self.robot.pos.x)
+        )
+        return pos, orientation
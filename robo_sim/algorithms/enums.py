@@ -3,3 +3,6 @@ from enum import Enum, auto
 
 class AlgorithmType(Enum):
     DEFAULT = auto()
+    DSTARLITE = auto()
+    RRTSTAR = auto()
+    PRM = auto()
@@ -15,6 +15,18 @@ logger = get_logger(__name__)
 
 
 class AlgorithmFactory:
+    @staticmethod
+    def preload(names: list[str]) -> None:
+        """Import the modules of the named algorithms ahead of time, so
+        that creating them later costs no import."""
+        for name in names:
+            try:
+                importlib.import_module(
+                    f"robo_sim.algorithms.path_planning.{name.lower()}"
+                )
+            except ModuleNotFoundError:
+                logger.debug(f"No module to preload for algorithm {name}.")
+
     @staticmethod
     def get_algorithm(
         env: "Env",
@@ -0,0 +1,559 @@
+import heapq
+import math
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from ... import accel
+from ...cache import artifact_key
+from ...components.env_objects import Target
+from ...components.mapping import traverse_beams
+from ...logging import get_logger
+from ...utils import Position
+from ..base import Algorithm, advance_along
+from ..smoothing import smooth_path
+
+if TYPE_CHECKING:
+    from ...components import Env, Robot
+    from ...config import DStarLiteConfig
+
+logger = get_logger(__name__)
+
+# Integer move costs keep every key exact, so ties between keys, which
+# D* Lite relies on, are never broken by floating-point rounding.
+STRAIGHT = 10
+DIAGONAL = 14
+# (di, dj, cost) of the 8-connected grid moves.
+MOVES = (
+    (0, 1, STRAIGHT),
+    (1, 0, STRAIGHT),
+    (0, -1, STRAIGHT),
+    (-1, 0, STRAIGHT),
+    (1, 1, DIAGONAL),
+    (1, -1, DIAGONAL),
+    (-1, 1, DIAGONAL),
+    (-1, -1, DIAGONAL),
+)
+MOVES_ARRAY = np.array(MOVES, dtype=np.int64)
+UNKNOWN = -1
+
+
+def grid_distances(blocked: np.ndarray, source: int) -> np.ndarray:
+    """Cost of the cheapest path from the free cell `source` to every cell
+    of `blocked`, under the planner's move rules; inf where unreachable."""
+    if accel.ENABLED:
+        return accel.grid_distances(blocked, source, MOVES_ARRAY)
+    rows, cols = blocked.shape
+    flat = blocked.ravel().tolist()
+    dist = [math.inf] * (rows * cols)
+    dist[source] = 0
+    queue = [(0, source)]
+    while queue:
+        d, idx = heapq.heappop(queue)
+        if d > dist[idx]:
+            continue
+        i, j = divmod(idx, cols)
+        for di, dj, cost in MOVES:
+            ni, nj = i + di, j + dj
+            if not (0 <= ni < rows and 0 <= nj < cols):
+                continue
+            n = ni * cols + nj
+            if flat[n] or (
+                di != 0 and dj != 0 and (flat[n - dj] or flat[n - di * cols])
+            ):
+                continue
+            if d + cost < dist[n]:
+                dist[n] = d + cost
+                heapq.heappush(queue, (d + cost, n))
+    return np.array(dist, dtype=float)
+
+
+class DStarLite(Algorithm):
+    """D* Lite on an 8-connected grid over the environment.
+
+    The search runs backwards from the target, and its priority queue and
+    g/rhs tables persist across `step` calls. When cells change, either
+    because the robot senses them or because obstacles moved in the
+    environment, only the vertices around those cells are updated and the
+    search repairs the affected part of the plan, so replanning cost scales
+    with the change rather than with the map.
+
+    Robots with a proximity sensor start out assuming unknown cells are
+    free and learn the map within sensor range. Robots without one plan on
+    the true map, which is evaluated lazily in tiles as the search reaches
+    it.
+
+    With an artifact cache configured, maps without moving obstacles are
+    evaluated in full once and the result is reused by every later run on
+    the same map. On such maps the planner can also strengthen its
+    heuristic with precomputed landmark distances (ALT): for any landmark
+    L, ``|d(L, a) - d(L, b)|`` is a lower bound on the cost from a to b.
+
+    With `smoothing` configured, the robot leaves the grid: the cells of
+    the current plan are shortcut and rounded, checked against the cells
+    the planner believes blocked, and the robot follows the result at
+    `init_vel` per step, resampled at that spacing, like the paths of
+    `PathFollowingAlgorithm`. The path is rebuilt whenever the plan
+    changes.
+
+    The planner's tables cover every cell of the map, so it does not run in
+    tiled worlds.
+    """
+
+    def __init__(
+        self,
+        env: "Env",
+        robot: "Robot",
+        start: Position,
+        target: Target,
+        params: "DStarLiteConfig",
+    ) -> None:
+        if env.world is not None:
+            raise ValueError(
+                "D* Lite keeps arrays over the whole map and cannot plan in "
+                "a tiled world."
+            )
+        super().__init__(env, robot, start, target, params)
+        self.params: "DStarLiteConfig" = params
+        self.resolution = params.resolution
+        self.tile_size = params.tile_size
+        self.rows, self.cols = env.grid_shape(self.resolution)
+        size = self.rows * self.cols
+
+        sensor = getattr(robot, "sensor", None)
+        self.sensor_range: float | None = getattr(sensor, "sensor_range", None)
+        # Collision status of every cell, filled in lazily per tile.
+        self.truth = np.full((self.rows, self.cols), UNKNOWN, dtype=np.int8)
+        # What the planner believes; only used when learning the map.
+        self.known = np.zeros((self.rows, self.cols), dtype=bool)
+
+        self.g = np.full(size, np.inf)
+        self.rhs = np.full(size, np.inf)
+        self.open: list[tuple[float, float, int]] = []
+        self.open_keys: dict[int, tuple[float, float]] = {}
+        self.km = 0.0
+        self.expansions = 0
+
+        self.goal = self.cell_index(target.pos)
+        self.start_idx = self.cell_index(robot.pos)
+        self.last_idx = self.start_idx
+        self.env_version = env.version
+        # Post-processed plan being followed when smoothing, and the
+        # distance covered per step along it.
+        self.path: list[Position] | None = None
+        self.waypoint_idx = 0
+        self.pace = (
+            robot.init_vel if robot.init_vel > 0 else 1.0 / self.resolution
+        )
+
+        static = not env.dynamic_obstacles
+        if static and self.cache is not None:
+            self.truth = self.cache.get_or_compute(
+                self.artifact_key("dstarlite-cells"), self.evaluate_map
+            )["truth"]
+        # Distances from every cell to each landmark, shape (cells, k).
+        self.landmark_dists: np.ndarray | None = None
+        if static and self.sensor_range is None and params.landmarks:
+            if self.cache is None:
+                arrays = self.compute_landmarks()
+            else:
+                arrays = self.cache.get_or_compute(
+                    self.artifact_key(
+                        "dstarlite-landmarks", count=params.landmarks
+                    ),
+                    self.compute_landmarks,
+                )
+            self.landmark_dists = arrays["distances"]
+
+        self.rhs[self.goal] = 0.0
+        self.push(self.goal)
+        if self.sensor_range is not None:
+            self.sense_cells()
+        self.compute_shortest_path()
+
+    def cell_index(self, pos: Position) -> int:
+        i = min(max(round(pos.y * self.resolution), 0), self.rows - 1)
+        j = min(max(round(pos.x * self.resolution), 0), self.cols - 1)
+        return i * self.cols + j
+
+    def cell_position(self, idx: int) -> Position:
+        i, j = divmod(idx, self.cols)
+        return Position(j / self.resolution, i / self.resolution)
+
+    def artifact_key(self, kind: str, **parts: Any) -> str:
+        return artifact_key(
+            kind,
+            map=self.env.content_hash(self.resolution),
+            radius=self.robot.radius,
+            **parts,
+        )
+
+    def evaluate_map(self) -> dict[str, np.ndarray]:
+        self.evaluate_cells(0, self.rows, 0, self.cols)
+        return {"truth": self.truth}
+
+    def compute_landmarks(self) -> dict[str, np.ndarray]:
+        """Pick landmarks spread over the free space, each one the free
+        cell farthest from those picked before, and compute the distance
+        from every cell to each of them."""
+        self.evaluate_cells(0, self.rows, 0, self.cols)
+        blocked = self.truth.astype(bool)
+        free = np.flatnonzero(~blocked)
+        distances = []
+        nearest = np.full(blocked.size, np.inf)
+        source = int(free[0]) if len(free) else -1
+        while source >= 0 and len(distances) < self.params.landmarks:
+            dist = grid_distances(blocked, source)
+            distances.append(dist)
+            nearest = np.minimum(nearest, dist)
+            spread = np.where(np.isfinite(nearest), nearest, -1)
+            source = int(spread.argmax()) if spread.max() > 0 else -1
+        table = np.zeros((blocked.size, len(distances)))
+        for k, dist in enumerate(distances):
+            # Cells a landmark cannot reach contribute no bound.
+            table[:, k] = np.where(np.isfinite(dist), dist, 0)
+        logger.info(f"Computed distances to {len(distances)} landmarks.")
+        return {"distances": table}
+
+    def heuristic(self, a: int, b: int) -> float:
+        """Octile distance, consistent with the 8-connected move costs,
+        tightened by the landmark bound when landmarks are available."""
+        ai, aj = divmod(a, self.cols)
+        bi, bj = divmod(b, self.cols)
+        di, dj = abs(ai - bi), abs(aj - bj)
+        octile = STRAIGHT * max(di, dj) + (DIAGONAL - STRAIGHT) * min(di, dj)
+        if self.landmark_dists is None:
+            return octile
+        bound = np.abs(self.landmark_dists[a] - self.landmark_dists[b]).max()
+        return max(octile, float(bound))
+
+    def calculate_key(self, idx: int) -> tuple[float, float]:
+        best = min(self.g[idx], self.rhs[idx])
+        return (
+            best + self.heuristic(self.start_idx, idx) + self.km,
+            best,
+        )
+
+    def push(self, idx: int) -> None:
+        key = self.calculate_key(idx)
+        self.open_keys[idx] = key
+        heapq.heappush(self.open, (key[0], key[1], idx))
+
+    def top_key(self) -> tuple[float, float]:
+        # Entries are never removed in place; skip superseded ones.
+        while self.open:
+            k1, k2, idx = self.open[0]
+            if self.open_keys.get(idx) == (k1, k2):
+                return k1, k2
+            heapq.heappop(self.open)
+        return math.inf, math.inf
+
+    def is_blocked(self, i: int, j: int) -> bool:
+        if self.sensor_range is not None:
+            return bool(self.known[i, j])
+        value = self.truth[i, j]
+        if value == UNKNOWN:
+            self.evaluate_tile(i, j)
+            value = self.truth[i, j]
+        return bool(value)
+
+    def evaluate_tile(self, i: int, j: int) -> None:
+        """Collision-check every unknown cell of the tile holding (i, j) in
+        a single batched query."""
+        t = self.tile_size
+        i0, j0 = i - i % t, j - j % t
+        i1, j1 = min(i0 + t, self.rows), min(j0 + t, self.cols)
+        self.evaluate_cells(i0, i1, j0, j1)
+
+    def evaluate_cells(self, i0: int, i1: int, j0: int, j1: int) -> None:
+        block = self.truth[i0:i1, j0:j1]
+        ii, jj = np.nonzero(block == UNKNOWN)
+        if not len(ii):
+            return
+        centers = np.column_stack((jj + j0, ii + i0)) / self.resolution
+        hits = self.env.points_in_collision(centers, self.robot.radius)
+        block[ii, jj] = hits
+
+    def neighbors(self, idx: int) -> list[tuple[int, float]]:
+        """Adjacent cells with the cost of the edge to each of them.
+
+        Edges touching a blocked cell cost infinity, and diagonal moves may
+        not cut the corner of a blocked cell.
+        """
+        i, j = divmod(idx, self.cols)
+        blocked = self.is_blocked(i, j)
+        result = []
+        for di, dj, cost in MOVES:
+            ni, nj = i + di, j + dj
+            if not (0 <= ni < self.rows and 0 <= nj < self.cols):
+                continue
+            edge_blocked = (
+                blocked
+                or self.is_blocked(ni, nj)
+                or (
+                    di != 0
+                    and dj != 0
+                    and (self.is_blocked(ni, j) or self.is_blocked(i, nj))
+                )
+            )
+            result.append(
+                (ni * self.cols + nj, math.inf if edge_blocked else cost)
+            )
+        return result
+
+    def update_vertex(self, idx: int) -> None:
+        if idx != self.goal:
+            self.rhs[idx] = min(
+                (cost + self.g[n] for n, cost in self.neighbors(idx)),
+                default=math.inf,
+            )
+        if self.g[idx] != self.rhs[idx]:
+            self.push(idx)
+        else:
+            self.open_keys.pop(idx, None)
+
+    def compute_shortest_path(self) -> None:
+        start = self.start_idx
+        while (
+            self.top_key() < self.calculate_key(start)
+            or self.rhs[start] != self.g[start]
+        ):
+            if not self.open:
+                break
+            k_old = self.top_key()
+            _, _, idx = self.open[0]
+            k_new = self.calculate_key(idx)
+            if k_old < k_new:
+                self.push(idx)
+                continue
+            heapq.heappop(self.open)
+            del self.open_keys[idx]
+            self.expansions += 1
+            if self.g[idx] > self.rhs[idx]:
+                self.g[idx] = self.rhs[idx]
+                for n, _ in self.neighbors(idx):
+                    self.update_vertex(n)
+            else:
+                self.g[idx] = math.inf
+                self.update_vertex(idx)
+                for n, _ in self.neighbors(idx):
+                    self.update_vertex(n)
+
+    def sense_cells(self) -> list[int]:
+        """Reveal the cells within sensor range of the robot and return
+        those whose believed status changed."""
+        assert self.sensor_range is not None
+        reach = self.sensor_range * self.resolution
+        ci, cj = divmod(self.cell_index(self.robot.pos), self.cols)
+        i0, i1 = max(ci - reach, 0), min(ci + reach + 1, self.rows)
+        j0, j1 = max(cj - reach, 0), min(cj + reach + 1, self.cols)
+        self.evaluate_cells(i0, i1, j0, j1)
+        ii, jj = np.mgrid[i0:i1, j0:j1]
+        in_range = (ii - ci) ** 2 + (jj - cj) ** 2 <= reach**2
+        truth = self.truth[i0:i1, j0:j1].astype(bool)
+        known = self.known[i0:i1, j0:j1]
+        changed = in_range & (truth != known)
+        known[changed] = truth[changed]
+        return ((ii[changed]) * self.cols + jj[changed]).tolist()
+
+    def changed_cells(self) -> list[int]:
+        """Cells whose status changed since the previous step."""
+        changed: list[int] = []
+        regions = self.env.dirty_regions(self.env_version)
+        self.env_version = self.env.version
+        if regions is None:
+            # Too many changes to replay, so re-check the whole map.
+            width, height = self.env.size
+            regions = [(0.0, 0.0, float(width), float(height))]
+        margin = self.robot.radius
+        res = self.resolution
+        for x_min, y_min, x_max, y_max in regions:
+            i0 = max(math.ceil((y_min - margin) * res), 0)
+            i1 = min(math.floor((y_max + margin) * res) + 1, self.rows)
+            j0 = max(math.ceil((x_min - margin) * res), 0)
+            j1 = min(math.floor((x_max + margin) * res) + 1, self.cols)
+            if i1 <= i0 or j1 <= j0:
+                continue
+            block = self.truth[i0:i1, j0:j1]
+            if self.sensor_range is not None:
+                # Picked up by sensing once the cells are in range.
+                block[:] = UNKNOWN
+                continue
+            previous = block.copy()
+            block[:] = UNKNOWN
+            self.evaluate_cells(i0, i1, j0, j1)
+            ii, jj = np.nonzero((previous != UNKNOWN) & (previous != block))
+            changed.extend(((ii + i0) * self.cols + jj + j0).tolist())
+        if self.sensor_range is not None:
+            changed.extend(self.sense_cells())
+        return changed
+
+    def step(self) -> tuple[Position | None, float]:
+        self.start_idx = self.cell_index(self.robot.pos)
+        if self.start_idx == self.goal:
+            return self.cell_position(self.goal), self.robot.orientation
+
+        changed = self.changed_cells()
+        start = self.start_idx
+        # Off the grid moves, the robot can reach cells the search has not
+        # settled, from which it has to be resumed.
+        off_grid = (
+            self.params.smoothing is not None
+            or self.robot.kinematics is not None
+        )
+        unsettled = off_grid and (
+            self.g[start] != self.rhs[start]
+            or self.top_key() < self.calculate_key(start)
+        )
+        if changed or unsettled:
+            self.km += self.heuristic(self.last_idx, start)
+            self.last_idx = start
+            affected = set()
+            for idx in changed:
+                affected.add(idx)
+                affected.update(n for n, _ in self.neighbors(idx))
+            for idx in affected:
+                self.update_vertex(idx)
+            before = self.expansions
+            self.compute_shortest_path()
+            logger.debug(
+                f"Replanned after {len(changed)} changed cells with "
+                f"{self.expansions - before} expansions."
+            )
+        if changed:
+            self.path = None
+
+        if math.isinf(self.g[self.start_idx]):
+            if self.env.dynamic_obstacles:
+                # A moving obstacle may clear the way again, so wait.
+                logger.debug("No path to the target, waiting in place.")
+                return self.robot.pos, self.robot.orientation
+            logger.warning("D* Lite found no path to the target.")
+            return None, self.robot.orientation
+
+        if self.params.smoothing is None:
+            next_idx, _ = min(
+                self.neighbors(self.start_idx),
+                key=lambda item: item[1] + self.g[item[0]],
+            )
+            next_pos = self.cell_position(next_idx)
+            # A kinematic robot drifts off the cell centers, from where the
+            # way to the next cell can be blocked, so it returns to the
+            # center of its cell first.
+            if self.robot.kinematics is not None and not self.in_reach(
+                next_pos
+            ):
+                next_pos = self.cell_position(self.start_idx)
+        else:
+            if self.path is None or self.waypoint_idx == len(self.path):
+                self.path = self.smoothed_path()
+                self.waypoint_idx = 0
+            next_pos, self.waypoint_idx = advance_along(
+                self.path, self.waypoint_idx, self.robot.pos, self.pace
+            )
+        orientation = math.degrees(
+            math.atan2(
+                next_pos.y - self.robot.pos.y, next_pos.x - self.robot.pos.x
+            )
+        )
+        return next_pos, orientation
+
+    def plan_cells(self) -> list[int]:
+        """Cells of the current plan from the robot's cell toward the
+        goal, following the cheapest neighbor while costs decrease."""
+        cells = [self.start_idx]
+        idx = self.start_idx
+        while idx != self.goal:
+            nxt, cost = min(
+                self.neighbors(idx),
+                key=lambda item: item[1] + self.g[item[0]],
+            )
+            # Cells away from the robot may not be settled yet.
+            if not self.g[nxt] < self.g[idx]:
+                break
+            cells.append(nxt)
+            idx = nxt
+        return cells
+
+    def segments_clear(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> np.ndarray:
+        """Whether each segment crosses only cells believed free, and is
+        collision-free.
+
+        Every segment is traced through the grid twice, offset a little to
+        either side, so that segments through the corner where four cells
+        meet also check the two cells beside it, like diagonal moves do.
+        Since only cell centers are checked for blocked cells, a segment
+        between them can still graze an obstacle, so segments are also
+        checked against the environment. That check only ever rules out a
+        shortcut of the plan, which is still built from the believed cells.
+        """
+        starts, ends = np.broadcast_arrays(
+            np.asarray(starts, dtype=float).reshape(-1, 2),
+            np.asarray(ends, dtype=float).reshape(-1, 2),
+        )
+        clear = np.ones(len(starts), dtype=bool)
+        if not len(starts):
+            return clear
+        deltas = ends - starts
+        lengths = np.hypot(*deltas.T)
+        directions = deltas / np.maximum(lengths, 1e-12)[:, None]
+        normals = np.column_stack((-directions[:, 1], directions[:, 0]))
+        for side in (1e-6, -1e-6):
+            cells, valid = traverse_beams(
+                starts + normals * side / self.resolution,
+                directions,
+                lengths,
+                self.resolution,
+            )
+            i, j = cells[..., 0], cells[..., 1]
+            inside = (i >= 0) & (i < self.rows) & (j >= 0) & (j < self.cols)
+            clear &= ~(valid & ~inside).any(axis=1)
+            ii, jj = i[valid & inside], j[valid & inside]
+            blocked = np.zeros(valid.shape, dtype=bool)
+            blocked[valid & inside] = self.cells_blocked(ii, jj)
+            clear &= ~blocked.any(axis=1)
+        if clear.any():
+            clear[clear] = self.env.segments_collision_free(
+                starts[clear], ends[clear], self.robot.radius
+            )
+        return clear
+
+    def cells_blocked(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Batched `is_blocked` for arrays of rows and columns."""
+        if self.sensor_range is not None:
+            return self.known[i, j]
+        unknown = self.truth[i, j] == UNKNOWN
+        if unknown.any():
+            ui, uj = i[unknown], j[unknown]
+            centers = np.column_stack((uj, ui)) / self.resolution
+            self.truth[ui, uj] = self.env.points_in_collision(
+                centers, self.robot.radius
+            )
+        return self.truth[i, j].astype(bool)
+
+    def smoothed_path(self) -> list[Position]:
+        """The current plan from the robot's position, post-processed as
+        configured by `smoothing`."""
+        assert self.params.smoothing is not None
+        cells = np.array(self.plan_cells(), dtype=np.intp)
+        i, j = np.divmod(cells, self.cols)
+        points = np.vstack(
+            (
+                (self.robot.pos.x, self.robot.pos.y),
+                np.column_stack((j[1:], i[1:])) / self.resolution,
+            )
+        )
+        points = smooth_path(
+            points,
+            self.params.smoothing,
+            self.segments_clear,
+            spacing=0.5 / self.resolution,
+            step=self.pace,
+        )
+        logger.debug(
+            f"Post-processed a plan of {len(cells) - 1} moves into "
+            f"{len(points)} waypoints."
+        )
+        return [Position(x, y) for x, y in points.tolist()]
@@ -0,0 +1,151 @@
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ...components.env_objects import Target
+from ...components.mapping import OccupancyMap
+from ...components.sensors import BasicProximitySensor
+from ...logging import get_logger
+from ...utils import Position
+from ..base import Algorithm
+from .dstarlite import MOVES, STRAIGHT, grid_distances
+
+if TYPE_CHECKING:
+    from ...components import Env, Robot
+    from ...config import FrontierExplorationConfig
+
+logger = get_logger(__name__)
+
+
+class FrontierExploration(Algorithm):
+    """Frontier-based exploration of an unknown environment.
+
+    The robot builds an `OccupancyMap` from the sweeps of its proximity
+    sensor and only plans on what it has seen: cells not known to be free,
+    and cells within the robot's radius of an occupied cell, are blocked.
+    Every step the cheapest paths from the robot's cell are recomputed on
+    that map. If a cell from which the robot would touch the target is
+    known and reachable, the robot heads for the nearest one; otherwise it
+    heads for the frontier, a free cell next to unknown space,
+    that minimizes its path length plus `target_weight` times its straight
+    line distance to the target. Frontiers the robot has stood on without
+    resolving, such as unknown cells hidden between beams, are not chosen
+    again. The run ends when no frontier is left. The map covers the whole
+    environment, so tiled worlds are not supported.
+    """
+
+    def __init__(
+        self,
+        env: "Env",
+        robot: "Robot",
+        start: Position,
+        target: Target,
+        params: "FrontierExplorationConfig",
+    ) -> None:
+        if env.world is not None:
+            raise ValueError(
+                "Frontier exploration maps the whole environment and cannot "
+                "run in a tiled world."
+            )
+        super().__init__(env, robot, start, target, params)
+        self.params: "FrontierExplorationConfig" = params
+        sensor = getattr(robot, "sensor", None)
+        if not isinstance(sensor, BasicProximitySensor):
+            raise ValueError(
+                "Frontier exploration needs a robot whose primary sensor is "
+                "a BasicProximitySensor."
+            )
+        if robot.belief is None:
+            robot.belief = OccupancyMap(env.size, params.resolution)
+        self.belief: OccupancyMap = robot.belief
+        self.goal = self.belief.cell_of(target.pos)
+        # Cells from which the robot touches the target. The padded
+        # footprint of `OccupancyMap.blocked` can block the target's own
+        # cell next to an obstacle while the robot still fits beside it.
+        ii, jj = np.indices(self.belief.shape)
+        res = self.belief.resolution
+        self.goal_cells = np.hypot(
+            jj / res - target.pos.x, ii / res - target.pos.y
+        ) <= (robot.radius + target.radius)
+        self.goal_cells[self.goal] = True
+        self.frontier: tuple[int, int] | None = None
+        # Frontier cells already visited.
+        self.exhausted = np.zeros(self.belief.shape, dtype=bool)
+        if not self.belief.scans:
+            # Sim senses after the first step, so take a first look here.
+            sensor.sense(env, robot.pos, robot.radius)
+            robot.update_belief()
+
+    def select_goal(self, dist: np.ndarray) -> tuple[int, int] | None:
+        """Cell to head for given path costs `dist` from the robot."""
+        ii, jj = np.nonzero(self.goal_cells & np.isfinite(dist))
+        if len(ii):
+            best = int(np.argmin(dist[ii, jj]))
+            return int(ii[best]), int(jj[best])
+        frontiers = self.belief.frontiers() & ~self.exhausted
+        ii, jj = np.nonzero(frontiers & np.isfinite(dist))
+        if not len(ii):
+            return None
+        res = self.belief.resolution
+        target = self.target.pos
+        travel = dist[ii, jj] / (STRAIGHT * res)
+        remaining = np.hypot(jj / res - target.x, ii / res - target.y)
+        best = int(np.argmin(travel + self.params.target_weight * remaining))
+        return int(ii[best]), int(jj[best])
+
+    def first_move(
+        self,
+        dist: np.ndarray,
+        blocked: np.ndarray,
+        source: tuple[int, int],
+        goal: tuple[int, int],
+    ) -> tuple[int, int]:
+        """Cell after `source` on a cheapest path to `goal`, found by
+        walking the path costs back from the goal."""
+        rows, cols = dist.shape
+        cell = goal
+        while True:
+            i, j = cell
+            best, best_cost = None, dist[i, j]
+            for di, dj, cost in MOVES:
+                ni, nj = i - di, j - dj
+                if not (0 <= ni < rows and 0 <= nj < cols):
+                    continue
+                # The same corner rule as `grid_distances`.
+                if di and dj and (blocked[ni, j] or blocked[i, nj]):
+                    continue
+                if dist[ni, nj] + cost <= best_cost:
+                    best, best_cost = (ni, nj), dist[ni, nj] + cost
+            if best is None or best == source:
+                return cell
+            cell = best
+
+    def step(self) -> tuple[Position | None, float]:
+        belief = self.belief
+        source = belief.cell_of(self.robot.pos)
+        if self.goal_cells[source]:
+            return self.target.pos, self.robot.orientation
+        if source == self.frontier:
+            self.exhausted[source] = True
+        blocked = belief.blocked(self.robot.radius)
+        blocked[source] = False
+        rows, cols = blocked.shape
+        dist = grid_distances(blocked, source[0] * cols + source[1])
+        dist = dist.reshape(rows, cols)
+        goal = self.select_goal(dist)
+        if goal is None:
+            logger.warning("No frontier left to explore.")
+            return None, self.robot.orientation
+        if goal != self.frontier:
+            logger.debug(f"Heading for cell {goal}.")
+            self.frontier = goal
+        next_pos = belief.cell_position(
+            *self.first_move(dist, blocked, source, goal)
+        )
+        orientation = math.degrees(
+            math.atan2(
+                next_pos.y - self.robot.pos.y, next_pos.x - self.robot.pos.x
+            )
+        )
+        return next_pos, orientation
@@ -0,0 +1,179 @@
+import heapq
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ...cache import artifact_key
+from ...components.env_objects import Target
+from ...geometry import KDTree
+from ...logging import get_logger
+from ...utils import Position
+from ..base import PathFollowingAlgorithm
+
+if TYPE_CHECKING:
+    from ...components import Env, Robot
+    from ...config import PRMConfig
+
+logger = get_logger(__name__)
+
+# Upper bound on the number of edges collision-checked in one batch.
+EDGE_BATCH = 1 << 15
+
+
+@dataclass
+class Roadmap:
+    """Collision-free sample nodes of shape (n, 2) and the undirected edges
+    between them as index pairs of shape (m, 2)."""
+
+    nodes: np.ndarray
+    edges: np.ndarray
+
+
+class PRM(PathFollowingAlgorithm):
+    """Probabilistic roadmap planner.
+
+    The roadmap is built in batches: samples are collision-checked all at
+    once, neighbors come from a KD-tree over the samples, and candidate
+    edges are checked in large batches against the environment. Since the
+    roadmap depends only on the map and the planner settings, it is stored
+    in the artifact cache, when one is configured, under a hash of both and
+    reused by later runs.
+    """
+
+    def __init__(
+        self,
+        env: "Env",
+        robot: "Robot",
+        start: Position,
+        target: Target,
+        params: "PRMConfig",
+    ) -> None:
+        super().__init__(env, robot, start, target, params)
+        self.params: "PRMConfig" = params
+        self.roadmap: Roadmap | None = None
+
+    def load_roadmap(self) -> Roadmap:
+        if self.cache is None:
+            return self.build_roadmap()
+        key = artifact_key(
+            "prm",
+            map=self.env.content_hash(),
+            radius=self.robot.radius,
+            num_samples=self.params.num_samples,
+            connection_radius=self.params.connection_radius,
+            max_neighbors=self.params.max_neighbors,
+            seed=self.params.seed,
+        )
+        arrays = self.cache.get_or_compute(
+            key, lambda: vars(self.build_roadmap())
+        )
+        return Roadmap(nodes=arrays["nodes"], edges=arrays["edges"])
+
+    def build_roadmap(self) -> Roadmap:
+        params = self.params
+        radius = self.robot.radius
+        rng = np.random.default_rng(params.seed)
+        samples = rng.uniform((0, 0), self.env.size, (params.num_samples, 2))
+        nodes = samples[~self.env.points_in_collision(samples, radius)]
+
+        tree = KDTree.from_points(nodes)
+        pairs = []
+        for i, (x, y) in enumerate(nodes.tolist()):
+            near = tree.within(x, y, params.connection_radius)
+            near = near[near != i]
+            k = params.max_neighbors
+            if len(near) > k:
+                dists = np.hypot(nodes[near, 0] - x, nodes[near, 1] - y)
+                near = near[np.argpartition(dists, k)[:k]]
+            pairs.append(np.column_stack((np.full(len(near), i), near)))
+        edges = np.empty((0, 2), dtype=np.intp)
+        if pairs:
+            edges = np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+
+        free = np.empty(len(edges), dtype=bool)
+        for start in range(0, len(edges), EDGE_BATCH):
+            stop = start + EDGE_BATCH
+            batch = edges[start:stop]
+            free[start:stop] = self.env.segments_collision_free(
+                nodes[batch[:, 0]], nodes[batch[:, 1]], radius
+            )
+        edges = edges[free]
+        logger.info(
+            f"Built PRM roadmap with {len(nodes)} nodes and {len(edges)} "
+            "edges."
+        )
+        return Roadmap(nodes=nodes, edges=edges)
+
+    def connect(self, nodes: np.ndarray, pos: Position) -> np.ndarray:
+        """Edges from `pos` to every roadmap node it can reach directly,
+        within the connection radius."""
+        dists = np.hypot(nodes[:, 0] - pos.x, nodes[:, 1] - pos.y)
+        near = np.nonzero(dists <= self.params.connection_radius)[0]
+        free = self.env.segments_collision_free(
+            (pos.x, pos.y), nodes[near], self.robot.radius
+        )
+        return near[free]
+
+    def plan(self) -> list[Position] | None:
+        if self.roadmap is None:
+            self.roadmap = self.load_roadmap()
+        start, goal = self.robot.pos, self.target.pos
+        nodes = np.vstack(
+            (self.roadmap.nodes, (start.x, start.y), (goal.x, goal.y))
+        )
+        start_idx, goal_idx = len(nodes) - 2, len(nodes) - 1
+        edges = [self.roadmap.edges.reshape(-1, 2)]
+        for idx, pos in ((start_idx, start), (goal_idx, goal)):
+            near = self.connect(self.roadmap.nodes, pos)
+            edges.append(np.column_stack((np.full(len(near), idx), near)))
+        if self.env.segments_collision_free(
+            (start.x, start.y), (goal.x, goal.y), self.robot.radius
+        )[0]:
+            edges.append(np.array([(start_idx, goal_idx)]))
+
+        path = self.shortest_path(
+            nodes, np.concatenate(edges), start_idx, goal_idx
+        )
+        if path is None:
+            return None
+        return [Position(*nodes[idx].tolist()) for idx in path]
+
+    @staticmethod
+    def shortest_path(
+        nodes: np.ndarray, edges: np.ndarray, source: int, sink: int
+    ) -> list[int] | None:
+        """A* over the undirected roadmap with Euclidean edge lengths."""
+        both = np.vstack((edges, edges[:, ::-1]))
+        order = np.argsort(both[:, 0], kind="stable")
+        targets = both[order, 1]
+        offsets = np.searchsorted(both[order, 0], np.arange(len(nodes) + 1))
+        lengths = np.hypot(*(nodes[targets] - nodes[both[order, 0]]).T)
+        heuristic = np.hypot(*(nodes - nodes[sink]).T).tolist()
+        targets_list, lengths_list = targets.tolist(), lengths.tolist()
+        offsets_list = offsets.tolist()
+
+        best = {source: 0.0}
+        parents = {source: -1}
+        queue = [(heuristic[source], source)]
+        closed = set()
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node in closed:
+                continue
+            if node == sink:
+                path = []
+                while node >= 0:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1]
+            closed.add(node)
+            for k in range(offsets_list[node], offsets_list[node + 1]):
+                nxt = targets_list[k]
+                cost = best[node] + lengths_list[k]
+                if cost < best.get(nxt, math.inf):
+                    best[nxt] = cost
+                    parents[nxt] = node
+                    heapq.heappush(queue, (cost + heuristic[nxt], nxt))
+        return None
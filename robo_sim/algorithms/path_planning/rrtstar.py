@@ -0,0 +1,269 @@
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ...components.env_objects import Target
+from ...geometry import KDTree
+from ...logging import get_logger
+from ...utils import Position
+from ..base import PathFollowingAlgorithm
+
+if TYPE_CHECKING:
+    from ...components import Env, Robot
+    from ...config import RRTStarConfig
+
+logger = get_logger(__name__)
+
+# Samples drawn from the generator at once.
+SAMPLE_BATCH = 1024
+# Most samples extended in one round; a round also never exceeds
+# 1 / ROUND_SHARE of the tree's nodes.
+MAX_ROUND = 64
+ROUND_SHARE = 8
+
+
+@dataclass
+class Extension:
+    """Candidate node of a round, with the tree nodes within
+    `rewire_radius` of it and which of the edges to them are known to be
+    collision-free."""
+
+    x: float
+    y: float
+    near: np.ndarray
+    lengths: np.ndarray
+    checked: np.ndarray
+    free: np.ndarray
+
+
+class RRTStar(PathFollowingAlgorithm):
+    """RRT* in the continuous plane.
+
+    Every iteration extends the tree towards a random sample, picks the
+    cheapest collision-free parent among the nodes within `rewire_radius`
+    and then rewires those nodes through the new one where that is
+    cheaper. Neighbor lookups go through an incremental KD-tree.
+
+    The tree grows in rounds of samples that are extended from the tree as
+    it was when the round started, so that the edges of a whole round are
+    collision-checked in one batch; the same check serves both parent
+    selection and rewiring, since edges are undirected. Only the cheapest
+    edge of each new node and the edges it could rewire are checked up
+    front, and any other edge once it matters. Rounds grow with the tree,
+    up to `MAX_ROUND` samples but never more than 1 / `ROUND_SHARE` of its
+    nodes, so a small tree grows one sample at a time.
+    """
+
+    def __init__(
+        self,
+        env: "Env",
+        robot: "Robot",
+        start: Position,
+        target: Target,
+        params: "RRTStarConfig",
+    ) -> None:
+        super().__init__(env, robot, start, target, params)
+        self.params: "RRTStarConfig" = params
+        self.rng = np.random.default_rng(params.seed)
+        self.tree = KDTree(leaf_size=256, capacity=params.max_nodes)
+        self.parents = np.full(params.max_nodes, -1, dtype=np.intp)
+        self.costs = np.full(params.max_nodes, np.inf)
+        self.children: list[list[int]] = []
+        self._samples: list[list[float]] = []
+        self._goal_draws: list[bool] = []
+        self._sample_idx = 0
+
+    def sample(self) -> tuple[float, float]:
+        if self._sample_idx == len(self._samples):
+            width, height = self.env.size
+            self._samples = self.rng.uniform(
+                (0, 0), (width, height), (SAMPLE_BATCH, 2)
+            ).tolist()
+            self._goal_draws = (
+                self.rng.random(SAMPLE_BATCH) < self.params.goal_bias
+            ).tolist()
+            self._sample_idx = 0
+        idx = self._sample_idx
+        self._sample_idx += 1
+        if self._goal_draws[idx]:
+            return self.target.pos.x, self.target.pos.y
+        x, y = self._samples[idx]
+        return x, y
+
+    def add_node(self, x: float, y: float, parent: int, cost: float) -> int:
+        idx = self.tree.insert(x, y)
+        self.parents[idx] = parent
+        self.costs[idx] = cost
+        self.children.append([])
+        if parent >= 0:
+            self.children[parent].append(idx)
+        return idx
+
+    def reparent(self, idx: int, parent: int, cost: float) -> None:
+        old = self.parents[idx]
+        self.children[old].remove(idx)
+        self.children[parent].append(idx)
+        self.parents[idx] = parent
+        delta = cost - self.costs[idx]
+        # Shift the cost of the whole subtree.
+        stack = [idx]
+        while stack:
+            node = stack.pop()
+            self.costs[node] += delta
+            stack.extend(self.children[node])
+
+    def extend(self, x: float, y: float) -> Extension | None:
+        """New node toward the sample (x, y), with the nodes within
+        `rewire_radius` of it and their distances, or None if the sample
+        adds nothing."""
+        params = self.params
+        points = self.tree.points
+        # Once the tree is dense, the sample is usually within a step of
+        # the tree and needs no steering, so a single radius query yields
+        # both the nearest node and the rewiring candidates.
+        near = self.tree.within(x, y, params.rewire_radius)
+        edge_lengths = np.hypot(points[near, 0] - x, points[near, 1] - y)
+        if not len(near) or edge_lengths.min() > params.step_size:
+            if len(near):
+                k = int(edge_lengths.argmin())
+                nearest, dist = int(near[k]), float(edge_lengths[k])
+            else:
+                nearest, dist = self.tree.nearest(x, y)
+            if dist == 0:
+                return None
+            nx, ny = points[nearest]
+            scale = params.step_size / dist
+            x, y = nx + (x - nx) * scale, ny + (y - ny) * scale
+            near = self.tree.within(x, y, params.rewire_radius)
+            if not len(near):
+                near = np.array([nearest])
+            edge_lengths = np.hypot(points[near, 0] - x, points[near, 1] - y)
+        elif edge_lengths.min() == 0:
+            return None
+        unknown = np.zeros(len(near), dtype=bool)
+        return Extension(x, y, near, edge_lengths, unknown, unknown.copy())
+
+    def check_edges(
+        self, extensions: list[Extension], masks: list[np.ndarray]
+    ) -> None:
+        """Collision-check the edges selected by `masks` that are not
+        checked yet, of all `extensions` in one batch."""
+        masks = [mask & ~ext.checked for ext, mask in zip(extensions, masks)]
+        if not any(mask.any() for mask in masks):
+            return
+        picks = [np.flatnonzero(mask) for mask in masks]
+        sizes = [len(pick) for pick in picks]
+        points = self.tree.points
+        free = self.env.segments_collision_free(
+            points[
+                np.concatenate([e.near[p] for e, p in zip(extensions, picks)])
+            ],
+            np.repeat([(ext.x, ext.y) for ext in extensions], sizes, axis=0),
+            self.robot.radius,
+        )
+        splits = np.cumsum(sizes)[:-1]
+        for ext, pick, result in zip(
+            extensions, picks, np.split(free, splits)
+        ):
+            ext.checked[pick] = True
+            ext.free[pick] = result
+
+    def plan(self) -> list[Position] | None:
+        params = self.params
+        radius = self.robot.radius
+        goal = self.target.pos
+        self.add_node(self.robot.pos.x, self.robot.pos.y, -1, 0.0)
+        best_goal, best_cost = -1, math.inf
+
+        iterations = 0
+        done = False
+        while not done and iterations < params.max_iterations:
+            size = len(self.tree)
+            if size >= params.max_nodes:
+                break
+            count = min(
+                max(size // ROUND_SHARE, 1),
+                MAX_ROUND,
+                params.max_nodes - size,
+                params.max_iterations - iterations,
+            )
+            iterations += count
+            extensions = []
+            for _ in range(count):
+                extension = self.extend(*self.sample())
+                if extension is not None:
+                    extensions.append(extension)
+            # Check the cheapest edge of every new node, which is usually
+            # its parent, and the edges it would then rewire, and all edges
+            # of the nodes whose cheapest edge is blocked.
+            masks = []
+            for ext in extensions:
+                costs = self.costs[ext.near]
+                k = int((costs + ext.lengths).argmin())
+                mask = costs[k] + ext.lengths[k] + ext.lengths < costs
+                mask[k] = True
+                masks.append(mask)
+            self.check_edges(extensions, masks)
+            self.check_edges(
+                extensions,
+                [
+                    ~ext.free[mask].any()
+                    for ext, mask in zip(extensions, masks)
+                ],
+            )
+
+            for ext in extensions:
+                near, edge_lengths = ext.near, ext.lengths
+                # Rewiring earlier in the round lowers costs, which can
+                # make edges that were not checked matter.
+                costs = self.costs[near] + edge_lengths
+                best = np.where(ext.free, costs, np.inf).min()
+                self.check_edges([ext], [costs < best])
+                candidate_costs = np.where(ext.free, costs, np.inf)
+                k = int(candidate_costs.argmin())
+                new_cost = float(candidate_costs[k])
+                if math.isinf(new_cost):
+                    continue
+                x, y = ext.x, ext.y
+                new = self.add_node(x, y, int(near[k]), new_cost)
+
+                rewire = new_cost + edge_lengths < self.costs[near]
+                self.check_edges([ext], [rewire])
+                rewire &= ext.free
+                for n, length in zip(near[rewire], edge_lengths[rewire]):
+                    self.reparent(int(n), new, new_cost + float(length))
+
+                goal_dist = math.hypot(goal.x - x, goal.y - y)
+                if goal_dist <= params.goal_tolerance:
+                    if new_cost + goal_dist < best_cost:
+                        best_goal, best_cost = new, new_cost + goal_dist
+                    if params.stop_at_goal:
+                        done = True
+                        break
+
+        logger.info(
+            f"RRT* grew {len(self.tree)} nodes; best path cost "
+            f"{best_cost:.2f}."
+        )
+        if best_goal < 0:
+            return None
+        # Rewiring may have lowered costs since the goal node was found.
+        points = self.tree.points
+        near = self.tree.within(goal.x, goal.y, params.goal_tolerance)
+        totals = self.costs[near] + np.hypot(
+            points[near, 0] - goal.x, points[near, 1] - goal.y
+        )
+        node = int(near[totals.argmin()])
+        path = []
+        while node >= 0:
+            path.append(Position(*points[node].tolist()))
+            node = int(self.parents[node])
+        path.reverse()
+        last = path[-1]
+        if self.env.segments_collision_free(
+            (last.x, last.y), (goal.x, goal.y), radius
+        )[0]:
+            path.append(goal)
+        return path
@@ -0,0 +1,241 @@
+import math
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from ..logging import get_logger
+
+if TYPE_CHECKING:
+    from ..config import PathSmoothingConfig
+
+logger = get_logger(__name__)
+
+# Takes segment starts and ends of shape (n, 2), either of which may be a
+# single point, and returns whether each segment is collision-free.
+SegmentCheck = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def dedupe(points: np.ndarray) -> np.ndarray:
+    """`points` without consecutive repeats."""
+    steps = np.hypot(*np.diff(points, axis=0).T)
+    return points[np.concatenate(([True], steps > 1e-9))]
+
+
+def shortcut(
+    points: np.ndarray, clear: SegmentCheck, window: int = 64
+) -> np.ndarray:
+    """Drop the waypoints of a path that can be skipped in a straight line.
+
+    From the first waypoint, the line of sight to each of the next
+    `window` waypoints is checked in one call of `clear`, the path jumps to
+    the farthest one in sight, and the search continues from there. The
+    segment to the next waypoint is never checked, so the result is never
+    less safe than the input.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Waypoints of shape (n, 2).
+    clear : SegmentCheck
+        Collision check of segments.
+    window : int, optional
+        Number of waypoints checked from each kept one, by default 64
+
+    Returns
+    -------
+    np.ndarray
+        The kept waypoints, including both ends.
+    """
+    last = len(points) - 1
+    kept = [0]
+    i = 0
+    while i < last:
+        stop = min(i + window, last)
+        candidates = np.arange(i + 2, stop + 1)
+        j = i + 1
+        if len(candidates):
+            visible = candidates[clear(points[i], points[candidates])]
+            if len(visible):
+                j = int(visible[-1])
+        kept.append(j)
+        i = j
+    return points[kept]
+
+
+def corner_arcs(
+    points: np.ndarray, radius: np.ndarray, spacing: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Path through `points` with every inner corner replaced by an arc.
+
+    The arc of each corner has the corner's `radius` and is tangent to both
+    of its segments. It may use all of an end segment but only half of a
+    segment shared with another corner, and where that is too short the
+    arc is tightened to fit.
+
+    Returns
+    -------
+    path : np.ndarray
+        Points of shape (m, 2) with arcs sampled at most `spacing` apart.
+    owner : np.ndarray
+        Corner each point belongs to, or -1 for the ends of the path.
+    curvature : np.ndarray
+        Curvature of the arc of each corner, 0 where the path runs straight
+        and inf where the corner stays sharp.
+    """
+    prev, corner, nxt = points[:-2], points[1:-1], points[2:]
+    len_in = np.hypot(*(corner - prev).T)
+    len_out = np.hypot(*(nxt - corner).T)
+    u_in = (corner - prev) / len_in[:, None]
+    u_out = (nxt - corner) / len_out[:, None]
+    turn = np.arccos(np.clip((u_in * u_out).sum(axis=1), -1.0, 1.0))
+    left = np.sign(u_in[:, 0] * u_out[:, 1] - u_in[:, 1] * u_out[:, 0])
+
+    room_in, room_out = len_in.copy(), len_out.copy()
+    room_in[1:] /= 2
+    room_out[:-1] /= 2
+    tan_half = np.tan(turn / 2)
+    tangent = np.minimum(radius * tan_half, np.minimum(room_in, room_out))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radius = np.where(tan_half > 1e-12, tangent / tan_half, 0.0)
+        curvature = np.where(tan_half > 1e-12, 1.0 / radius, 0.0)
+    start = corner - u_in * tangent[:, None]
+    normal = np.column_stack((-u_in[:, 1], u_in[:, 0])) * left[:, None]
+    center = start + normal * radius[:, None]
+    offset = start - center
+    phase = np.arctan2(offset[:, 1], offset[:, 0])
+
+    counts = np.maximum(np.ceil(turn * radius / spacing), 1).astype(int) + 1
+    owner = np.repeat(np.arange(len(counts)), counts)
+    first = np.cumsum(counts) - counts
+    frac = (np.arange(len(owner)) - first[owner]) / (counts[owner] - 1)
+    angle = phase[owner] + (left * turn)[owner] * frac
+    arcs = center[owner] + radius[owner, None] * np.column_stack(
+        (np.cos(angle), np.sin(angle))
+    )
+    path = np.vstack((points[:1], arcs, points[-1:]))
+    return path, np.concatenate(([-1], owner, [-1])), curvature
+
+
+def round_corners(
+    points: np.ndarray,
+    max_curvature: float,
+    clear: SegmentCheck,
+    spacing: float,
+) -> np.ndarray | None:
+    """Round the corners of a path with arcs of curvature `max_curvature`.
+
+    The chords of all arcs are collision-checked in one call of `clear`.
+    An arc that does not fit between its neighbors would have to be
+    tighter, so where one does not fit or collides, the corners cannot be
+    rounded within `max_curvature` and None is returned.
+    """
+    if len(points) < 3:
+        return points
+    radius = np.full(len(points) - 2, 1.0 / max_curvature)
+    path, owner, curvature = corner_arcs(points, radius, spacing)
+    tight = int(np.count_nonzero(curvature > max_curvature * (1 + 1e-9)))
+    if tight:
+        logger.debug(
+            f"{tight} of {len(curvature)} corners have no room for an arc "
+            f"of curvature {max_curvature}."
+        )
+        return None
+    inner = (owner[1:] == owner[:-1]) & (owner[1:] >= 0)
+    colliding = ~clear(path[:-1][inner], path[1:][inner])
+    if colliding.any():
+        count = len(np.unique(owner[1:][inner][colliding]))
+        logger.debug(
+            f"The arcs of {count} of {len(curvature)} corners collide."
+        )
+        return None
+    return path
+
+
+def resample(
+    points: np.ndarray, spacing: float, clear: SegmentCheck
+) -> np.ndarray:
+    """Points along the path through `points`, `spacing` apart by arc
+    length from its start, and its end.
+
+    Chords between the new points can cut the path's corners, so they are
+    checked in one call of `clear`, and the original points within those
+    that collide are kept.
+    """
+    lengths = np.concatenate(
+        ([0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T)))
+    )
+    total = float(lengths[-1])
+    if total <= 0:
+        return points[-1:]
+    stations = np.append(
+        np.arange(math.ceil(total / spacing)) * spacing, total
+    )
+    resampled = np.column_stack(
+        (
+            np.interp(stations, lengths, points[:, 0]),
+            np.interp(stations, lengths, points[:, 1]),
+        )
+    )
+    blocked = ~clear(resampled[:-1], resampled[1:])
+    if not blocked.any():
+        return resampled
+    chord = np.searchsorted(stations, lengths, side="right") - 1
+    inner = (chord >= 0) & (chord < len(blocked))
+    inner[inner] &= blocked[chord[inner]]
+    stations = np.union1d(stations, lengths[inner])
+    return np.column_stack(
+        (
+            np.interp(stations, lengths, points[:, 0]),
+            np.interp(stations, lengths, points[:, 1]),
+        )
+    )
+
+
+def smooth_path(
+    points: np.ndarray,
+    config: "PathSmoothingConfig",
+    clear: SegmentCheck,
+    spacing: float,
+    step: float | None = None,
+) -> np.ndarray:
+    """Post-process a planned path before it is followed.
+
+    Corners are rounded either all within `max_curvature` or not at all,
+    so the path never turns more sharply than the bound on an arc; if
+    some corner has no room for its arc, the path keeps the sharp corners
+    of the shortcut stage.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Waypoints of shape (n, 2), from the robot's position to the goal.
+    config : PathSmoothingConfig
+        Which stages run, and how.
+    clear : SegmentCheck
+        Collision check of segments.
+    spacing : float
+        Largest distance between the points sampled on rounded corners.
+    step : float | None, optional
+        Spacing at which the result is resampled, by default None to keep
+        the waypoints
+
+    Returns
+    -------
+    np.ndarray
+        Waypoints of shape (m, 2) with the same ends.
+    """
+    points = dedupe(np.asarray(points, dtype=float))
+    if config.shortcut:
+        points = shortcut(points, clear, config.shortcut_window)
+    if config.max_curvature is not None:
+        rounded = round_corners(points, config.max_curvature, clear, spacing)
+        if rounded is None:
+            logger.info(
+                "Corners cannot be rounded within a curvature of "
+                f"{config.max_curvature}, so they are left sharp."
+            )
+        else:
+            points = dedupe(rounded)
+    if step is not None and config.resample:
+        points = resample(points, step, clear)
+    return points
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+Arrays = dict[str, np.ndarray]
+
+
+def artifact_key(kind: str, **parts: Any) -> str:
+    """Stable cache key for an artifact of `kind` computed from `parts`,
+    which must be JSON-serializable."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode()).hexdigest()[:24]
+    return f"{kind}-{digest}"
+
+
+class ArtifactCache:
+    """Size-bounded on-disk store of precomputed numpy arrays.
+
+    Each artifact is a single ``.npz`` file named after its key. Reading an
+    artifact refreshes its modification time, and whenever the cache grows
+    past `max_bytes` the files used least recently are deleted first.
+    Writes go through a temporary file, so concurrent runs sharing a cache
+    directory never read a partial artifact.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 256 << 20) -> None:
+        self.root = Path(root).expanduser()
+        self.max_bytes = max_bytes
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.npz"
+
+    def load(self, key: str) -> Arrays | None:
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        logger.debug(f"Cache hit for {key}.")
+        return arrays
+
+    def store(self, key: str, arrays: Arrays) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], Arrays]
+    ) -> Arrays:
+        """Load the artifact stored under `key`, computing and storing it
+        first if it is missing."""
+        arrays = self.load(key)
+        if arrays is None:
+            arrays = compute()
+            self.store(key, arrays)
+        return arrays
+
+    def evict(self, keep: Path | None = None) -> None:
+        """Delete the least recently used artifacts until the cache fits in
+        `max_bytes`, never deleting `keep`."""
+        entries = []
+        for path in self.root.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted {path} from the cache.")
@@ -0,0 +1,71 @@
+import argparse
+import sys
+from pathlib import Path
+
+from robo_sim.golden import GoldenSet, backend_registry, format_report
+from robo_sim.pool import Episode
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="robo_sim golden",
+        description="Record reference trajectories of seeded runs, and check "
+        "that other engine backends reproduce them.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser(
+        "record", help="Record golden trajectories with the reference engine."
+    )
+    record.add_argument("directory", type=Path, help="Golden set directory.")
+    record.add_argument("env", type=Path, help="Environment config file.")
+    record.add_argument("robot", type=Path, help="Robot config file.")
+    record.add_argument("algorithm", type=Path, help="Algorithm config file.")
+    record.add_argument(
+        "--seeds",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="Seeds of the random maps, one case per seed.",
+    )
+
+    check = commands.add_parser(
+        "check", help="Replay golden cases on backends and compare them."
+    )
+    check.add_argument("directory", type=Path, help="Golden set directory.")
+    check.add_argument(
+        "--backends",
+        nargs="+",
+        choices=sorted(backend_registry),
+        default=sorted(backend_registry),
+        help="Backends to check, by default all that are available.",
+    )
+    check.add_argument(
+        "--tolerance",
+        type=float,
+        default=1e-9,
+        help="Largest accepted difference in positions, orientations and "
+        "sensor readings.",
+    )
+    args = parser.parse_args(argv)
+
+    golden = GoldenSet(args.directory)
+    if args.command == "record":
+        stem = "-".join(p.stem for p in (args.env, args.robot, args.algorithm))
+        golden.record(
+            {
+                f"{stem}-{seed}": Episode(
+                    args.env, args.robot, args.algorithm, seed=seed
+                )
+                for seed in args.seeds
+            }
+        )
+        return
+    if not golden.cases:
+        parser.error(f"{args.directory} holds no golden trajectories.")
+    comparisons = golden.check(
+        [backend_registry[name] for name in args.backends], args.tolerance
+    )
+    sys.stdout.write(format_report(comparisons) + "\n")
+    if not all(c.equivalent for c in comparisons):
+        sys.exit(1)
@@ -0,0 +1,31 @@
+import argparse
+import sys
+from pathlib import Path
+
+from robo_sim.metrics import aggregate_snapshots, write_atomic
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="robo_sim metrics",
+        description="Merge the metrics snapshots written by worker "
+        "processes into a single OpenMetrics report.",
+    )
+    parser.add_argument(
+        "directory", type=Path, help="Directory of metrics snapshots."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the report to this file instead of standard output.",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.directory.is_dir():
+        parser.error(f"{args.directory} is not a directory.")
+    text = aggregate_snapshots(args.directory).render()
+    if args.output is None:
+        sys.stdout.write(text)
+    else:
+        write_atomic(args.output, text)
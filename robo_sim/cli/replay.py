@@ -0,0 +1,123 @@
+import argparse
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+from matplotlib.widgets import Slider
+
+from robo_sim.components import Renderer
+from robo_sim.components.recorder import FrameRecorder, get_frame_writer
+from robo_sim.components.trajectory import TrajectoryReader
+
+# Upper bound on traced path vertices read from disk when seeking.
+MAX_PATH_POINTS = 20_000
+
+
+class ReplayViewer:
+    """Scrub through a recorded trajectory with the Renderer visuals."""
+
+    def __init__(
+        self,
+        reader: TrajectoryReader,
+        renderer: Renderer,
+    ) -> None:
+        self.reader = reader
+        self.renderer = renderer
+        self.frame = -1
+
+    def show_frame(self, frame: int) -> None:
+        frame = max(0, min(frame, len(self.reader) - 1))
+        if self.renderer.trace_path and frame != self.frame + 1:
+            # Seeking, so rebuild the path up to (excluding) this frame.
+            self.renderer.reset_path(
+                self.reader.positions(frame, max_points=MAX_PATH_POINTS)
+            )
+        self.renderer.render(self.reader[frame])
+        self.frame = frame
+
+    def export(self, start: int, stop: int, stride: int) -> None:
+        for frame in range(start, stop, stride):
+            if stride != 1 and self.renderer.trace_path:
+                self.frame = -1  # Force a path rebuild for strided frames.
+            self.show_frame(frame)
+            self.renderer.capture_frame()
+        self.renderer.close()
+
+    def interactive(self, start: int) -> None:
+        fig = self.renderer.fig
+        fig.subplots_adjust(bottom=0.15)
+        slider = Slider(
+            fig.add_axes((0.15, 0.03, 0.7, 0.03)),
+            "Frame",
+            0,
+            max(len(self.reader) - 1, 1),
+            valinit=start,
+            valstep=1,
+        )
+
+        def on_slide(value: float) -> None:
+            self.show_frame(int(value))
+            fig.canvas.draw_idle()
+
+        def on_key(event) -> None:
+            steps = {"right": 1, "left": -1, "up": 100, "down": -100}
+            if event.key in steps:
+                slider.set_val(
+                    max(0, min(self.frame + steps[event.key], slider.valmax))
+                )
+
+        slider.on_changed(on_slide)
+        fig.canvas.mpl_connect("key_press_event", on_key)
+        self.slider = slider
+        self.show_frame(start)
+        plt.show()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="robo_sim replay",
+        description="Replay a recorded RoboSim trajectory without "
+        "re-running the simulation.",
+    )
+    parser.add_argument("trajectory", type=Path, help="Trajectory file.")
+    parser.add_argument(
+        "--start", type=int, default=0, help="Frame to start from."
+    )
+    parser.add_argument(
+        "--stop", type=int, default=None, help="Frame to stop at (export)."
+    )
+    parser.add_argument(
+        "--stride", type=int, default=1, help="Frame stride (export)."
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        help="Export the frames to this video or .gif file instead of "
+        "opening the viewer.",
+    )
+    parser.add_argument(
+        "--fps", type=int, default=10, help="Frame rate of the export."
+    )
+    parser.add_argument(
+        "--no-trace",
+        action="store_true",
+        help="Do not draw the robot's path.",
+    )
+    args = parser.parse_args(argv)
+
+    reader = TrajectoryReader(args.trajectory)
+    if not len(reader):
+        parser.error(f"{args.trajectory} contains no frames.")
+
+    recorder = None
+    if args.record is not None:
+        recorder = FrameRecorder(get_frame_writer(args.record, args.fps))
+    renderer = Renderer(
+        reader.build_env(), trace_path=not args.no_trace, recorder=recorder
+    )
+    viewer = ReplayViewer(reader, renderer)
+    if recorder is not None:
+        stop = len(reader) if args.stop is None else args.stop
+        viewer.export(args.start, min(stop, len(reader)), args.stride)
+    else:
+        viewer.interactive(args.start)
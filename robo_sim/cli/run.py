@@ -1,15 +1,33 @@
 import argparse
+import sys
+from pathlib import Path
+from typing import Callable
 
 from robo_sim import Sim
+from robo_sim.metrics import MetricsExporter
 
+from . import golden, metrics, replay, scenarios, worker
 from .constants import (
     ALGORITHM_EXAMPLES_DIR,
     ENV_EXAMPLES_DIR,
     ROBOT_EXAMPLES_DIR,
 )
 
+subcommands: dict[str, Callable[[list[str]], None]] = {
+    "golden": golden.main,
+    "metrics": metrics.main,
+    "replay": replay.main,
+    "scenarios": scenarios.main,
+    "worker": worker.main,
+}
+
 
 def main() -> None:
+    argv = sys.argv[1:]
+    if argv and argv[0] in subcommands:
+        subcommands[argv[0]](argv[1:])
+        return
+
     parser = argparse.ArgumentParser(
         prog="robo_sim", description="Run RoboSim simulations."
     )
@@ -28,8 +46,50 @@ def main() -> None:
         default="DWA",
         help="The algorithm to use.",
     )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        help="Render offscreen and export the run to this video or .gif "
+        "file instead of opening a window.",
+    )
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=10,
+        help="Frame rate of the exported recording.",
+    )
+    parser.add_argument(
+        "--trajectory",
+        type=Path,
+        default=None,
+        help="Record the run to this trajectory file for `robo_sim replay`.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without opening a window.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        default=None,
+        help="Periodically write live metrics to this OpenMetrics file.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve live metrics at http://127.0.0.1:<port>/metrics.",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between metrics file updates.",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.env and args.robot and args.algorithm:
         env_config_path = ENV_EXAMPLES_DIR / f"{args.env.lower()}.yaml"
@@ -37,8 +97,30 @@ def main() -> None:
         algorithm_config_path = (
             ALGORITHM_EXAMPLES_DIR / f"{args.algorithm.lower()}.yaml"
         )
-        sim = Sim(env_config_path, robot_config_path, algorithm_config_path)
-        sim.run()
+        exporter = None
+        if args.metrics is not None or args.metrics_port is not None:
+            exporter = MetricsExporter(
+                path=args.metrics,
+                port=args.metrics_port,
+                interval=args.metrics_interval,
+            )
+        try:
+            sim = Sim(
+                env_config_path,
+                robot_config_path,
+                algorithm_config_path,
+                record_path=args.record,
+                fps=args.fps,
+                trajectory_path=args.trajectory,
+                headless=args.headless,
+                metrics=exporter,
+            )
+            sim.run()
+        finally:
+            # Release the port and write the final metrics even when the
+            # run fails.
+            if exporter is not None:
+                exporter.close()
     else:
         parser.print_help()
 
@@ -0,0 +1,50 @@
+import argparse
+from pathlib import Path
+
+from robo_sim.config import ScenarioConfig
+from robo_sim.logging import get_logger
+from robo_sim.scenarios import generate_suite
+from robo_sim.scenarios.suite import KINDS
+
+logger = get_logger(__name__)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="robo_sim scenarios",
+        description="Generate a suite of procedural benchmark maps.",
+    )
+    parser.add_argument("kind", choices=KINDS, help="Map generator.")
+    parser.add_argument("output", type=Path, help="Output .npz file.")
+    parser.add_argument(
+        "--count", type=int, default=1000, help="Number of maps."
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        nargs=2,
+        default=(64, 64),
+        metavar=("WIDTH", "HEIGHT"),
+        help="Map size in cells.",
+    )
+    parser.add_argument(
+        "--density", type=float, default=0.2, help="Clutter density."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="First seed.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes, by default one per CPU.",
+    )
+    args = parser.parse_args(argv)
+
+    config = ScenarioConfig(
+        kind=args.kind,
+        size=tuple(args.size),
+        density=args.density,
+        seed=args.seed,
+    )
+    suite = generate_suite(config, args.count, workers=args.workers)
+    suite.save(args.output)
+    logger.info(f"Saved {len(suite)} maps to {args.output}.")
@@ -0,0 +1,68 @@
+import argparse
+import logging
+
+from robo_sim.distributed import get_broker, serve
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="robo_sim worker",
+        description="Run episode batches submitted to a task broker by a "
+        "DistributedPool.",
+    )
+    parser.add_argument(
+        "broker",
+        help="A redis:// URL, or the path of an SQLite broker database.",
+    )
+    parser.add_argument(
+        "--name",
+        default=None,
+        help="Worker name in leases, by default the host name and process "
+        "id.",
+    )
+    parser.add_argument(
+        "--heartbeat",
+        type=float,
+        default=5.0,
+        help="Seconds between heartbeats while running a batch.",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=1.0,
+        help="Seconds between polls of an empty queue.",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="Exit once the queue has been empty for this many seconds.",
+    )
+    parser.add_argument(
+        "--max-tasks",
+        type=int,
+        default=None,
+        help="Exit after running this many batches.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Keep per-episode logging, which slows down short episodes.",
+    )
+    args = parser.parse_args(argv)
+
+    broker = get_broker(args.broker)
+    try:
+        serve(
+            broker,
+            name=args.name,
+            heartbeat=args.heartbeat,
+            poll=args.poll,
+            idle_timeout=args.idle_timeout,
+            max_tasks=args.max_tasks,
+            log_level=None if args.verbose else logging.WARNING,
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close()
@@ -1,9 +1,27 @@
 from ._robot_factory import get_robot
+from .costmap import Costmap
 from .env import Env
+from .kinematics import (
+    Bicycle,
+    DifferentialDrive,
+    KinematicModel,
+    Unicycle,
+    get_kinematic_model,
+)
+from .mapping import OccupancyMap
 from .renderer import Renderer
 from .robot import BasicRobot, Robot, SensorRobot
-from .sensors import BasicProximitySensor
-from .summarizer import Summarizer
+from .sensors import (
+    BasicProximitySensor,
+    BumpSensor,
+    GPSSensor,
+    LidarSensor,
+    SensingPipeline,
+    SonarSensor,
+)
+from .stepping import StepController, StepStats
+from .summarizer import EpisodeAggregator, RunningStats, Summarizer
+from .world import TiledWorld, write_tiled_world
 
 __all__ = [
     "Env",
@@ -12,6 +30,24 @@ __all__ = [
     "BasicRobot",
     "SensorRobot",
     "BasicProximitySensor",
+    "LidarSensor",
+    "SonarSensor",
+    "BumpSensor",
+    "GPSSensor",
+    "SensingPipeline",
+    "StepController",
+    "StepStats",
     "Summarizer",
+    "EpisodeAggregator",
+    "RunningStats",
+    "TiledWorld",
+    "Costmap",
+    "OccupancyMap",
+    "write_tiled_world",
+    "KinematicModel",
+    "Unicycle",
+    "DifferentialDrive",
+    "Bicycle",
+    "get_kinematic_model",
     "get_robot",
 ]
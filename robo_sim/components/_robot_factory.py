@@ -1,14 +1,23 @@
 from abc import ABC, abstractmethod
 
 from ..config import RobotConfig, SensorRobotConfig
+from ._sensor_factory import get_sensor
+from .kinematics import KinematicModel, get_kinematic_model
 from .robot import BasicRobot, Robot, SensorRobot
-from .sensors import BasicProximitySensor
 
 
 class RobotFactory(ABC):
     def __init__(self, config: RobotConfig) -> None:
         self.config = config
 
+    def kinematics(self) -> tuple[KinematicModel | None, float]:
+        if self.config.kinematics is None:
+            return None, 1.0
+        return (
+            get_kinematic_model(self.config.kinematics),
+            self.config.kinematics.dt,
+        )
+
     @abstractmethod
     def create(self) -> Robot:
         raise NotImplementedError("Subclasses must override create().")
@@ -16,11 +25,14 @@ class RobotFactory(ABC):
 
 class BasicRobotFactory(RobotFactory):
     def create(self) -> Robot:
+        kinematics, dt = self.kinematics()
         return BasicRobot(
             pos=self.config.start_pos,
             init_vel=self.config.init_vel,
             init_ang_vel=self.config.init_ang_vel,
             orientation=self.config.start_orientation,
+            kinematics=kinematics,
+            dt=dt,
         )
 
 
@@ -31,16 +43,20 @@ class SensorRobotFactory(RobotFactory):
                 "SensorRobotFactory requires a SensorRobotConfig."
             )
 
-        sensor = BasicProximitySensor(
-            sensor_range=self.config.sensor.sensor_range,
-            granularity=self.config.sensor.granularity,
-        )
+        sensors = [
+            get_sensor(config).create() for config in self.config.sensors
+        ]
+        kinematics, dt = self.kinematics()
         return SensorRobot(
             pos=self.config.start_pos,
             init_vel=self.config.init_vel,
             init_ang_vel=self.config.init_ang_vel,
             orientation=self.config.start_orientation,
-            sensor=sensor,
+            sensor=get_sensor(self.config.sensor).create(),
+            sensors=sensors,
+            seed=self.config.seed,
+            kinematics=kinematics,
+            dt=dt,
         )
 
 
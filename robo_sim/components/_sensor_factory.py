@@ -1,15 +1,29 @@
 from abc import ABC, abstractmethod
 
-from ..config import ProximitySensorConfig, SensorConfig
-from .sensors import BasicProximitySensor, SensorInterface
+from ..config import (
+    BumpSensorConfig,
+    GPSSensorConfig,
+    LidarSensorConfig,
+    MountedSensorConfig,
+    SensorConfig,
+    SonarSensorConfig,
+)
+from .sensors import (
+    BasicProximitySensor,
+    BatchedSensor,
+    BumpSensor,
+    GPSSensor,
+    LidarSensor,
+    SonarSensor,
+)
 
 
 class SensorFactory(ABC):
-    def __init__(self, config: ProximitySensorConfig) -> None:
+    def __init__(self, config: MountedSensorConfig) -> None:
         self.config = config
 
     @abstractmethod
-    def create(self) -> SensorInterface:
+    def create(self) -> BatchedSensor:
         raise NotImplementedError("Subclasses must override create().")
 
 
@@ -18,17 +32,68 @@ class BasicProximitySensorFactory(SensorFactory):
         return BasicProximitySensor(
             sensor_range=self.config.sensor_range,
             granularity=self.config.granularity,
+            early_exit=self.config.early_exit,
+            period=self.config.period,
+            name=self.config.name,
         )
 
 
-sensor_registry: dict[type[SensorConfig], type[SensorFactory]] = {
-    ProximitySensorConfig: BasicProximitySensorFactory,
+class LidarSensorFactory(SensorFactory):
+    def create(self) -> LidarSensor:
+        return LidarSensor(
+            num_beams=self.config.num_beams,
+            max_range=self.config.max_range,
+            fov=self.config.fov,
+            resolution=self.config.resolution,
+            noise_std=self.config.noise_std,
+            period=self.config.period,
+            name=self.config.name,
+        )
+
+
+class SonarSensorFactory(SensorFactory):
+    def create(self) -> SonarSensor:
+        return SonarSensor(
+            num_cones=self.config.num_cones,
+            cone_width=self.config.cone_width,
+            rays_per_cone=self.config.rays_per_cone,
+            max_range=self.config.max_range,
+            resolution=self.config.resolution,
+            noise_std=self.config.noise_std,
+            period=self.config.period,
+            name=self.config.name,
+        )
+
+
+class BumpSensorFactory(SensorFactory):
+    def create(self) -> BumpSensor:
+        return BumpSensor(
+            num_sectors=self.config.num_sectors,
+            margin=self.config.margin,
+            period=self.config.period,
+            name=self.config.name,
+        )
+
+
+class GPSSensorFactory(SensorFactory):
+    def create(self) -> GPSSensor:
+        return GPSSensor(
+            noise_std=self.config.noise_std,
+            period=self.config.period,
+            name=self.config.name,
+        )
+
+
+sensor_registry: dict[type[MountedSensorConfig], type[SensorFactory]] = {
+    SensorConfig: BasicProximitySensorFactory,
+    LidarSensorConfig: LidarSensorFactory,
+    SonarSensorConfig: SonarSensorFactory,
+    BumpSensorConfig: BumpSensorFactory,
+    GPSSensorConfig: GPSSensorFactory,
 }
 
 
-def get_robot(
-    config: ProximitySensorConfig,
-) -> SensorFactory:  # TODO Change type hint to SensorConfig.
+def get_sensor(config: MountedSensorConfig) -> SensorFactory:
     for config_type, factory in sensor_registry.items():
         if isinstance(config, config_type):
             return factory(config)
@@ -0,0 +1,287 @@
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..logging import get_logger
+from .sensors import LidarSensor
+
+if TYPE_CHECKING:
+    from ..config import CostmapConfig
+    from .env import Env
+    from .robot import Robot
+
+logger = get_logger(__name__)
+
+# Cost of cells where the robot would touch an obstacle.
+LETHAL = 1.0
+
+Key = tuple[int, int]
+
+
+def distance_field(grid: np.ndarray, max_cells: int) -> np.ndarray:
+    """Euclidean distance, in cells, from every cell center to the nearest
+    occupied cell center, exact up to `max_cells` and inf beyond.
+
+    The distance to the nearest occupied cell in each column is found with
+    running extrema of occupied row indices, and the squared distance is
+    then the minimum over horizontal offsets ``dx`` of that column distance
+    squared plus ``dx**2``, taken one offset at a time for the whole grid.
+
+    Parameters
+    ----------
+    grid : np.ndarray
+        Boolean occupancy grid of shape (rows, cols).
+    max_cells : int
+        Largest distance computed.
+
+    Returns
+    -------
+    np.ndarray
+        Float array of the same shape as `grid`.
+    """
+    rows, cols = grid.shape
+    far = max_cells + 1
+    index = np.arange(rows)[:, None]
+    above = np.where(grid, index, -(2 * far + rows))
+    above = np.maximum.accumulate(above, axis=0)
+    below = np.where(grid, index, 2 * far + rows)
+    below = np.minimum.accumulate(below[::-1], axis=0)[::-1]
+    vertical = np.minimum(index - above, below - index)
+    vertical = np.minimum(vertical, far).astype(np.float64)
+    squared = vertical**2
+    best = squared.copy()
+    for dx in range(1, min(max_cells, cols - 1) + 1):
+        shifted = squared[:, dx:] + dx * dx
+        np.minimum(best[:, :-dx], shifted, out=best[:, :-dx])
+        shifted = squared[:, :-dx] + dx * dx
+        np.minimum(best[:, dx:], shifted, out=best[:, dx:])
+    distances = np.sqrt(best)
+    distances[distances > max_cells] = math.inf
+    return distances
+
+
+class Costmap:
+    """Layered cost map of an environment for one robot footprint.
+
+    Three layers are combined on a grid at `resolution`. The obstacle layer
+    is the environment's occupancy grid. The sensor layer holds cells
+    marked from sensor readings. The inflation layer grades every cell by
+    its distance to the nearest cell occupied in either layer. Distances
+    come from one distance transform, capped at `max_distance`, that is
+    cached per environment version and sensor layer version and patched
+    around obstacle changes. Inflation costs are cached per robot radius
+    on top of it, so a collision check is one grid lookup instead of a
+    geometric query.
+
+    Distances are measured between cell centers, so the footprint used for
+    costs is padded by a cell diagonal, which errs on the side of reporting
+    collisions.
+
+    Every layer covers the whole map, so environments with a tiled world
+    are rejected.
+
+    Parameters
+    ----------
+    env : Env
+        Environment to map.
+    resolution : int, optional
+        Cells per unit length, by default 4
+    max_distance : float, optional
+        Distance from obstacles beyond which cells cost nothing, by
+        default 3.0
+    cost_scaling : float, optional
+        Rate at which costs decay with distance beyond the robot's radius,
+        by default 3.0
+    """
+
+    def __init__(
+        self,
+        env: "Env",
+        resolution: int = 4,
+        max_distance: float = 3.0,
+        cost_scaling: float = 3.0,
+    ) -> None:
+        if env.world is not None:
+            raise ValueError(
+                "Cost maps cover the whole map and cannot be used with a "
+                "tiled world."
+            )
+        self.env = env
+        self.resolution = resolution
+        self.max_distance = max_distance
+        self.cost_scaling = cost_scaling
+        self.max_cells = math.ceil(max_distance * resolution)
+        # Points snap to cell centers and obstacles are represented by the
+        # centers they cover, each off by up to half a cell diagonal.
+        self.margin = math.sqrt(2) / resolution
+        self.sensor_layer = np.zeros(env.grid_shape(resolution), dtype=bool)
+        self.sensor_version = 0
+        self._field: tuple[Key, np.ndarray] | None = None
+        self._inflation: dict[float, tuple[Key, np.ndarray]] = {}
+
+    @classmethod
+    def from_config(cls, env: "Env", config: "CostmapConfig") -> "Costmap":
+        return cls(
+            env, config.resolution, config.max_distance, config.cost_scaling
+        )
+
+    @property
+    def key(self) -> Key:
+        return self.env.version, self.sensor_version
+
+    def static_layer(self) -> np.ndarray:
+        """Occupancy grid of the static obstacles."""
+        return self.env.occupancy_grid(self.resolution, static_only=True)
+
+    def obstacle_grid(self) -> np.ndarray:
+        """Cells occupied by any obstacle or marked by sensors."""
+        grid = self.env.occupancy_grid(self.resolution)
+        if self.sensor_version:
+            grid = grid | self.sensor_layer
+        return grid
+
+    def mark(self, points: np.ndarray) -> None:
+        """Mark the cells at `points` (n, 2) as occupied in the sensor
+        layer."""
+        cells = np.floor(np.asarray(points) * self.resolution + 0.5)
+        cells = cells.astype(np.intp)
+        rows, cols = self.sensor_layer.shape
+        inside = (
+            (cells[:, 0] >= 0)
+            & (cells[:, 0] < cols)
+            & (cells[:, 1] >= 0)
+            & (cells[:, 1] < rows)
+        )
+        cells = cells[inside]
+        if not len(cells):
+            return
+        if self.sensor_layer[cells[:, 1], cells[:, 0]].all():
+            return
+        self.sensor_layer[cells[:, 1], cells[:, 0]] = True
+        self.sensor_version += 1
+
+    def clear_sensor_layer(self) -> None:
+        if self.sensor_layer.any():
+            self.sensor_layer[:] = False
+            self.sensor_version += 1
+
+    def observe(self, robot: "Robot") -> None:
+        """Mark the end points of the robot's lidar beams that hit an
+        obstacle."""
+        for sensor in getattr(robot, "sensors", []):
+            readings = sensor.last_reading
+            if not isinstance(sensor, LidarSensor) or readings is None:
+                continue
+            hit = readings < sensor.max_range
+            if not hit.any():
+                continue
+            angles = np.radians(sensor.ray_angles[hit] + robot.orientation)
+            points = np.column_stack(
+                (
+                    robot.pos.x + readings[hit] * np.cos(angles),
+                    robot.pos.y + readings[hit] * np.sin(angles),
+                )
+            )
+            self.mark(points)
+
+    def distances(self) -> np.ndarray:
+        """Distance from every cell center to the nearest occupied cell,
+        in world units, inf beyond `max_distance`."""
+        key = self.key
+        if self._field is not None and self._field[0] == key:
+            return self._field[1]
+        regions = None
+        if self._field is not None and self._field[0][1] == key[1]:
+            regions = self.env.dirty_regions(self._field[0][0])
+        if regions is None:
+            field = distance_field(self.obstacle_grid(), self.max_cells)
+            field /= self.resolution
+        else:
+            field = self._field[1]
+            for bounds in regions:
+                self._patch(field, bounds)
+        self._field = key, field
+        return field
+
+    def _patch(self, field: np.ndarray, bounds: tuple) -> None:
+        """Recompute the distances that an obstacle change within `bounds`
+        can affect."""
+        res, reach = self.resolution, self.max_cells
+        rows, cols = field.shape
+        x_min, y_min, x_max, y_max = bounds
+        # Cells whose distances may change, and the cells they depend on.
+        i0 = max(math.floor(y_min * res) - reach, 0)
+        i1 = min(math.ceil(y_max * res) + reach + 1, rows)
+        j0 = max(math.floor(x_min * res) - reach, 0)
+        j1 = min(math.ceil(x_max * res) + reach + 1, cols)
+        if i1 <= i0 or j1 <= j0:
+            return
+        a0, a1 = max(i0 - reach, 0), min(i1 + reach, rows)
+        b0, b1 = max(j0 - reach, 0), min(j1 + reach, cols)
+        window = self.obstacle_grid()[a0:a1, b0:b1]
+        patch = distance_field(window, reach) / res
+        inner_i = i0 - a0
+        inner_j = j0 - b0
+        stop_i = inner_i + i1 - i0
+        stop_j = inner_j + j1 - j0
+        field[i0:i1, j0:j1] = patch[inner_i:stop_i, inner_j:stop_j]
+
+    def inflation_layer(self, radius: float) -> np.ndarray:
+        """Traversal cost of every cell for a robot of `radius`.
+
+        Cells within ``radius + margin`` of an obstacle are `LETHAL`.
+        Further out the cost decays as
+        ``exp(-cost_scaling * (distance - radius - margin))``, and cells
+        beyond `max_distance` cost nothing.
+        """
+        key = self.key
+        cached = self._inflation.get(radius)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        field = self.distances()
+        reach = radius + self.margin
+        costs = np.exp(-self.cost_scaling * (field - reach))
+        costs[field <= reach] = LETHAL
+        costs = costs.astype(np.float32)
+        costs.setflags(write=False)
+        self._inflation[radius] = key, costs
+        return costs
+
+    def _cells(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Flat grid indices of `points` (n, 2) by nearest cell center, and
+        which points lie inside the grid."""
+        rows, cols = self.sensor_layer.shape
+        cells = np.floor(np.asarray(points) * self.resolution + 0.5)
+        cells = cells.astype(np.intp)
+        inside = (
+            (cells[:, 0] >= 0)
+            & (cells[:, 0] < cols)
+            & (cells[:, 1] >= 0)
+            & (cells[:, 1] < rows)
+        )
+        flat = cells[:, 1] * cols + cells[:, 0]
+        return np.where(inside, flat, 0), inside
+
+    def cost_at(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """Inflation cost at each of `points` (n, 2), `LETHAL` outside the
+        grid."""
+        flat, inside = self._cells(points)
+        costs = self.inflation_layer(radius).ravel().take(flat)
+        return np.where(inside, costs, LETHAL)
+
+    def collides(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """Whether a robot of `radius` at each of `points` (n, 2) touches an
+        obstacle or leaves the grid."""
+        return self.cost_at(points, radius) >= LETHAL
+
+    def clearance_at(self, points: np.ndarray) -> np.ndarray:
+        """Distance from each of `points` (n, 2) to the nearest obstacle,
+        less the margin and capped at `max_distance`, and 0 outside the
+        grid."""
+        flat, inside = self._cells(points)
+        clearance = np.minimum(
+            self.distances().ravel().take(flat) - self.margin,
+            self.max_distance - self.margin,
+        )
+        return np.where(inside, clearance, 0.0)
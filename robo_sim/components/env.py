@@ -1,48 +1,215 @@
+import hashlib
+import math
 import random
+from collections import deque
 from typing import TYPE_CHECKING
 
+import numpy as np
+
+from ..geometry import AABB, GeometryIndex, Quadtree, Shape
+from ..geometry.index import MAX_BLOCK, ShapeBucket
+from ..geometry.quadtree import FREE, FULL, MIXED, BlockClassifier
 from ..logging import get_logger
+from ..metrics import registry
 from ..utils import Position
-from .env_objects import EnvObject, EnvObjectFactory, Obstacle
+from .env_objects import DynamicObstacle, EnvObject, EnvObjectFactory, Obstacle
+from .world import TiledWorld
 
 if TYPE_CHECKING:
+    from .costmap import Costmap
+    from .motion import MotionModel
     from .robot import Robot
 
 logger = get_logger(__name__)
 
+# Number of obstacle changes remembered for `Env.dirty_regions`.
+MAX_TRACKED_CHANGES = 4096
+
+Bounds = tuple[float, float, float, float]
+
+COLLISION_CHECKS = registry.counter(
+    "robo_sim_collision_checks",
+    "Points checked against obstacles, one per disc query.",
+).labels()
+
 
 class Env:
     def __init__(
         self,
         size: tuple[int, int] = (10, 10),
-        obstacles: int | set[Position] = 0,
+        obstacles: (
+            int | set[Position] | list[tuple[Position, Shape | None]]
+        ) = 0,
+        world: TiledWorld | None = None,
+        quadtree: bool = False,
+        rng: random.Random | None = None,
     ) -> None:
-        self.size = size
+        # Static occupancy stored on disk in tiles, for maps too large to
+        # hold in memory. It sets the size and is checked alongside the
+        # obstacle objects.
+        self.world = world
+        self.size = world.size if world is not None else size
+        if world is not None and quadtree:
+            raise ValueError(
+                "Tiled worlds answer grid lookups from their own tiles and "
+                "cannot use a quadtree."
+            )
+        # Whether `occupied_at` looks cells up in a quadtree of the map
+        # instead of a dense grid.
+        self.use_quadtree = quadtree
+        # Layered cost map answering motion checks by grid lookups, if set.
+        self.costmap: "Costmap | None" = None
         self.objects: list[EnvObject] = []
+        self.dynamic_obstacles: list[DynamicObstacle] = []
+        self.obstacle_index = GeometryIndex()
+        # Incremented whenever obstacle geometry changes.
+        self.version = 0
+        self.changes: deque[tuple[int, Bounds]] = deque()
+        self._history_start = 0
+        self._handles: dict[int, tuple] = {}
+        # Per (resolution, static_only): obstacle counts per cell and the
+        # boolean grid derived from them.
+        self._occupancy: dict[tuple[int, bool], tuple] = {}
+        self._obstacles: frozenset[Obstacle] | None = None
+        self._hashes: dict[float | None, tuple[int, str]] = {}
+        # Per resolution: occupancy grids framed by occupied cells.
+        self._framed: dict[int, np.ndarray] = {}
+        self._quadtrees: dict[int, tuple[int, Quadtree]] = {}
 
         if isinstance(obstacles, set):
             for pos in obstacles:
                 self.add_object("obstacle", pos)
+        elif isinstance(obstacles, list):
+            for pos, geometry in obstacles:
+                self.add_object("obstacle", pos, geometry)
         elif isinstance(obstacles, int):
-            self.generate_random_obstacles(obstacles)
+            self.generate_random_obstacles(obstacles, rng)
 
-    def add_object(self, object_type: str, pos: Position):
+    def add_object(
+        self, object_type: str, pos: Position, geometry: Shape | None = None
+    ):
         if self.is_within_bounds(pos):
-            obj = EnvObjectFactory.create(object_type, pos)
+            obj = EnvObjectFactory.create(object_type, pos, geometry)
             if object_type == "target":
                 self.target = obj
-            self.objects.append(obj)
+            self._register(obj)
             logger.info(
                 f"{object_type.title()} of radius {obj.radius} at {pos}."
             )
         else:
             raise ValueError("Position out of bounds.")
 
+    def add_dynamic_obstacle(
+        self,
+        pos: Position,
+        motion: "MotionModel | None",
+        geometry: Shape | None = None,
+    ) -> DynamicObstacle:
+        """Add an obstacle that `step_dynamics` moves with `motion`.
+
+        An obstacle without a motion model stays in place, which is how
+        recorded dynamic obstacles are replayed.
+        """
+        if not self.is_within_bounds(pos):
+            raise ValueError("Position out of bounds.")
+        obj = DynamicObstacle(pos, geometry, motion)
+        self.dynamic_obstacles.append(obj)
+        self._register(obj)
+        logger.info(f"Dynamic obstacle of radius {obj.radius} at {pos}.")
+        return obj
+
+    def _register(self, obj: EnvObject) -> None:
+        self.objects.append(obj)
+        if not isinstance(obj, Obstacle):
+            return
+        self._handles[id(obj)] = self.obstacle_index.add(
+            obj.geometry, obj.pos.x, obj.pos.y
+        )
+        self._stamp(obj, obj.pos, 1)
+        self._obstacles = None
+        self._record_change(self._world_bounds(obj, obj.pos))
+
+    def move_obstacle(self, obj: Obstacle, pos: Position) -> None:
+        """Move an obstacle, updating the geometry index and every cached
+        occupancy grid in place.
+
+        Only the cells covered by the obstacle's old and new footprints
+        are touched.
+        """
+        old_pos = obj.pos
+        self.obstacle_index.move(self._handles[id(obj)], pos.x, pos.y)
+        self._stamp(obj, old_pos, -1)
+        obj.pos = pos
+        self._stamp(obj, pos, 1)
+        x0, y0, x1, y1 = self._world_bounds(obj, old_pos)
+        u0, v0, u1, v1 = self._world_bounds(obj, pos)
+        self._record_change(
+            (min(x0, u0), min(y0, v0), max(x1, u1), max(y1, v1))
+        )
+
+    def step_dynamics(self, dt: float = 1.0) -> int:
+        """Advance every dynamic obstacle by its motion model.
+
+        Returns
+        -------
+        int
+            Number of obstacles that moved.
+        """
+        moved = 0
+        for obj in self.dynamic_obstacles:
+            if obj.motion is None:
+                continue
+            pos = obj.motion.step(obj.pos, dt, self)
+            if (pos.x, pos.y) != (obj.pos.x, obj.pos.y):
+                self.move_obstacle(obj, pos)
+                moved += 1
+        return moved
+
+    def _record_change(self, bounds: Bounds) -> None:
+        self.version += 1
+        self.changes.append((self.version, bounds))
+        if len(self.changes) > MAX_TRACKED_CHANGES:
+            self._history_start, _ = self.changes.popleft()
+
+    def dirty_regions(self, since: int) -> list[Bounds] | None:
+        """World-space bounding boxes of every obstacle change made after
+        version `since`.
+
+        Parameters
+        ----------
+        since : int
+            Version a cache was built at.
+
+        Returns
+        -------
+        list[Bounds] | None
+            Boxes as (xmin, ymin, xmax, ymax), covering both the old and the
+            new footprint of moved obstacles, or None if the changes are no
+            longer known and the cache must be rebuilt in full.
+        """
+        if since < self._history_start:
+            return None
+        regions = []
+        for version, bounds in reversed(self.changes):
+            if version <= since:
+                break
+            regions.append(bounds)
+        return regions
+
+    @staticmethod
+    def _world_bounds(obj: EnvObject, pos: Position) -> Bounds:
+        x_min, y_min, x_max, y_max = obj.geometry.bounds()
+        return pos.x + x_min, pos.y + y_min, pos.x + x_max, pos.y + y_max
+
     def is_within_bounds(self, pos: Position) -> bool:
         return 0 <= pos.x <= self.size[0] and 0 <= pos.y <= self.size[1]
 
     def set_target(self, pos: Position) -> None:
         if self.is_within_bounds(pos):
+            previous = getattr(self, "target", None)
+            if previous is not None:
+                # Replace the target of an earlier episode.
+                self.objects.remove(previous)
             self.add_object("target", pos)
             logger.info(f"Target set at {pos}.")
         else:
@@ -52,24 +219,544 @@ class Env:
         return self.target.pos if self.target else None
 
     def is_obstacle_in_range(self, pos: Position, other_radius: float) -> bool:
-        return any(
-            obj.position_within_range(pos, other_radius)
-            and isinstance(obj, Obstacle)
-            for obj in self.objects
+        COLLISION_CHECKS.inc()
+        if self.obstacle_index.any_hit(pos.x, pos.y, other_radius):
+            return True
+        if self.world is None:
+            return False
+        return bool(self.world.disc_hits([(pos.x, pos.y)], other_radius)[0])
+
+    def points_in_collision(
+        self, points: np.ndarray, other_radius: float
+    ) -> np.ndarray:
+        """Batched `is_obstacle_in_range` for an (n, 2) array of points."""
+        COLLISION_CHECKS.inc(len(points))
+        hits = self.obstacle_index.points_hit(points, other_radius)
+        if self.world is not None:
+            rest = ~hits
+            hits[rest] = self.world.disc_hits(points[rest], other_radius)
+        return hits
+
+    def segments_collision_free(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        other_radius: float,
+        spacing: float | None = None,
+    ) -> np.ndarray:
+        """Whether a disc of `other_radius` swept along each segment stays
+        inside the environment and clear of every obstacle.
+
+        Every segment is sampled evenly, at most `spacing` apart, which
+        defaults to the disc radius, and all samples of all segments are
+        checked in one batched query. Every point of the swept disc lies
+        within ``hypot(other_radius, spacing / 2)`` of a sample, so the
+        samples are checked with that radius and no collision is missed.
+        Since the samples of a segment depend only on the segment itself,
+        its result does not depend on the others checked with it.
+
+        Parameters
+        ----------
+        starts, ends : np.ndarray
+            Segment endpoints of shape (n, 2). Either may also be a single
+            point shared by every segment.
+        other_radius : float
+            Radius of the swept disc.
+        spacing : float | None, optional
+            Maximum distance between samples, by default None
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (n,).
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        deltas = ends - starts
+        if not len(deltas):
+            return np.ones(0, dtype=bool)
+        if spacing is None:
+            spacing = max(other_radius, 0.05)
+        # Segments lie inside the environment if their ends do.
+        outside = ((starts < 0) | (starts > self.size)).any(axis=1) | (
+            (ends < 0) | (ends > self.size)
+        ).any(axis=1)
+        lengths = np.sqrt((deltas * deltas).sum(axis=1))
+        intervals = np.ceil(lengths / spacing)
+        # Segments with fewer intervals than the longest repeat their end.
+        t = (
+            np.minimum(np.arange(int(intervals.max()) + 1), intervals[:, None])
+            / np.maximum(intervals, 1)[:, None]
+        )
+        points = (starts[:, None] + deltas[:, None] * t[:, :, None]).reshape(
+            -1, 2
         )
+        blocked = self.points_in_collision(
+            points, math.hypot(other_radius, spacing / 2)
+        )
+        return ~(blocked.reshape(t.shape).any(axis=1) | outside)
+
+    def content_hash(self, resolution: float | None = None) -> str:
+        """Digest of the environment size and every obstacle's geometry
+        and position, for keying artifacts computed from the map.
+
+        Artifacts computed on a grid should pass its `resolution`, which is
+        folded into the digest. The digest does not depend on the order in
+        which obstacles were added, and is memoized until the obstacles
+        change.
+        """
+        cached = self._hashes.get(resolution)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        digest = hashlib.sha256()
+        digest.update(np.asarray(self.size, dtype=float).tobytes())
+        if resolution is not None:
+            digest.update(np.float64(resolution).tobytes())
+        if self.world is not None:
+            digest.update(self.world.digest.encode())
+        for shape_type, bucket in sorted(
+            self.obstacle_index.buckets.items(), key=lambda kv: kv[0].kind
+        ):
+            digest.update(shape_type.kind.encode())
+            rows = np.hstack(
+                (bucket.centers[: bucket.size], bucket.params[: bucket.size])
+            )
+            # Sorted rows, so the order obstacles were added in does not
+            # change the digest.
+            order = np.lexsort(rows.T[::-1])
+            digest.update(np.ascontiguousarray(rows[order]).tobytes())
+        self._hashes[resolution] = (self.version, digest.hexdigest())
+        return self._hashes[resolution][1]
 
     def robot_within_reach(self, robot: "Robot", obj: EnvObject) -> bool:
         return robot.object_within_range(obj)
 
-    def generate_random_obstacles(self, num_obstacles: int) -> None:
+    def generate_random_obstacles(
+        self, num_obstacles: int, rng: random.Random | None = None
+    ) -> None:
+        """Add `num_obstacles` obstacles at random cells, drawn from `rng`
+        or, by default, from the `random` module."""
+        draw = rng if rng is not None else random
         count = 0
         while count < num_obstacles:
-            x = random.randint(0, self.size[0] - 1)
-            y = random.randint(0, self.size[1] - 1)
+            x = draw.randint(0, self.size[0] - 1)
+            y = draw.randint(0, self.size[1] - 1)
             pos = Position(x, y)
             self.add_object("obstacle", pos)
             count += 1
 
+    def grid_shape(self, resolution: int = 1) -> tuple[int, int]:
+        """Shape (rows, cols) of the occupancy grid at a resolution."""
+        return (
+            self.size[1] * resolution + 1,
+            self.size[0] * resolution + 1,
+        )
+
+    def occupancy_grid(
+        self, resolution: int = 1, static_only: bool = False
+    ) -> np.ndarray:
+        """Rasterize the obstacles into a boolean occupancy grid.
+
+        Cell ``(i, j)`` is centered on ``(j / resolution, i / resolution)``,
+        so at resolution 1 an obstacle at ``Position(x, y)`` fills exactly
+        ``grid[y, x]``. A cell is occupied if its center lies inside an
+        obstacle. Grids are cached, and updated in place when obstacles are
+        added or moved.
+
+        Parameters
+        ----------
+        resolution : int, optional
+            Number of cells per unit length, by default 1
+        static_only : bool, optional
+            Whether to leave out dynamic obstacles, by default False
+
+        Returns
+        -------
+        np.ndarray
+            Read-only boolean array of shape ``grid_shape(resolution)``.
+
+        Raises
+        ------
+        ValueError
+            If the environment has a tiled world, whose grid may not fit in
+            memory; use `occupancy_window` or `occupied_at` instead.
+        """
+        if self.world is not None:
+            raise ValueError(
+                "A grid of a whole tiled world may not fit in memory; use "
+                "occupancy_window or occupied_at instead."
+            )
+        layer = self._occupancy.get((resolution, static_only))
+        if layer is None:
+            counts = self._rasterize(resolution, static_only)
+            grid = counts > 0
+            grid.setflags(write=False)
+            layer = counts, grid
+            self._occupancy[resolution, static_only] = layer
+        return layer[1]
+
+    def occupancy_window(
+        self,
+        rows: slice,
+        cols: slice,
+        resolution: int = 1,
+        static_only: bool = False,
+    ) -> np.ndarray:
+        """Cells ``occupancy_grid(resolution, static_only)[rows, cols]``,
+        rasterized for the window alone.
+
+        The window's memory grows with the number of cells it selects, so
+        strided slices give a coarse view of a map far larger than memory.
+        A cached grid is sliced instead, if one exists.
+
+        Parameters
+        ----------
+        rows, cols : slice
+            Rows and columns of the grid to select, with positive steps.
+        resolution : int, optional
+            Number of cells per unit length, by default 1
+        static_only : bool, optional
+            Whether to leave out dynamic obstacles, by default False
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of the selected cells.
+        """
+        cached = self._occupancy.get((resolution, static_only))
+        if cached is not None:
+            return cached[1][rows, cols]
+        shape = self.grid_shape(resolution)
+        i0, i1, di = rows.indices(shape[0])
+        j0, j1, dj = cols.indices(shape[1])
+        if di <= 0 or dj <= 0:
+            raise ValueError("Window slices must have positive steps.")
+        ii = np.arange(i0, i1, di)
+        jj = np.arange(j0, j1, dj)
+        grid = np.zeros((len(ii), len(jj)), dtype=bool)
+        if not grid.size:
+            return grid
+        if self.world is not None:
+            xx, yy = np.meshgrid(jj / resolution, ii / resolution)
+            points = np.column_stack((xx.ravel(), yy.ravel()))
+            grid |= self.world.occupied_at(points).reshape(grid.shape)
+        x0, x1 = jj[0] / resolution, jj[-1] / resolution
+        y0, y1 = ii[0] / resolution, ii[-1] / resolution
+        for obj in self.objects:
+            if not isinstance(obj, Obstacle):
+                continue
+            if static_only and isinstance(obj, DynamicObstacle):
+                continue
+            u0, v0, u1, v1 = self._world_bounds(obj, obj.pos)
+            if u1 < x0 or u0 > x1 or v1 < y0 or v0 > y1:
+                continue
+            fi, fj = self._footprint(
+                obj.geometry, obj.pos, resolution, (i1, j1)
+            )
+            fi, fj = fi - i0, fj - j0
+            keep = (fi >= 0) & (fj >= 0) & (fi % di == 0) & (fj % dj == 0)
+            grid[fi[keep] // di, fj[keep] // dj] = True
+        return grid
+
+    def occupied_at(
+        self, points: np.ndarray, resolution: int = 1
+    ) -> np.ndarray:
+        """Whether each of `points` (n, 2) lies on an occupied cell of the
+        occupancy grid at `resolution`, or outside the grid.
+
+        Lookups go through a copy of the grid framed by a border of
+        occupied cells, so outside points are clamped onto the border and
+        need no separate bounds test. The copy is updated in place with
+        the grid when obstacles are added or moved.
+
+        With a tiled world, the world's cells are looked up directly at its
+        own resolution instead, and obstacle objects are tested by their
+        geometry, so that no grid of the whole map is built.
+        """
+        if self.world is not None:
+            hits = self.world.occupied_at(points)
+            if self.objects:
+                rest = ~hits
+                hits[rest] = self.obstacle_index.points_hit(points[rest], 0.0)
+            return hits
+        if self.use_quadtree:
+            cells = np.floor(points * resolution + 0.5).astype(np.intp)
+            tree = self.quadtree(resolution)
+            return tree.occupied_cells(cells[:, 1], cells[:, 0])
+        framed = self._framed.get(resolution)
+        if framed is None:
+            grid = self.occupancy_grid(resolution)
+            framed = np.ones((grid.shape[0] + 2, grid.shape[1] + 2), bool)
+            framed[1:-1, 1:-1] = grid
+            self._framed[resolution] = framed
+        # Shift by one cell for the border and by half a cell to round to
+        # the nearest cell center.
+        cells = points * resolution
+        cells += 1.5
+        cells = cells.astype(np.intp)
+        flat = np.ravel_multi_index(
+            (cells[:, 1], cells[:, 0]), framed.shape, mode="clip"
+        )
+        return framed.ravel().take(flat)
+
+    def quadtree(self, resolution: int = 1) -> Quadtree:
+        """Quadtree of the occupancy grid at `resolution`.
+
+        The tree is built from the obstacles' geometry without rasterizing
+        the map, so its memory grows with the length of obstacle boundaries
+        rather than with the area of the map. Trees are memoized, and when
+        obstacles change only the leaves over `dirty_regions` are
+        reclassified. Environments with a tiled world, which would have to
+        be rasterized whole, raise a ValueError.
+        """
+        if self.world is not None:
+            raise ValueError(
+                "A quadtree of a tiled world would be built from a grid of "
+                "the whole world; tiled worlds answer lookups themselves."
+            )
+        cached = self._quadtrees.get(resolution)
+        if cached is not None and cached[0] != self.version:
+            regions = self.dirty_regions(cached[0])
+            if regions is None:
+                cached = None
+            else:
+                tree = cached[1]
+                classify = self._block_classifier(resolution)
+                for x0, y0, x1, y1 in regions:
+                    tree.patch(
+                        math.floor(y0 * resolution),
+                        math.floor(x0 * resolution),
+                        math.ceil(y1 * resolution),
+                        math.ceil(x1 * resolution),
+                        classify,
+                    )
+                cached = self.version, tree
+                self._quadtrees[resolution] = cached
+        if cached is None:
+            tree = Quadtree.build(
+                self.grid_shape(resolution), self._block_classifier(resolution)
+            )
+            cached = self.version, tree
+            self._quadtrees[resolution] = cached
+        return cached[1]
+
+    def _block_classifier(self, resolution: int) -> BlockClassifier:
+        """Classify blocks of cells against the obstacles, with the cell
+        center semantics of `occupancy_grid`.
+
+        A block is free if it misses the cell range of every obstacle. It
+        is full if it lies within a box's cell range, or if its four corner
+        cells lie inside one of the other shapes, which are all convex.
+        """
+        obstacles = [obj for obj in self.objects if isinstance(obj, Obstacle)]
+        # Inclusive row and column ranges of the cells each obstacle covers.
+        ranges = np.empty((len(obstacles), 4), dtype=np.int64)
+        boxes = np.zeros(len(obstacles), dtype=bool)
+        handles = []
+        for k, obj in enumerate(obstacles):
+            x0, y0, x1, y1 = self._world_bounds(obj, obj.pos)
+            boxes[k] = isinstance(obj.geometry, AABB)
+            if boxes[k]:
+                # Same half-open ranges as `_rasterize_boxes`.
+                hi_x = math.ceil(x1 * resolution) - 1
+                hi_y = math.ceil(y1 * resolution) - 1
+            else:
+                hi_x = math.floor(x1 * resolution)
+                hi_y = math.floor(y1 * resolution)
+            ranges[k] = (
+                math.ceil(y0 * resolution),
+                hi_y,
+                math.ceil(x0 * resolution),
+                hi_x,
+            )
+            handles.append(self._handles[id(obj)])
+        buckets = list(self.obstacle_index.buckets.values())
+        kinds = np.array(
+            [buckets.index(bucket) for bucket, _ in handles], dtype=np.intp
+        )
+        slots = np.array([slot for _, slot in handles], dtype=np.intp)
+
+        def classify(i0, j0, i1, j1):
+            states = np.full(len(i0), FREE, dtype=np.int8)
+            if not len(obstacles):
+                return states
+            step = max(1, MAX_BLOCK // len(obstacles))
+            for start in range(0, len(i0), step):
+                stop = min(start + step, len(i0))
+                b0, c0 = i0[start:stop, None], j0[start:stop, None]
+                b1, c1 = i1[start:stop, None], j1[start:stop, None]
+                overlap = (
+                    (b0 <= ranges[:, 1])
+                    & (b1 >= ranges[:, 0])
+                    & (c0 <= ranges[:, 3])
+                    & (c1 >= ranges[:, 2])
+                )
+                blocks, obs = np.nonzero(overlap)
+                if not len(blocks):
+                    continue
+                blocks += start
+                full = boxes[obs] & (
+                    (i0[blocks] >= ranges[obs, 0])
+                    & (i1[blocks] <= ranges[obs, 1])
+                    & (j0[blocks] >= ranges[obs, 2])
+                    & (j1[blocks] <= ranges[obs, 3])
+                )
+                shaped = np.flatnonzero(~boxes[obs])
+                if len(shaped):
+                    full[shaped] = self._corners_inside(
+                        buckets,
+                        kinds[obs[shaped]],
+                        slots[obs[shaped]],
+                        (i0, j0, i1, j1),
+                        blocks[shaped],
+                        resolution,
+                    )
+                states[blocks] = MIXED
+                states[blocks[full]] = FULL
+            # A single cell that only touches an obstacle's range is free.
+            single = (states == MIXED) & (i0 == i1) & (j0 == j1)
+            states[single] = FREE
+            return states
+
+        return classify
+
+    @staticmethod
+    def _corners_inside(
+        buckets: list[ShapeBucket],
+        kinds: np.ndarray,
+        slots: np.ndarray,
+        bounds: tuple[np.ndarray, ...],
+        blocks: np.ndarray,
+        resolution: int,
+    ) -> np.ndarray:
+        """Per (block, shape) pair, whether the centers of the block's four
+        corner cells lie inside the shape in slot `slots[k]` of bucket
+        `buckets[kinds[k]]`."""
+        i0, j0, i1, j1 = (a[blocks] for a in bounds)
+        xs = np.stack((j0, j1, j0, j1)) / resolution
+        ys = np.stack((i0, i0, i1, i1)) / resolution
+        inside = np.zeros(len(blocks), dtype=bool)
+        for kind in np.unique(kinds).tolist():
+            bucket = buckets[kind]
+            pairs = np.flatnonzero(kinds == kind)
+            centers = bucket.centers[slots[pairs]]
+            hits = bucket.shape_type.batch_hits(
+                xs[:, pairs] - centers[:, 0],
+                ys[:, pairs] - centers[:, 1],
+                bucket.params[slots[pairs]],
+                0.0,
+            )
+            inside[pairs] = hits.all(axis=0)
+        return inside
+
+    def _stamp(self, obj: Obstacle, pos: Position, delta: int) -> None:
+        """Add `delta` to the cell counts under an obstacle's footprint in
+        every cached occupancy grid."""
+        dynamic = isinstance(obj, DynamicObstacle)
+        for (resolution, static_only), (
+            counts,
+            grid,
+        ) in self._occupancy.items():
+            if static_only and dynamic:
+                continue
+            ii, jj = self._footprint(
+                obj.geometry, pos, resolution, counts.shape
+            )
+            counts[ii, jj] += delta
+            grid.setflags(write=True)
+            grid[ii, jj] = counts[ii, jj] > 0
+            grid.setflags(write=False)
+            framed = None if static_only else self._framed.get(resolution)
+            if framed is not None:
+                framed[ii + 1, jj + 1] = grid[ii, jj]
+
+    def _rasterize(self, resolution: int, static_only: bool) -> np.ndarray:
+        rows, cols = self.grid_shape(resolution)
+        counts = np.zeros((rows, cols), dtype=np.int32)
+        boxes = []
+        for obj in self.objects:
+            if not isinstance(obj, Obstacle):
+                continue
+            if static_only and isinstance(obj, DynamicObstacle):
+                continue
+            if isinstance(obj.geometry, AABB):
+                boxes.append(self._world_bounds(obj, obj.pos))
+            else:
+                ii, jj = self._footprint(
+                    obj.geometry, obj.pos, resolution, (rows, cols)
+                )
+                counts[ii, jj] += 1
+        if boxes:
+            counts += self._rasterize_boxes(
+                np.array(boxes), rows, cols, resolution
+            )
+        return counts
+
+    def prefetch(self, pos: Position) -> None:
+        """Page in the tiles of the tiled world around `pos`, if any."""
+        if self.world is not None:
+            self.world.prefetch(pos.x, pos.y)
+
+    @staticmethod
+    def _rasterize_boxes(
+        bounds: np.ndarray, rows: int, cols: int, resolution: int
+    ) -> np.ndarray:
+        # Half-open cell ranges [lo, hi) whose centers fall inside each box.
+        lo = np.ceil(bounds[:, :2] * resolution).astype(int)
+        hi = np.ceil(bounds[:, 2:] * resolution).astype(int)
+        lo = np.clip(lo, 0, [cols, rows])
+        hi = np.clip(hi, 0, [cols, rows])
+        keep = np.all(hi > lo, axis=1)
+        lo, hi = lo[keep], hi[keep]
+
+        # Count all boxes at once with a 2D difference array.
+        diff = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+        np.add.at(diff, (lo[:, 1], lo[:, 0]), 1)
+        np.add.at(diff, (lo[:, 1], hi[:, 0]), -1)
+        np.add.at(diff, (hi[:, 1], lo[:, 0]), -1)
+        np.add.at(diff, (hi[:, 1], hi[:, 0]), 1)
+        counts = diff.cumsum(axis=0).cumsum(axis=1)
+        return counts[:rows, :cols]
+
+    @staticmethod
+    def _footprint(
+        geometry: Shape,
+        pos: Position,
+        resolution: int,
+        shape: tuple[int, int],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Row and column indices of the cells whose centers lie inside a
+        shape placed at `pos`."""
+        rows, cols = shape
+        x_min, y_min, x_max, y_max = geometry.bounds()
+        if isinstance(geometry, AABB):
+            # Same half-open ranges as `_rasterize_boxes`.
+            j0 = max(int(np.ceil((pos.x + x_min) * resolution)), 0)
+            j1 = min(int(np.ceil((pos.x + x_max) * resolution)), cols)
+            i0 = max(int(np.ceil((pos.y + y_min) * resolution)), 0)
+            i1 = min(int(np.ceil((pos.y + y_max) * resolution)), rows)
+        else:
+            j0 = max(int(np.ceil((pos.x + x_min) * resolution)), 0)
+            j1 = min(int(np.floor((pos.x + x_max) * resolution)) + 1, cols)
+            i0 = max(int(np.ceil((pos.y + y_min) * resolution)), 0)
+            i1 = min(int(np.floor((pos.y + y_max) * resolution)) + 1, rows)
+        if j1 <= j0 or i1 <= i0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        ii, jj = np.mgrid[i0:i1, j0:j1]
+        ii, jj = ii.ravel(), jj.ravel()
+        if isinstance(geometry, AABB):
+            return ii, jj
+        dx = (jj / resolution - pos.x)[:, None]
+        dy = (ii / resolution - pos.y)[:, None]
+        inside = geometry.batch_hits(dx, dy, geometry.params()[None], 0.0)[
+            :, 0
+        ]
+        return ii[inside], jj[inside]
+
     @property
-    def obstacles(self) -> set[Obstacle]:
-        return {obj for obj in self.objects if isinstance(obj, Obstacle)}
+    def obstacles(self) -> frozenset[Obstacle]:
+        if self._obstacles is None:
+            self._obstacles = frozenset(
+                obj for obj in self.objects if isinstance(obj, Obstacle)
+            )
+        return self._obstacles
@@ -1,37 +1,38 @@
-import math
+from typing import TYPE_CHECKING
 
+from ..geometry import AABB, Circle, Shape, intersects
 from ..utils import Position
 
+if TYPE_CHECKING:
+    from .motion import MotionModel
+
 
 class EnvObject:
-    def __init__(self, pos: Position) -> None:
+    def __init__(self, pos: Position, geometry: Shape | None = None) -> None:
         self.pos = pos
+        self.geometry = geometry or self.default_geometry()
+
+    def default_geometry(self) -> Shape:
+        raise NotImplementedError()
 
     def object_within_range(self, other: "EnvObject") -> bool:
-        if self.shape == "square" and other.shape == "square":
-            return max(
-                abs(self.pos.x - other.pos.x), abs(self.pos.y - other.pos.y)
-            ) <= (self.radius + other.radius)
-        else:
-            distance = math.hypot(
-                self.pos.x - other.pos.x, self.pos.y - other.pos.y
-            )
-            return distance <= (self.radius + other.radius)
+        return intersects(
+            self.geometry,
+            (self.pos.x, self.pos.y),
+            other.geometry,
+            (other.pos.x, other.pos.y),
+        )
 
     def position_within_range(
         self, pos: Position, other_radius: float
     ) -> bool:
-        if self.shape == "square":
-            return max(abs(self.pos.x - pos.x), abs(self.pos.y - pos.y)) <= (
-                self.radius + other_radius
-            )
-        else:
-            distance = math.hypot(self.pos.x - pos.x, self.pos.y - pos.y)
-            return distance <= (self.radius + other_radius)
+        return self.geometry.hits_circle(
+            pos.x - self.pos.x, pos.y - self.pos.y, other_radius
+        )
 
     @property
     def radius(self) -> float:
-        raise NotImplementedError()
+        return self.geometry.extent
 
     @property
     def color(self) -> str:
@@ -39,50 +40,53 @@ class EnvObject:
 
     @property
     def shape(self) -> str:
-        raise NotImplementedError()
+        return self.geometry.kind
 
 
 class Obstacle(EnvObject):
-    def __init__(self, pos: Position) -> None:
-        super().__init__(pos)
-
-    @property
-    def radius(self) -> float:
-        return 0.5
+    def default_geometry(self) -> Shape:
+        return AABB(0.5, 0.5)
 
     @property
     def color(self) -> str:
         return "black"
 
+
+class DynamicObstacle(Obstacle):
+    def __init__(
+        self,
+        pos: Position,
+        geometry: Shape | None = None,
+        motion: "MotionModel | None" = None,
+    ) -> None:
+        super().__init__(pos, geometry)
+        self.start_pos = pos
+        self.motion = motion
+
     @property
-    def shape(self) -> str:
-        return "square"
+    def color(self) -> str:
+        return "dimgray"
 
 
 class Target(EnvObject):
-    def __init__(self, pos: Position) -> None:
-        super().__init__(pos)
-
-    @property
-    def radius(self) -> float:
-        return 0.5
+    def default_geometry(self) -> Shape:
+        return Circle(0.5)
 
     @property
     def color(self) -> str:
         return "gold"
 
-    @property
-    def shape(self) -> str:
-        return "circle"
-
 
 class EnvObjectFactory:
+    object_registry: dict[str, type[EnvObject]] = {
+        "obstacle": Obstacle,
+        "target": Target,
+    }
+
     @staticmethod
-    def create(object_type: str, pos: Position):
-        object_registry: dict[str, EnvObject] = {
-            "obstacle": Obstacle(pos),
-            "target": Target(pos),
-        }
-        if object_type not in object_registry.keys():
+    def create(
+        object_type: str, pos: Position, geometry: Shape | None = None
+    ) -> EnvObject:
+        if object_type not in EnvObjectFactory.object_registry:
             raise ValueError(f"Unknown object type '{object_type}'.")
-        return object_registry[object_type]
+        return EnvObjectFactory.object_registry[object_type](pos, geometry)
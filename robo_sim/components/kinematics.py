@@ -0,0 +1,258 @@
+import math
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ..config import KinematicsConfig
+
+Derivatives = Callable[[np.ndarray, np.ndarray], np.ndarray]
+Integrator = Callable[[Derivatives, np.ndarray, np.ndarray, float], np.ndarray]
+
+
+def euler(
+    f: Derivatives, states: np.ndarray, controls: np.ndarray, dt: float
+) -> np.ndarray:
+    """Explicit Euler step."""
+    return states + dt * f(states, controls)
+
+
+def rk4(
+    f: Derivatives, states: np.ndarray, controls: np.ndarray, dt: float
+) -> np.ndarray:
+    """Classic fourth-order Runge-Kutta step, holding the controls fixed
+    over the step."""
+    k1 = f(states, controls)
+    k2 = f(states + (dt / 2) * k1, controls)
+    k3 = f(states + (dt / 2) * k2, controls)
+    k4 = f(states + dt * k3, controls)
+    k2 += k3
+    k2 *= 2
+    k1 += k2
+    k1 += k4
+    k1 *= dt / 6
+    return states + k1
+
+
+integrator_registry: dict[str, Integrator] = {
+    "euler": euler,
+    "rk4": rk4,
+}
+
+
+class KinematicModel(ABC):
+    """Kinematic model of a planar robot, integrated at fixed steps.
+
+    States are rows ``(x, y, theta)`` with the heading `theta` in radians,
+    and controls are rows of two model-specific inputs. Every method works
+    on arrays of shape (n, 3) and (n, 2), so a single call advances many
+    robots at once; `step_pose` wraps the same code for a single robot.
+    """
+
+    # Whether the model can change heading without moving.
+    turns_in_place = True
+
+    def __init__(self, integrator: str = "euler") -> None:
+        if integrator not in integrator_registry:
+            raise ValueError(
+                f"Unknown integrator '{integrator}', expected one of "
+                f"{sorted(integrator_registry)}."
+            )
+        self.integrator = integrator_registry[integrator]
+
+    @abstractmethod
+    def derivatives(
+        self, states: np.ndarray, controls: np.ndarray
+    ) -> np.ndarray:
+        """Time derivative of every state under its control."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def controls_for(
+        self, speeds: np.ndarray, turn_rates: np.ndarray
+    ) -> np.ndarray:
+        """Native controls realizing the given forward speeds and turn
+        rates, as far as the model allows."""
+        raise NotImplementedError()
+
+    def step(
+        self, states: np.ndarray, controls: np.ndarray, dt: float
+    ) -> np.ndarray:
+        """Advance states of shape (n, 3) by `dt` under controls of shape
+        (n, 2)."""
+        return self.integrator(self.derivatives, states, controls, dt)
+
+    def rollout(
+        self, states: np.ndarray, controls: np.ndarray, dt: float
+    ) -> np.ndarray:
+        """Integrate a control sequence.
+
+        Parameters
+        ----------
+        states : np.ndarray
+            Initial states of shape (n, 3).
+        controls : np.ndarray
+            Controls of shape (steps, n, 2).
+        dt : float
+            Length of each step.
+
+        Returns
+        -------
+        np.ndarray
+            States of shape (steps + 1, n, 3), starting with `states`.
+        """
+        states = np.asarray(states, dtype=float)
+        controls = np.asarray(controls, dtype=float)
+        trajectory = np.empty((len(controls) + 1,) + states.shape)
+        trajectory[0] = states
+        for k, control in enumerate(controls):
+            trajectory[k + 1] = self.step(trajectory[k], control, dt)
+        return trajectory
+
+    def track(
+        self,
+        states: np.ndarray,
+        targets: np.ndarray,
+        max_speed: float | np.ndarray,
+        max_turn_rate: float | np.ndarray,
+        dt: float,
+    ) -> np.ndarray:
+        """Controls that steer each state toward its target (n, 2) point.
+
+        The turn rate closes the heading error within a step where the
+        limit allows. The forward speed covers the remaining distance
+        within a step, scaled down by the cosine of the heading error, so
+        the robot turns before driving off course.
+        """
+        delta = targets - states[:, :2]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        error = np.arctan2(delta[:, 1], delta[:, 0]) - states[:, 2]
+        error = (error + np.pi) % (2 * np.pi) - np.pi
+        turn_rates = np.clip(error / dt, -max_turn_rate, max_turn_rate)
+        alignment = np.cos(error)
+        if not self.turns_in_place:
+            # Keep moving, since turning needs forward speed.
+            alignment = np.maximum(alignment, 0.5)
+        speeds = np.minimum(dist / dt, max_speed) * np.maximum(alignment, 0)
+        return self.controls_for(speeds, turn_rates)
+
+    def step_pose(
+        self,
+        x: float,
+        y: float,
+        theta: float,
+        control: tuple[float, float],
+        dt: float,
+    ) -> tuple[float, float, float]:
+        """Advance a single pose; `theta` is in radians."""
+        state = self.step(
+            np.array([(x, y, theta)]), np.array([control], dtype=float), dt
+        )
+        x, y, theta = state[0].tolist()
+        return x, y, theta
+
+
+class Unicycle(KinematicModel):
+    """Controls are the forward speed and the turn rate."""
+
+    def derivatives(
+        self, states: np.ndarray, controls: np.ndarray
+    ) -> np.ndarray:
+        theta = states[:, 2]
+        speed = controls[:, 0]
+        out = np.empty_like(states)
+        out[:, 0] = speed * np.cos(theta)
+        out[:, 1] = speed * np.sin(theta)
+        out[:, 2] = controls[:, 1]
+        return out
+
+    def controls_for(
+        self, speeds: np.ndarray, turn_rates: np.ndarray
+    ) -> np.ndarray:
+        return np.column_stack((speeds, turn_rates))
+
+
+class DifferentialDrive(KinematicModel):
+    """Controls are the ground speeds of the left and right wheels, which
+    are `track_width` apart."""
+
+    def __init__(
+        self, track_width: float = 0.5, integrator: str = "euler"
+    ) -> None:
+        super().__init__(integrator)
+        self.track_width = track_width
+
+    def derivatives(
+        self, states: np.ndarray, controls: np.ndarray
+    ) -> np.ndarray:
+        theta = states[:, 2]
+        left, right = controls[:, 0], controls[:, 1]
+        speed = (left + right) / 2
+        out = np.empty_like(states)
+        out[:, 0] = speed * np.cos(theta)
+        out[:, 1] = speed * np.sin(theta)
+        out[:, 2] = (right - left) / self.track_width
+        return out
+
+    def controls_for(
+        self, speeds: np.ndarray, turn_rates: np.ndarray
+    ) -> np.ndarray:
+        half = turn_rates * (self.track_width / 2)
+        return np.column_stack((speeds - half, speeds + half))
+
+
+class Bicycle(KinematicModel):
+    """Kinematic bicycle, or Ackermann steering, about the rear axle.
+
+    Controls are the forward speed and the steering angle in radians,
+    limited to `max_steer`, with the axles `wheel_base` apart.
+    """
+
+    turns_in_place = False
+
+    def __init__(
+        self,
+        wheel_base: float = 0.5,
+        max_steer: float = math.radians(35),
+        integrator: str = "euler",
+    ) -> None:
+        super().__init__(integrator)
+        self.wheel_base = wheel_base
+        self.max_steer = max_steer
+
+    def derivatives(
+        self, states: np.ndarray, controls: np.ndarray
+    ) -> np.ndarray:
+        theta = states[:, 2]
+        speed = controls[:, 0]
+        steer = np.clip(controls[:, 1], -self.max_steer, self.max_steer)
+        out = np.empty_like(states)
+        out[:, 0] = speed * np.cos(theta)
+        out[:, 1] = speed * np.sin(theta)
+        out[:, 2] = speed * np.tan(steer) / self.wheel_base
+        return out
+
+    def controls_for(
+        self, speeds: np.ndarray, turn_rates: np.ndarray
+    ) -> np.ndarray:
+        steer = np.arctan2(turn_rates * self.wheel_base, speeds)
+        # A stopped bicycle cannot turn; leave the wheels straight.
+        steer = np.where(speeds > 0, steer, 0.0)
+        return np.column_stack(
+            (speeds, np.clip(steer, -self.max_steer, self.max_steer))
+        )
+
+
+def get_kinematic_model(config: "KinematicsConfig") -> KinematicModel:
+    if config.model == "unicycle":
+        return Unicycle(config.integrator)
+    if config.model == "differential_drive":
+        return DifferentialDrive(config.track_width, config.integrator)
+    if config.model == "bicycle":
+        return Bicycle(
+            config.wheel_base,
+            math.radians(config.max_steer),
+            config.integrator,
+        )
+    raise ValueError(f"Unknown kinematic model '{config.model}'.")
@@ -0,0 +1,236 @@
+import math
+
+import numpy as np
+
+from ..logging import get_logger
+from ..utils import Position
+from .costmap import distance_field
+
+logger = get_logger(__name__)
+
+
+def traverse_beams(
+    origin: Position | np.ndarray,
+    directions: np.ndarray,
+    lengths: np.ndarray,
+    resolution: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cells crossed by beams from `origin`, for all beams at once.
+
+    This is the DDA traversal of Amanatides and Woo, vectorized over beams:
+    the distances at which each beam crosses a vertical or horizontal cell
+    boundary are computed in one array, sorted per beam, and every stretch
+    between consecutive crossings falls in one cell.
+
+    Parameters
+    ----------
+    origin : Position | np.ndarray
+        Start of every beam, or starts of shape (beams, 2).
+    directions : np.ndarray
+        Unit directions of shape (beams, 2).
+    lengths : np.ndarray
+        Beam lengths of shape (beams,).
+    resolution : int
+        Cells per unit length; cell ``(i, j)`` is centered on
+        ``(j / resolution, i / resolution)``.
+
+    Returns
+    -------
+    cells : np.ndarray
+        Cell indices (i, j) of shape (beams, steps, 2), in order along
+        each beam.
+    valid : np.ndarray
+        Boolean mask of shape (beams, steps) of the entries of `cells` that
+        a beam actually crosses. The last valid entry holds the beam's end.
+    """
+    # Grid units, in which cell boundaries are at integers.
+    if isinstance(origin, Position):
+        origin = np.array([origin.x, origin.y])
+    start = np.broadcast_to(
+        np.asarray(origin, dtype=float) * resolution + 0.5,
+        (len(directions), 2),
+    )
+    lengths = np.asarray(lengths, dtype=float) * resolution
+    steps = math.ceil(float(lengths.max(initial=0.0))) + 1
+    k = np.arange(steps)
+    crossings = []
+    for axis in (0, 1):
+        d = directions[:, axis]
+        s = start[:, axis]
+        forward = d > 0
+        # First boundary strictly ahead of the start along the axis.
+        first = np.where(forward, np.floor(s) + 1, np.ceil(s) - 1)
+        bounds = first[:, None] + np.where(forward, 1, -1)[:, None] * k
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (bounds - s[:, None]) / d[:, None]
+        t[d == 0] = math.inf
+        crossings.append(t)
+    t = np.sort(np.concatenate(crossings, axis=1), axis=1)
+    edges = np.concatenate(
+        (np.zeros((len(t), 1)), t, lengths[:, None]), axis=1
+    )
+    edges = np.minimum(edges, lengths[:, None])
+    valid = edges[:, 1:] > edges[:, :-1]
+    # Every beam has at least its start cell.
+    valid[:, 0] |= ~valid.any(axis=1)
+    mid = (edges[:, 1:] + edges[:, :-1]) / 2
+    x = np.floor(start[:, 0:1] + mid * directions[:, 0:1]).astype(np.intp)
+    y = np.floor(start[:, 1:2] + mid * directions[:, 1:2]).astype(np.intp)
+    return np.stack((y, x), axis=-1), valid
+
+
+class OccupancyMap:
+    """Log-odds occupancy grid built up from range readings.
+
+    Every cell holds the log-odds that it is occupied, starting at 0 for
+    unknown. A scan adds `miss` to every cell its beams pass through and
+    `hit` to the cells where they end on an obstacle, each cell at most
+    once per scan, and values are clamped to ``[-clamp, clamp]`` so the map
+    can still change its mind. Cells are on the grid of
+    `Env.occupancy_grid` at `resolution`.
+
+    Parameters
+    ----------
+    size : tuple[int, int]
+        Environment size as (width, height).
+    resolution : int, optional
+        Cells per unit length, by default 2
+    hit : float, optional
+        Log-odds added where a beam ends on an obstacle, by default 0.85
+    miss : float, optional
+        Log-odds added where a beam passes, by default -0.4
+    clamp : float, optional
+        Bound on the magnitude of the log-odds, by default 4.0
+    threshold : float, optional
+        Magnitude beyond which a cell counts as known, by default 0.2
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int],
+        resolution: int = 2,
+        hit: float = 0.85,
+        miss: float = -0.4,
+        clamp: float = 4.0,
+        threshold: float = 0.2,
+    ) -> None:
+        self.size = size
+        self.resolution = resolution
+        self.hit = hit
+        self.miss = miss
+        self.clamp = clamp
+        self.threshold = threshold
+        self.shape = (size[1] * resolution + 1, size[0] * resolution + 1)
+        self.log_odds = np.zeros(self.shape, dtype=np.float32)
+        self.scans = 0
+
+    def integrate(
+        self,
+        origin: Position,
+        directions: np.ndarray,
+        ranges: np.ndarray,
+        max_range: float,
+        hit_offset: float = 0.0,
+    ) -> None:
+        """Update the map with one scan.
+
+        Parameters
+        ----------
+        origin : Position
+            Position of the sensor.
+        directions : np.ndarray
+            Unit directions of the beams, shape (beams, 2).
+        ranges : np.ndarray
+            Free distance read along every beam, shape (beams,).
+        max_range : float
+            Range of the sensor; beams reading it hit nothing.
+        hit_offset : float, optional
+            Distance beyond the reading at which the obstacle lies, by
+            default 0.0
+        """
+        ranges = np.asarray(ranges, dtype=float)
+        cells, valid = traverse_beams(
+            origin, directions, ranges, self.resolution
+        )
+        rows, cols = self.shape
+        inside = (
+            (cells[..., 0] >= 0)
+            & (cells[..., 0] < rows)
+            & (cells[..., 1] >= 0)
+            & (cells[..., 1] < cols)
+        )
+        hits = ranges < max_range
+        # The cell at the end of a beam that hit something is not known to
+        # be free.
+        last = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        free = valid & inside
+        free[np.flatnonzero(hits), last[hits]] = False
+        free_cells = cells[free]
+        free_cells = free_cells[:, 0] * cols + free_cells[:, 1]
+
+        ends = (
+            np.array([origin.x, origin.y])
+            + directions[hits] * (ranges[hits] + hit_offset)[:, None]
+        )
+        ends = np.floor(ends * self.resolution + 0.5).astype(np.intp)
+        keep = (
+            (ends[:, 0] >= 0)
+            & (ends[:, 0] < cols)
+            & (ends[:, 1] >= 0)
+            & (ends[:, 1] < rows)
+        )
+        hit_cells = ends[keep, 1] * cols + ends[keep, 0]
+
+        # New values are computed from the old ones before any is written,
+        # so cells listed several times are still updated once, and hit
+        # cells that other beams pass through count as hits.
+        log_odds = self.log_odds.ravel()
+        hit_values = log_odds[hit_cells] + self.hit
+        log_odds[free_cells] = np.clip(
+            log_odds[free_cells] + self.miss, -self.clamp, self.clamp
+        )
+        log_odds[hit_cells] = np.clip(hit_values, -self.clamp, self.clamp)
+        self.scans += 1
+
+    def probabilities(self) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-self.log_odds))
+
+    def occupied(self) -> np.ndarray:
+        return self.log_odds > self.threshold
+
+    def free(self) -> np.ndarray:
+        return self.log_odds < -self.threshold
+
+    def unknown(self) -> np.ndarray:
+        return np.abs(self.log_odds) <= self.threshold
+
+    def frontiers(self) -> np.ndarray:
+        """Mask of free cells that border an unknown cell."""
+        unknown = self.unknown()
+        border = np.zeros_like(unknown)
+        border[1:] |= unknown[:-1]
+        border[:-1] |= unknown[1:]
+        border[:, 1:] |= unknown[:, :-1]
+        border[:, :-1] |= unknown[:, 1:]
+        return self.free() & border
+
+    def blocked(self, radius: float) -> np.ndarray:
+        """Cells where a robot of `radius` could touch an occupied cell, or
+        that are not known to be free.
+
+        Like `Costmap`, the footprint is padded by a cell diagonal, since
+        both robot positions and obstacles are only known to the cell.
+        """
+        reach = radius * self.resolution + math.sqrt(2)
+        near = distance_field(self.occupied(), math.ceil(reach)) <= reach
+        return near | ~self.free()
+
+    def cell_of(self, pos: Position) -> tuple[int, int]:
+        """Row and column of the cell holding `pos`, clamped to the grid."""
+        rows, cols = self.shape
+        i = min(max(int(pos.y * self.resolution + 0.5), 0), rows - 1)
+        j = min(max(int(pos.x * self.resolution + 0.5), 0), cols - 1)
+        return i, j
+
+    def cell_position(self, i: int, j: int) -> Position:
+        return Position(j / self.resolution, i / self.resolution)
@@ -0,0 +1,93 @@
+import math
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from ..utils import Position
+
+if TYPE_CHECKING:
+    from ..config import DynamicObstacleConfig
+    from .env import Env
+
+
+class MotionModel(ABC):
+    """Per-step motion of a dynamic obstacle."""
+
+    @abstractmethod
+    def step(self, pos: Position, dt: float, env: "Env") -> Position:
+        """Return the obstacle's position after `dt`.
+
+        Parameters
+        ----------
+        pos : Position
+            Current position of the obstacle.
+        dt : float
+            Time step.
+        env : Env
+            Environment the obstacle moves in.
+        """
+        raise NotImplementedError()
+
+    def reset(self) -> None:
+        """Restore any internal state to its initial value."""
+
+
+class BounceMotion(MotionModel):
+    """Constant velocity, reflected off the environment bounds."""
+
+    def __init__(self, velocity: tuple[float, float]) -> None:
+        self.initial_velocity = velocity
+        self.velocity = velocity
+
+    def step(self, pos: Position, dt: float, env: "Env") -> Position:
+        vx, vy = self.velocity
+        x = pos.x + vx * dt
+        y = pos.y + vy * dt
+        width, height = env.size
+        if not 0 <= x <= width:
+            vx = -vx
+            x = min(max(x, 0), width)
+        if not 0 <= y <= height:
+            vy = -vy
+            y = min(max(y, 0), height)
+        self.velocity = (vx, vy)
+        return Position(x, y)
+
+    def reset(self) -> None:
+        self.velocity = self.initial_velocity
+
+
+class PatrolMotion(MotionModel):
+    """Move at constant speed through a closed loop of waypoints."""
+
+    def __init__(self, waypoints: list[Position], speed: float) -> None:
+        if not waypoints:
+            raise ValueError("PatrolMotion needs at least one waypoint.")
+        self.waypoints = waypoints
+        self.speed = speed
+        self.next_idx = 0
+
+    def step(self, pos: Position, dt: float, env: "Env") -> Position:
+        remaining = self.speed * dt
+        x, y = pos.x, pos.y
+        for _ in range(len(self.waypoints)):
+            goal = self.waypoints[self.next_idx]
+            dist = math.hypot(goal.x - x, goal.y - y)
+            if dist > remaining:
+                x += (goal.x - x) / dist * remaining
+                y += (goal.y - y) / dist * remaining
+                break
+            x, y = goal.x, goal.y
+            remaining -= dist
+            self.next_idx = (self.next_idx + 1) % len(self.waypoints)
+        return Position(x, y)
+
+    def reset(self) -> None:
+        self.next_idx = 0
+
+
+def get_motion_model(config: "DynamicObstacleConfig") -> MotionModel:
+    if config.motion == "bounce":
+        return BounceMotion(config.velocity)
+    if config.motion == "patrol":
+        return PatrolMotion(config.waypoints, config.speed)
+    raise ValueError(f"Unknown motion model '{config.motion}'.")
@@ -0,0 +1,228 @@
+import queue
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class FrameWriter(ABC):
+    """Sink for raw RGBA frames produced by an offscreen renderer."""
+
+    def __init__(self, output_path: Path, fps: int) -> None:
+        self.output_path = Path(output_path)
+        self.fps = fps
+
+    @abstractmethod
+    def open(self, width: int, height: int) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def write(self, frame: np.ndarray) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError()
+
+
+class FFmpegWriter(FrameWriter):
+    """Pipe raw RGBA frames into an ffmpeg subprocess."""
+
+    def __init__(
+        self,
+        output_path: Path,
+        fps: int,
+        codec: str = "libx264",
+        ffmpeg_bin: str = "ffmpeg",
+    ) -> None:
+        super().__init__(output_path, fps)
+        self.codec = codec
+        self.ffmpeg_bin = ffmpeg_bin
+        self.process: subprocess.Popen | None = None
+
+    def open(self, width: int, height: int) -> None:
+        if shutil.which(self.ffmpeg_bin) is None:
+            raise RuntimeError(
+                f"'{self.ffmpeg_bin}' was not found on PATH; it is required "
+                "to export video."
+            )
+        command = [
+            self.ffmpeg_bin,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",
+            "-an",
+            "-vcodec",
+            self.codec,
+            "-pix_fmt",
+            "yuv420p",
+            # yuv420p requires even dimensions.
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            str(self.output_path),
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray) -> None:
+        if self.process is None or self.process.stdin is None:
+            raise RuntimeError("FFmpegWriter must be opened before writing.")
+        self.process.stdin.write(frame.tobytes())
+
+    def close(self) -> None:
+        if self.process is None:
+            return
+        if self.process.stdin is not None:
+            self.process.stdin.close()
+        return_code = self.process.wait()
+        self.process = None
+        if return_code != 0:
+            raise RuntimeError(f"ffmpeg exited with status {return_code}.")
+
+
+class GifWriter(FrameWriter):
+    """Write frames to an animated GIF with Pillow.
+
+    Each frame is quantized to its own palette and appended to the file as
+    it arrives, so memory use does not grow with the length of the episode.
+    """
+
+    def __init__(self, output_path: Path, fps: int) -> None:
+        super().__init__(output_path, fps)
+        self.file: BinaryIO | None = None
+        self.frames_written = 0
+
+    def open(self, width: int, height: int) -> None:
+        try:
+            from PIL import GifImagePlugin, Image
+        except ImportError as e:
+            raise RuntimeError("Pillow is required to export GIFs.") from e
+        self._image = Image
+        self._gif = GifImagePlugin
+        self.file = open(self.output_path, "wb")
+        self.frames_written = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        if self.file is None:
+            raise RuntimeError("GifWriter must be opened before writing.")
+        image = self._image.fromarray(frame[..., :3], mode="RGB")
+        image = image.quantize(colors=256)
+        if not self.frames_written:
+            header, _ = self._gif.getheader(image, info={"loop": 0})
+            self.file.writelines(header)
+        self.file.writelines(
+            self._gif.getdata(
+                image,
+                duration=int(1000 / self.fps),
+                include_color_table=True,
+            )
+        )
+        self.frames_written += 1
+
+    def close(self) -> None:
+        if self.file is None:
+            return
+        if self.frames_written:
+            self.file.write(b";")  # GIF trailer
+        self.file.close()
+        self.file = None
+        if not self.frames_written:
+            self.output_path.unlink(missing_ok=True)
+
+
+writer_registry: dict[str, type[FrameWriter]] = {
+    ".gif": GifWriter,
+}
+
+
+def get_frame_writer(output_path: Path, fps: int) -> FrameWriter:
+    """Select a frame writer based on the output file suffix.
+
+    GIF files are written with Pillow, everything else is handed to ffmpeg.
+    """
+    writer_cls = writer_registry.get(Path(output_path).suffix.lower())
+    if writer_cls is None:
+        return FFmpegWriter(output_path, fps)
+    return writer_cls(output_path, fps)
+
+
+class FrameRecorder:
+    """Encode frames on a background thread fed by a bounded queue.
+
+    The renderer thread only copies the canvas buffer into the queue. When
+    the encoder falls behind, `submit` blocks, so memory use stays bounded
+    at `max_queued_frames` frames.
+    """
+
+    _STOP = object()
+
+    def __init__(self, writer: FrameWriter, max_queued_frames: int = 32):
+        self.writer = writer
+        self.frames: queue.Queue = queue.Queue(maxsize=max_queued_frames)
+        self.frames_written = 0
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._thread is not None
+
+    def open(self, width: int, height: int) -> None:
+        self.writer.open(width, height)
+        self._thread = threading.Thread(
+            target=self._drain, name="robo-sim-frame-writer", daemon=True
+        )
+        self._thread.start()
+        logger.debug(
+            f"Recording {width}x{height} frames to "
+            f"{self.writer.output_path}."
+        )
+
+    def submit(self, frame: np.ndarray) -> None:
+        if self._error is not None:
+            raise RuntimeError("Frame writer failed.") from self._error
+        self.frames.put(frame)
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self.frames.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+        self.writer.close()
+        if self._error is not None:
+            raise RuntimeError("Frame writer failed.") from self._error
+        logger.info(
+            f"Wrote {self.frames_written} frames to "
+            f"{self.writer.output_path}."
+        )
+
+    def _drain(self) -> None:
+        while True:
+            frame = self.frames.get()
+            if frame is self._STOP:
+                return
+            if self._error is not None:
+                continue  # Keep draining so producers never block forever.
+            try:
+                self.writer.write(frame)
+                self.frames_written += 1
+            except BaseException as e:
+                self._error = e
@@ -1,24 +1,77 @@
 import math
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 import matplotlib
 
 matplotlib.use("QtAgg")
 import matplotlib.patches as patches
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.animation import FuncAnimation
 from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 
+from ..geometry import AABB, Circle, ConvexPolygon, OrientedBox, Shape
 from ..logging import get_logger
 from ..utils import Position, manhattan_distance
 from .env import Env
-from .sensors import BasicProximitySensor
+from .env_objects import DynamicObstacle, EnvObject, Obstacle
+from .recorder import FrameRecorder
+from .trajectory import FrameState
 
 logger = get_logger(__name__)
 
 if TYPE_CHECKING:
     from ..sim import Sim
 
+# Maps with more objects than this switch to level-of-detail rendering.
+LARGE_MAP_OBJECTS = 1000
+
+
+def _circle_patch(shape: Shape, pos: Position, **kwargs) -> patches.Patch:
+    assert isinstance(shape, Circle)
+    return patches.Circle((pos.x, pos.y), shape.radius, **kwargs)
+
+
+def _box_patch(shape: Shape, pos: Position, **kwargs) -> patches.Patch:
+    assert isinstance(shape, AABB)
+    return patches.Rectangle(
+        (pos.x - shape.half_width, pos.y - shape.half_height),
+        2 * shape.half_width,
+        2 * shape.half_height,
+        **kwargs,
+    )
+
+
+def _polygon_patch(shape: Shape, pos: Position, **kwargs) -> patches.Patch:
+    vertices = shape.polygon()
+    assert vertices is not None
+    return patches.Polygon(vertices + (pos.x, pos.y), **kwargs)
+
+
+patch_builders: dict[type[Shape], Callable[..., patches.Patch]] = {
+    Circle: _circle_patch,
+    AABB: _box_patch,
+    OrientedBox: _polygon_patch,
+    ConvexPolygon: _polygon_patch,
+}
+
+
+def object_patch(
+    obj: EnvObject, pos: Position | None = None, **kwargs
+) -> patches.Patch:
+    """Build the matplotlib patch for an object from its geometry, at `pos`
+    if given and at the object's own position otherwise."""
+    kwargs.setdefault("facecolor", obj.color)
+    kwargs.setdefault("edgecolor", "none")
+    return patch_builders[type(obj.geometry)](
+        obj.geometry, obj.pos if pos is None else pos, **kwargs
+    )
+
 
 class Renderer:
     """RoboSim Renderer class."""
@@ -27,6 +80,9 @@ class Renderer:
         self,
         env: Env,
         trace_path: bool = False,
+        recorder: FrameRecorder | None = None,
+        large_map: bool | None = None,
+        raster_resolution: int = 1,
     ) -> None:
         """Constructor for Renderer.
 
@@ -36,14 +92,46 @@ class Renderer:
             Environment to animate.
         trace_path : bool, optional
             Whether to visually trace the robot's path, by default False
+        recorder : FrameRecorder | None, optional
+            If given, frames are rendered offscreen on an Agg canvas and
+            streamed to the recorder instead of being shown in a window, by
+            default None
+        large_map : bool | None, optional
+            Whether to use level-of-detail rendering, where obstacles are
+            rasterized once into an image and the per-frame artists are
+            updated in place. Inferred from the number of objects if None,
+            by default None
+        raster_resolution : int, optional
+            Cells per unit length of the obstacle image in large-map mode,
+            by default 1
         """
         self.env = env
         self.trace_path = trace_path
+        self.recorder = recorder
+        if large_map is None:
+            large_map = len(env.objects) > LARGE_MAP_OBJECTS
+        self.large_map = large_map
+        self.raster_resolution = raster_resolution
+        self.lod_artists: dict[str, Artist] = {}
+        self._path_xy = np.empty((0, 2))
+        self._path_len = 0
+        self._decimated_path: list[tuple[float, float]] = []
+        self._decimation_px = 0.0
+        self._raster_view: tuple | None = None
         self.robot_path: list[Position] = []
         self.artists: list[Artist] = []
-        self.fig, self.ax = plt.subplots(figsize=(10, 6))
+        if self.recording:
+            self.fig = Figure(figsize=(10, 6))
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+        else:
+            self.fig, self.ax = plt.subplots(figsize=(10, 6))
         self.setup_plot()
 
+    @property
+    def recording(self) -> bool:
+        return self.recorder is not None
+
     def setup_plot(self) -> None:
         """Set up the initial plotting parameters."""
         self.ax.set_xlim(0, self.env.size[1])
@@ -54,30 +142,35 @@ class Renderer:
 
     def draw_objects(self) -> None:
         for obj in self.env.objects:
-            obj_shape: patches.Rectangle | patches.Circle
-            if obj.shape == "square":
-                obj_shape = patches.Rectangle(
-                    (obj.pos.x - obj.radius, obj.pos.y - obj.radius),
-                    2 * obj.radius,
-                    2 * obj.radius,
-                    facecolor=obj.color,
-                    edgecolor="none",
-                )
-            else:
-                obj_shape = patches.Circle(
-                    (obj.pos.x, obj.pos.y),
-                    obj.radius,
-                    facecolor=obj.color,
-                    edgecolor="none",
-                )
+            if isinstance(obj, DynamicObstacle):
+                continue
+            obj_shape = object_patch(obj)
+            self.ax.add_patch(obj_shape)
+            self.artists.append(obj_shape)
+
+    def draw_dynamic_obstacles(self, state: FrameState) -> None:
+        for obj_shape in self.dynamic_patches(state):
             self.ax.add_patch(obj_shape)
             self.artists.append(obj_shape)
 
-    def draw_robot(self, sim: "Sim") -> None:
+    def dynamic_patches(self, state: FrameState) -> list[patches.Patch]:
+        """Patches of the dynamic obstacles at their positions in `state`,
+        falling back to their current positions in the environment."""
+        positions: list[Position | None] = [None] * len(
+            self.env.dynamic_obstacles
+        )
+        if state.dynamic_obstacles is not None:
+            positions = [Position(x, y) for x, y in state.dynamic_obstacles]
+        return [
+            object_patch(obj, pos)
+            for obj, pos in zip(self.env.dynamic_obstacles, positions)
+        ]
+
+    def draw_robot(self, state: FrameState) -> None:
         robot_circle = patches.Circle(
-            (sim.robot.pos.x, sim.robot.pos.y),
-            sim.robot.radius,
-            facecolor=sim.robot.color,
+            (state.robot_pos.x, state.robot_pos.y),
+            state.robot_radius,
+            facecolor=state.robot_color,
             edgecolor="none",
         )
         self.ax.add_patch(robot_circle)
@@ -93,55 +186,92 @@ class Renderer:
             )
             self.artists.append(path_line)
 
-    def draw_sensors(self, sim: "Sim") -> None:
+    def reset_path(self, points: np.ndarray) -> None:
+        """Replace the traced path, e.g. after seeking in a replay.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Positions of shape (n, 2) visited so far.
+        """
+        self.robot_path = [Position(x, y) for x, y in points]
+        self._path_xy = np.array(points, dtype=float).reshape(-1, 2)
+        self._path_len = len(self._path_xy)
+        self._decimated_path = []
+        self._decimation_px = 0.0
+
+    def draw_sensors(self, state: FrameState) -> None:
         """Draw sensor beams if the robot has a sensor.
 
         Parameters
         ----------
-        sim : Sim
-            Simulation whose animation in which to draw the sensor beams.
+        state : FrameState
+            Frame whose sensor readings to draw.
         """
-        if hasattr(sim.robot, "sensor"):
-            if isinstance(sim.robot.sensor, BasicProximitySensor):
-                for angle, dist in sim.robot.sensor.sense(
-                    sim.env, sim.robot.pos, sim.robot.radius
-                ).items():
-                    end_x = sim.robot.pos.x + dist * math.cos(
-                        math.radians(angle)
-                    )
-                    end_y = sim.robot.pos.y + dist * math.sin(
-                        math.radians(angle)
-                    )
-                    (sensor_line,) = self.ax.plot(
-                        [sim.robot.pos.x, end_x],
-                        [sim.robot.pos.y, end_y],
-                        "r-",
-                        alpha=0.3,
-                        linewidth=0.5,
-                    )
-                    self.artists.append(sensor_line)
+        segments = self.sensor_beams(state)
+        if segments is None:
+            return
+        for (start_x, start_y), (end_x, end_y) in segments:
+            (sensor_line,) = self.ax.plot(
+                [start_x, end_x],
+                [start_y, end_y],
+                "r-",
+                alpha=0.3,
+                linewidth=0.5,
+            )
+            self.artists.append(sensor_line)
+
+    def sensor_beams(self, state: FrameState) -> np.ndarray | None:
+        """Sensor beam segments of shape (beams, 2, 2), if the frame has
+        sensor readings."""
+        if state.sensor_angles is None or state.sensor_readings is None:
+            return None
+        angles = np.radians(state.sensor_angles)
+        dists = state.sensor_readings
+        origin = np.array([state.robot_pos.x, state.robot_pos.y])
+        ends = origin + dists[:, None] * np.column_stack(
+            (np.cos(angles), np.sin(angles))
+        )
+        return np.stack((np.broadcast_to(origin, ends.shape), ends), axis=1)
 
     def update(self, frame: int, sim: "Sim", done: bool) -> list[Artist]:
         """Update the visualization each frame based on the simulation
         status."""
+        return self.render(FrameState.from_sim(sim, frame, done))
+
+    def render(self, state: FrameState) -> list[Artist]:
+        """Draw a single frame, independently of any live simulation."""
+        if self.large_map:
+            return self.render_large_map(state)
+
         self.ax.clear()
+        self.artists = []
         self.setup_plot()
         self.draw_objects()
-        self.update_robot_path(sim.robot.pos)
-        self.draw_sensors(sim)
-        self.draw_robot(sim)
+        self.draw_dynamic_obstacles(state)
+        self.update_robot_path(state.robot_pos)
+        self.draw_sensors(state)
+        self.draw_robot(state)
+        self.draw_status(state)
+        return self.artists
 
-        distance_to_target = manhattan_distance(sim.robot.pos, sim.target)
+    def draw_status(self, state: FrameState) -> None:
+        distance_to_target = manhattan_distance(state.robot_pos, state.target)
         self.fig.suptitle(
-            f"$\\mathbf{{Frame}}$: {frame + 1}, "
+            f"$\\mathbf{{Frame}}$: {state.frame + 1}, "
             f"$\\mathbf{{Distance from Target}}$: {distance_to_target}\n"
-            f"$\\mathbf{{Robot Position}}$: {sim.robot.pos}",
+            f"$\\mathbf{{Robot Position}}$: {state.robot_pos}",
             fontsize=10,
         )
 
-        if done:
+        completion = self.lod_artists.pop("completion", None)
+        if completion is not None and not state.done:
+            completion.remove()  # Scrubbed back from the final frame.
+        elif completion is not None:
+            self.lod_artists["completion"] = completion
+        elif state.done:
             completion_text = (
-                "Simulation Complete" if sim.reached else "Simulation Ended"
+                "Simulation Complete" if state.reached else "Simulation Ended"
             )
             text = self.ax.text(
                 0.5,
@@ -159,11 +289,193 @@ class Renderer:
                 ),
             )
             self.artists.append(text)
+            if self.large_map:
+                self.lod_artists["completion"] = text
 
-        return self.artists
+    def setup_large_map(self) -> None:
+        """Create the persistent artists used by large-map rendering.
+
+        Static obstacles are rasterized into an occupancy image of the
+        view, so the cost of a frame does not depend on how many obstacles
+        the map holds. Dynamic obstacles are redrawn as patches every
+        frame.
+        """
+        self.ax.clear()
+        self.setup_plot()
+        limits = self.ax.get_xlim(), self.ax.get_ylim()
+        self.lod_artists["obstacles"] = self.ax.imshow(
+            np.zeros((1, 1)),
+            cmap=ListedColormap([Obstacle(Position(0, 0)).color]),
+            origin="lower",
+            interpolation="nearest",
+            zorder=1,
+        )
+        self.ax.set_xlim(limits[0])
+        self.ax.set_ylim(limits[1])
+        self._raster_view = None
+        self.raster_obstacles()
+        for obj in self.env.objects:
+            if not isinstance(obj, Obstacle):
+                self.ax.add_patch(object_patch(obj, zorder=2))
+
+        dynamic = PatchCollection([], match_original=True, zorder=2)
+        self.ax.add_collection(dynamic)
+        self.lod_artists["dynamic"] = dynamic
+
+        path_line = Line2D(
+            [], [], color="deepskyblue", linewidth=2, alpha=0.6, zorder=3
+        )
+        self.ax.add_line(path_line)
+        self.lod_artists["path"] = path_line
+
+        beams = LineCollection(
+            [], colors="r", alpha=0.3, linewidths=0.5, zorder=4
+        )
+        self.ax.add_collection(beams)
+        self.lod_artists["sensors"] = beams
+
+        robot_circle = patches.Circle((0, 0), 0, edgecolor="none", zorder=5)
+        self.ax.add_patch(robot_circle)
+        self.lod_artists["robot"] = robot_circle
+
+    def raster_obstacles(self) -> None:
+        """Rasterize the static obstacles in view into the obstacle image,
+        if the view changed since the last call.
+
+        Only the cells in view are rasterized, at most one per screen
+        pixel, so a map held in a tiled world is never loaded whole.
+        """
+        x_min, x_max = self.ax.get_xlim()
+        y_min, y_max = self.ax.get_ylim()
+        width, height = self.ax.bbox.width, self.ax.bbox.height
+        view = (x_min, x_max, y_min, y_max, width, height)
+        if view == self._raster_view:
+            return
+        self._raster_view = view
+        res = self.raster_resolution
+        rows, cols = self.env.grid_shape(res)
+        i0 = max(math.floor(y_min * res), 0)
+        i1 = min(math.ceil(y_max * res) + 1, rows)
+        j0 = max(math.floor(x_min * res), 0)
+        j1 = min(math.ceil(x_max * res) + 1, cols)
+        step = max(
+            1,
+            math.ceil((i1 - i0) / max(height, 1.0)),
+            math.ceil((j1 - j0) / max(width, 1.0)),
+        )
+        grid = self.env.occupancy_window(
+            slice(i0, i1, step), slice(j0, j1, step), res, static_only=True
+        )
+        image = self.lod_artists["obstacles"]
+        image.set_data(np.ma.masked_where(~grid, grid))
+        image.set_clim(0, 1)
+        # Each image pixel spans `step` cells around its cell center.
+        image.set_extent(
+            (
+                (j0 - step / 2) / res,
+                (j0 + (grid.shape[1] - 0.5) * step) / res,
+                (i0 - step / 2) / res,
+                (i0 + (grid.shape[0] - 0.5) * step) / res,
+            )
+        )
+        # The extent must not widen the view.
+        self.ax.set_xlim(x_min, x_max)
+        self.ax.set_ylim(y_min, y_max)
+
+    def render_large_map(self, state: FrameState) -> list[Artist]:
+        """Update the persistent large-map artists in place."""
+        if not self.lod_artists:
+            self.setup_large_map()
+        else:
+            self.raster_obstacles()
+
+        if self.env.dynamic_obstacles:
+            self.lod_artists["dynamic"].remove()
+            dynamic = PatchCollection(
+                self.dynamic_patches(state), match_original=True, zorder=2
+            )
+            self.ax.add_collection(dynamic)
+            self.lod_artists["dynamic"] = dynamic
+
+        pos = state.robot_pos
+        if self.trace_path:
+            path_x, path_y = self.decimated_path(pos)
+            self.lod_artists["path"].set_data(path_x, path_y)
+
+        segments = self.sensor_beams(state)
+        self.lod_artists["sensors"].set_segments(
+            [] if segments is None else segments
+        )
+
+        robot_circle = self.lod_artists["robot"]
+        robot_circle.set_center((pos.x, pos.y))
+        robot_circle.set_radius(state.robot_radius)
+        robot_circle.set_facecolor(state.robot_color)
+
+        self.draw_status(state)
+        return list(self.lod_artists.values())
+
+    def decimated_path(
+        self, robot_pos: Position
+    ) -> tuple[list[float], list[float]]:
+        """Append a position to the traced path and return it thinned to at
+        most one vertex per screen pixel at the current zoom level."""
+        if self._path_len == len(self._path_xy):
+            grown = np.empty((max(64, 2 * len(self._path_xy)), 2))
+            grown[: self._path_len] = self._path_xy[: self._path_len]
+            self._path_xy = grown
+        self._path_xy[self._path_len] = (robot_pos.x, robot_pos.y)
+        self._path_len += 1
+
+        x_min, x_max = self.ax.get_xlim()
+        px = (x_max - x_min) / max(self.ax.bbox.width, 1.0)
+        if px != self._decimation_px:
+            # Zoom changed, so re-thin the whole path.
+            self._decimation_px = px
+            points = self._path_xy[: self._path_len]
+            cells = np.floor(points / px)
+            keep = np.ones(len(points), dtype=bool)
+            keep[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+            self._decimated_path = [tuple(p) for p in points[keep]]
+        else:
+            last = self._decimated_path[-1] if self._decimated_path else None
+            if last is None or (
+                math.floor(last[0] / px) != math.floor(robot_pos.x / px)
+                or math.floor(last[1] / px) != math.floor(robot_pos.y / px)
+            ):
+                self._decimated_path.append((robot_pos.x, robot_pos.y))
+
+        path_x = [p[0] for p in self._decimated_path]
+        path_y = [p[1] for p in self._decimated_path]
+        # Always end the line at the robot, even within the last pixel.
+        if (path_x[-1], path_y[-1]) != (robot_pos.x, robot_pos.y):
+            path_x.append(robot_pos.x)
+            path_y.append(robot_pos.y)
+        return path_x, path_y
+
+    def capture_frame(self) -> None:
+        """Draw the figure offscreen and hand its RGBA buffer to the
+        recorder."""
+        if self.recorder is None:
+            raise RuntimeError("Renderer was not created with a recorder.")
+        canvas = self.fig.canvas
+        canvas.draw()
+        # The Agg buffer is reused by the next draw, so queue a copy.
+        frame = np.asarray(canvas.buffer_rgba()).copy()
+        if not self.recorder.is_open:
+            height, width = frame.shape[:2]
+            self.recorder.open(width, height)
+        self.recorder.submit(frame)
 
     def animate_step_by_step(self, sim: "Sim", frame: int, done: bool) -> None:
-        self.update(frame, sim, done)
+        self.present(FrameState.from_sim(sim, frame, done))
+
+    def present(self, state: FrameState) -> None:
+        """Render a frame and either record it or show it on screen."""
+        self.render(state)
+        if self.recording:
+            self.capture_frame()
+            return
         plt.draw()
         plt.pause(0.1)
 
@@ -171,7 +483,19 @@ class Renderer:
         def update_frame(frame: int) -> list[Artist]:
             return self.update(frame, sim, done=(frame == steps - 1))
 
+        if self.recording:
+            for frame in range(steps):
+                update_frame(frame)
+                self.capture_frame()
+            self.close()
+            return
+
         self.anim = FuncAnimation(
             self.fig, update_frame, frames=steps, interval=50, repeat=False
         )
         plt.show()
+
+    def close(self) -> None:
+        """Flush any pending frames and finalize the recording."""
+        if self.recorder is not None:
+            self.recorder.close()
@@ -1,10 +1,21 @@
 import math
 from abc import abstractmethod
+from typing import Any
 
+import numpy as np
+
+from ..geometry import Circle, Shape
 from ..utils import Direction, Position
 from .env import Env
 from .env_objects import EnvObject
-from .sensors import SensorInterface
+from .kinematics import KinematicModel
+from .mapping import OccupancyMap
+from .sensors import (
+    BasicProximitySensor,
+    BatchedSensor,
+    SensingPipeline,
+    SensorInterface,
+)
 
 
 class Robot(EnvObject):
@@ -14,24 +25,29 @@ class Robot(EnvObject):
         init_vel: float,
         init_ang_vel: float,
         orientation: float,
+        kinematics: KinematicModel | None = None,
+        dt: float = 1.0,
     ) -> None:
-        self.pos = pos
+        super().__init__(pos)
         self.init_vel = init_vel
         self.init_ang_vel = init_ang_vel
         self.orientation = orientation
         self.prev_pos = self.pos
+        self.kinematics = kinematics
+        self.dt = dt
 
-    @property
-    def radius(self) -> float:
-        return 0.3
+    def default_geometry(self) -> Shape:
+        return Circle(0.3)
 
     @property
     def color(self) -> str:
         return "blue"
 
     @property
-    def shape(self) -> str:
-        return "circle"
+    def substeps(self) -> int:
+        """Number of sub-steps at which `drive_towards` checks a step, so
+        that they are at most a quarter of the robot's radius apart."""
+        return max(1, math.ceil(4 * self.init_vel * self.dt / self.radius))
 
     @abstractmethod
     def move(self, direction: Direction, env: Env) -> None:
@@ -67,6 +83,69 @@ class Robot(EnvObject):
         """
         self.orientation = new_orientation % 360
 
+    def drive_towards(self, target: Position, env: Env) -> None:
+        """Advance the robot by one step of `dt` under its kinematic model,
+        steering toward `target` with its speed bounded by `init_vel` and
+        its turn rate by `init_ang_vel`.
+
+        The swept motion is checked at sub-steps at most a quarter of the
+        robot's radius apart. Where it would collide or leave the
+        environment, the robot turns in place if its model allows and it
+        has to turn, and otherwise stops at the last free sub-step. A robot
+        that already collides is not held back, so that it can move out of
+        the obstacle.
+
+        Parameters
+        ----------
+        target : Position
+            Position to steer toward.
+        env : Env
+            Environment the robot is using.
+        """
+        if self.kinematics is None:
+            raise RuntimeError("Robot has no kinematic model to drive with.")
+        state = np.array(
+            [(self.pos.x, self.pos.y, math.radians(self.orientation))]
+        )
+        controls = self.kinematics.track(
+            state,
+            np.array([(target.x, target.y)]),
+            self.init_vel,
+            self.init_ang_vel,
+            self.dt,
+        )
+        count = self.substeps
+        poses = self.kinematics.rollout(
+            state,
+            np.broadcast_to(controls, (count,) + controls.shape),
+            self.dt / count,
+        )[:, 0]
+        poses[-1] = self.kinematics.step(state, controls, self.dt)[0]
+        # The current pose comes first, so that a robot which already
+        # collides is told apart from one which would.
+        points = np.vstack((state[:, :2], poses[:, :2]))
+        if env.costmap is not None:
+            blocked = env.costmap.collides(points, self.radius)
+        else:
+            blocked = env.points_in_collision(points, self.radius)
+        blocked |= ((points < 0) | (points > env.size)).any(axis=1)
+        end = poses[-1]
+        if not blocked[0] and blocked.any():
+            stop = int(np.argmax(blocked)) - 1
+            turn = abs(math.remainder(poses[-1, 2] - state[0, 2], math.tau))
+            if self.kinematics.turns_in_place and turn > 1e-9:
+                # Turning on the spot first keeps the arc from sweeping
+                # into what blocks it.
+                end = state[0].copy()
+                end[2] = poses[-1, 2]
+            elif stop:
+                end = poses[stop - 1]
+            else:
+                end = state[0]
+        x, y, theta = end.tolist()
+        self.move_to(Position(x, y))
+        self.rotate_to(math.degrees(theta))
+
     def rotate_by(self, angle: float) -> None:
         """Rotate the robot by a given angle.
 
@@ -101,6 +180,14 @@ class BasicRobot(Robot):
 
 
 class SensorRobot(Robot):
+    """Robot carrying a primary `sensor` and any number of additional
+    `sensors`, all evaluated together by a `SensingPipeline` whose noise
+    comes from the robot's own generator, seeded with `seed`.
+
+    When `belief` is set, every sweep of a `BasicProximitySensor` primary
+    sensor is integrated into it as the robot senses.
+    """
+
     def __init__(
         self,
         pos: Position,
@@ -108,9 +195,62 @@ class SensorRobot(Robot):
         init_ang_vel: float,
         orientation: float,
         sensor: SensorInterface,
+        sensors: list[BatchedSensor] | None = None,
+        seed: int | None = None,
+        kinematics: KinematicModel | None = None,
+        dt: float = 1.0,
     ) -> None:
-        super().__init__(pos, init_vel, init_ang_vel, orientation)
+        super().__init__(
+            pos, init_vel, init_ang_vel, orientation, kinematics, dt
+        )
         self.sensor = sensor
+        self.sensors: list[BatchedSensor] = []
+        if isinstance(sensor, BatchedSensor):
+            self.sensors.append(sensor)
+        self.sensors.extend(sensors or [])
+        self.rng = np.random.default_rng(seed)
+        self.pipeline = SensingPipeline(self.sensors, self.rng)
+        self.observations: dict[str, Any] = {}
+        self.belief: OccupancyMap | None = None
+
+    def sense(self, env: Env) -> dict[str, Any]:
+        """Update every due sensor at the current pose.
+
+        Returns
+        -------
+        dict[str, Any]
+            Latest reading of every sensor, keyed by sensor name.
+        """
+        sensor = self.sensor
+        mapped = (
+            self.belief is not None
+            and isinstance(sensor, BasicProximitySensor)
+            and self.pipeline.step_idx % sensor.period == 0
+        )
+        self.observations = self.pipeline.step(
+            env, self.pos, self.orientation, self.radius
+        )
+        if mapped:
+            self.update_belief()
+        return self.observations
+
+    def update_belief(self) -> None:
+        """Integrate the primary sensor's latest sweep into `belief`.
+
+        Readings end where the robot's disc would first touch an obstacle,
+        so the cells along each beam are free and the obstacle lies about
+        one radius beyond the reading.
+        """
+        sensor = self.sensor
+        assert self.belief is not None
+        assert isinstance(sensor, BasicProximitySensor)
+        self.belief.integrate(
+            self.pos,
+            sensor.table.directions,
+            sensor.readings,
+            sensor.sensor_range,
+            hit_offset=self.radius,
+        )
 
     def move(self, direction: Direction, env: Env) -> None:
         """Move the robot in the specified direction within the evironment.
@@ -165,9 +305,8 @@ class SensorRobot(Robot):
         Position
             New position based on the best sensed direction.
         """
-        sensor_data = self.sensor.sense(env, self.pos, self.radius)
-        best_angle = max(sensor_data, key=sensor_data.get)
-        rad = math.radians(best_angle)
-        dx = math.cos(rad) * self.init_vel
-        dy = math.sin(rad) * self.init_vel
-        return self.pos + (dx, dy)
+        if not isinstance(self.sensor, BasicProximitySensor):
+            raise ValueError("decide_move requires a BasicProximitySensor.")
+        beam = self.sensor.best_beam(env, self.pos, self.radius)
+        dx, dy = self.sensor.table.directions[beam].tolist()
+        return self.pos + (dx * self.init_vel, dy * self.init_vel)
@@ -0,0 +1,182 @@
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..logging import get_logger
+from ..utils import Position, euclidean_distance
+from .env import Env
+from .robot import Robot
+
+if TYPE_CHECKING:
+    from ..config import AdaptiveStepConfig
+    from ..sim import Sim
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class StepStats:
+    frames: int = 0
+    steps: int = 0
+    # Frames that took more than one algorithm step.
+    merged_frames: int = 0
+    # Steps checked for collisions in sub-steps.
+    refined_steps: int = 0
+    # Refined steps cut short by a collision.
+    blocked_steps: int = 0
+    max_steps_per_frame: int = 0
+
+    @property
+    def steps_per_frame(self) -> float:
+        return self.steps / self.frames if self.frames else 0.0
+
+
+class StepController:
+    """Chooses how much simulated motion each frame covers.
+
+    A step of length ``d`` from a point whose surroundings are free of
+    obstacles up to the robot's radius plus ``d`` and `clearance` cannot
+    collide, so such steps are taken without further checks and up to
+    `max_steps_per_frame` of them are merged into one frame. Any other step
+    is checked at samples at most `error_bound` apart, stops before the
+    first colliding sample and ends the frame. Frames within
+    `slowdown_radius` of the target, or in maps with moving obstacles,
+    take a single step. If the environment has a cost map, both checks are
+    lookups in it, at its resolution.
+
+    Every algorithm step is still taken; merging saves the per-frame work
+    around it, such as sensing, dynamics, rendering and metrics.
+
+    Parameters
+    ----------
+    max_steps_per_frame : int
+        Maximum algorithm steps taken in one frame.
+    clearance : float
+        Safety margin of the open-space test.
+    error_bound : float
+        Maximum distance between collision checks along refined steps.
+    slowdown_radius : float
+        Distance from the target at which merging stops.
+    """
+
+    def __init__(
+        self,
+        max_steps_per_frame: int,
+        clearance: float,
+        error_bound: float,
+        slowdown_radius: float,
+    ) -> None:
+        self.max_steps_per_frame = max_steps_per_frame
+        self.clearance = clearance
+        self.error_bound = error_bound
+        self.slowdown_radius = slowdown_radius
+        self.stats = StepStats()
+
+    @classmethod
+    def from_config(cls, config: "AdaptiveStepConfig") -> "StepController":
+        return cls(
+            config.max_steps_per_frame,
+            config.clearance,
+            config.error_bound,
+            config.slowdown_radius,
+        )
+
+    def in_open_space(self, env: Env, robot: Robot, end: Position) -> bool:
+        """Whether the step to `end` is clear without sub-step checks."""
+        if not env.is_within_bounds(end):
+            return False
+        reach = euclidean_distance(robot.pos, end)
+        needed = robot.radius + reach + self.clearance
+        if env.costmap is not None:
+            clearance = env.costmap.clearance_at([(robot.pos.x, robot.pos.y)])
+            return bool(clearance[0] > needed)
+        return not env.is_obstacle_in_range(robot.pos, needed)
+
+    def clear_until(self, env: Env, robot: Robot, end: Position) -> Position:
+        """Furthest checked point on the move to `end` before the first
+        sample where the robot would collide or leave the environment.
+
+        A robot that already collides may move out of the obstacle, as far
+        as the first free sample, and stays put if no sample is free.
+        """
+        start = robot.pos
+        length = euclidean_distance(start, end)
+        count = max(1, math.ceil(length / self.error_bound))
+        t = np.linspace(0.0, 1.0, count + 1)
+        points = np.column_stack(
+            (
+                start.x + (end.x - start.x) * t,
+                start.y + (end.y - start.y) * t,
+            )
+        )
+        if env.costmap is not None:
+            blocked = env.costmap.collides(points, robot.radius)
+        else:
+            blocked = env.points_in_collision(points, robot.radius)
+        blocked |= ((points < 0) | (points > env.size)).any(axis=1)
+        if not blocked.any():
+            return end
+        if blocked[0]:
+            first_free = int(np.argmin(blocked))
+            if blocked[first_free]:
+                return start
+            if first_free == count:
+                return end
+            return Position(*points[first_free].tolist())
+        last_free = int(np.argmax(blocked)) - 1
+        return Position(*points[last_free].tolist())
+
+    def advance(self, sim: "Sim") -> int:
+        """Move the robot by one frame.
+
+        Returns
+        -------
+        int
+            Number of algorithm steps taken, 0 if the algorithm has no
+            further move.
+        """
+        robot, env = sim.robot, sim.env
+        # Moving obstacles could cross a step between checks.
+        limit = 1 if env.dynamic_obstacles else self.max_steps_per_frame
+        steps = 0
+        while steps < limit:
+            next_pos, next_angle = sim.algorithm.step()
+            if next_pos is None:
+                break
+            steps += 1
+            if not env.dynamic_obstacles and self.in_open_space(
+                env, robot, next_pos
+            ):
+                sim.move_robot(next_pos, next_angle)
+            else:
+                self.stats.refined_steps += 1
+                end = self.clear_until(env, robot, next_pos)
+                if end is not next_pos:
+                    self.stats.blocked_steps += 1
+                sim.move_robot(end, next_angle)
+                break
+            if (
+                euclidean_distance(robot.pos, env.target.pos)
+                < self.slowdown_radius + env.target.radius
+            ):
+                break
+
+        if steps:
+            self.stats.frames += 1
+            self.stats.steps += steps
+            self.stats.merged_frames += steps > 1
+            self.stats.max_steps_per_frame = max(
+                self.stats.max_steps_per_frame, steps
+            )
+        return steps
+
+    def log_summary(self) -> None:
+        stats = self.stats
+        logger.info(
+            f"- Adaptive Stepping: {stats.steps} steps in {stats.frames} "
+            f"frames ({stats.steps_per_frame:.2f} per frame, at most "
+            f"{stats.max_steps_per_frame}), {stats.refined_steps} refined, "
+            f"{stats.blocked_steps} blocked"
+        )
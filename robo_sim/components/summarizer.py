@@ -1,9 +1,13 @@
+import math
+import random
 import time
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
 
 from ..logging import get_logger
-from ..utils import manhattan_distance
+from ..utils import euclidean_distance
 
 if TYPE_CHECKING:
     from ..sim import Sim
@@ -19,6 +23,8 @@ class SimStats:
     steps_taken: int
     total_displacement: float
     sensor_readings_count: int | None
+    path_length: float = 0.0
+    reached: bool = False
 
 
 class Summarizer:
@@ -27,9 +33,9 @@ class Summarizer:
         self.robot = robot
         self.env = env
         self.start_pos = robot.pos
-        self.total_distance_traveled = 0
+        self.total_distance_traveled = 0.0
 
-    def record_movement(self, distance: int) -> None:
+    def record_movement(self, distance: float) -> None:
         self.total_distance_traveled += distance
 
     def start(self) -> None:
@@ -43,18 +49,24 @@ class Summarizer:
         exec_time = self.end_time - self.start_time if self.end_time else 0
         steps_taken = self.sim.step_idx
         sensor_readings_count = None
-        if hasattr(self.robot, "sensor"):
+        if hasattr(self.robot, "sensors"):
+            sensor_readings_count = sum(
+                sensor.sensor_readings_count for sensor in self.robot.sensors
+            )
+        elif hasattr(self.robot, "sensor"):
             sensor_readings_count = getattr(
                 self.robot.sensor, "sensor_readings_count", None
             )
 
-        total_displacement = manhattan_distance(self.robot.pos, self.start_pos)
+        total_displacement = euclidean_distance(self.robot.pos, self.start_pos)
 
         self.stats = SimStats(
             execution_time=exec_time,
             steps_taken=steps_taken,
             total_displacement=round(total_displacement, 2),
             sensor_readings_count=sensor_readings_count,
+            path_length=round(self.total_distance_traveled, 2),
+            reached=self.sim.reached,
         )
 
     def log_summary(self) -> None:
@@ -68,6 +80,7 @@ class Summarizer:
         )
         logger.info(f"- Number of Steps Taken: {self.stats.steps_taken}")
         logger.info(f"- Total Displacement: {self.stats.total_displacement}")
+        logger.info(f"- Path Length: {self.stats.path_length}")
 
         if self.stats.sensor_readings_count is not None:
             logger.info(
@@ -80,3 +93,178 @@ class Summarizer:
             logger.warning(
                 f"Target not reached. Final position: {self.robot.pos}"
             )
+
+
+class RunningStats:
+    """Streaming count, mean, variance and extremes of a quantity, with a
+    fixed-size uniform sample of the values for quantiles.
+
+    Memory is bounded by `capacity` regardless of how many values are
+    added, and two instances merge into the statistics of the combined
+    stream, so partial results from worker processes can be folded
+    together.
+    """
+
+    def __init__(
+        self, capacity: int = 1024, rng: np.random.Generator | None = None
+    ) -> None:
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # Per-value draws are much cheaper from the standard library.
+        self.random = random.Random(int(self.rng.integers(2**63)))
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean (Welford).
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sample: list[float] = []
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        # Reservoir sampling keeps every value seen with equal probability.
+        if len(self.sample) < self.capacity:
+            self.sample.append(value)
+        else:
+            slot = int(self.random.random() * self.count)
+            if slot < self.capacity:
+                self.sample[slot] = value
+
+    def merge(self, other: "RunningStats") -> None:
+        """Fold the statistics of another stream into this one."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.sample) + len(other.sample) <= self.capacity:
+            self.sample.extend(other.sample)
+        else:
+            # Draw from each reservoir in proportion to its stream size.
+            ours = int(self.rng.binomial(self.capacity, self.count / total))
+            ours = min(
+                max(ours, self.capacity - len(other.sample)), len(self.sample)
+            )
+            theirs = self.capacity - ours
+            self.sample = (
+                self.rng.choice(self.sample, ours, replace=False).tolist()
+                + self.rng.choice(other.sample, theirs, replace=False).tolist()
+            )
+        self.count = total
+
+    def quantile(self, q: float | list[float]) -> float | np.ndarray:
+        """Estimated quantile(s) of the stream from the sample."""
+        if not self.sample:
+            return math.nan
+        return np.quantile(self.sample, q)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "sample": [float(value) for value in self.sample],
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], rng: np.random.Generator | None = None
+    ) -> "RunningStats":
+        stats = cls(data["capacity"], rng)
+        stats.count = data["count"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.min = data["min"]
+        stats.max = data["max"]
+        stats.sample = list(data["sample"])
+        return stats
+
+
+class EpisodeAggregator:
+    """Constant-memory summary of many episodes' `SimStats`.
+
+    Tracks the success rate along with a `RunningStats` per quantity.
+    Aggregators from different processes combine with `merge`, or through
+    `to_dict` and `from_dict` when they have to cross a process boundary.
+    """
+
+    fields = ("steps_taken", "path_length", "execution_time")
+
+    def __init__(self, capacity: int = 1024, seed: int | None = None) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.episodes = 0
+        self.successes = 0
+        self.stats = {
+            field: RunningStats(capacity, self.rng) for field in self.fields
+        }
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.episodes if self.episodes else 0.0
+
+    def add(self, stats: SimStats) -> None:
+        self.episodes += 1
+        self.successes += int(stats.reached)
+        for field, running in self.stats.items():
+            running.add(getattr(stats, field))
+
+    def merge(self, other: "EpisodeAggregator") -> None:
+        self.episodes += other.episodes
+        self.successes += other.successes
+        for field, running in self.stats.items():
+            running.merge(other.stats[field])
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "episodes": self.episodes,
+            "successes": self.successes,
+            "stats": {
+                field: running.to_dict()
+                for field, running in self.stats.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], seed: int | None = None
+    ) -> "EpisodeAggregator":
+        aggregator = cls(seed=seed)
+        aggregator.episodes = data["episodes"]
+        aggregator.successes = data["successes"]
+        aggregator.stats = {
+            field: RunningStats.from_dict(running, aggregator.rng)
+            for field, running in data["stats"].items()
+        }
+        return aggregator
+
+    def log_summary(self) -> None:
+        logger.info(f"Summary of {self.episodes} episodes:")
+        logger.info(f"- Success Rate: {self.success_rate:.1%}")
+        for field, running in self.stats.items():
+            if not running.count:
+                continue
+            p50, p90, p99 = running.quantile([0.5, 0.9, 0.99])
+            logger.info(
+                f"- {field}: mean {running.mean:.2f} "
+                f"(std {running.std:.2f}), p50 {p50:.2f}, p90 {p90:.2f}, "
+                f"p99 {p99:.2f}, max {running.max:.2f}"
+            )
@@ -0,0 +1,300 @@
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+import numpy as np
+
+from ..geometry import shape_from_dict
+from ..logging import get_logger
+from ..utils import Position
+from .env import Env
+from .env_objects import DynamicObstacle, Obstacle
+from .sensors import BasicProximitySensor
+
+if TYPE_CHECKING:
+    from ..sim import Sim
+
+logger = get_logger(__name__)
+
+MAGIC = b"RSTRAJ01"
+# Records start on an aligned offset after the JSON header.
+DATA_ALIGNMENT = 64
+
+REACHED_FLAG = 1
+DONE_FLAG = 2
+
+
+@dataclass
+class FrameState:
+    """Everything the Renderer needs to draw a single frame."""
+
+    frame: int
+    robot_pos: Position
+    robot_radius: float
+    orientation: float
+    target: Position
+    reached: bool
+    done: bool
+    sensor_angles: np.ndarray | None = None
+    sensor_readings: np.ndarray | None = None
+    robot_color: str = "blue"
+    dynamic_obstacles: np.ndarray | None = None
+
+    @classmethod
+    def from_sim(cls, sim: "Sim", frame: int, done: bool) -> "FrameState":
+        robot = sim.robot
+        angles = readings = None
+        sensor = getattr(robot, "sensor", None)
+        if isinstance(sensor, BasicProximitySensor):
+            # Served from the sensor's cache if it already sensed this pose.
+            sensed = sensor.sense(sim.env, robot.pos, robot.radius)
+            angles = sensor.angles.astype(float)
+            readings = sensed.copy()
+        dynamic = None
+        if sim.env.dynamic_obstacles:
+            dynamic = np.array(
+                [(obj.pos.x, obj.pos.y) for obj in sim.env.dynamic_obstacles]
+            )
+        return cls(
+            frame=frame,
+            robot_pos=robot.pos,
+            robot_radius=robot.radius,
+            orientation=robot.orientation,
+            target=sim.target,
+            reached=sim.reached,
+            done=done,
+            sensor_angles=angles,
+            sensor_readings=readings,
+            robot_color=robot.color,
+            dynamic_obstacles=dynamic,
+        )
+
+
+def record_dtype(num_beams: int, num_dynamic: int = 0) -> np.dtype:
+    fields: list = [
+        ("frame", "<i8"),
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("orientation", "<f8"),
+        ("flags", "u1"),
+    ]
+    if num_beams:
+        fields.append(("sensor", "<f4", (num_beams,)))
+    if num_dynamic:
+        fields.append(("dynamic", "<f8", (num_dynamic, 2)))
+    return np.dtype(fields)
+
+
+class TrajectoryWriter:
+    """Append-only writer for fixed-width trajectory records.
+
+    The file holds a JSON header describing the environment, followed by
+    one fixed-size record per frame, so any frame can be located by offset
+    arithmetic alone. Records are buffered and written in batches.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        env: Env,
+        robot_radius: float,
+        sensor_angles: np.ndarray | None = None,
+        batch_size: int = 4096,
+    ) -> None:
+        self.path = Path(path)
+        self.sensor_angles = (
+            np.asarray(sensor_angles, dtype=float)
+            if sensor_angles is not None
+            else np.empty(0)
+        )
+        self.num_dynamic = len(env.dynamic_obstacles)
+        self.dtype = record_dtype(len(self.sensor_angles), self.num_dynamic)
+        self.batch = np.zeros(batch_size, dtype=self.dtype)
+        self.pending = 0
+        self.frames_written = 0
+
+        header = {
+            "size": list(env.size),
+            "target": [env.target.pos.x, env.target.pos.y],
+            "obstacles": [
+                obstacle_record(obj)
+                for obj in env.objects
+                if isinstance(obj, Obstacle)
+                and not isinstance(obj, DynamicObstacle)
+            ],
+            "dynamic_obstacles": [
+                obstacle_record(obj) for obj in env.dynamic_obstacles
+            ],
+            "robot_radius": robot_radius,
+            "sensor_angles": self.sensor_angles.tolist(),
+        }
+        self.file: BinaryIO = self.path.open("wb")
+        write_header(self.file, header)
+
+    def append(self, state: FrameState) -> None:
+        record = self.batch[self.pending]
+        record["frame"] = state.frame
+        record["x"] = state.robot_pos.x
+        record["y"] = state.robot_pos.y
+        record["orientation"] = state.orientation
+        record["flags"] = (REACHED_FLAG if state.reached else 0) | (
+            DONE_FLAG if state.done else 0
+        )
+        if len(self.sensor_angles):
+            if state.sensor_readings is None:
+                record["sensor"] = np.nan
+            else:
+                record["sensor"] = state.sensor_readings
+        if self.num_dynamic:
+            record["dynamic"] = state.dynamic_obstacles
+        self.pending += 1
+        if self.pending == len(self.batch):
+            self.flush()
+
+    def flush(self) -> None:
+        self.file.write(self.batch[: self.pending].tobytes())
+        self.frames_written += self.pending
+        self.pending = 0
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        logger.info(f"Wrote {self.frames_written} frames to {self.path}.")
+
+
+def obstacle_record(obj: Obstacle) -> list:
+    """Compact header entry: ``[x, y]`` for default unit obstacles, with
+    the geometry appended otherwise."""
+    record: list = [obj.pos.x, obj.pos.y]
+    if obj.geometry.to_dict() != obj.default_geometry().to_dict():
+        record.append(obj.geometry.to_dict())
+    return record
+
+
+def write_header(file: BinaryIO, header: dict) -> None:
+    payload = json.dumps(header).encode()
+    prefix = len(MAGIC) + struct.calcsize("<Q")
+    padding = -(prefix + len(payload)) % DATA_ALIGNMENT
+    file.write(MAGIC)
+    file.write(struct.pack("<Q", len(payload) + padding))
+    file.write(payload + b" " * padding)
+
+
+def read_header(path: Path) -> tuple[dict, int]:
+    with Path(path).open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a RoboSim trajectory file.")
+        (length,) = struct.unpack("<Q", f.read(struct.calcsize("<Q")))
+        header = json.loads(f.read(length))
+    return header, len(MAGIC) + struct.calcsize("<Q") + length
+
+
+class TrajectoryReader:
+    """Random-access reader over a recorded trajectory.
+
+    Records are memory-mapped, and only the chunk containing the requested
+    frame is copied into memory, so seeking anywhere in a run with millions
+    of frames is constant time.
+    """
+
+    def __init__(self, path: Path, chunk_size: int = 4096) -> None:
+        self.path = Path(path)
+        self.header, offset = read_header(self.path)
+        self.sensor_angles = np.asarray(self.header["sensor_angles"])
+        # Files written before dynamic obstacles existed have no entry.
+        self.num_dynamic = len(self.header.get("dynamic_obstacles", []))
+        self.dtype = record_dtype(len(self.sensor_angles), self.num_dynamic)
+        # Ignore a partially written trailing record.
+        num_frames = (self.path.stat().st_size - offset) // self.dtype.itemsize
+        self.records = np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            offset=offset,
+            shape=(num_frames,),
+        )
+        self.chunk_size = chunk_size
+        self._chunk_start = -1
+        self._chunk: np.ndarray = np.empty(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def chunk(self, frame: int) -> tuple[int, np.ndarray]:
+        """Load the chunk holding `frame` and return its first frame index
+        along with the records."""
+        if not 0 <= frame < len(self):
+            raise IndexError(f"Frame {frame} out of range.")
+        start = frame - frame % self.chunk_size
+        if start != self._chunk_start:
+            stop = min(start + self.chunk_size, len(self))
+            self._chunk = np.array(self.records[start:stop])
+            self._chunk_start = start
+        return start, self._chunk
+
+    def __getitem__(self, frame: int) -> FrameState:
+        if frame < 0:
+            frame += len(self)
+        start, records = self.chunk(frame)
+        record = records[frame - start]
+        flags = int(record["flags"])
+        readings = None
+        if len(self.sensor_angles):
+            readings = record["sensor"].astype(float)
+            if np.isnan(readings).all():
+                readings = None
+        return FrameState(
+            frame=int(record["frame"]),
+            robot_pos=Position(float(record["x"]), float(record["y"])),
+            robot_radius=self.header["robot_radius"],
+            orientation=float(record["orientation"]),
+            target=Position(*self.header["target"]),
+            reached=bool(flags & REACHED_FLAG),
+            done=bool(flags & DONE_FLAG),
+            sensor_angles=self.sensor_angles if readings is not None else None,
+            sensor_readings=readings,
+            dynamic_obstacles=(
+                record["dynamic"].copy() if self.num_dynamic else None
+            ),
+        )
+
+    def positions(
+        self, stop: int, max_points: int | None = None
+    ) -> np.ndarray:
+        """Robot positions of frames ``[0, stop)``, strided so that at most
+        `max_points` are read from disk."""
+        stride = 1
+        if max_points is not None and stop > max_points:
+            stride = -(-stop // max_points)
+        view = self.records[:stop:stride]
+        points = np.column_stack((view["x"], view["y"]))
+        if stop and (stop - 1) % stride:
+            last = self.records[stop - 1]
+            points = np.vstack((points, (last["x"], last["y"])))
+        return points
+
+    def build_env(self) -> Env:
+        """Rebuild the recorded environment for rendering."""
+        env = Env(
+            size=tuple(self.header["size"]),
+            obstacles=[
+                (
+                    Position(x, y),
+                    shape_from_dict(rest[0]) if rest else None,
+                )
+                for x, y, *rest in self.header["obstacles"]
+            ],
+        )
+        for x, y, *rest in self.header.get("dynamic_obstacles", []):
+            env.add_dynamic_obstacle(
+                Position(x, y),
+                None,
+                shape_from_dict(rest[0]) if rest else None,
+            )
+        env.set_target(Position(*self.header["target"]))
+        return env
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from ..logging import get_logger
+
+logger = get_logger(__name__)
+
+META_FILE = "world.json"
+INDEX_FILE = "index.npy"
+TILES_FILE = "tiles.bin"
+
+# Tile index entries of tiles that are not stored, being uniform.
+FREE_TILE = -1
+FULL_TILE = -2
+
+
+def write_tiled_world(
+    path: Path,
+    size: tuple[int, int],
+    resolution: int,
+    strips: Iterable[np.ndarray],
+    tile_size: int = 256,
+) -> None:
+    """Write an occupancy grid as a tiled world, one strip at a time.
+
+    The grid follows `Env.occupancy_grid`: cell ``(i, j)`` is centered on
+    ``(j / resolution, i / resolution)`` and the grid has shape
+    ``(height * resolution + 1, width * resolution + 1)``. It is cut into
+    square tiles of `tile_size` cells. Tiles that are entirely free or
+    entirely occupied are only recorded in the tile index; every other tile
+    is appended to a flat file that readers memory-map. At most one strip
+    of tiles is held in memory, so worlds larger than RAM can be written
+    from a generator.
+
+    Parameters
+    ----------
+    path : Path
+        Directory to write the world to.
+    size : tuple[int, int]
+        World size as (width, height).
+    resolution : int
+        Grid cells per unit length.
+    strips : Iterable[np.ndarray]
+        Consecutive boolean row blocks of the grid, each `tile_size` rows
+        high except possibly the last.
+    tile_size : int, optional
+        Cells along each side of a tile, by default 256
+    """
+    rows = size[1] * resolution + 1
+    cols = size[0] * resolution + 1
+    tile_rows = math.ceil(rows / tile_size)
+    tile_cols = math.ceil(cols / tile_size)
+    index = np.full((tile_rows, tile_cols), FREE_TILE, dtype=np.int64)
+    digest = hashlib.sha256()
+    path.mkdir(parents=True, exist_ok=True)
+    count = 0
+    written_rows = 0
+    with (path / TILES_FILE).open("wb") as f:
+        for ti, strip in enumerate(strips):
+            strip = np.asarray(strip, dtype=bool)
+            if ti >= tile_rows or strip.shape[1] != cols:
+                raise ValueError(
+                    f"Strip {ti} of shape {strip.shape} does not fit a grid "
+                    f"of shape {(rows, cols)} in tiles of {tile_size}."
+                )
+            written_rows += len(strip)
+            # Repeating the edge cells leaves every tile's any/all intact.
+            padded = np.pad(
+                strip,
+                (
+                    (0, tile_size - len(strip)),
+                    (0, tile_cols * tile_size - cols),
+                ),
+                mode="edge",
+            )
+            tiles = padded.reshape(tile_size, tile_cols, tile_size).transpose(
+                1, 0, 2
+            )
+            occupied = tiles.any(axis=(1, 2))
+            full = tiles.all(axis=(1, 2))
+            index[ti, full] = FULL_TILE
+            for tj in np.flatnonzero(occupied & ~full):
+                data = np.ascontiguousarray(tiles[tj], dtype=np.uint8)
+                f.write(data.tobytes())
+                digest.update(data.tobytes())
+                index[ti, tj] = count
+                count += 1
+    if written_rows != rows:
+        raise ValueError(f"Got {written_rows} grid rows, expected {rows}.")
+    np.save(path / INDEX_FILE, index)
+    digest.update(index.tobytes())
+    meta = {
+        "size": list(size),
+        "resolution": resolution,
+        "tile_size": tile_size,
+        "tiles": count,
+        "digest": digest.hexdigest(),
+    }
+    (path / META_FILE).write_text(json.dumps(meta))
+    logger.info(
+        f"Wrote a {rows}x{cols} world to {path} with {count} of "
+        f"{index.size} tiles stored."
+    )
+
+
+def grid_strips(grid: np.ndarray, tile_size: int) -> Iterator[np.ndarray]:
+    """Row blocks of an in-memory or memory-mapped grid for
+    `write_tiled_world`."""
+    for start in range(0, len(grid), tile_size):
+        stop = start + tile_size
+        yield grid[start:stop]
+
+
+class TiledWorld:
+    """Read access to a world written by `write_tiled_world`.
+
+    The stored tiles are memory-mapped and only the tiles that queries
+    touch are read. The `max_tiles` most recently used tiles are kept as
+    in-memory copies, so resident memory is bounded by the cache rather
+    than by the size of the world.
+
+    Parameters
+    ----------
+    path : Path
+        Directory of the world.
+    max_tiles : int, optional
+        Number of tiles kept in memory, by default 64
+    prefetch_radius : float, optional
+        Default distance around a position within which `prefetch` reads
+        tiles, by default 5.0
+    """
+
+    def __init__(
+        self, path: Path, max_tiles: int = 64, prefetch_radius: float = 5.0
+    ) -> None:
+        self.path = Path(path)
+        meta = json.loads((self.path / META_FILE).read_text())
+        self.size: tuple[int, int] = tuple(meta["size"])
+        self.resolution: int = meta["resolution"]
+        self.tile_size: int = meta["tile_size"]
+        self.digest: str = meta["digest"]
+        self.shape = (
+            self.size[1] * self.resolution + 1,
+            self.size[0] * self.resolution + 1,
+        )
+        self.index = np.load(self.path / INDEX_FILE)
+        self.tiles: np.ndarray | None = None
+        if meta["tiles"]:
+            self.tiles = np.memmap(
+                self.path / TILES_FILE,
+                dtype=np.uint8,
+                mode="r",
+                shape=(meta["tiles"], self.tile_size, self.tile_size),
+            )
+        self.max_tiles = max_tiles
+        self.prefetch_radius = prefetch_radius
+        self.resident: OrderedDict[int, np.ndarray] = OrderedDict()
+        # Number of tiles read from the file.
+        self.tile_reads = 0
+        self._stencils: dict[float, np.ndarray] = {}
+
+    def tile(self, slot: int) -> np.ndarray:
+        """Stored tile `slot`, read into the cache on first use."""
+        tile = self.resident.get(slot)
+        if tile is not None:
+            self.resident.move_to_end(slot)
+            return tile
+        assert self.tiles is not None
+        tile = np.array(self.tiles[slot], dtype=bool)
+        self.tile_reads += 1
+        self.resident[slot] = tile
+        if len(self.resident) > self.max_tiles:
+            self.resident.popitem(last=False)
+        return tile
+
+    def occupied_cells(
+        self, ii: np.ndarray, jj: np.ndarray, outside: bool = True
+    ) -> np.ndarray:
+        """Whether each cell ``(ii[k], jj[k])`` is occupied, with cells
+        outside the grid counted as `outside`."""
+        rows, cols = self.shape
+        inside = (ii >= 0) & (ii < rows) & (jj >= 0) & (jj < cols)
+        result = np.full(len(ii), outside)
+        ii, jj = ii[inside], jj[inside]
+        size = self.tile_size
+        slots = self.index[ii // size, jj // size]
+        values = slots == FULL_TILE
+        mixed = np.flatnonzero(slots >= 0)
+        if len(mixed):
+            mixed_slots = slots[mixed]
+            for slot in np.unique(mixed_slots):
+                sel = mixed[mixed_slots == slot]
+                values[sel] = self.tile(int(slot))[
+                    ii[sel] % size, jj[sel] % size
+                ]
+        result[inside] = values
+        return result
+
+    def occupied_at(self, points: np.ndarray) -> np.ndarray:
+        """Whether each of `points` (n, 2) lies on an occupied cell, by
+        nearest cell center, or outside the world."""
+        cells = np.floor(np.asarray(points) * self.resolution + 0.5)
+        cells = cells.astype(np.intp)
+        return self.occupied_cells(cells[:, 1], cells[:, 0])
+
+    def stencil(self, radius: float) -> np.ndarray:
+        """Offsets (k, 2) of every cell that a disc of `radius` centered
+        within half a cell of the origin cell can touch."""
+        stencil = self._stencils.get(radius)
+        if stencil is None:
+            reach = math.ceil(radius * self.resolution + 1)
+            offsets = np.arange(-reach, reach + 1)
+            dj, di = np.meshgrid(offsets, offsets)
+            # Offsets whose cell square lies within `radius` of the origin
+            # cell's square.
+            gap = np.maximum(np.abs(np.stack((dj, di), -1)) - 1, 0)
+            near = np.hypot(gap[..., 0], gap[..., 1]) <= (
+                radius * self.resolution
+            )
+            stencil = np.column_stack((dj[near], di[near]))
+            self._stencils[radius] = stencil
+        return stencil
+
+    def disc_hits(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """Whether discs of `radius` at each of `points` (n, 2) touch an
+        occupied cell, treating each cell as a square of side
+        ``1 / resolution`` around its center.
+
+        Like obstacle queries on `Env`, the world's boundary does not count
+        as an obstacle.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if not len(points):
+            return np.zeros(0, dtype=bool)
+        res = self.resolution
+        centers = np.floor(points * res + 0.5).astype(np.intp)
+        cells = centers[:, None, :] + self.stencil(radius)
+        # Distance from each point to each candidate cell's square.
+        gap = np.abs(cells / res - points[:, None, :]) - 0.5 / res
+        gap = np.maximum(gap, 0)
+        near = np.hypot(gap[..., 0], gap[..., 1]) <= radius
+        jj, ii = cells[near][:, 0], cells[near][:, 1]
+        hit = np.zeros(near.shape, dtype=bool)
+        hit[near] = self.occupied_cells(ii, jj, outside=False)
+        return hit.any(axis=1)
+
+    def prefetch(
+        self, x: float, y: float, radius: float | None = None
+    ) -> None:
+        """Read the stored tiles within `radius` of (x, y), by default
+        `prefetch_radius`, into the cache ahead of the queries that will
+        need them."""
+        if radius is None:
+            radius = self.prefetch_radius
+        res, size = self.resolution, self.tile_size
+        rows, cols = self.index.shape
+        ti0 = max(int((y - radius) * res) // size, 0)
+        ti1 = min(int((y + radius) * res) // size + 1, rows)
+        tj0 = max(int((x - radius) * res) // size, 0)
+        tj1 = min(int((x + radius) * res) // size + 1, cols)
+        for slot in self.index[ti0:ti1, tj0:tj1].ravel():
+            if slot >= 0:
+                self.tile(int(slot))
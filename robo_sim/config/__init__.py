@@ -1,20 +1,63 @@
-from .config_factory import ConfigFactory
+from .config_factory import (
+    ConfigFactory,
+    build_algorithm_config,
+    build_env_config,
+    build_robot_config,
+)
 from .config_models import (
+    AdaptiveStepConfig,
     AlgorithmConfig,
+    BumpSensorConfig,
+    CostmapConfig,
+    DStarLiteConfig,
+    DynamicObstacleConfig,
+    EnvConfig,
+    FrontierExplorationConfig,
+    GPSSensorConfig,
+    KinematicsConfig,
+    LidarSensorConfig,
+    MountedSensorConfig,
+    ObstacleConfig,
+    PathSmoothingConfig,
+    PRMConfig,
     ProximitySensorConfig,
     RobotConfig,
+    RRTStarConfig,
+    ScenarioConfig,
     SensorConfig,
     SensorRobotConfig,
+    SonarSensorConfig,
+    WorldConfig,
 )
 from .config_utils import read_yaml_config
 
 __all__ = [
     "ConfigFactory",
+    "build_env_config",
+    "build_robot_config",
+    "build_algorithm_config",
     "EnvConfig",
+    "AdaptiveStepConfig",
+    "WorldConfig",
+    "CostmapConfig",
+    "ObstacleConfig",
+    "DynamicObstacleConfig",
     "read_yaml_config",
     "SensorConfig",
     "ProximitySensorConfig",
+    "MountedSensorConfig",
+    "LidarSensorConfig",
+    "SonarSensorConfig",
+    "BumpSensorConfig",
+    "GPSSensorConfig",
     "RobotConfig",
+    "KinematicsConfig",
     "AlgorithmConfig",
+    "PathSmoothingConfig",
+    "DStarLiteConfig",
+    "RRTStarConfig",
+    "PRMConfig",
+    "FrontierExplorationConfig",
     "SensorRobotConfig",
+    "ScenarioConfig",
 ]
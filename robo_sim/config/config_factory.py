@@ -1,7 +1,12 @@
 import sys
 from pathlib import Path
 
-from .config_models import AlgorithmConfig, EnvConfig, RobotConfig
+from .config_models import (
+    AlgorithmConfig,
+    EnvConfig,
+    RobotConfig,
+    SensorRobotConfig,
+)
 from .config_utils import read_yaml_config
 
 
@@ -16,6 +21,26 @@ def get_algorithm_config_classes() -> dict[str, type[AlgorithmConfig]]:
     }
 
 
+def build_env_config(data: dict) -> EnvConfig:
+    return EnvConfig(**data)
+
+
+def build_robot_config(data: dict) -> RobotConfig:
+    if "sensor" in data or "sensors" in data:
+        return SensorRobotConfig(**data)
+    return RobotConfig(**data)
+
+
+def build_algorithm_config(
+    data: dict,
+    algorithm_configs: dict[str, type[AlgorithmConfig]] | None = None,
+) -> AlgorithmConfig:
+    if algorithm_configs is None:
+        algorithm_configs = get_algorithm_config_classes()
+    config_class = algorithm_configs.get(data.get("name", ""), AlgorithmConfig)
+    return config_class(**data)
+
+
 class ConfigFactory:
     def __init__(
         self,
@@ -30,16 +55,12 @@ class ConfigFactory:
 
     def load_env_config(self) -> EnvConfig:
         env_data = read_yaml_config(self.env_config_path)
-        return EnvConfig(**env_data)
+        return build_env_config(env_data)
 
     def load_robot_config(self) -> RobotConfig:
         robot_data = read_yaml_config(self.robot_config_path)
-        return RobotConfig(**robot_data)
+        return build_robot_config(robot_data)
 
     def load_algorithm_config(self) -> AlgorithmConfig:
         algorithm_data = read_yaml_config(self.algorithm_config_path)
-        algorithm_type = algorithm_data.get("name", "")
-        config_class = self.algorithm_configs.get(
-            algorithm_type, AlgorithmConfig
-        )
-        return config_class(**algorithm_data)
+        return build_algorithm_config(algorithm_data, self.algorithm_configs)
@@ -1,22 +1,160 @@
+from pathlib import Path
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, ConfigDict, Field, validator
 
 from ..utils import Position
 
 
+class ObstacleConfig(BaseModel):
+    pos: Position = Field(description="Center of the obstacle.")
+    shape: Literal["box", "circle", "oriented_box", "polygon"] = Field(
+        default="box", description="Collision geometry of the obstacle."
+    )
+    size: tuple[float, float] = Field(
+        default=(1.0, 1.0),
+        description="Width and height of box-shaped obstacles.",
+    )
+    radius: float = Field(
+        default=0.5, description="Radius of circular obstacles."
+    )
+    angle: float = Field(
+        default=0.0,
+        description="Counter-clockwise rotation in degrees of oriented "
+        "boxes.",
+    )
+    vertices: list[tuple[float, float]] | None = Field(
+        default=None,
+        description="Vertices of convex polygons, relative to `pos`.",
+    )
+
+    @validator("pos", pre=True)
+    def validate(cls, v):
+        if isinstance(v, (tuple, list)) and len(v) == 2:
+            return Position(*v)
+        elif isinstance(v, Position):
+            return v
+        else:
+            raise ValueError("Invalid position format!")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class DynamicObstacleConfig(ObstacleConfig):
+    motion: Literal["bounce", "patrol"] = Field(
+        default="bounce", description="Motion model of the obstacle."
+    )
+    velocity: tuple[float, float] = Field(
+        default=(0.0, 0.0),
+        description="Velocity per step of bouncing obstacles.",
+    )
+    waypoints: list[Position] = Field(
+        default=[],
+        description="Closed loop of positions visited by patrolling "
+        "obstacles.",
+    )
+    speed: float = Field(
+        default=0.5, description="Distance per step of patrolling obstacles."
+    )
+
+    @validator("waypoints", pre=True)
+    def validate_waypoints(cls, v):
+        return [Position(*p) if isinstance(p, (tuple, list)) else p for p in v]
+
+
+class AdaptiveStepConfig(BaseModel):
+    max_steps_per_frame: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum algorithm steps taken in one frame.",
+    )
+    clearance: float = Field(
+        default=0.25,
+        ge=0,
+        description="Free distance required around the robot, beyond its "
+        "radius and the length of a step, to take the step in open space "
+        "without sub-step checks.",
+    )
+    error_bound: float = Field(
+        default=0.1,
+        gt=0,
+        description="Spacing of the collision checks along moves near "
+        "obstacles, bounding how far a collision can go undetected.",
+    )
+    slowdown_radius: float = Field(
+        default=1.0,
+        ge=0,
+        description="Distance from the target within which every frame "
+        "takes a single step.",
+    )
+
+
+class CostmapConfig(BaseModel):
+    resolution: int = Field(
+        default=4, ge=1, description="Cost map cells per unit length."
+    )
+    max_distance: float = Field(
+        default=3.0,
+        gt=0,
+        description="Distance from obstacles up to which distances and "
+        "costs are computed.",
+    )
+    cost_scaling: float = Field(
+        default=3.0,
+        gt=0,
+        description="Rate at which costs decay with distance beyond the "
+        "robot's radius.",
+    )
+    sensor_layer: bool = Field(
+        default=False,
+        description="Whether obstacles hit by lidar beams are marked in the "
+        "cost map.",
+    )
+
+
+class WorldConfig(BaseModel):
+    path: Path = Field(
+        description="Directory of a tiled world written by "
+        "`write_tiled_world`.",
+    )
+    cache_tiles: int = Field(
+        default=64,
+        ge=1,
+        description="Number of world tiles kept in memory.",
+    )
+    prefetch_radius: float = Field(
+        default=5.0,
+        ge=0,
+        description="Distance around the robot within which tiles are read "
+        "ahead of use after every move.",
+    )
+
+
 class EnvConfig(BaseModel):
     size: tuple[int, int] = Field(
         default=(10, 10),
         description="Size of the 2D environment as (width, height).",
     )
-    obstacles: int | set[Position] = Field(
+    obstacles: int | set[Position] | list[ObstacleConfig] = Field(
         default=set(),
         description="List of obstacle positions or number of "
-        "obstacles to generate randomly.",
+        "obstacles to generate randomly. Entries may also be mappings "
+        "describing obstacles of other shapes and sizes.",
+    )
+    dynamic_obstacles: list[DynamicObstacleConfig] = Field(
+        default=[], description="Obstacles that move every step."
     )
     trace_path: bool = Field(
         default=False,
         description="Whether to visually trace the robot's path.",
     )
+    large_map: bool | None = Field(
+        default=None,
+        description="Whether to render with level-of-detail mode, which "
+        "rasterizes the obstacles in view into an image, at most one cell "
+        "per screen pixel. Inferred from the number of obstacles if not "
+        "set.",
+    )
     max_frames: int = Field(
         default=100,
         description="Maximum frames to reach before the algorithm must be "
@@ -25,10 +163,34 @@ class EnvConfig(BaseModel):
     target_pos: Position = Field(
         default=Position(8, 8), description="Position of the target."
     )
+    adaptive_step: AdaptiveStepConfig | None = Field(
+        default=None,
+        description="Merge algorithm steps into one frame in open space "
+        "and check moves near obstacles in fine sub-steps. Every frame "
+        "takes exactly one step if not set.",
+    )
+    world: WorldConfig | None = Field(
+        default=None,
+        description="Static occupancy paged in from a tiled world on disk, "
+        "for maps larger than memory. Its size replaces `size`.",
+    )
+    costmap: CostmapConfig | None = Field(
+        default=None,
+        description="Layered cost map with obstacles inflated by the robot's "
+        "radius, which adaptive stepping uses for its motion checks. Not "
+        "available with a `world`.",
+    )
+    quadtree: bool = Field(
+        default=False,
+        description="Whether grid lookups, such as those of sensors, use a "
+        "quadtree of the map instead of a dense grid. Saves memory on large "
+        "sparse maps; the tree is patched where obstacles move. Not "
+        "available with a `world`.",
+    )
 
     @validator("target_pos", pre=True)
     def validate(cls, v):
-        if isinstance(v, tuple) and len(v) == 2:
+        if isinstance(v, (tuple, list)) and len(v) == 2:
             return Position(*v)
         elif isinstance(v, Position):
             return v
@@ -37,8 +199,14 @@ class EnvConfig(BaseModel):
 
     @validator("obstacles", pre=True)
     def check_obstacles_type(cls, v):
-        if isinstance(v, list):
-            return set(v)  # List of Positions for coordinates.
+        if isinstance(v, list) and any(isinstance(o, dict) for o in v):
+            # Shaped obstacles; bare coordinates become default boxes.
+            return [o if isinstance(o, dict) else {"pos": o} for o in v]
+        elif isinstance(v, list):
+            # List of Positions for coordinates.
+            return {
+                Position(*o) if isinstance(o, (tuple, list)) else o for o in v
+            }
         elif isinstance(v, int) or isinstance(v, set):
             return v  # Number of obstacles to generate randomly.
         else:
@@ -49,7 +217,21 @@ class EnvConfig(BaseModel):
     model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True)
 
 
-class SensorConfig(BaseModel):
+class MountedSensorConfig(BaseModel):
+    name: str | None = Field(
+        default=None,
+        description="Key of the sensor's reading. Defaults to the sensor's "
+        "class name.",
+    )
+    period: int = Field(
+        default=1, ge=1, description="Number of steps between updates."
+    )
+
+
+class SensorConfig(MountedSensorConfig):
+    type: Literal["proximity"] = Field(
+        default="proximity", description="Kind of sensor."
+    )
     sensor_range: int = Field(
         default=3, description="Range of the robot's sensors."
     )
@@ -57,12 +239,130 @@ class SensorConfig(BaseModel):
         default=5,
         description="Amount of degrees between which to separate sensors.",
     )
+    early_exit: bool = Field(
+        default=False,
+        description="Whether choosing the clearest direction may stop at the "
+        "first beam that is clear over the full range.",
+    )
 
 
 class ProximitySensorConfig(SensorConfig):
     pass
 
 
+class LidarSensorConfig(MountedSensorConfig):
+    type: Literal["lidar"] = Field(
+        default="lidar", description="Kind of sensor."
+    )
+    num_beams: int = Field(default=360, ge=1, description="Number of beams.")
+    max_range: float = Field(
+        default=8.0, gt=0, description="Maximum measured distance."
+    )
+    fov: float = Field(
+        default=360.0,
+        gt=0,
+        le=360,
+        description="Field of view in degrees, centered on the heading.",
+    )
+    resolution: int = Field(
+        default=4,
+        ge=1,
+        description="Cells per unit length of the occupancy grid probed "
+        "along the beams.",
+    )
+    noise_std: float = Field(
+        default=0.0, ge=0, description="Standard deviation of range noise."
+    )
+
+
+class SonarSensorConfig(MountedSensorConfig):
+    type: Literal["sonar"] = Field(
+        default="sonar", description="Kind of sensor."
+    )
+    num_cones: int = Field(
+        default=8, ge=1, description="Number of cones around the robot."
+    )
+    cone_width: float = Field(
+        default=30.0, gt=0, description="Width of each cone in degrees."
+    )
+    rays_per_cone: int = Field(
+        default=5, ge=1, description="Rays approximating each cone."
+    )
+    max_range: float = Field(
+        default=4.0, gt=0, description="Maximum measured distance."
+    )
+    resolution: int = Field(
+        default=4,
+        ge=1,
+        description="Cells per unit length of the occupancy grid probed "
+        "along the rays.",
+    )
+    noise_std: float = Field(
+        default=0.0, ge=0, description="Standard deviation of range noise."
+    )
+
+
+class BumpSensorConfig(MountedSensorConfig):
+    type: Literal["bump"] = Field(
+        default="bump", description="Kind of sensor."
+    )
+    num_sectors: int = Field(
+        default=4, ge=1, description="Number of contact sectors on the rim."
+    )
+    margin: float = Field(
+        default=0.05,
+        gt=0,
+        description="Distance from the rim at which contact registers.",
+    )
+
+
+class GPSSensorConfig(MountedSensorConfig):
+    type: Literal["gps"] = Field(default="gps", description="Kind of sensor.")
+    noise_std: float = Field(
+        default=0.5,
+        ge=0,
+        description="Standard deviation of the position noise per axis.",
+    )
+
+
+AnySensorConfig = Annotated[
+    ProximitySensorConfig
+    | LidarSensorConfig
+    | SonarSensorConfig
+    | BumpSensorConfig
+    | GPSSensorConfig,
+    Field(discriminator="type"),
+]
+
+
+class KinematicsConfig(BaseModel):
+    model: Literal["unicycle", "differential_drive", "bicycle"] = Field(
+        default="unicycle", description="Kinematic model of the robot."
+    )
+    integrator: Literal["euler", "rk4"] = Field(
+        default="euler", description="Fixed-step integrator."
+    )
+    dt: float = Field(
+        default=1.0, gt=0, description="Simulated time per step."
+    )
+    track_width: float = Field(
+        default=0.5,
+        gt=0,
+        description="Distance between the wheels of a differential drive.",
+    )
+    wheel_base: float = Field(
+        default=0.5,
+        gt=0,
+        description="Distance between the axles of a bicycle model.",
+    )
+    max_steer: float = Field(
+        default=35.0,
+        gt=0,
+        lt=90,
+        description="Steering limit of a bicycle model in degrees.",
+    )
+
+
 class RobotConfig(BaseModel):
     start_pos: Position = Field(
         default=Position(1, 1), description="Starting position of the robot."
@@ -76,10 +376,17 @@ class RobotConfig(BaseModel):
     init_ang_vel: float = Field(
         default=1.0, description="Initial angular velocity."
     )
+    kinematics: KinematicsConfig | None = Field(
+        default=None,
+        description="Kinematic model the robot moves under. Without one, the "
+        "robot moves straight to each position the algorithm returns. With "
+        "one, `init_vel` and `init_ang_vel` (radians per unit time) bound its "
+        "speed and turn rate.",
+    )
 
     @validator("start_pos", pre=True)
     def validate(cls, v):
-        if isinstance(v, tuple) and len(v) == 2:
+        if isinstance(v, (tuple, list)) and len(v) == 2:
             return Position(*v)
         elif isinstance(v, Position):
             return v
@@ -91,7 +398,196 @@ class RobotConfig(BaseModel):
 
 class SensorRobotConfig(RobotConfig):
     sensor: SensorConfig = SensorConfig()
+    sensors: list[AnySensorConfig] = Field(
+        default_factory=list,
+        description="Additional sensors, evaluated in the same batched pass "
+        "as the primary sensor.",
+    )
+    seed: int | None = Field(
+        default=None, description="Seed of the robot's sensor noise."
+    )
+
+
+class PathSmoothingConfig(BaseModel):
+    shortcut: bool = Field(
+        default=True,
+        description="Whether waypoints that can be skipped in a straight, "
+        "collision-free line are removed.",
+    )
+    shortcut_window: int = Field(
+        default=64,
+        ge=2,
+        description="Number of waypoints ahead of each kept one whose line "
+        "of sight is checked in one batch.",
+    )
+    max_curvature: float | None = Field(
+        default=2.0,
+        gt=0,
+        description="Bound on the curvature of the arcs that round the "
+        "corners of the path, the inverse of the turning radius, or None "
+        "to leave corners sharp. If some corner has no collision-free room "
+        "for its arc, no corner of the path is rounded.",
+    )
+    resample: bool = Field(
+        default=True,
+        description="Whether paths followed at `init_vel` per step are "
+        "resampled at that spacing.",
+    )
 
 
 class AlgorithmConfig(BaseModel):
     name: str = Field(default="default", description="Name of the algorithm.")
+    cache_dir: Path | None = Field(
+        default=None,
+        description="Directory in which precomputed planning artifacts are "
+        "cached per map hash. Caching is disabled if unset.",
+    )
+    cache_size_mb: float = Field(
+        default=256,
+        gt=0,
+        description="Size above which the least recently used artifacts are "
+        "evicted from the cache.",
+    )
+    smoothing: PathSmoothingConfig | None = Field(
+        default=None,
+        description="Post-processing of planned paths before they are "
+        "followed, used by D* Lite and the sampling-based planners. Paths "
+        "are executed as planned if unset.",
+    )
+
+
+class DStarLiteConfig(AlgorithmConfig):
+    name: str = Field(
+        default="DStarLite", description="Name of the algorithm."
+    )
+    resolution: int = Field(
+        default=1, ge=1, description="Grid cells per unit length."
+    )
+    tile_size: int = Field(
+        default=16,
+        ge=1,
+        description="Side length in cells of the tiles collision-checked "
+        "together when the search first reaches them.",
+    )
+    landmarks: int = Field(
+        default=0,
+        ge=0,
+        description="Number of landmarks whose precomputed distances tighten "
+        "the heuristic. Only used on maps without moving obstacles when the "
+        "robot has no sensor.",
+    )
+
+
+class RRTStarConfig(AlgorithmConfig):
+    name: str = Field(default="RRTStar", description="Name of the algorithm.")
+    max_nodes: int = Field(
+        default=5000, ge=1, description="Maximum size of the tree."
+    )
+    max_iterations: int = Field(
+        default=20000, ge=1, description="Maximum number of samples drawn."
+    )
+    step_size: float = Field(
+        default=1.0, gt=0, description="Maximum length of a tree extension."
+    )
+    rewire_radius: float = Field(
+        default=2.0,
+        gt=0,
+        description="Radius searched for cheaper parents and for nodes to "
+        "rewire.",
+    )
+    goal_bias: float = Field(
+        default=0.05,
+        ge=0.0,
+        le=1.0,
+        description="Probability of sampling the target itself.",
+    )
+    goal_tolerance: float = Field(
+        default=0.5,
+        gt=0,
+        description="Distance from the target at which a node reaches it.",
+    )
+    stop_at_goal: bool = Field(
+        default=False,
+        description="Whether to stop at the first path instead of refining "
+        "it until the node budget is spent.",
+    )
+    seed: int | None = Field(default=None, description="Seed of the sampler.")
+
+
+class PRMConfig(AlgorithmConfig):
+    name: str = Field(default="PRM", description="Name of the algorithm.")
+    num_samples: int = Field(
+        default=2000, ge=1, description="Number of roadmap samples drawn."
+    )
+    connection_radius: float = Field(
+        default=3.0,
+        gt=0,
+        description="Maximum length of a roadmap edge.",
+    )
+    max_neighbors: int = Field(
+        default=10,
+        ge=1,
+        description="Maximum number of edges tried from each sample.",
+    )
+    seed: int | None = Field(default=0, description="Seed of the sampler.")
+
+
+class FrontierExplorationConfig(AlgorithmConfig):
+    name: str = Field(
+        default="FrontierExploration", description="Name of the algorithm."
+    )
+    resolution: int = Field(
+        default=2, ge=1, description="Cells per unit length of the map."
+    )
+    target_weight: float = Field(
+        default=1.0,
+        ge=0.0,
+        description="Weight of a frontier's distance to the target against "
+        "the length of the path to it. With 0 the nearest frontier is "
+        "explored first.",
+    )
+
+
+class ScenarioConfig(BaseModel):
+    kind: Literal["uniform", "maze", "rooms", "corridors", "perlin"] = Field(
+        default="uniform", description="Procedural map generator to use."
+    )
+    size: tuple[int, int] = Field(
+        default=(64, 64),
+        description="Size of the generated maps as (width, height).",
+    )
+    density: float = Field(
+        default=0.2,
+        ge=0.0,
+        le=1.0,
+        description="Target fraction of cells occupied by clutter.",
+    )
+    seed: int = Field(
+        default=0, description="Seed of the first map; map i uses seed + i."
+    )
+    corridor_width: int = Field(
+        default=1,
+        ge=1,
+        description="Width in cells of maze passages and corridors.",
+    )
+    room_size: int = Field(
+        default=10, ge=3, description="Side length in cells of each room."
+    )
+    noise_scale: int = Field(
+        default=8,
+        ge=1,
+        description="Cells per lattice period of the Perlin noise field.",
+    )
+    start_pos: tuple[int, int] | None = Field(
+        default=None,
+        description=(
+            "Start cell; defaults to (1, 1), or to the first cell of a maze."
+        ),
+    )
+    target_pos: tuple[int, int] | None = Field(
+        default=None,
+        description=(
+            "Target cell; defaults to the opposite corner, or to the last "
+            "cell of a maze."
+        ),
+    )
@@ -0,0 +1,712 @@
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from . import accel
+from .algorithms import AlgorithmFactory
+from .components.summarizer import SimStats
+from .config.config_factory import get_algorithm_config_classes
+from .logging import get_logger, set_log_level
+from .pool import Episode, EpisodeRunner, WorkerState
+
+logger = get_logger(__name__)
+
+BROKER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    heartbeat REAL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, id);
+"""
+
+
+@dataclass
+class Lease:
+    """Claim of a running task by a worker."""
+
+    worker: str | None
+    # Worker's clock at its last heartbeat, or None if it has not sent one.
+    heartbeat: float | None
+
+
+@dataclass
+class TaskOutcome:
+    """Result of a finished task, or the error it failed with."""
+
+    ok: bool
+    payload: str
+
+
+class TaskBroker(ABC):
+    """Queue of tasks shared by a coordinator and any number of workers.
+
+    Payloads and results are opaque strings. A task is queued until a
+    worker claims it, running while the worker heartbeats, and finished
+    once the worker completes or fails it; only the first outcome of a
+    task counts. A running task can be requeued, after which the worker
+    holding it may still finish it first.
+    """
+
+    @abstractmethod
+    def submit(self, payloads: list[str]) -> list[int]:
+        """Queue tasks, returning their ids in order."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def claim(self, worker: str) -> tuple[int, str] | None:
+        """Id and payload of the oldest queued task, now leased to
+        `worker`, or None if the queue is empty."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def heartbeat(self, task_id: int, worker: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def complete(self, task_id: int, result: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def fail(self, task_id: int, error: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def requeue(self, task_id: int) -> None:
+        """Put a running task back at the front of the queue."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def leases(self, task_ids: Iterable[int]) -> dict[int, Lease]:
+        """Leases of those of `task_ids` that are running."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def finished(self, task_ids: Iterable[int]) -> dict[int, TaskOutcome]:
+        """Outcomes of those of `task_ids` that are finished."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def discard(self, task_ids: Iterable[int]) -> None:
+        """Forget tasks, so that queued ones are never run."""
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBroker(TaskBroker):
+    """Task broker in an SQLite database, for workers on one host or on
+    a filesystem with working locks.
+
+    Parameters
+    ----------
+    path : Path
+        Database file, created if missing.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared with the heartbeat thread of a worker.
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            self.path, timeout=60.0, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(BROKER_SCHEMA)
+
+    def execute(self, query: str, args: Iterable[Any] = ()) -> list[tuple]:
+        with self.lock, self.conn:
+            return self.conn.execute(query, tuple(args)).fetchall()
+
+    def submit(self, payloads: list[str]) -> list[int]:
+        ids = []
+        with self.lock, self.conn:
+            for payload in payloads:
+                cursor = self.conn.execute(
+                    "INSERT INTO tasks (payload) VALUES (?)", (payload,)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def claim(self, worker: str) -> tuple[int, str] | None:
+        # One statement, so two workers cannot claim the same task.
+        rows = self.execute(
+            "UPDATE tasks SET state = 'running', worker = ?, heartbeat = ? "
+            "WHERE id = (SELECT id FROM tasks WHERE state = 'queued' "
+            "ORDER BY id LIMIT 1) RETURNING id, payload",
+            (worker, time.time()),
+        )
+        return rows[0] if rows else None
+
+    def heartbeat(self, task_id: int, worker: str) -> None:
+        self.execute(
+            "UPDATE tasks SET heartbeat = ? "
+            "WHERE id = ? AND worker = ? AND state = 'running'",
+            (time.time(), task_id, worker),
+        )
+
+    def finish(self, task_id: int, state: str, result: str) -> None:
+        self.execute(
+            "UPDATE tasks SET state = ?, result = ? "
+            "WHERE id = ? AND state IN ('queued', 'running')",
+            (state, result, task_id),
+        )
+
+    def complete(self, task_id: int, result: str) -> None:
+        self.finish(task_id, "done", result)
+
+    def fail(self, task_id: int, error: str) -> None:
+        self.finish(task_id, "failed", error)
+
+    def requeue(self, task_id: int) -> None:
+        self.execute(
+            "UPDATE tasks SET state = 'queued', worker = NULL, "
+            "heartbeat = NULL WHERE id = ? AND state = 'running'",
+            (task_id,),
+        )
+
+    def select(
+        self, columns: str, state: str, task_ids: Iterable[int]
+    ) -> list[tuple]:
+        task_ids = list(task_ids)
+        rows = []
+        # Stays under SQLite's limit on query parameters.
+        for start in range(0, len(task_ids), 500):
+            stop = start + 500
+            chunk = task_ids[start:stop]
+            rows += self.execute(
+                f"SELECT id, {columns} FROM tasks WHERE {state} "
+                f"AND id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+        return rows
+
+    def leases(self, task_ids: Iterable[int]) -> dict[int, Lease]:
+        rows = self.select("worker, heartbeat", "state = 'running'", task_ids)
+        return {task_id: Lease(*lease) for task_id, *lease in rows}
+
+    def finished(self, task_ids: Iterable[int]) -> dict[int, TaskOutcome]:
+        rows = self.select(
+            "state, result", "state IN ('done', 'failed')", task_ids
+        )
+        return {
+            task_id: TaskOutcome(state == "done", result)
+            for task_id, state, result in rows
+        }
+
+    def discard(self, task_ids: Iterable[int]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM tasks WHERE id = ?", [(i,) for i in task_ids]
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class RedisBroker(TaskBroker):
+    """Task broker in a Redis server, for workers across many hosts.
+
+    Queued task ids are kept in a list and claimed ones are moved
+    atomically to a list of claimed tasks, so a task is never lost between
+    a worker taking it and leasing it. Any client with the API of
+    ``redis.Redis`` created with ``decode_responses=True`` works, including
+    `LocalRedis`.
+
+    Parameters
+    ----------
+    client : Any
+        Redis client.
+    prefix : str, optional
+        Prefix of the broker's keys, by default "robo_sim"
+    """
+
+    def __init__(self, client: Any, prefix: str = "robo_sim") -> None:
+        self.client = client
+        self.prefix = prefix
+        self.counter = f"{prefix}:next"
+        self.payloads = f"{prefix}:payloads"
+        self.queue = f"{prefix}:queue"
+        self.claimed = f"{prefix}:claimed"
+        self.lease_hash = f"{prefix}:leases"
+        self.outcomes = f"{prefix}:outcomes"
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "robo_sim") -> "RedisBroker":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "The Redis broker needs the redis package; install it with "
+                "`pip install redis`."
+            )
+        return cls(redis.Redis.from_url(url, decode_responses=True), prefix)
+
+    def submit(self, payloads: list[str]) -> list[int]:
+        if not payloads:
+            return []
+        last = self.client.incr(self.counter, len(payloads))
+        ids = list(range(last - len(payloads) + 1, last + 1))
+        self.client.hset(self.payloads, mapping=dict(zip(ids, payloads)))
+        # Claims pop from the right, so the queue runs oldest first.
+        self.client.lpush(self.queue, *ids)
+        return ids
+
+    def claim(self, worker: str) -> tuple[int, str] | None:
+        while True:
+            task_id = self.client.rpoplpush(self.queue, self.claimed)
+            if task_id is None:
+                return None
+            payload = self.client.hget(self.payloads, task_id)
+            if payload is None or self.client.hexists(self.outcomes, task_id):
+                # Discarded, or a requeued copy that finished meanwhile.
+                self.client.lrem(self.claimed, 0, task_id)
+                continue
+            self.heartbeat(int(task_id), worker)
+            return int(task_id), payload
+
+    def heartbeat(self, task_id: int, worker: str) -> None:
+        self.client.hset(
+            self.lease_hash,
+            task_id,
+            json.dumps({"worker": worker, "heartbeat": time.time()}),
+        )
+
+    def finish(self, task_id: int, outcome: TaskOutcome) -> None:
+        # A discarded task leaves no outcome behind.
+        if self.client.hexists(self.payloads, task_id):
+            self.client.hsetnx(
+                self.outcomes, task_id, json.dumps(asdict(outcome))
+            )
+        self.client.lrem(self.claimed, 0, task_id)
+        self.client.hdel(self.lease_hash, task_id)
+
+    def complete(self, task_id: int, result: str) -> None:
+        self.finish(task_id, TaskOutcome(True, result))
+
+    def fail(self, task_id: int, error: str) -> None:
+        self.finish(task_id, TaskOutcome(False, error))
+
+    def requeue(self, task_id: int) -> None:
+        if self.client.lrem(self.claimed, 0, task_id):
+            self.client.hdel(self.lease_hash, task_id)
+            self.client.rpush(self.queue, task_id)
+
+    def leases(self, task_ids: Iterable[int]) -> dict[int, Lease]:
+        wanted = set(task_ids)
+        running = [
+            int(i)
+            for i in self.client.lrange(self.claimed, 0, -1)
+            if int(i) in wanted
+        ]
+        if not running:
+            return {}
+        leases = {}
+        values = self.client.hmget(self.lease_hash, running)
+        for task_id, value in zip(running, values):
+            if value is None:
+                # Claimed a moment ago and not leased yet.
+                leases[task_id] = Lease(None, None)
+            else:
+                leases[task_id] = Lease(**json.loads(value))
+        return leases
+
+    def finished(self, task_ids: Iterable[int]) -> dict[int, TaskOutcome]:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return {}
+        values = self.client.hmget(self.outcomes, task_ids)
+        return {
+            task_id: TaskOutcome(**json.loads(value))
+            for task_id, value in zip(task_ids, values)
+            if value is not None
+        }
+
+    def discard(self, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        for key in (self.payloads, self.lease_hash, self.outcomes):
+            self.client.hdel(key, *task_ids)
+        # Running tasks no longer show up in `leases`, and queued ones are
+        # not left for `claim` to skip.
+        for task_id in task_ids:
+            self.client.lrem(self.claimed, 0, task_id)
+            self.client.lrem(self.queue, 0, task_id)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class LocalRedis:
+    """In-process stand-in for a Redis client, with the commands that
+    `RedisBroker` uses.
+
+    Values are stored as strings, as a client with ``decode_responses``
+    returns them. Workers must run in threads of the process that holds
+    it, which makes it fit for tests and for trying out a sweep before
+    starting a server.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.data: dict[str, Any] = {}
+
+    def fields_of(self, name: str) -> dict[str, str]:
+        return self.data.setdefault(name, {})
+
+    def items_of(self, name: str) -> list[str]:
+        return self.data.setdefault(name, [])
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self.lock:
+            self.data[name] = int(self.data.get(name, 0)) + amount
+            return self.data[name]
+
+    def hset(
+        self,
+        name: str,
+        key: Any = None,
+        value: Any = None,
+        mapping: dict[Any, Any] | None = None,
+    ) -> int:
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        with self.lock:
+            fields = self.fields_of(name)
+            added = sum(str(k) not in fields for k in items)
+            fields.update((str(k), str(v)) for k, v in items.items())
+            return added
+
+    def hsetnx(self, name: str, key: Any, value: Any) -> bool:
+        with self.lock:
+            fields = self.fields_of(name)
+            if str(key) in fields:
+                return False
+            fields[str(key)] = str(value)
+            return True
+
+    def hget(self, name: str, key: Any) -> str | None:
+        with self.lock:
+            return self.fields_of(name).get(str(key))
+
+    def hmget(self, name: str, keys: list[Any]) -> list[str | None]:
+        with self.lock:
+            fields = self.fields_of(name)
+            return [fields.get(str(k)) for k in keys]
+
+    def hexists(self, name: str, key: Any) -> bool:
+        with self.lock:
+            return str(key) in self.fields_of(name)
+
+    def hdel(self, name: str, *keys: Any) -> int:
+        with self.lock:
+            fields = self.fields_of(name)
+            return sum(fields.pop(str(k), None) is not None for k in keys)
+
+    def lpush(self, name: str, *values: Any) -> int:
+        with self.lock:
+            items = self.items_of(name)
+            for value in values:
+                items.insert(0, str(value))
+            return len(items)
+
+    def rpush(self, name: str, *values: Any) -> int:
+        with self.lock:
+            items = self.items_of(name)
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def rpoplpush(self, src: str, dst: str) -> str | None:
+        with self.lock:
+            items = self.items_of(src)
+            if not items:
+                return None
+            value = items.pop()
+            self.items_of(dst).insert(0, value)
+            return value
+
+    def lrem(self, name: str, count: int, value: Any) -> int:
+        # Only a count of 0, removing every occurrence, is supported.
+        with self.lock:
+            items = self.items_of(name)
+            kept = [item for item in items if item != str(value)]
+            removed = len(items) - len(kept)
+            items[:] = kept
+            return removed
+
+    def lrange(self, name: str, start: int, end: int) -> list[str]:
+        with self.lock:
+            items = self.items_of(name)
+            stop = None if end == -1 else end + 1
+            return items[start:stop]
+
+    def close(self) -> None:
+        pass
+
+
+def get_broker(location: str) -> TaskBroker:
+    """Broker at a ``redis://`` or ``rediss://`` URL, or else in the
+    SQLite database file at `location`."""
+    if location.startswith(("redis://", "rediss://")):
+        return RedisBroker.from_url(location)
+    return SQLiteBroker(Path(location))
+
+
+def serve(
+    broker: TaskBroker,
+    name: str | None = None,
+    heartbeat: float = 5.0,
+    poll: float = 1.0,
+    idle_timeout: float | None = None,
+    max_tasks: int | None = None,
+    log_level: int | None = None,
+) -> int:
+    """Run episode batches from `broker` until it stays empty.
+
+    The worker prepares like those of `WarmPool`, claims one batch at a
+    time, and sends a heartbeat every `heartbeat` seconds from a background
+    thread while running it, so long episodes are not mistaken for a dead
+    worker. An episode that raises fails its whole batch.
+
+    Parameters
+    ----------
+    broker : TaskBroker
+        Broker to take batches from.
+    name : str | None, optional
+        Worker name in leases, by default the host name and process id
+    heartbeat : float, optional
+        Seconds between heartbeats, by default 5.0
+    poll : float, optional
+        Seconds to wait before polling an empty queue again, by default 1.0
+    idle_timeout : float | None, optional
+        Seconds the queue may stay empty before the worker exits, by
+        default None to run until interrupted
+    max_tasks : int | None, optional
+        Number of batches after which the worker exits, by default None
+    log_level : int | None, optional
+        Level of the robo_sim loggers, by default left unchanged
+
+    Returns
+    -------
+    int
+        Number of batches run.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    if log_level is not None:
+        set_log_level(log_level)
+    AlgorithmFactory.preload(list(get_algorithm_config_classes()))
+    accel.warmup()
+    state = WorkerState()
+    logger.info(f"Worker {name} is waiting for episodes.")
+    ran = 0
+    idle_since = time.monotonic()
+    while max_tasks is None or ran < max_tasks:
+        task = broker.claim(name)
+        if task is None:
+            if (
+                idle_timeout is not None
+                and time.monotonic() - idle_since >= idle_timeout
+            ):
+                break
+            time.sleep(poll)
+            continue
+        task_id, payload = task
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(heartbeat):
+                broker.heartbeat(task_id, name)
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        start = time.perf_counter()
+        try:
+            stats = [
+                asdict(state.run(Episode.from_dict(episode)))
+                for episode in json.loads(payload)
+            ]
+        except Exception as e:
+            logger.exception(f"Episode batch {task_id} failed.")
+            broker.fail(task_id, f"{type(e).__name__}: {e}")
+        else:
+            seconds = time.perf_counter() - start
+            broker.complete(
+                task_id, json.dumps({"stats": stats, "seconds": seconds})
+            )
+        finally:
+            stop.set()
+            thread.join()
+        ran += 1
+        idle_since = time.monotonic()
+    logger.info(f"Worker {name} ran {ran} episode batches.")
+    return ran
+
+
+class DistributedPool(EpisodeRunner):
+    """Runs episodes on workers that take them from a `TaskBroker`.
+
+    Episodes are submitted in batches and run by any number of `serve`
+    loops, typically ``robo_sim worker`` processes on many hosts, which
+    need the config files at the same absolute paths. Stats come back in
+    order like those of `WarmPool`, and `sweep` stores them as they do.
+
+    Lost and slow batches are run again. A batch whose heartbeat has not
+    changed for `timeout` seconds, as timed by this process so that the
+    clocks of workers do not matter, is requeued. Once every batch has
+    started, one that has run `straggler_factor` times longer than the
+    median batch is requeued too, so that an idle worker can race the slow
+    one; whichever finishes first counts.
+
+    Parameters
+    ----------
+    broker : TaskBroker
+        Broker shared with the workers.
+    timeout : float, optional
+        Seconds without a heartbeat after which a worker counts as lost,
+        by default 30.0
+    poll : float, optional
+        Seconds between checks for results, by default 0.5
+    straggler_factor : float | None, optional
+        Multiple of the median batch time after which a batch is run
+        again, by default 3.0, or None to never do so
+    """
+
+    def __init__(
+        self,
+        broker: TaskBroker,
+        timeout: float = 30.0,
+        poll: float = 0.5,
+        straggler_factor: float | None = 3.0,
+    ) -> None:
+        if timeout <= 0:
+            raise ValueError("Heartbeat timeout must be positive.")
+        if straggler_factor is not None and straggler_factor < 1:
+            raise ValueError("Straggler factor must be at least 1.")
+        self.broker = broker
+        self.timeout = timeout
+        self.poll = poll
+        self.straggler_factor = straggler_factor
+
+    def run(
+        self, episodes: Iterable[Episode], batch_size: int = 8
+    ) -> Iterator[SimStats]:
+        """Run episodes, yielding their stats in order."""
+        episodes = [
+            replace(
+                episode,
+                env=Path(episode.env).resolve(),
+                robot=Path(episode.robot).resolve(),
+                algorithm=Path(episode.algorithm).resolve(),
+            )
+            for episode in episodes
+        ]
+        payloads = []
+        for start in range(0, len(episodes), batch_size):
+            stop = start + batch_size
+            payloads.append(
+                json.dumps([e.to_dict() for e in episodes[start:stop]])
+            )
+        task_ids = self.broker.submit(payloads)
+        try:
+            yield from self.collect(task_ids)
+        finally:
+            # Frees the results, and cancels what is left if the caller
+            # stopped early.
+            self.broker.discard(task_ids)
+
+    def collect(self, task_ids: list[int]) -> Iterator[SimStats]:
+        results: dict[int, list[SimStats]] = {}
+        durations: list[float] = []
+        # Last lease seen of every running batch, with when it changed.
+        seen: dict[int, tuple[Lease, float]] = {}
+        started: dict[int, float] = {}
+        raced: set[int] = set()
+        done = 0
+        while done < len(task_ids):
+            waiting = [i for i in task_ids[done:] if i not in results]
+            for task_id, outcome in self.broker.finished(waiting).items():
+                if not outcome.ok:
+                    raise RuntimeError(
+                        f"Episode batch {task_id} failed: {outcome.payload}"
+                    )
+                data = json.loads(outcome.payload)
+                results[task_id] = [SimStats(**s) for s in data["stats"]]
+                durations.append(data["seconds"])
+            while done < len(task_ids) and task_ids[done] in results:
+                yield from results.pop(task_ids[done])
+                done += 1
+            if done < len(task_ids):
+                self.requeue_lost(task_ids[done:], results, seen, started)
+                self.requeue_stragglers(
+                    task_ids[done:], results, started, durations, raced
+                )
+                time.sleep(self.poll)
+
+    def requeue_lost(
+        self,
+        task_ids: list[int],
+        results: dict[int, list[SimStats]],
+        seen: dict[int, tuple[Lease, float]],
+        started: dict[int, float],
+    ) -> None:
+        now = time.monotonic()
+        leases = self.broker.leases(i for i in task_ids if i not in results)
+        for task_id, lease in leases.items():
+            last = seen.get(task_id)
+            if last is None or last[0] != lease:
+                seen[task_id] = (lease, now)
+                if last is None or last[0].worker != lease.worker:
+                    started[task_id] = now
+            elif now - last[1] > self.timeout:
+                logger.warning(
+                    f"Lost worker {lease.worker}, requeueing episode batch "
+                    f"{task_id}."
+                )
+                self.broker.requeue(task_id)
+                del seen[task_id]
+                started.pop(task_id, None)
+        for task_id in set(started) - set(leases):
+            started.pop(task_id)
+
+    def requeue_stragglers(
+        self,
+        task_ids: list[int],
+        results: dict[int, list[SimStats]],
+        started: dict[int, float],
+        durations: list[float],
+        raced: set[int],
+    ) -> None:
+        unfinished = [i for i in task_ids if i not in results]
+        if (
+            self.straggler_factor is None
+            or not durations
+            or any(i not in started for i in unfinished)
+        ):
+            return
+        now = time.monotonic()
+        limit = self.straggler_factor * statistics.median(durations)
+        for task_id in unfinished:
+            if task_id not in raced and now - started[task_id] > limit:
+                logger.info(
+                    f"Running straggling episode batch {task_id} again."
+                )
+                self.broker.requeue(task_id)
+                raced.add(task_id)
+
+    def close(self) -> None:
+        self.broker.close()
@@ -0,0 +1,26 @@
+from .collision import intersects, pair_kernels
+from .index import GeometryIndex
+from .kdtree import KDTree
+from .quadtree import Quadtree
+from .shapes import (
+    AABB,
+    Circle,
+    ConvexPolygon,
+    OrientedBox,
+    Shape,
+    shape_from_dict,
+)
+
+__all__ = [
+    "AABB",
+    "Circle",
+    "ConvexPolygon",
+    "GeometryIndex",
+    "KDTree",
+    "OrientedBox",
+    "Quadtree",
+    "Shape",
+    "intersects",
+    "pair_kernels",
+    "shape_from_dict",
+]
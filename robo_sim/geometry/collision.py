@@ -0,0 +1,75 @@
+from itertools import product
+from typing import Callable
+
+import numpy as np
+
+from .shapes import AABB, Circle, ConvexPolygon, OrientedBox, Shape
+
+PairKernel = Callable[[Shape, Shape, float, float], bool]
+
+
+def _circle_vs_shape(a: Shape, b: Shape, dx: float, dy: float) -> bool:
+    assert isinstance(a, Circle)
+    return b.hits_circle(-dx, -dy, a.radius)
+
+
+def _shape_vs_circle(a: Shape, b: Shape, dx: float, dy: float) -> bool:
+    assert isinstance(b, Circle)
+    return a.hits_circle(dx, dy, b.radius)
+
+
+def _circle_vs_circle(a: Shape, b: Shape, dx: float, dy: float) -> bool:
+    assert isinstance(a, Circle) and isinstance(b, Circle)
+    return a.hits_circle(dx, dy, b.radius)
+
+
+def _aabb_vs_aabb(a: Shape, b: Shape, dx: float, dy: float) -> bool:
+    assert isinstance(a, AABB) and isinstance(b, AABB)
+    return (
+        abs(dx) <= a.half_width + b.half_width
+        and abs(dy) <= a.half_height + b.half_height
+    )
+
+
+def _polygon_vs_polygon(a: Shape, b: Shape, dx: float, dy: float) -> bool:
+    """Separating axis test between two convex polygons."""
+    poly_a = a.polygon()
+    poly_b = b.polygon()
+    assert poly_a is not None and poly_b is not None
+    poly_b = poly_b + (dx, dy)
+    for poly in (poly_a, poly_b):
+        edges = np.roll(poly, -1, axis=0) - poly
+        normals = np.column_stack((-edges[:, 1], edges[:, 0]))
+        proj_a = poly_a @ normals.T
+        proj_b = poly_b @ normals.T
+        if np.any(
+            (proj_a.max(axis=0) < proj_b.min(axis=0))
+            | (proj_b.max(axis=0) < proj_a.min(axis=0))
+        ):
+            return False
+    return True
+
+
+def _build_pair_kernels() -> dict[tuple[type, type], PairKernel]:
+    polygonal = (AABB, OrientedBox, ConvexPolygon)
+    kernels: dict[tuple[type, type], PairKernel] = {
+        (Circle, Circle): _circle_vs_circle,
+        (AABB, AABB): _aabb_vs_aabb,
+    }
+    for shape_type in polygonal:
+        kernels[(Circle, shape_type)] = _circle_vs_shape
+        kernels[(shape_type, Circle)] = _shape_vs_circle
+    for pair in product(polygonal, repeat=2):
+        kernels.setdefault(pair, _polygon_vs_polygon)
+    return kernels
+
+
+pair_kernels = _build_pair_kernels()
+
+
+def intersects(
+    a: Shape, a_pos: tuple[float, float], b: Shape, b_pos: tuple[float, float]
+) -> bool:
+    """Whether shape `a` at `a_pos` overlaps shape `b` at `b_pos`."""
+    kernel = pair_kernels[(type(a), type(b))]
+    return kernel(a, b, b_pos[0] - a_pos[0], b_pos[1] - a_pos[1])
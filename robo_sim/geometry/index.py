@@ -0,0 +1,330 @@
+import math
+
+import numpy as np
+
+from .. import accel
+from .shapes import Shape
+
+# Upper bound on the (points x shapes) block evaluated at once.
+MAX_BLOCK = 1 << 20
+# Buckets at most this large are scanned without bounding-box culling.
+MIN_CULL_SIZE = 64
+# Queries spanning more cells of a bucket's grid than this along either
+# axis look up shapes by cell instead of culling by their bounding box.
+GRID_QUERY_SPAN = 8
+# Largest number of rings of neighboring cells searched around a point.
+MAX_GRID_RING = 2
+
+
+class BucketGrid:
+    """Slots of a bucket binned by center into square cells.
+
+    Every cell keeps its slots in a doubly linked list, so a slot moves
+    between cells by relinking it, touching nothing but those two cells.
+    """
+
+    def __init__(
+        self, origin: np.ndarray, cell: float, cols: int, rows: int
+    ) -> None:
+        self.origin = origin
+        self.cell = cell
+        self.cols = cols
+        self.rows = rows
+        # First slot of every cell and the neighbors of every slot in its
+        # cell's list, or -1.
+        self.head = np.full(cols * rows, -1, dtype=np.intp)
+        self.next = np.empty(0, dtype=np.intp)
+        self.prev = np.empty(0, dtype=np.intp)
+        self.cell_of = np.empty(0, dtype=np.intp)
+
+    def cell_ids(self, centers: np.ndarray) -> np.ndarray:
+        """Cell of each center, or -1 for centers outside the grid."""
+        cells = ((centers - self.origin) // self.cell).astype(np.intp)
+        inside = (
+            (cells[:, 0] >= 0)
+            & (cells[:, 0] < self.cols)
+            & (cells[:, 1] >= 0)
+            & (cells[:, 1] < self.rows)
+        )
+        return np.where(inside, cells[:, 0] * self.rows + cells[:, 1], -1)
+
+    def fill(self, cell_ids: np.ndarray) -> None:
+        """Link slots ``0..len(cell_ids)`` into their cells at once."""
+        count = len(cell_ids)
+        order = np.argsort(cell_ids, kind="stable")
+        ordered = cell_ids[order]
+        same = ordered[1:] == ordered[:-1]
+        self.next = np.full(count, -1, dtype=np.intp)
+        self.prev = np.full(count, -1, dtype=np.intp)
+        self.next[order[:-1][same]] = order[1:][same]
+        self.prev[order[1:][same]] = order[:-1][same]
+        first = np.ones(count, dtype=bool)
+        first[1:] = ~same
+        self.head[ordered[first]] = order[first]
+        self.cell_of = cell_ids.copy()
+
+    def insert(self, slot: int, cell: int) -> None:
+        if slot >= len(self.cell_of):
+            grown = max(2 * len(self.cell_of), slot + 1)
+            self.next = np.resize(self.next, grown)
+            self.prev = np.resize(self.prev, grown)
+            self.cell_of = np.resize(self.cell_of, grown)
+        first = self.head[cell]
+        self.next[slot] = first
+        self.prev[slot] = -1
+        if first >= 0:
+            self.prev[first] = slot
+        self.head[cell] = slot
+        self.cell_of[slot] = cell
+
+    def remove(self, slot: int) -> None:
+        before, after = self.prev[slot], self.next[slot]
+        if before >= 0:
+            self.next[before] = after
+        else:
+            self.head[self.cell_of[slot]] = after
+        if after >= 0:
+            self.prev[after] = before
+
+    def slots_in(
+        self, owners: np.ndarray, cells: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Every slot in each of `cells`, paired with the entry of
+        `owners` at the same position.
+
+        The lists of all cells are walked in parallel, one array pass per
+        element of the longest list.
+        """
+        pair_owners, pair_slots = [], []
+        current = self.head[cells]
+        while True:
+            live = current >= 0
+            owners, current = owners[live], current[live]
+            if not len(current):
+                break
+            pair_owners.append(owners)
+            pair_slots.append(current)
+            current = self.next[current]
+        if not pair_slots:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(pair_owners), np.concatenate(pair_slots)
+
+
+class ShapeBucket:
+    """Centers and parameters of every indexed shape of one type."""
+
+    def __init__(self, shape_type: type[Shape], width: int) -> None:
+        self.shape_type = shape_type
+        self.centers = np.empty((8, 2))
+        self.params = np.empty((8, width))
+        self.size = 0
+        # Largest distance along either axis from a center to its shape.
+        self.reach = 0.0
+        # Bumped whenever a shape is added or moved.
+        self.version = 0
+        self._grid: BucketGrid | None = None
+        # Area that rebuilt grids cover at least, once a shape left one.
+        self._extent: tuple[np.ndarray, np.ndarray] | None = None
+
+    def add(self, shape: Shape, x: float, y: float) -> int:
+        params = shape.params()
+        if len(params) > self.params.shape[1]:
+            self.params = self.shape_type.pad_params(self.params, len(params))
+        elif len(params) < self.params.shape[1]:
+            params = self.shape_type.pad_params(
+                params[None], self.params.shape[1]
+            )[0]
+        if self.size == len(self.centers):
+            self.centers = np.resize(self.centers, (2 * self.size, 2))
+            self.params = np.resize(
+                self.params, (2 * self.size, self.params.shape[1])
+            )
+        slot = self.size
+        self.reach = max(self.reach, *map(abs, shape.bounds()))
+        self.centers[slot] = (x, y)
+        self.params[slot] = params
+        self.size += 1
+        self.version += 1
+        if self._grid is not None:
+            cell = int(self._grid.cell_ids(self.centers[slot][None])[0])
+            if cell < 0 or self._grid.cell < 2 * self.reach:
+                self._grid = None
+            else:
+                self._grid.insert(slot, cell)
+        return slot
+
+    def move(self, slot: int, x: float, y: float) -> None:
+        """Recenter a shape, moving it between grid cells in place."""
+        self.centers[slot] = (x, y)
+        self.version += 1
+        grid = self._grid
+        if grid is None:
+            return
+        cell = int(grid.cell_ids(self.centers[slot][None])[0])
+        if cell < 0:
+            # Left the grid, which is rebuilt around a wider extent so that
+            # shapes roaming near its edge do not rebuild it every move.
+            lo = grid.origin
+            hi = lo + grid.cell * np.array((grid.cols, grid.rows))
+            pad = (hi - lo) / 4 + grid.cell
+            self._extent = (
+                np.minimum(lo, self.centers[slot]) - pad,
+                np.maximum(hi, self.centers[slot]) + pad,
+            )
+            self._grid = None
+        elif cell != grid.cell_of[slot]:
+            grid.remove(slot)
+            grid.insert(slot, cell)
+
+    def grid(self) -> BucketGrid:
+        """Shapes binned by center into square cells.
+
+        Cells are twice the bucket's reach wide, so a disc no wider than
+        that only needs the cells around its center, but no smaller than
+        about 16 per shape. Added and moved shapes are filed into their
+        cells in place; the grid is only rebuilt when a shape's center
+        leaves it or a wider shape is added.
+        """
+        if self._grid is not None:
+            return self._grid
+        centers = self.centers[: self.size]
+        origin, far = centers.min(axis=0), centers.max(axis=0)
+        if self._extent is not None:
+            origin = np.minimum(origin, self._extent[0])
+            far = np.maximum(far, self._extent[1])
+        span = far - origin
+        cell = max(
+            2 * self.reach,
+            math.sqrt(float(span[0] * span[1]) / self.size) / 4,
+            float(span.max()) / 1024,
+            1e-9,
+        )
+        cols, rows = (span // cell).astype(int) + 1
+        grid = BucketGrid(origin, cell, int(cols), int(rows))
+        grid.fill(grid.cell_ids(centers))
+        self._grid = grid
+        return grid
+
+    def hits(
+        self,
+        points: np.ndarray,
+        radius: float,
+        query_bounds: tuple[np.ndarray, np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """Per point, whether any shape in the bucket is hit.
+
+        If the bounding box ``(lo, hi)`` of the points is given, shapes
+        that cannot reach it are skipped, so local queries only run the
+        kernel on nearby shapes.
+        """
+        centers = self.centers[: self.size]
+        params = self.params[: self.size]
+        hit = np.zeros(len(points), dtype=bool)
+        if query_bounds is not None and self.size > MIN_CULL_SIZE:
+            margin = radius + self.reach
+            lo, hi = query_bounds[0] - margin, query_bounds[1] + margin
+            x, y = centers[:, 0], centers[:, 1]
+            nearby = (x >= lo[0]) & (x <= hi[0]) & (y >= lo[1]) & (y <= hi[1])
+            centers, params = centers[nearby], params[nearby]
+            if not len(centers):
+                return hit
+        kernel = accel.bucket_kernels.get(self.shape_type.kind)
+        if accel.ENABLED and kernel is not None:
+            return kernel(points, centers, params, radius)
+        step = max(1, MAX_BLOCK // len(centers))
+        for start in range(0, len(points), step):
+            stop = start + step
+            block = points[start:stop]
+            dx = block[:, 0:1] - centers[:, 0]
+            dy = block[:, 1:2] - centers[:, 1]
+            hits = self.shape_type.batch_hits(dx, dy, params, radius)
+            hit[start:stop] = hits.any(axis=1)
+        return hit
+
+
+class GeometryIndex:
+    """Batched collision queries over a set of positioned shapes.
+
+    Shapes are grouped into one bucket per shape type, and a query runs
+    each bucket's vectorized kernel, so there is no per-object dispatch.
+    """
+
+    def __init__(self) -> None:
+        self.buckets: dict[type[Shape], ShapeBucket] = {}
+
+    def __len__(self) -> int:
+        return sum(bucket.size for bucket in self.buckets.values())
+
+    def add(self, shape: Shape, x: float, y: float) -> tuple[ShapeBucket, int]:
+        """Index a shape centered at (x, y) and return its handle."""
+        bucket = self.buckets.get(type(shape))
+        if bucket is None:
+            bucket = ShapeBucket(type(shape), len(shape.params()))
+            self.buckets[type(shape)] = bucket
+        return bucket, bucket.add(shape, x, y)
+
+    def move(
+        self, handle: tuple[ShapeBucket, int], x: float, y: float
+    ) -> None:
+        """Recenter a shape previously returned by `add`, in place."""
+        bucket, slot = handle
+        bucket.move(slot, x, y)
+
+    def points_hit(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """Whether discs of `radius` at each of `points` (n, 2) touch any
+        indexed shape."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        hit = np.zeros(len(points), dtype=bool)
+        if not len(points):
+            return hit
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        for bucket in self.buckets.values():
+            if not bucket.size:
+                continue
+            if bucket.size > MIN_CULL_SIZE:
+                cell = bucket.grid().cell
+                ring = math.ceil((radius + bucket.reach) / cell)
+                if (
+                    ring <= MAX_GRID_RING
+                    and (hi - lo).max() > GRID_QUERY_SPAN * cell
+                ):
+                    hit |= self._grid_hits(bucket, points, radius, ring)
+                    continue
+            hit |= bucket.hits(points, radius, (lo, hi))
+        return hit
+
+    @staticmethod
+    def _grid_hits(
+        bucket: ShapeBucket, points: np.ndarray, radius: float, ring: int
+    ) -> np.ndarray:
+        """`ShapeBucket.hits` testing each point only against the shapes
+        in the `ring` rings of grid cells around it, since a bounding box
+        around points all over the map culls nothing."""
+        grid = bucket.grid()
+        cols, rows = grid.cols, grid.rows
+        cells = ((points - grid.origin) // grid.cell).astype(np.intp)
+        offsets = np.arange(-ring, ring + 1)
+        col = cells[:, 0, None, None] + offsets[:, None]
+        row = cells[:, 1, None, None] + offsets
+        valid = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        valid = valid.reshape(len(points), -1)
+        owners = np.nonzero(valid)[0]
+        ids = (col * rows + row).reshape(len(points), -1)[valid]
+        # One (point, shape) pair per shape in each neighboring cell.
+        pair_points, slots = grid.slots_in(owners, ids)
+        hit = np.zeros(len(points), dtype=bool)
+        if not len(slots):
+            return hit
+        centers = bucket.centers[slots]
+        hits = bucket.shape_type.batch_hits(
+            (points[pair_points, 0] - centers[:, 0])[None],
+            (points[pair_points, 1] - centers[:, 1])[None],
+            bucket.params[slots],
+            radius,
+        )[0]
+        hit[pair_points[hits]] = True
+        return hit
+
+    def any_hit(self, x: float, y: float, radius: float) -> bool:
+        return bool(self.points_hit(np.array([[x, y]]), radius)[0])
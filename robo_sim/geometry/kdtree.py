@@ -0,0 +1,160 @@
+import math
+
+import numpy as np
+
+
+class KDTree:
+    """Incrementally built 2D KD-tree with bucketed leaves.
+
+    Points are appended one at a time, as sampling-based planners grow
+    their graphs. Each leaf holds up to `leaf_size` points in a small
+    array that queries scan with one vectorized distance computation, and
+    a full leaf is split at the median of its wider axis.
+
+    Nodes are stored in flat lists indexed by node id. Internal nodes have
+    a split axis and value; leaves have ``axis == -1``.
+    """
+
+    def __init__(self, leaf_size: int = 32, capacity: int = 1024) -> None:
+        self.leaf_size = leaf_size
+        self.points = np.empty((capacity, 2))
+        self.size = 0
+        self.axis: list[int] = [-1]
+        self.value: list[float] = [0.0]
+        self.children: list[tuple[int, int]] = [(-1, -1)]
+        self.leaf_points: list[np.ndarray] = [np.empty((leaf_size, 2))]
+        self.leaf_ids: list[np.ndarray] = [np.empty(leaf_size, dtype=np.intp)]
+        self.leaf_count: list[int] = [0]
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def from_points(cls, points: np.ndarray, leaf_size: int = 32) -> "KDTree":
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        tree = cls(leaf_size, capacity=max(len(points), 1))
+        for x, y in points.tolist():
+            tree.insert(x, y)
+        return tree
+
+    def insert(self, x: float, y: float) -> int:
+        """Add a point and return its index."""
+        if self.size == len(self.points):
+            self.points = np.resize(self.points, (2 * self.size, 2))
+        idx = self.size
+        self.points[idx] = (x, y)
+        self.size += 1
+
+        node = 0
+        while self.axis[node] >= 0:
+            left, right = self.children[node]
+            coord = x if self.axis[node] == 0 else y
+            node = left if coord < self.value[node] else right
+        count = self.leaf_count[node]
+        self.leaf_points[node][count] = (x, y)
+        self.leaf_ids[node][count] = idx
+        self.leaf_count[node] = count + 1
+        if count + 1 == len(self.leaf_ids[node]):
+            self._split(node)
+        return idx
+
+    def _new_leaf(self, points: np.ndarray, ids: np.ndarray) -> int:
+        node = len(self.axis)
+        capacity = max(self.leaf_size, len(ids) + 1)
+        leaf_points = np.empty((capacity, 2))
+        leaf_ids = np.empty(capacity, dtype=np.intp)
+        leaf_points[: len(points)] = points
+        leaf_ids[: len(ids)] = ids
+        self.axis.append(-1)
+        self.value.append(0.0)
+        self.children.append((-1, -1))
+        self.leaf_points.append(leaf_points)
+        self.leaf_ids.append(leaf_ids)
+        self.leaf_count.append(len(points))
+        return node
+
+    def _split(self, node: int) -> None:
+        # Only called on full leaves, so every slot is in use.
+        points = self.leaf_points[node]
+        ids = self.leaf_ids[node]
+        spread = points.max(axis=0) - points.min(axis=0)
+        axis = int(np.argmax(spread))
+        if spread[axis] == 0:
+            # Identical points cannot be separated; let the leaf grow.
+            self.leaf_points[node] = np.resize(points, (2 * len(points), 2))
+            self.leaf_ids[node] = np.resize(ids, 2 * len(ids))
+            return
+        coords = points[:, axis]
+        value = float(np.median(coords))
+        below = coords < value
+        if below.all() or not below.any():
+            value = float(coords.max())
+            below = coords < value
+        left = self._new_leaf(points[below], ids[below])
+        right = self._new_leaf(points[~below], ids[~below])
+        self.axis[node] = axis
+        self.value[node] = value
+        self.children[node] = (left, right)
+        self.leaf_points[node] = self.leaf_points[0][:0]
+        self.leaf_ids[node] = self.leaf_ids[0][:0]
+        self.leaf_count[node] = 0
+
+    def nearest(self, x: float, y: float) -> tuple[int, float]:
+        """Index of and distance to the closest point."""
+        if not self.size:
+            raise ValueError("Nearest-neighbor query on an empty KDTree.")
+        best, best_d2 = -1, math.inf
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_d2:
+                continue
+            axis = self.axis[node]
+            if axis < 0:
+                count = self.leaf_count[node]
+                if not count:
+                    continue
+                pts = self.leaf_points[node][:count]
+                d2 = (pts[:, 0] - x) ** 2 + (pts[:, 1] - y) ** 2
+                k = int(d2.argmin())
+                if d2[k] < best_d2:
+                    best_d2 = float(d2[k])
+                    best = int(self.leaf_ids[node][k])
+                continue
+            diff = (x if axis == 0 else y) - self.value[node]
+            left, right = self.children[node]
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, diff * diff))
+            stack.append((near, bound))
+        return best, math.sqrt(best_d2)
+
+    def within(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Indices of every point within `radius` of (x, y)."""
+        # Collect the candidate leaves first and then test all of their
+        # points in a single vectorized pass.
+        points, ids = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            axis = self.axis[node]
+            if axis < 0:
+                count = self.leaf_count[node]
+                if count:
+                    points.append(self.leaf_points[node][:count])
+                    ids.append(self.leaf_ids[node][:count])
+                continue
+            diff = (x if axis == 0 else y) - self.value[node]
+            left, right = self.children[node]
+            if diff - radius < 0:
+                stack.append(left)
+            if diff + radius >= 0:
+                stack.append(right)
+        if not points:
+            return np.empty(0, dtype=np.intp)
+        if len(points) > 1:
+            pts = np.concatenate(points)
+            candidates = np.concatenate(ids)
+        else:
+            pts, candidates = points[0], ids[0]
+        d2 = (pts[:, 0] - x) ** 2 + (pts[:, 1] - y) ** 2
+        return candidates[d2 <= radius * radius]
@@ -0,0 +1,334 @@
+from typing import Callable
+
+import numpy as np
+
+FREE = 0
+FULL = 1
+MIXED = 2
+
+# Classifies blocks of cells given by inclusive row and column ranges
+# (i0, j0, i1, j1) as FREE, FULL or MIXED. Blocks of a single cell must not
+# be MIXED.
+BlockClassifier = Callable[
+    [np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray
+]
+
+
+def morton(ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+    """Z-order codes of cells, interleaving the bits of the column (even
+    bits) and row (odd bits) indices."""
+    return _spread(np.asarray(jj)) | (_spread(np.asarray(ii)) << 1)
+
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    # Moves bit k of a 32-bit value to bit 2k.
+    v = v.astype(np.uint64) & 0xFFFFFFFF
+    v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v << 2)) & 0x3333333333333333
+    v = (v | (v << 1)) & 0x5555555555555555
+    return v
+
+
+class Quadtree:
+    """Region quadtree over a grid of cells, stored as its leaves.
+
+    Every leaf is a square block of ``2**level`` cells per side that is
+    either entirely free or entirely occupied. Leaves are kept sorted by
+    the Z-order (Morton) code of their first cell, so that the blocks
+    partition the grid in code order and the leaf holding a cell is found
+    by binary search. A map with large uniform regions needs only as many
+    leaves as it takes to follow the boundaries of its obstacles, rather
+    than one entry per cell.
+
+    Cell ``(i, j)`` is row `i` and column `j`, as in `Env.occupancy_grid`.
+    Cells outside the grid count as occupied in queries.
+
+    Parameters
+    ----------
+    shape : tuple[int, int]
+        Grid shape as (rows, cols).
+    codes : np.ndarray
+        Sorted Morton codes of the first cell of every leaf.
+    levels : np.ndarray
+        Level of every leaf.
+    occupied : np.ndarray
+        Whether every leaf is occupied.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, int],
+        codes: np.ndarray,
+        levels: np.ndarray,
+        occupied: np.ndarray,
+    ) -> None:
+        self.shape = shape
+        self.depth = max(int(max(shape) - 1).bit_length(), 0)
+        self.codes = codes
+        self.levels = levels
+        self.occupied = occupied
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.levels.nbytes + self.occupied.nbytes
+
+    @classmethod
+    def build(
+        cls, shape: tuple[int, int], classify: BlockClassifier
+    ) -> "Quadtree":
+        """Build a quadtree top-down, splitting only the blocks that
+        `classify` reports as mixed.
+
+        Blocks that straddle the grid's edge are classified by the part
+        inside the grid, and blocks entirely outside it become free leaves
+        that queries never reach.
+        """
+        depth = max(int(max(shape) - 1).bit_length(), 0)
+        zero = np.zeros(1, dtype=np.int64)
+        codes, levels, occupied = _split_blocks(
+            shape, classify, zero, zero, np.array([depth])
+        )
+        tree = cls(shape, codes, levels, occupied)
+        tree._merge_siblings()
+        return tree
+
+    def patch(
+        self, i0: int, j0: int, i1: int, j1: int, classify: BlockClassifier
+    ) -> None:
+        """Reclassify the cells in rows `i0` to `i1` and columns `j0` to
+        `j1`, inclusive, after their occupancy changed.
+
+        Only the leaves overlapping the box are split again by `classify`,
+        which must reflect the new occupancy, and the rest of the tree is
+        kept.
+        """
+        rows, cols = self.shape
+        i0, j0 = max(i0, 0), max(j0, 0)
+        i1, j1 = min(i1, rows - 1), min(j1, cols - 1)
+        if i1 < i0 or j1 < j0:
+            return
+        lo, hi = self.leaf_at(np.array([i0, i1]), np.array([j0, j1]))
+        stop = hi + 1
+        candidates = np.arange(lo, stop)
+        ii, jj, sizes = self.leaf_blocks(candidates)
+        overlap = (
+            (ii <= i1) & (ii + sizes > i0) & (jj <= j1) & (jj + sizes > j0)
+        )
+        stale = candidates[overlap]
+        codes, levels, occupied = _split_blocks(
+            self.shape,
+            classify,
+            ii[overlap],
+            jj[overlap],
+            self.levels[stale].astype(np.int64),
+        )
+        keep = np.ones(len(self.codes), dtype=bool)
+        keep[stale] = False
+        # Leaves of a block stay within its code range, so they slot in
+        # where the block's old leaf was.
+        at = np.searchsorted(self.codes[keep], codes)
+        self.codes = np.insert(self.codes[keep], at, codes)
+        self.levels = np.insert(self.levels[keep], at, levels)
+        self.occupied = np.insert(self.occupied[keep], at, occupied)
+        self._merge_siblings()
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray) -> "Quadtree":
+        """Quadtree of a dense boolean occupancy grid."""
+        grid = np.asarray(grid, dtype=bool)
+        # Occupied cells in each block from a summed-area table.
+        table = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), np.int64)
+        table[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+
+        def classify(i0, j0, i1, j1):
+            count = (
+                table[i1 + 1, j1 + 1]
+                - table[i0, j1 + 1]
+                - table[i1 + 1, j0]
+                + table[i0, j0]
+            )
+            area = (i1 - i0 + 1) * (j1 - j0 + 1)
+            states = np.full(len(count), MIXED, dtype=np.int8)
+            states[count == 0] = FREE
+            states[count == area] = FULL
+            return states
+
+        return cls.build(grid.shape, classify)
+
+    def _merge_siblings(self) -> None:
+        """Replace every four sibling leaves of equal state by their
+        parent, so the tree has the fewest leaves for its occupancy."""
+        rows, cols = self.shape
+        for level in range(self.depth):
+            span = np.uint64(1) << np.uint64(2 * level)
+            # A run of four siblings starts at a code aligned to their
+            # parent and continues with the next three leaves.
+            count = len(self.codes)
+            first = np.flatnonzero(
+                (self.levels[: count - 3] == level)
+                & (self.codes[: count - 3] % (span * np.uint64(4)) == 0)
+            )
+            if not len(first):
+                continue
+            runs = first[:, None] + np.arange(4)
+            offsets = span * np.arange(4, dtype=np.uint64)
+            siblings = self.codes[runs] == self.codes[first, None] + offsets
+            # Siblings wholly outside the grid are free by convention and
+            # take the state of the rest, as `build` classifies blocks
+            # clipped to the grid.
+            ii, jj, _ = self.leaf_blocks(runs.ravel())
+            outside = (ii >= rows) | (jj >= cols)
+            same = (self.occupied[runs] == self.occupied[first, None]) | (
+                outside.reshape(runs.shape)
+            )
+            merge = ((self.levels[runs] == level) & siblings & same).all(
+                axis=1
+            )
+            if not merge.any():
+                continue
+            first = first[merge]
+            keep = np.ones(count, dtype=bool)
+            keep[(first[:, None] + np.arange(1, 4)).ravel()] = False
+            self.levels[first] = level + 1
+            self.codes = self.codes[keep]
+            self.levels = self.levels[keep]
+            self.occupied = self.occupied[keep]
+
+    def leaf_at(self, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+        """Index of the leaf holding each cell inside the grid."""
+        codes = morton(ii, jj)
+        return np.searchsorted(self.codes, codes, side="right") - 1
+
+    def occupied_cells(self, ii: np.ndarray, jj: np.ndarray) -> np.ndarray:
+        """Whether each cell ``(ii[k], jj[k])`` is occupied or outside the
+        grid."""
+        ii, jj = np.asarray(ii), np.asarray(jj)
+        rows, cols = self.shape
+        inside = (ii >= 0) & (ii < rows) & (jj >= 0) & (jj < cols)
+        result = np.ones(len(ii), dtype=bool)
+        result[inside] = self.occupied[self.leaf_at(ii[inside], jj[inside])]
+        return result
+
+    def leaf_blocks(
+        self, leaves: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """First row, first column and side length in cells of each of
+        `leaves`, by default every leaf."""
+        codes, levels = self.codes, self.levels
+        if leaves is not None:
+            codes, levels = codes[leaves], levels[leaves]
+        sizes = np.left_shift(1, levels.astype(np.int64))
+        return _compact(codes >> np.uint64(1)), _compact(codes), sizes
+
+    def box_occupied(self, i0: int, j0: int, i1: int, j1: int) -> bool:
+        """Whether any cell in rows `i0` to `i1` and columns `j0` to `j1`,
+        inclusive, is occupied or outside the grid."""
+        rows, cols = self.shape
+        if i0 < 0 or j0 < 0 or i1 >= rows or j1 >= cols:
+            return True
+        # Z-order codes increase along both axes, so the leaves covering
+        # the box lie between the leaves of its corners.
+        lo, hi = self.leaf_at(np.array([i0, i1]), np.array([j0, j1]))
+        stop = hi + 1
+        candidates = lo + np.flatnonzero(self.occupied[lo:stop])
+        if not len(candidates):
+            return False
+        ii, jj, sizes = self.leaf_blocks(candidates)
+        overlap = (
+            (ii <= i1) & (ii + sizes > i0) & (jj <= j1) & (jj + sizes > j0)
+        )
+        return bool(overlap.any())
+
+    def neighbors(self, leaf: int, diagonal: bool = True) -> np.ndarray:
+        """Indices of the leaves that share an edge with `leaf`, or with
+        `diagonal` also a corner."""
+        ii, jj, sizes = self.leaf_blocks(np.array([leaf]))
+        i0, j0, size = int(ii[0]), int(jj[0]), int(sizes[0])
+        i1, j1 = i0 + size, j0 + size
+        side = np.arange(size)
+        # Cells just outside each edge, then each corner.
+        ci = [np.full(size, i0 - 1), np.full(size, i1), i0 + side, i0 + side]
+        cj = [j0 + side, j0 + side, np.full(size, j0 - 1), np.full(size, j1)]
+        if diagonal:
+            ci.append(np.array([i0 - 1, i0 - 1, i1, i1]))
+            cj.append(np.array([j0 - 1, j1, j0 - 1, j1]))
+        ci, cj = np.concatenate(ci), np.concatenate(cj)
+        rows, cols = self.shape
+        inside = (ci >= 0) & (ci < rows) & (cj >= 0) & (cj < cols)
+        return np.unique(self.leaf_at(ci[inside], cj[inside]))
+
+    def to_grid(self) -> np.ndarray:
+        """Dense boolean occupancy grid of the tree."""
+        grid = np.zeros(self.shape, dtype=bool)
+        ii, jj, sizes = self.leaf_blocks(np.flatnonzero(self.occupied))
+        for i, j, size in zip(ii.tolist(), jj.tolist(), sizes.tolist()):
+            stop_i, stop_j = i + size, j + size
+            grid[i:stop_i, j:stop_j] = True
+        return grid
+
+
+def _split_blocks(
+    shape: tuple[int, int],
+    classify: BlockClassifier,
+    i0: np.ndarray,
+    j0: np.ndarray,
+    levels: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Leaves covering the blocks of side ``2**levels[k]`` at cells
+    ``(i0[k], j0[k])``, splitting the blocks `classify` reports as mixed,
+    as Morton codes, levels and occupancy sorted by code."""
+    rows, cols = shape
+    leaves: list[tuple[np.ndarray, np.ndarray, int, np.ndarray]] = []
+    bi = np.empty(0, dtype=np.int64)
+    bj = np.empty(0, dtype=np.int64)
+    for level in range(int(levels.max(initial=-1)), -1, -1):
+        at = levels == level
+        bi = np.concatenate((bi, i0[at]))
+        bj = np.concatenate((bj, j0[at]))
+        size = 1 << level
+        states = np.full(len(bi), FREE, dtype=np.int8)
+        inside = (bi < rows) & (bj < cols)
+        if inside.any():
+            states[inside] = classify(
+                bi[inside],
+                bj[inside],
+                np.minimum(bi[inside] + size, rows) - 1,
+                np.minimum(bj[inside] + size, cols) - 1,
+            )
+        mixed = states == MIXED
+        if level == 0 and mixed.any():
+            raise ValueError("Single cells cannot be classified mixed.")
+        leaf = ~mixed
+        leaves.append((bi[leaf], bj[leaf], level, states[leaf] == FULL))
+        half = size >> 1
+        bi, bj = bi[mixed], bj[mixed]
+        bi = np.concatenate((bi, bi, bi + half, bi + half))
+        bj = np.concatenate((bj, bj + half, bj, bj + half))
+    if not leaves:
+        empty = np.empty(0, dtype=np.uint64)
+        return empty, np.empty(0, np.uint8), np.empty(0, bool)
+    ii = np.concatenate([leaf[0] for leaf in leaves])
+    jj = np.concatenate([leaf[1] for leaf in leaves])
+    levels = np.concatenate(
+        [np.full(len(leaf[0]), leaf[2], np.uint8) for leaf in leaves]
+    )
+    occupied = np.concatenate([leaf[3] for leaf in leaves])
+    codes = morton(ii, jj)
+    order = np.argsort(codes, kind="stable")
+    return codes[order], levels[order], occupied[order]
+
+
+def _compact(v: np.ndarray) -> np.ndarray:
+    # Inverse of `_spread` on the even bits.
+    v = v & 0x5555555555555555
+    v = (v | (v >> 1)) & 0x3333333333333333
+    v = (v | (v >> 2)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v >> 4)) & 0x00FF00FF00FF00FF
+    v = (v | (v >> 8)) & 0x0000FFFF0000FFFF
+    v = (v | (v >> 16)) & 0x00000000FFFFFFFF
+    return v.astype(np.int64)
@@ -0,0 +1,307 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Any, ClassVar
+
+import numpy as np
+
+
+class Shape(ABC):
+    """Collision geometry of an object, in a frame centered on the object.
+
+    Every shape provides a scalar test against a query disc and a batched
+    NumPy kernel that tests many query points against many shapes of the
+    same type at once. Offsets are always ``query - center``.
+
+    Box-like shapes test a disc by inflating the box by the disc radius
+    along the box axes, which reproduces the original square-obstacle check
+    exactly.
+    """
+
+    kind: ClassVar[str]
+
+    @property
+    @abstractmethod
+    def extent(self) -> float:
+        """Characteristic radius of the shape."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def bounds(self) -> tuple[float, float, float, float]:
+        """Local bounding box as (xmin, ymin, xmax, ymax)."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def hits_circle(self, dx: float, dy: float, radius: float) -> bool:
+        """Whether a disc of `radius` at offset (dx, dy) touches the
+        shape."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def params(self) -> np.ndarray:
+        """Flat parameter vector consumed by `batch_hits`."""
+        raise NotImplementedError()
+
+    @staticmethod
+    @abstractmethod
+    def batch_hits(
+        dx: np.ndarray, dy: np.ndarray, params: np.ndarray, radius: float
+    ) -> np.ndarray:
+        """Batched disc test.
+
+        Parameters
+        ----------
+        dx, dy : np.ndarray
+            Offsets of shape (points, shapes).
+        params : np.ndarray
+            Parameters of shape (shapes, P).
+        radius : float
+            Radius of the query discs.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (points, shapes).
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def pad_params(params: np.ndarray, width: int) -> np.ndarray:
+        """Widen a parameter matrix to `width` columns."""
+        raise ValueError("Shape parameters have a fixed width.")
+
+    def polygon(self) -> np.ndarray | None:
+        """Local counter-clockwise vertices, for polygonal shapes."""
+        return None
+
+    @abstractmethod
+    def to_dict(self) -> dict[str, Any]:
+        raise NotImplementedError()
+
+
+class Circle(Shape):
+    kind = "circle"
+
+    def __init__(self, radius: float) -> None:
+        self.radius = radius
+
+    @property
+    def extent(self) -> float:
+        return self.radius
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        r = self.radius
+        return -r, -r, r, r
+
+    def hits_circle(self, dx: float, dy: float, radius: float) -> bool:
+        return math.hypot(dx, dy) <= self.radius + radius
+
+    def params(self) -> np.ndarray:
+        return np.array([self.radius])
+
+    @staticmethod
+    def batch_hits(
+        dx: np.ndarray, dy: np.ndarray, params: np.ndarray, radius: float
+    ) -> np.ndarray:
+        return np.hypot(dx, dy) <= params[:, 0] + radius
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"shape": self.kind, "radius": self.radius}
+
+
+class AABB(Shape):
+    """Axis-aligned box given by its half extents."""
+
+    kind = "box"
+
+    def __init__(self, half_width: float, half_height: float) -> None:
+        self.half_width = half_width
+        self.half_height = half_height
+
+    @property
+    def extent(self) -> float:
+        return max(self.half_width, self.half_height)
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        return (
+            -self.half_width,
+            -self.half_height,
+            self.half_width,
+            self.half_height,
+        )
+
+    def hits_circle(self, dx: float, dy: float, radius: float) -> bool:
+        return (
+            abs(dx) <= self.half_width + radius
+            and abs(dy) <= self.half_height + radius
+        )
+
+    def params(self) -> np.ndarray:
+        return np.array([self.half_width, self.half_height])
+
+    @staticmethod
+    def batch_hits(
+        dx: np.ndarray, dy: np.ndarray, params: np.ndarray, radius: float
+    ) -> np.ndarray:
+        return (np.abs(dx) <= params[:, 0] + radius) & (
+            np.abs(dy) <= params[:, 1] + radius
+        )
+
+    def polygon(self) -> np.ndarray:
+        w, h = self.half_width, self.half_height
+        return np.array([(-w, -h), (w, -h), (w, h), (-w, h)], dtype=float)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "shape": self.kind,
+            "size": [2 * self.half_width, 2 * self.half_height],
+        }
+
+
+class OrientedBox(Shape):
+    """Box rotated counter-clockwise by `angle` degrees."""
+
+    kind = "oriented_box"
+
+    def __init__(
+        self, half_width: float, half_height: float, angle: float
+    ) -> None:
+        self.half_width = half_width
+        self.half_height = half_height
+        self.angle = angle
+        rad = math.radians(angle)
+        self.cos = math.cos(rad)
+        self.sin = math.sin(rad)
+
+    @property
+    def extent(self) -> float:
+        return max(self.half_width, self.half_height)
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        corners = self.polygon()
+        x_min, y_min = corners.min(axis=0)
+        x_max, y_max = corners.max(axis=0)
+        return x_min, y_min, x_max, y_max
+
+    def hits_circle(self, dx: float, dy: float, radius: float) -> bool:
+        local_x = self.cos * dx + self.sin * dy
+        local_y = -self.sin * dx + self.cos * dy
+        return (
+            abs(local_x) <= self.half_width + radius
+            and abs(local_y) <= self.half_height + radius
+        )
+
+    def params(self) -> np.ndarray:
+        return np.array(
+            [self.half_width, self.half_height, self.cos, self.sin]
+        )
+
+    @staticmethod
+    def batch_hits(
+        dx: np.ndarray, dy: np.ndarray, params: np.ndarray, radius: float
+    ) -> np.ndarray:
+        cos, sin = params[:, 2], params[:, 3]
+        local_x = cos * dx + sin * dy
+        local_y = cos * dy - sin * dx
+        return (np.abs(local_x) <= params[:, 0] + radius) & (
+            np.abs(local_y) <= params[:, 1] + radius
+        )
+
+    def polygon(self) -> np.ndarray:
+        w, h = self.half_width, self.half_height
+        local = np.array([(-w, -h), (w, -h), (w, h), (-w, h)], dtype=float)
+        rotation = np.array([[self.cos, -self.sin], [self.sin, self.cos]])
+        return local @ rotation.T
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "shape": self.kind,
+            "size": [2 * self.half_width, 2 * self.half_height],
+            "angle": self.angle,
+        }
+
+
+class ConvexPolygon(Shape):
+    """Convex polygon with vertices relative to the object's position."""
+
+    kind = "polygon"
+
+    def __init__(self, vertices: np.ndarray | list) -> None:
+        vertices = np.asarray(vertices, dtype=float)
+        if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+            raise ValueError("A polygon needs at least three (x, y) vertices.")
+        x, y = vertices[:, 0], vertices[:, 1]
+        signed_area = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+        if signed_area < 0:
+            vertices = vertices[::-1]
+        self.vertices = vertices
+
+    @property
+    def extent(self) -> float:
+        return float(np.hypot(*self.vertices.T).max())
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        x_min, y_min = self.vertices.min(axis=0)
+        x_max, y_max = self.vertices.max(axis=0)
+        return x_min, y_min, x_max, y_max
+
+    def hits_circle(self, dx: float, dy: float, radius: float) -> bool:
+        return bool(
+            self.batch_hits(
+                np.array([[dx]]), np.array([[dy]]), self.params()[None], radius
+            )[0, 0]
+        )
+
+    def params(self) -> np.ndarray:
+        return self.vertices.ravel()
+
+    @staticmethod
+    def pad_params(params: np.ndarray, width: int) -> np.ndarray:
+        # Repeating the last vertex adds zero-length edges, which change
+        # neither the inside test nor the edge distances.
+        extra = (width - params.shape[1]) // 2
+        last = params[:, -2:]
+        return np.hstack([params] + [last] * extra)
+
+    @staticmethod
+    def batch_hits(
+        dx: np.ndarray, dy: np.ndarray, params: np.ndarray, radius: float
+    ) -> np.ndarray:
+        vertices = params.reshape(len(params), -1, 2)
+        edges = np.roll(vertices, -1, axis=1) - vertices
+        # Offsets relative to every vertex: (points, shapes, vertices).
+        px = dx[..., None] - vertices[..., 0]
+        py = dy[..., None] - vertices[..., 1]
+        cross = edges[..., 0] * py - edges[..., 1] * px
+        inside = np.all(cross >= 0, axis=-1)
+
+        length2 = np.einsum("mkd,mkd->mk", edges, edges)
+        t = (px * edges[..., 0] + py * edges[..., 1]) / np.where(
+            length2 > 0, length2, 1.0
+        )
+        t = np.clip(t, 0.0, 1.0)
+        nearest2 = (px - t * edges[..., 0]) ** 2 + (
+            py - t * edges[..., 1]
+        ) ** 2
+        return inside | (nearest2.min(axis=-1) <= radius * radius)
+
+    def polygon(self) -> np.ndarray:
+        return self.vertices
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"shape": self.kind, "vertices": self.vertices.tolist()}
+
+
+def shape_from_dict(data: dict[str, Any]) -> Shape:
+    """Build a shape from its `to_dict` / config representation."""
+    kind = data.get("shape", AABB.kind)
+    if kind == Circle.kind:
+        return Circle(data.get("radius", 0.5))
+    if kind in (AABB.kind, "square"):
+        width, height = data.get("size", (1.0, 1.0))
+        return AABB(width / 2, height / 2)
+    if kind == OrientedBox.kind:
+        width, height = data.get("size", (1.0, 1.0))
+        return OrientedBox(width / 2, height / 2, data.get("angle", 0.0))
+    if kind == ConvexPolygon.kind:
+        return ConvexPolygon(data["vertices"])
+    raise ValueError(f"Unknown shape '{kind}'.")
@@ -0,0 +1,283 @@
+import json
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+from . import accel
+from .components.trajectory import TrajectoryReader
+from .logging import get_logger
+from .pool import Episode, WorkerState
+from .sim import Sim, build_env
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "golden.json"
+# Record fields compared exactly rather than within the tolerance.
+EXACT_FIELDS = ("frame", "flags")
+
+
+@dataclass
+class Backend:
+    """Engine configuration whose trajectories must match the reference.
+
+    A backend is applied to a case as config overrides, merged over the
+    case's own overrides, and by switching the compiled kernels of
+    `robo_sim.accel` on or off for the run.
+    """
+
+    name: str
+    env_overrides: dict[str, Any] = field(default_factory=dict)
+    robot_overrides: dict[str, Any] = field(default_factory=dict)
+    algorithm_overrides: dict[str, Any] = field(default_factory=dict)
+    jit: bool = False
+
+    @property
+    def available(self) -> bool:
+        return not self.jit or accel.COMPILED
+
+    def apply(self, episode: Episode) -> Episode:
+        return replace(
+            episode,
+            env_overrides={**episode.env_overrides, **self.env_overrides},
+            robot_overrides={
+                **episode.robot_overrides,
+                **self.robot_overrides,
+            },
+            algorithm_overrides={
+                **episode.algorithm_overrides,
+                **self.algorithm_overrides,
+            },
+        )
+
+
+REFERENCE = Backend("reference")
+
+backend_registry: dict[str, Backend] = {
+    backend.name: backend
+    for backend in (
+        REFERENCE,
+        Backend("quadtree", env_overrides={"quadtree": True}),
+        Backend("jit", jit=True),
+    )
+}
+
+
+def get_backend(name: str) -> Backend:
+    if name not in backend_registry:
+        raise ValueError(
+            f"Unknown backend {name!r}, expected one of "
+            f"{sorted(backend_registry)}."
+        )
+    return backend_registry[name]
+
+
+@dataclass
+class Divergence:
+    """First frame at which a trajectory departs from its golden one."""
+
+    frame: int
+    field: str
+    expected: Any
+    actual: Any
+
+    def __str__(self) -> str:
+        return (
+            f"frame {self.frame}: {self.field} is {self.actual}, expected "
+            f"{self.expected}"
+        )
+
+
+@dataclass
+class Comparison:
+    """Outcome of replaying one golden case on one backend."""
+
+    case: str
+    backend: str
+    frames: int
+    seconds: float
+    divergence: Divergence | None = None
+    # Reference run time over this backend's run time.
+    speedup: float | None = None
+
+    @property
+    def equivalent(self) -> bool:
+        return self.divergence is None
+
+
+def run_case(
+    state: WorkerState, episode: Episode, backend: Backend, path: Path
+) -> float:
+    """Run `episode` on `backend`, recording its trajectory to `path`.
+
+    Returns
+    -------
+    float
+        Wall time of the run in seconds, excluding setup.
+    """
+    env_config, robot_config, algorithm_config = state.episode_configs(
+        backend.apply(episode)
+    )
+    enabled = accel.ENABLED
+    accel.ENABLED = backend.jit
+    try:
+        env = None
+        if episode.seed is not None:
+            env = build_env(env_config, random.Random(episode.seed))
+        sim = Sim.from_configs(
+            env_config,
+            robot_config,
+            algorithm_config,
+            env=env,
+            headless=True,
+            trajectory_path=path,
+        )
+        start = time.perf_counter()
+        sim.run()
+        return time.perf_counter() - start
+    finally:
+        accel.ENABLED = enabled
+
+
+def first_divergence(
+    expected: np.ndarray, actual: np.ndarray, tolerance: float
+) -> Divergence | None:
+    """First frame at which two trajectory record arrays differ by more
+    than `tolerance` in any field, or by anything in the frame number and
+    flags."""
+    frames = min(len(expected), len(actual))
+    first: Divergence | None = None
+    for name in expected.dtype.names:
+        a, b = expected[name][:frames], actual[name][:frames]
+        if name in EXACT_FIELDS:
+            bad = a != b
+        else:
+            bad = ~np.isclose(a, b, rtol=0.0, atol=tolerance, equal_nan=True)
+        if bad.ndim > 1:
+            bad = bad.reshape(frames, -1).any(axis=1)
+        hits = np.flatnonzero(bad)
+        if len(hits) and (first is None or hits[0] < first.frame):
+            frame = int(hits[0])
+            first = Divergence(
+                frame, name, a[frame].tolist(), b[frame].tolist()
+            )
+    if first is None and len(expected) != len(actual):
+        first = Divergence(frames, "frames", len(expected), len(actual))
+    return first
+
+
+class GoldenSet:
+    """Reference trajectories of seeded cases, kept in one directory.
+
+    `record` runs every case with the reference engine, with compiled
+    kernels off, and stores the trajectories in the format of
+    `robo_sim replay` along with a manifest of the cases. `check` replays
+    the cases on other backends and compares the recorded frames: robot
+    position, orientation and sensor readings within a tolerance, and frame
+    numbers and flags exactly.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory of the manifest and trajectories.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.cases: dict[str, Episode] = {}
+        # Reference run time of every case when it was recorded.
+        self.seconds: dict[str, float] = {}
+        manifest = self.directory / MANIFEST_FILE
+        if manifest.exists():
+            data = json.loads(manifest.read_text())
+            for name, entry in data["cases"].items():
+                self.seconds[name] = entry.pop("seconds")
+                self.cases[name] = Episode.from_dict(entry)
+        self.state = WorkerState()
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.traj"
+
+    def record(self, cases: dict[str, Episode]) -> None:
+        """Record golden trajectories of `cases`, replacing any previous
+        recording under the same names."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, episode in cases.items():
+            self.seconds[name] = run_case(
+                self.state, episode, REFERENCE, self.path(name)
+            )
+            self.cases[name] = episode
+            logger.info(f"Recorded golden trajectory {name}.")
+        entries = {}
+        for name, episode in self.cases.items():
+            entry = episode.to_dict()
+            entry["seconds"] = self.seconds[name]
+            entries[name] = entry
+        (self.directory / MANIFEST_FILE).write_text(
+            json.dumps({"cases": entries}, indent=2, default=str)
+        )
+
+    def check(
+        self,
+        backends: Iterable[Backend],
+        tolerance: float = 1e-9,
+        cases: Iterable[str] | None = None,
+    ) -> list[Comparison]:
+        """Replay cases on every backend and compare them to the golden
+        trajectories.
+
+        Speedups are relative to the reference backend's run in the same
+        check if it is among `backends`, and to the recorded run time
+        otherwise.
+        """
+        backends = [backend for backend in backends if backend.available]
+        # Reference first, so that speedups can use its timing.
+        backends.sort(key=lambda backend: backend.name != REFERENCE.name)
+        comparisons = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in cases if cases is not None else self.cases:
+                golden = np.array(TrajectoryReader(self.path(name)).records)
+                baseline = self.seconds[name]
+                for backend in backends:
+                    path = Path(tmp) / f"{name}-{backend.name}.traj"
+                    seconds = run_case(
+                        self.state, self.cases[name], backend, path
+                    )
+                    if backend is REFERENCE:
+                        baseline = seconds
+                    actual = np.array(TrajectoryReader(path).records)
+                    comparison = Comparison(
+                        case=name,
+                        backend=backend.name,
+                        frames=len(actual),
+                        seconds=seconds,
+                        divergence=first_divergence(golden, actual, tolerance),
+                        speedup=baseline / seconds if seconds else None,
+                    )
+                    if not comparison.equivalent:
+                        logger.warning(
+                            f"{name} on {backend.name} diverges at "
+                            f"{comparison.divergence}."
+                        )
+                    comparisons.append(comparison)
+        return comparisons
+
+
+def format_report(comparisons: list[Comparison]) -> str:
+    """Table of comparisons, one line per case and backend."""
+    lines = [
+        f"{'case':<32} {'backend':<12} {'frames':>7} {'time':>9} "
+        f"{'speedup':>8}  result"
+    ]
+    for c in comparisons:
+        speedup = f"{c.speedup:.2f}x" if c.speedup is not None else "-"
+        result = "ok" if c.equivalent else f"diverges at {c.divergence}"
+        lines.append(
+            f"{c.case:<32} {c.backend:<12} {c.frames:>7} "
+            f"{c.seconds:>8.3f}s {speedup:>8}  {result}"
+        )
+    return "\n".join(lines)
@@ -46,3 +46,10 @@ def get_logger(
         logger.addHandler(file_handler)
 
     return logger
+
+
+def set_log_level(level: int) -> None:
+    """Set the level of every robo_sim logger created so far."""
+    for name, logger in logging.Logger.manager.loggerDict.items():
+        if name.startswith("robo_sim") and isinstance(logger, logging.Logger):
+            logger.setLevel(level)
@@ -0,0 +1,393 @@
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Upper bounds, in seconds, of the default latency histogram buckets.
+DEFAULT_BUCKETS = (
+    1e-5,
+    5e-5,
+    1e-4,
+    5e-4,
+    1e-3,
+    5e-3,
+    1e-2,
+    5e-2,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonically increasing total."""
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def state(self) -> Any:
+        return self.value
+
+    def merge(self, state: Any) -> None:
+        self.value += state
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        yield f"{name}_total{labels} {format_value(self.value)}"
+
+
+class Gauge:
+    """Value that can go up and down. Gauges of different processes are
+    summed when merged, so per-process rates merge into a total rate."""
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def state(self) -> Any:
+        return self.value
+
+    def merge(self, state: Any) -> None:
+        self.value += state
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        yield f"{name}{labels} {format_value(self.value)}"
+
+
+class Histogram:
+    """Counts of observations per bucket, along with their sum."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        # The last count is for observations above every bound.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def state(self) -> Any:
+        return {"counts": list(self.counts), "sum": self.sum}
+
+    def merge(self, state: Any) -> None:
+        if len(state["counts"]) != len(self.counts):
+            raise ValueError("Cannot merge histograms with different buckets.")
+        for i, count in enumerate(state["counts"]):
+            self.counts[i] += count
+        self.sum += state["sum"]
+
+    def samples(self, name: str, labels: str) -> Iterator[str]:
+        # Splice the bucket bound into the existing label set.
+        prefix = labels[:-1] + "," if labels else "{"
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            le = format_value(bound)
+            yield f'{name}_bucket{prefix}le="{le}"}} {total}'
+        yield f"{name}_count{labels} {total}"
+        yield f"{name}_sum{labels} {format_value(self.sum)}"
+
+
+metric_types: dict[str, type[Counter] | type[Gauge] | type[Histogram]] = {
+    "counter": Counter,
+    "gauge": Gauge,
+    "histogram": Histogram,
+}
+
+
+class MetricFamily:
+    """A named metric with one child per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] | None = None,
+    ) -> None:
+        if kind not in metric_types:
+            raise ValueError(f"Unknown metric type '{kind}'.")
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *values: Any) -> Any:
+        """The child for the given label values, created on first use."""
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"Metric '{self.name}' takes labels {self.labelnames}, "
+                    f"got {key}."
+                )
+            if self.kind == "histogram" and self.buckets is not None:
+                child = Histogram(self.buckets)
+            else:
+                child = metric_types[self.kind]()
+            self.children[key] = child
+        return child
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {escape(self.help)}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, child in list(self.children.items()):
+            yield from child.samples(
+                self.name, format_labels(self.labelnames, key)
+            )
+
+
+class MetricsRegistry:
+    """Per-process collection of metrics.
+
+    Updates are plain attribute arithmetic with no locking: each process
+    accumulates into its own registry, and registries of different
+    processes are combined through `snapshot` and `merge`. An exporter
+    thread only ever reads, so at worst it renders a histogram whose sum
+    lags its counts by one observation.
+    """
+
+    def __init__(self) -> None:
+        self.families: dict[str, MetricFamily] = {}
+
+    def _family(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] | None = None,
+    ) -> MetricFamily:
+        family = self.families.get(name)
+        if family is None:
+            family = MetricFamily(name, help, kind, labelnames, buckets)
+            self.families[name] = family
+        elif family.kind != kind or family.labelnames != labelnames:
+            raise ValueError(
+                f"Metric '{name}' is already registered as a {family.kind} "
+                f"with labels {family.labelnames}."
+            )
+        return family
+
+    def counter(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> MetricFamily:
+        return self._family(name, help, "counter", labelnames)
+
+    def gauge(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> MetricFamily:
+        return self._family(name, help, "gauge", labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> MetricFamily:
+        return self._family(name, help, "histogram", labelnames, buckets)
+
+    def render(self) -> str:
+        """The registry in the OpenMetrics text format."""
+        lines = []
+        for family in list(self.families.values()):
+            lines.extend(family.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable copy of every metric, for `merge`."""
+        return {
+            name: {
+                "help": family.help,
+                "kind": family.kind,
+                "labelnames": list(family.labelnames),
+                "buckets": family.buckets and list(family.buckets),
+                "children": [
+                    [list(key), child.state()]
+                    for key, child in list(family.children.items())
+                ],
+            }
+            for name, family in list(self.families.items())
+        }
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """Add the metrics of another registry's `snapshot` to this one."""
+        for name, data in snapshot.items():
+            buckets = data.get("buckets")
+            family = self._family(
+                name,
+                data["help"],
+                data["kind"],
+                tuple(data["labelnames"]),
+                tuple(buckets) if buckets else None,
+            )
+            for key, state in data["children"]:
+                family.labels(*key).merge(state)
+
+
+registry = MetricsRegistry()
+
+
+def write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def write_snapshot(directory: Path, reg: MetricsRegistry = registry) -> Path:
+    """Write this process's snapshot into `directory`, which may be shared
+    by many worker processes, each writing its own file."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"metrics-{os.getpid()}.json"
+    write_atomic(path, json.dumps(reg.snapshot()))
+    return path
+
+
+def aggregate_snapshots(directory: Path) -> MetricsRegistry:
+    """Merge every snapshot written by `write_snapshot` into `directory`."""
+    merged = MetricsRegistry()
+    for path in sorted(directory.glob("metrics-*.json")):
+        try:
+            merged.merge(json.loads(path.read_text()))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable metrics snapshot {path}: {e}")
+    return merged
+
+
+class MetricsExporter:
+    """Publishes a registry while a long run is in progress.
+
+    Parameters
+    ----------
+    path : Path | None, optional
+        OpenMetrics text file rewritten on every flush, by default None
+    port : int | None, optional
+        Serve the registry at ``http://127.0.0.1:<port>/metrics`` from a
+        background thread, by default None
+    snapshot_dir : Path | None, optional
+        Directory shared by worker processes, each flushing its snapshot
+        there for `aggregate_snapshots`, by default None
+    interval : float, optional
+        Minimum number of seconds between flushes, by default 10.0
+    reg : MetricsRegistry, optional
+        Registry to publish, by default the process-wide one
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        port: int | None = None,
+        snapshot_dir: Path | None = None,
+        interval: float = 10.0,
+        reg: MetricsRegistry = registry,
+    ) -> None:
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.interval = interval
+        self.registry = reg
+        self.last_flush = time.monotonic()
+        self.server: ThreadingHTTPServer | None = None
+        if port is not None:
+            self.server = ThreadingHTTPServer(
+                ("127.0.0.1", port), self._handler()
+            )
+            threading.Thread(
+                target=self.server.serve_forever, daemon=True
+            ).start()
+            logger.info(
+                f"Serving metrics at http://127.0.0.1:"
+                f"{self.server.server_address[1]}/metrics."
+            )
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        reg = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = reg.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def maybe_flush(self) -> None:
+        """Flush if `interval` seconds have passed since the last flush."""
+        if time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self.last_flush = time.monotonic()
+        if self.path is not None:
+            write_atomic(self.path, self.registry.render())
+        if self.snapshot_dir is not None:
+            write_snapshot(self.snapshot_dir, self.registry)
+
+    def close(self) -> None:
+        self.flush()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,316 @@
+import json
+import logging
+import random
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from . import accel
+from .algorithms import AlgorithmFactory
+from .components import Env, EpisodeAggregator
+from .components.summarizer import SimStats
+from .config import (
+    AlgorithmConfig,
+    EnvConfig,
+    RobotConfig,
+    build_algorithm_config,
+    build_env_config,
+    build_robot_config,
+    read_yaml_config,
+)
+from .config.config_factory import get_algorithm_config_classes
+from .logging import get_logger, set_log_level
+from .results import EpisodeResult, ResultsStore, config_hash
+from .sim import Sim, build_env
+
+logger = get_logger(__name__)
+
+# Environments kept per worker, least recently used evicted first.
+MAX_CACHED_ENVS = 16
+
+
+@dataclass
+class Episode:
+    """One simulation run, as config files plus per-episode overrides.
+
+    The overrides are merged over the top-level keys of the corresponding
+    YAML file, so only the delta from a shared config crosses to workers.
+    """
+
+    env: Path
+    robot: Path
+    algorithm: Path
+    env_overrides: dict[str, Any] = field(default_factory=dict)
+    robot_overrides: dict[str, Any] = field(default_factory=dict)
+    algorithm_overrides: dict[str, Any] = field(default_factory=dict)
+    # Seeds the obstacles of randomly generated maps.
+    seed: int | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form of the episode."""
+        data = asdict(self)
+        for key in ("env", "robot", "algorithm"):
+            data[key] = str(data[key])
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Episode":
+        data = dict(data)
+        for key in ("env", "robot", "algorithm"):
+            data[key] = Path(data[key])
+        return cls(**data)
+
+
+class WorkerState:
+    """Parsed configs and built environments cached by one worker."""
+
+    def __init__(self, max_envs: int = MAX_CACHED_ENVS) -> None:
+        self.max_envs = max_envs
+        self.raw: dict[Path, dict[str, Any]] = {}
+        self.configs: dict[tuple, Any] = {}
+        self.envs: OrderedDict[tuple, Env] = OrderedDict()
+        self.algorithm_configs = get_algorithm_config_classes()
+
+    def read(self, path: Path) -> dict[str, Any]:
+        if path not in self.raw:
+            self.raw[path] = read_yaml_config(path) or {}
+        return self.raw[path]
+
+    def config(
+        self, kind: str, path: Path, overrides: dict[str, Any]
+    ) -> EnvConfig | RobotConfig | AlgorithmConfig:
+        key = (kind, path, json.dumps(overrides, sort_keys=True, default=str))
+        config = self.configs.get(key)
+        if config is None:
+            data = {**self.read(path), **overrides}
+            if kind == "env":
+                config = build_env_config(data)
+            elif kind == "robot":
+                config = build_robot_config(data)
+            else:
+                config = build_algorithm_config(data, self.algorithm_configs)
+            self.configs[key] = config
+        return config
+
+    def env(self, key: tuple, env_config: EnvConfig, seed: int | None) -> Env:
+        """The cached environment for `key`, built on first use."""
+        env = self.envs.get(key)
+        if env is not None:
+            self.envs.move_to_end(key)
+            return env
+        # A generator of its own, so the map depends only on the seed and
+        # in-process runs leave the caller's global `random` state alone.
+        rng = random.Random(seed) if seed is not None else None
+        env = build_env(env_config, rng)
+        self.envs[key] = env
+        if len(self.envs) > self.max_envs:
+            self.envs.popitem(last=False)
+        return env
+
+    def episode_configs(
+        self, episode: Episode
+    ) -> tuple[EnvConfig, RobotConfig, AlgorithmConfig]:
+        """Environment, robot and algorithm configs of `episode`."""
+        return (
+            self.config("env", episode.env, episode.env_overrides),
+            self.config("robot", episode.robot, episode.robot_overrides),
+            self.config(
+                "algorithm", episode.algorithm, episode.algorithm_overrides
+            ),
+        )
+
+    def run(self, episode: Episode) -> SimStats:
+        env_config, robot_config, algorithm_config = self.episode_configs(
+            episode
+        )
+        # Random maps differ per seed; every other map is shared.
+        random_map = isinstance(env_config.obstacles, int)
+        env_key = (
+            episode.env,
+            json.dumps(episode.env_overrides, sort_keys=True, default=str),
+            episode.seed if random_map else None,
+        )
+        sim = Sim.from_configs(
+            env_config,
+            robot_config,
+            algorithm_config,
+            env=self.env(env_key, env_config, episode.seed),
+            headless=True,
+        )
+        sim.run()
+        return sim.summarizer.stats
+
+
+_state: WorkerState | None = None
+
+
+def _prepare_worker(algorithms: list[str]) -> WorkerState:
+    AlgorithmFactory.preload(algorithms)
+    accel.warmup()
+    return WorkerState()
+
+
+def _init_worker(log_level: int, algorithms: list[str]) -> None:
+    global _state
+    # Only worker processes change logging, which they do not share with
+    # the caller.
+    set_log_level(log_level)
+    _state = _prepare_worker(algorithms)
+
+
+def _run_batch(episodes: list[Episode]) -> list[SimStats]:
+    assert _state is not None
+    return [_state.run(episode) for episode in episodes]
+
+
+class EpisodeRunner(ABC):
+    """Runs batches of episodes and reports their stats.
+
+    Subclasses decide where episodes run by implementing `run`; summaries
+    and resumable sweeps build on it. Use as a context manager, or call
+    `close` when done.
+    """
+
+    # Parses configs in this process to key episodes for `sweep`.
+    parser: WorkerState | None = None
+
+    @abstractmethod
+    def run(
+        self, episodes: Iterable[Episode], batch_size: int = 8
+    ) -> Iterator[SimStats]:
+        """Run episodes, yielding their stats in order."""
+        raise NotImplementedError()
+
+    def aggregate(
+        self, episodes: Iterable[Episode], batch_size: int = 8
+    ) -> EpisodeAggregator:
+        """Run episodes and fold their stats into one summary."""
+        aggregator = EpisodeAggregator()
+        for stats in self.run(episodes, batch_size):
+            aggregator.add(stats)
+        return aggregator
+
+    def sweep(
+        self,
+        episodes: Iterable[Episode],
+        store: ResultsStore,
+        batch_size: int = 8,
+    ) -> int:
+        """Run the episodes whose results are not in `store` yet and store
+        their results.
+
+        Episodes are keyed by the hash of their parsed configs and their
+        seed, so a sweep restarted after a crash, or extended with more
+        episodes, only runs the missing ones.
+
+        Returns
+        -------
+        int
+            Number of episodes run.
+        """
+        if self.parser is None:
+            self.parser = WorkerState()
+        done = store.completed()
+        todo = []
+        for episode in episodes:
+            configs = self.parser.episode_configs(episode)
+            key = config_hash(*configs)
+            if (key, episode.seed) in done:
+                continue
+            done.add((key, episode.seed))
+            todo.append((episode, key, configs[2].name))
+        logger.info(
+            f"Running {len(todo)} episodes, the rest are already stored."
+        )
+        results = self.run([episode for episode, _, _ in todo], batch_size)
+        try:
+            for (episode, key, algorithm), stats in zip(todo, results):
+                store.add(
+                    EpisodeResult(
+                        config_hash=key,
+                        seed=episode.seed,
+                        scenario=str(episode.env),
+                        algorithm=algorithm,
+                        stats=stats,
+                        params={
+                            "env": episode.env_overrides,
+                            "robot": episode.robot_overrides,
+                            "algorithm": episode.algorithm_overrides,
+                        },
+                    )
+                )
+        finally:
+            # Keep what finished even if the sweep is interrupted.
+            store.flush()
+        return len(todo)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "EpisodeRunner":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class WarmPool(EpisodeRunner):
+    """Long-lived worker processes that run many episodes.
+
+    Each worker imports the algorithm modules and prepares the compiled
+    kernels of `robo_sim.accel` once at startup, then caches parsed configs
+    and built environments across episodes, so an episode only costs
+    creating a robot and an algorithm and running them. Use as a context
+    manager, or call `close` when done.
+
+    Parameters
+    ----------
+    workers : int | None, optional
+        Number of worker processes; episodes run in-process if 1, by
+        default one per CPU
+    log_level : int, optional
+        Level of the robo_sim loggers in worker processes, by default
+        ``logging.WARNING`` since per-episode logging dominates the cost
+        of short episodes. In-process runs leave the caller's logging
+        alone.
+    """
+
+    def __init__(
+        self, workers: int | None = None, log_level: int = logging.WARNING
+    ) -> None:
+        self.log_level = log_level
+        self.algorithms = list(get_algorithm_config_classes())
+        self.state: WorkerState | None = None
+        self.executor: ProcessPoolExecutor | None = None
+        if workers != 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(log_level, self.algorithms),
+            )
+
+    def run(
+        self, episodes: Iterable[Episode], batch_size: int = 8
+    ) -> Iterator[SimStats]:
+        """Run episodes, yielding their stats in order."""
+        episodes = list(episodes)
+        if self.executor is None:
+            if self.state is None:
+                self.state = _prepare_worker(self.algorithms)
+            for episode in episodes:
+                yield self.state.run(episode)
+            return
+        batches = []
+        for start in range(0, len(episodes), batch_size):
+            stop = start + batch_size
+            batches.append(episodes[start:stop])
+        for results in self.executor.map(_run_batch, batches):
+            yield from results
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
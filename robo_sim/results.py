@@ -0,0 +1,241 @@
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from .cache import artifact_key
+from .components import EpisodeAggregator
+from .components.summarizer import SimStats
+from .config import AlgorithmConfig, EnvConfig, RobotConfig
+from .logging import get_logger
+from .utils import Position
+
+logger = get_logger(__name__)
+
+STATS_COLUMNS = (
+    "execution_time",
+    "steps_taken",
+    "total_displacement",
+    "sensor_readings_count",
+    "path_length",
+    "reached",
+)
+COLUMNS = (
+    "config_hash",
+    "seed",
+    "scenario",
+    "algorithm",
+    "params",
+    *STATS_COLUMNS,
+    "finished_at",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    config_hash TEXT NOT NULL,
+    seed INTEGER,
+    scenario TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    params TEXT NOT NULL,
+    execution_time REAL NOT NULL,
+    steps_taken INTEGER NOT NULL,
+    total_displacement REAL NOT NULL,
+    sensor_readings_count INTEGER,
+    path_length REAL NOT NULL,
+    reached INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS episodes_key
+    ON episodes (config_hash, IFNULL(seed, ''));
+CREATE INDEX IF NOT EXISTS episodes_scenario ON episodes (scenario);
+CREATE INDEX IF NOT EXISTS episodes_params ON episodes (algorithm, params);
+"""
+
+
+def config_hash(
+    env_config: EnvConfig,
+    robot_config: RobotConfig,
+    algorithm_config: AlgorithmConfig,
+) -> str:
+    """Stable hash of the full configuration of an episode.
+
+    Configs are hashed after parsing, so episodes that spell the same
+    settings differently, or in different files, share a hash.
+    """
+    return artifact_key(
+        "episode",
+        env=_canonical(env_config.model_dump()),
+        robot=_canonical(robot_config.model_dump()),
+        algorithm=_canonical(algorithm_config.model_dump()),
+    )
+
+
+def _canonical(value: Any) -> Any:
+    # JSON-ready form of a dumped config in which equal configs are equal,
+    # whatever the order of their sets.
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, Position):
+        return [value.x, value.y]
+    if isinstance(value, (set, frozenset)):
+        items = [_canonical(v) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, default=str))
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+@dataclass
+class EpisodeResult:
+    """Stats of one finished episode with what identifies it in a sweep."""
+
+    config_hash: str
+    seed: int | None
+    # Environment config the episode ran on.
+    scenario: str
+    algorithm: str
+    stats: SimStats
+    # Per-episode overrides, by config kind.
+    params: dict[str, Any] = field(default_factory=dict)
+    finished_at: float = field(default_factory=time.time)
+
+
+class ResultsStore:
+    """SQLite database of episode results, for sweeps over many runs.
+
+    Results are buffered and written `batch_size` at a time, each batch in
+    one transaction, so a crash loses at most the episodes of the batch in
+    progress. Every (config hash, seed) pair is stored once, and `completed`
+    lists the stored pairs so that a restarted sweep can skip them.
+    Scenario, algorithm and parameters are indexed, and `params` is stored
+    as JSON that SQLite's ``json_extract`` can query.
+
+    Use as a context manager, or call `close` when done.
+
+    Parameters
+    ----------
+    path : Path
+        Database file, created if missing.
+    batch_size : int, optional
+        Number of results written per transaction, by default 64
+    """
+
+    def __init__(self, path: Path, batch_size: int = 64) -> None:
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1.")
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(self.path)
+        # Lets readers query the store while a sweep writes to it.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.pending: list[EpisodeResult] = []
+
+    def completed(self) -> set[tuple[str, int | None]]:
+        """(config hash, seed) pairs of every stored or queued episode."""
+        done = set(self.conn.execute("SELECT config_hash, seed FROM episodes"))
+        done.update((r.config_hash, r.seed) for r in self.pending)
+        return done
+
+    def add(self, result: EpisodeResult) -> None:
+        """Queue `result`, writing the queue once it holds a batch.
+
+        A result for a pair that is already stored replaces it.
+        """
+        self.pending.append(result)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every queued result in one transaction."""
+        if not self.pending:
+            return
+        rows = [
+            (
+                result.config_hash,
+                result.seed,
+                result.scenario,
+                result.algorithm,
+                json.dumps(result.params, sort_keys=True, default=str),
+                *(getattr(result.stats, column) for column in STATS_COLUMNS),
+                result.finished_at,
+            )
+            for result in self.pending
+        ]
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO episodes ({', '.join(COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                rows,
+            )
+        logger.debug(f"Stored {len(rows)} results in {self.path}.")
+        self.pending.clear()
+
+    def results(
+        self,
+        scenario: str | None = None,
+        algorithm: str | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> Iterator[EpisodeResult]:
+        """Stored results, optionally only those matching `scenario`,
+        `algorithm` and every entry of `params`.
+
+        Keys of `params` are dotted paths into the stored overrides, such as
+        ``"algorithm.num_samples"``.
+        """
+        self.flush()
+        where, args = [], []
+        if scenario is not None:
+            where.append("scenario = ?")
+            args.append(scenario)
+        if algorithm is not None:
+            where.append("algorithm = ?")
+            args.append(algorithm)
+        for key, value in (params or {}).items():
+            where.append("json_extract(params, ?) = ?")
+            args.extend((f"$.{key}", value))
+        query = f"SELECT {', '.join(COLUMNS)} FROM episodes"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        for row in self.conn.execute(query, args):
+            values = dict(zip(STATS_COLUMNS, row[5:-1]))
+            values["reached"] = bool(values["reached"])
+            yield EpisodeResult(
+                config_hash=row[0],
+                seed=row[1],
+                scenario=row[2],
+                algorithm=row[3],
+                stats=SimStats(**values),
+                params=json.loads(row[4]),
+                finished_at=row[-1],
+            )
+
+    def aggregate(
+        self,
+        scenario: str | None = None,
+        algorithm: str | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> EpisodeAggregator:
+        """Summary of the stored results selected as in `results`."""
+        aggregator = EpisodeAggregator()
+        for result in self.results(scenario, algorithm, params):
+            aggregator.add(result.stats)
+        return aggregator
+
+    def __len__(self) -> int:
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,21 @@
+from .connectivity import (
+    ensure_connected,
+    flood_fill,
+    is_connected,
+    label_components,
+)
+from .generators import generator_registry, get_generator
+from .suite import Scenario, ScenarioSuite, generate_scenario, generate_suite
+
+__all__ = [
+    "Scenario",
+    "ScenarioSuite",
+    "ensure_connected",
+    "flood_fill",
+    "generate_scenario",
+    "generate_suite",
+    "generator_registry",
+    "get_generator",
+    "is_connected",
+    "label_components",
+]
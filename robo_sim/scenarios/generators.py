@@ -0,0 +1,199 @@
+from typing import Callable
+
+import numpy as np
+
+from ..config import ScenarioConfig
+
+Generator = Callable[[ScenarioConfig, np.random.Generator], np.ndarray]
+
+
+def _shape(config: ScenarioConfig) -> tuple[int, int]:
+    width, height = config.size
+    return height, width
+
+
+def _maze_cells(config: ScenarioConfig) -> tuple[int, int]:
+    """Rows and columns of maze cells that fit the grid, with a wall around
+    and between them."""
+    rows, cols = _shape(config)
+    width = config.corridor_width
+    return (
+        max(1, (rows // width - 1) // 2),
+        max(1, (cols // width - 1) // 2),
+    )
+
+
+def maze_endpoints(
+    config: ScenarioConfig,
+) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Grid cells at the outer corners of the first and last maze cells,
+    which are always carved, unlike (1, 1) and (width - 2, height - 2)
+    where the maze does not fill the grid exactly."""
+    cells_y, cells_x = _maze_cells(config)
+    width = config.corridor_width
+    return (width, width), (2 * cells_x * width - 1, 2 * cells_y * width - 1)
+
+
+def generate_uniform(
+    config: ScenarioConfig, rng: np.random.Generator
+) -> np.ndarray:
+    """Independently occupied cells, like `Env.generate_random_obstacles`."""
+    return rng.random(_shape(config)) < config.density
+
+
+def generate_maze(
+    config: ScenarioConfig, rng: np.random.Generator
+) -> np.ndarray:
+    """Perfect maze built with the binary-tree algorithm.
+
+    Every maze cell carves a passage either north or east, chosen for all
+    cells at once, which yields a spanning tree without a sequential walk.
+    Passages are then scaled up to `corridor_width` cells.
+    """
+    rows, cols = _shape(config)
+    width = config.corridor_width
+    cells_y, cells_x = _maze_cells(config)
+
+    maze = np.ones((2 * cells_y + 1, 2 * cells_x + 1), dtype=bool)
+    maze[1::2, 1::2] = False
+
+    carve_north = rng.random((cells_y, cells_x)) < 0.5
+    # The top row can only carve east and the east column only north.
+    carve_north[-1, :] = False
+    carve_north[:, -1] = True
+    carve_north[-1, -1] = False
+    cy, cx = np.nonzero(carve_north)
+    maze[2 * cy + 2, 2 * cx + 1] = False
+    cy, cx = np.nonzero(~carve_north)
+    east = cx < cells_x - 1
+    maze[2 * cy[east] + 1, 2 * cx[east] + 2] = False
+
+    maze = np.repeat(np.repeat(maze, width, axis=0), width, axis=1)
+    grid = np.ones((rows, cols), dtype=bool)
+    grid[: maze.shape[0], : maze.shape[1]] = maze[:rows, :cols]
+    return grid
+
+
+def generate_rooms(
+    config: ScenarioConfig, rng: np.random.Generator
+) -> np.ndarray:
+    """Grid of rooms separated by walls with one door per wall segment,
+    cluttered inside at `density`."""
+    rows, cols = _shape(config)
+    size = config.room_size
+    grid = rng.random((rows, cols)) < config.density
+
+    walls = np.zeros((rows, cols), dtype=bool)
+    walls[::size, :] = True
+    walls[:, ::size] = True
+    walls[-1, :] = True
+    walls[:, -1] = True
+    grid |= walls
+
+    # One door in every wall segment between two neighbouring rooms.
+    wall_rows = np.arange(size, rows - 1, size)
+    seg_starts = np.arange(0, cols - 1, size)
+    if len(wall_rows) and len(seg_starts):
+        r, c = np.meshgrid(wall_rows, seg_starts, indexing="ij")
+        seg_len = np.minimum(size, cols - 1 - c) - 1
+        doors = c + 1 + (rng.random(c.shape) * np.maximum(seg_len, 1))
+        grid[r.ravel(), doors.astype(int).ravel()] = False
+    wall_cols = np.arange(size, cols - 1, size)
+    seg_starts = np.arange(0, rows - 1, size)
+    if len(wall_cols) and len(seg_starts):
+        c, r = np.meshgrid(wall_cols, seg_starts, indexing="ij")
+        seg_len = np.minimum(size, rows - 1 - r) - 1
+        doors = r + 1 + (rng.random(r.shape) * np.maximum(seg_len, 1))
+        grid[doors.astype(int).ravel(), c.ravel()] = False
+    return grid
+
+
+def generate_corridors(
+    config: ScenarioConfig, rng: np.random.Generator
+) -> np.ndarray:
+    """Solid block crossed by random full-length horizontal and vertical
+    corridors."""
+    rows, cols = _shape(config)
+    width = config.corridor_width
+    goal = (1.0 - config.density) * rows * cols
+    carved_rows = np.zeros(rows, dtype=bool)
+    carved_cols = np.zeros(cols, dtype=bool)
+
+    # Alternate horizontal and vertical corridors, at least one of each,
+    # until (1 - density) of the area is carved.
+    horizontal = True
+    while True:
+        free_rows, free_cols = carved_rows.sum(), carved_cols.sum()
+        carved = free_rows * cols + free_cols * rows - free_rows * free_cols
+        if carved >= goal and free_rows and free_cols:
+            break
+        if horizontal:
+            y = int(rng.integers(0, max(1, rows - width + 1)))
+            end = y + width
+            carved_rows[y:end] = True
+        else:
+            x = int(rng.integers(0, max(1, cols - width + 1)))
+            end = x + width
+            carved_cols[x:end] = True
+        horizontal = not horizontal
+
+    grid = np.ones((rows, cols), dtype=bool)
+    grid[carved_rows, :] = False
+    grid[:, carved_cols] = False
+    return grid
+
+
+def perlin_noise(
+    shape: tuple[int, int], scale: int, rng: np.random.Generator
+) -> np.ndarray:
+    """2D gradient noise in roughly [-1, 1], evaluated for all cells at
+    once."""
+    rows, cols = shape
+    lattice_y = rows // scale + 2
+    lattice_x = cols // scale + 2
+    angles = rng.random((lattice_y, lattice_x)) * 2 * np.pi
+    gradients = np.stack((np.cos(angles), np.sin(angles)), axis=-1)
+
+    y = np.arange(rows) / scale
+    x = np.arange(cols) / scale
+    y0 = y.astype(int)[:, None]
+    x0 = x.astype(int)[None, :]
+    fy = (y - y.astype(int))[:, None]
+    fx = (x - x.astype(int))[None, :]
+
+    def corner(dy: int, dx: int) -> np.ndarray:
+        g = gradients[y0 + dy, x0 + dx]
+        return g[..., 0] * (fx - dx) + g[..., 1] * (fy - dy)
+
+    def fade(t: np.ndarray) -> np.ndarray:
+        return t * t * t * (t * (t * 6 - 15) + 10)
+
+    u, v = fade(fx), fade(fy)
+    top = corner(0, 0) + u * (corner(0, 1) - corner(0, 0))
+    bottom = corner(1, 0) + u * (corner(1, 1) - corner(1, 0))
+    return np.sqrt(2) * (top + v * (bottom - top))
+
+
+def generate_perlin(
+    config: ScenarioConfig, rng: np.random.Generator
+) -> np.ndarray:
+    """Organic blobs from thresholding Perlin noise at the density
+    quantile."""
+    noise = perlin_noise(_shape(config), config.noise_scale, rng)
+    threshold = np.quantile(noise, 1.0 - config.density)
+    return noise > threshold
+
+
+generator_registry: dict[str, Generator] = {
+    "uniform": generate_uniform,
+    "maze": generate_maze,
+    "rooms": generate_rooms,
+    "corridors": generate_corridors,
+    "perlin": generate_perlin,
+}
+
+
+def get_generator(kind: str) -> Generator:
+    if kind not in generator_registry:
+        raise ValueError(f"Unknown scenario kind '{kind}'.")
+    return generator_registry[kind]
@@ -0,0 +1,190 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ..components import Env
+from ..config import ScenarioConfig
+from ..logging import get_logger
+from ..utils import Position
+from .connectivity import ensure_connected
+from .generators import generator_registry, get_generator, maze_endpoints
+
+logger = get_logger(__name__)
+
+KINDS = list(generator_registry)
+
+
+@dataclass
+class Scenario:
+    """A single generated map, with `grid[y, x]` True where occupied."""
+
+    kind: str
+    seed: int
+    grid: np.ndarray
+    start: tuple[int, int]
+    target: tuple[int, int]
+
+    @property
+    def size(self) -> tuple[int, int]:
+        rows, cols = self.grid.shape
+        return cols, rows
+
+    def obstacle_positions(self) -> set[Position]:
+        ys, xs = np.nonzero(self.grid)
+        return {Position(int(x), int(y)) for x, y in zip(xs, ys)}
+
+    def to_env(self) -> Env:
+        env = Env(size=self.size, obstacles=self.obstacle_positions())
+        env.set_target(Position(*self.target))
+        return env
+
+
+def endpoints(
+    config: ScenarioConfig,
+) -> tuple[tuple[int, int], tuple[int, int]]:
+    width, height = config.size
+    if config.kind == "maze":
+        start, target = maze_endpoints(config)
+    else:
+        start, target = (1, 1), (width - 2, height - 2)
+    return config.start_pos or start, config.target_pos or target
+
+
+def generate_scenario(config: ScenarioConfig, seed: int) -> Scenario:
+    """Generate one map and guarantee its start and target are connected."""
+    rng = np.random.default_rng(seed)
+    grid = get_generator(config.kind)(config, rng)
+    start, target = endpoints(config)
+    ensure_connected(grid, start, target)
+    return Scenario(config.kind, seed, grid, start, target)
+
+
+def _generate_batch(config: ScenarioConfig, seeds: list[int]) -> np.ndarray:
+    """Worker entry point; returns bit-packed grids to keep IPC small."""
+    grids = [generate_scenario(config, seed).grid.ravel() for seed in seeds]
+    return np.packbits(np.stack(grids), axis=1)
+
+
+class ScenarioSuite:
+    """A batch of equally sized maps stored as bit-packed occupancy grids.
+
+    Suites are saved as a single compressed ``.npz`` file, at one bit per
+    cell before compression.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, int],
+        packed: np.ndarray,
+        kinds: np.ndarray,
+        seeds: np.ndarray,
+        starts: np.ndarray,
+        targets: np.ndarray,
+    ) -> None:
+        self.shape = shape
+        self.packed = packed
+        self.kinds = kinds
+        self.seeds = seeds
+        self.starts = starts
+        self.targets = targets
+
+    def __len__(self) -> int:
+        return len(self.packed)
+
+    def __getitem__(self, idx: int) -> Scenario:
+        rows, cols = self.shape
+        grid = np.unpackbits(self.packed[idx], count=rows * cols)
+        return Scenario(
+            kind=KINDS[self.kinds[idx]],
+            seed=int(self.seeds[idx]),
+            grid=grid.reshape(rows, cols).astype(bool),
+            start=tuple(int(v) for v in self.starts[idx]),
+            target=tuple(int(v) for v in self.targets[idx]),
+        )
+
+    def save(self, path: Path) -> None:
+        np.savez_compressed(
+            path,
+            shape=np.array(self.shape),
+            packed=self.packed,
+            kinds=self.kinds,
+            seeds=self.seeds,
+            starts=self.starts,
+            targets=self.targets,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "ScenarioSuite":
+        with np.load(path) as data:
+            return cls(
+                shape=tuple(int(v) for v in data["shape"]),
+                packed=data["packed"],
+                kinds=data["kinds"],
+                seeds=data["seeds"],
+                starts=data["starts"],
+                targets=data["targets"],
+            )
+
+
+def generate_suite(
+    config: ScenarioConfig,
+    count: int,
+    workers: int | None = None,
+    batch_size: int = 64,
+) -> ScenarioSuite:
+    """Generate `count` maps in parallel across processes.
+
+    Map ``i`` is generated from seed ``config.seed + i``, so a suite is
+    reproducible regardless of the number of workers.
+
+    Parameters
+    ----------
+    config : ScenarioConfig
+        Generator settings shared by all maps.
+    count : int
+        Number of maps to generate.
+    workers : int | None, optional
+        Number of worker processes; generation runs in-process if 1, by
+        default one per CPU
+    batch_size : int, optional
+        Maps generated per task, by default 64
+
+    Returns
+    -------
+    ScenarioSuite
+        The generated maps.
+    """
+    end = config.seed + count
+    seeds = list(range(config.seed, end))
+    batches = [
+        list(range(first, min(first + batch_size, end)))
+        for first in range(config.seed, end, batch_size)
+    ]
+    start_time = time.perf_counter()
+    if workers == 1:
+        packed = [_generate_batch(config, batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            packed = list(
+                pool.map(_generate_batch, [config] * len(batches), batches)
+            )
+    elapsed = time.perf_counter() - start_time
+
+    width, height = config.size
+    start, target = endpoints(config)
+    suite = ScenarioSuite(
+        shape=(height, width),
+        packed=np.concatenate(packed) if packed else np.empty((0, 0), "u1"),
+        kinds=np.full(count, KINDS.index(config.kind), dtype=np.uint8),
+        seeds=np.array(seeds, dtype=np.int64),
+        starts=np.tile(np.array(start, dtype=np.int32), (count, 1)),
+        targets=np.tile(np.array(target, dtype=np.int32), (count, 1)),
+    )
+    logger.info(
+        f"Generated {count} {config.kind} maps in {elapsed:.2f}s "
+        f"({count / max(elapsed, 1e-9):.1f} maps/s)."
+    )
+    return suite
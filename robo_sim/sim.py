@@ -1,16 +1,103 @@
+import random
+import time
 from pathlib import Path
+from typing import Any
 
 import numpy as np
 
-from robo_sim.components import Env, Renderer, Summarizer, get_robot
+from robo_sim.components import (
+    Env,
+    Renderer,
+    SensorRobot,
+    Summarizer,
+    TiledWorld,
+    get_robot,
+)
+from robo_sim.components.costmap import Costmap
+from robo_sim.components.motion import get_motion_model
+from robo_sim.components.recorder import FrameRecorder, get_frame_writer
+from robo_sim.components.sensors import BasicProximitySensor
+from robo_sim.components.stepping import StepController
+from robo_sim.components.trajectory import FrameState, TrajectoryWriter
 
 from .algorithms import AlgorithmFactory
-from .config import ConfigFactory
+from .config import AlgorithmConfig, ConfigFactory, EnvConfig, RobotConfig
+from .geometry import Shape, shape_from_dict
 from .logging import get_logger
-from .utils import Position
+from .metrics import MetricsExporter, registry
+from .utils import Position, euclidean_distance
 
 logger = get_logger(__name__)
 
+STEPS = registry.counter("robo_sim_steps", "Simulation steps taken.").labels()
+STEP_SECONDS = registry.histogram(
+    "robo_sim_step_seconds", "Wall-clock time per simulation step."
+).labels()
+STEPS_PER_SECOND = registry.gauge(
+    "robo_sim_steps_per_second", "Step rate of the current episode."
+).labels()
+EPISODES = registry.counter(
+    "robo_sim_episodes", "Finished episodes by outcome.", ("outcome",)
+)
+
+
+def env_obstacles(
+    env_config: EnvConfig,
+) -> int | set[Position] | list[tuple[Position, Shape | None]]:
+    """Translate configured obstacles into the form `Env` accepts."""
+    obstacles = env_config.obstacles
+    if isinstance(obstacles, list):
+        return [
+            (obstacle.pos, shape_from_dict(obstacle.model_dump()))
+            for obstacle in obstacles
+        ]
+    return obstacles
+
+
+def build_env(env_config: EnvConfig, rng: random.Random | None = None) -> Env:
+    """Build the environment described by `env_config`, placing random
+    obstacles with `rng`, by default the `random` module."""
+    world = None
+    if env_config.world is not None:
+        world = TiledWorld(
+            env_config.world.path,
+            max_tiles=env_config.world.cache_tiles,
+            prefetch_radius=env_config.world.prefetch_radius,
+        )
+    env = Env(
+        size=env_config.size,
+        obstacles=env_obstacles(env_config),
+        world=world,
+        quadtree=env_config.quadtree,
+        rng=rng,
+    )
+    for obstacle in env_config.dynamic_obstacles:
+        env.add_dynamic_obstacle(
+            obstacle.pos,
+            get_motion_model(obstacle),
+            shape_from_dict(obstacle.model_dump()),
+        )
+    if env_config.costmap is not None:
+        env.costmap = Costmap.from_config(env, env_config.costmap)
+    return env
+
+
+def reset_env(env: Env, env_config: EnvConfig) -> None:
+    """Return an environment built by `build_env` to its initial state, so
+    it can be reused for another episode.
+
+    Dynamic obstacles move back to their configured positions with fresh
+    motion models; static geometry and every cache built from it are kept.
+    """
+    for obj, obstacle in zip(
+        env.dynamic_obstacles, env_config.dynamic_obstacles
+    ):
+        if (obj.pos.x, obj.pos.y) != (obstacle.pos.x, obstacle.pos.y):
+            env.move_obstacle(obj, obstacle.pos)
+        obj.motion = get_motion_model(obstacle)
+    if env.costmap is not None:
+        env.costmap.clear_sensor_layer()
+
 
 class Sim:
     def __init__(
@@ -18,17 +105,73 @@ class Sim:
         env_config_path: Path,
         robot_config_path: Path,
         algorithm_config_path: Path,
+        record_path: Path | None = None,
+        fps: int = 10,
+        trajectory_path: Path | None = None,
+        headless: bool = False,
+        metrics: MetricsExporter | None = None,
     ) -> None:
-        logger.debug("Initializing simulation...")
         config_factory = ConfigFactory(
             env_config_path, robot_config_path, algorithm_config_path
         )
-        self.env_config = config_factory.load_env_config()
-        self.robot_config = config_factory.load_robot_config()
-        self.algorithm_config = config_factory.load_algorithm_config()
-        self.env = Env(
-            size=self.env_config.size, obstacles=self.env_config.obstacles
+        self.setup(
+            config_factory.load_env_config(),
+            config_factory.load_robot_config(),
+            config_factory.load_algorithm_config(),
+            record_path=record_path,
+            fps=fps,
+            trajectory_path=trajectory_path,
+            headless=headless,
+            metrics=metrics,
         )
+
+    @classmethod
+    def from_configs(
+        cls,
+        env_config: EnvConfig,
+        robot_config: RobotConfig,
+        algorithm_config: AlgorithmConfig,
+        env: Env | None = None,
+        **options: Any,
+    ) -> "Sim":
+        """Create a simulation from already parsed configs.
+
+        Parameters
+        ----------
+        env_config, robot_config, algorithm_config
+            Parsed configs.
+        env : Env | None, optional
+            Environment built by `build_env` from `env_config` for an
+            earlier episode, which is reset and reused instead of being
+            built again, by default None
+        **options
+            Keyword arguments of `Sim`, such as `headless`.
+        """
+        sim = cls.__new__(cls)
+        sim.setup(env_config, robot_config, algorithm_config, env, **options)
+        return sim
+
+    def setup(
+        self,
+        env_config: EnvConfig,
+        robot_config: RobotConfig,
+        algorithm_config: AlgorithmConfig,
+        env: Env | None = None,
+        record_path: Path | None = None,
+        fps: int = 10,
+        trajectory_path: Path | None = None,
+        headless: bool = False,
+        metrics: MetricsExporter | None = None,
+    ) -> None:
+        logger.debug("Initializing simulation...")
+        self.env_config = env_config
+        self.robot_config = robot_config
+        self.algorithm_config = algorithm_config
+        if env is None:
+            self.env = build_env(env_config)
+        else:
+            reset_env(env, env_config)
+            self.env = env
         self.robot = get_robot(self.robot_config).create()
         self.target = self.env_config.target_pos
         self.start = self.robot_config.start_pos
@@ -41,11 +184,34 @@ class Sim:
             target=self.env.target,
             params=self.algorithm_config,
         )
-        self.renderer = Renderer(
-            self.env,
-            trace_path=self.env_config.trace_path,
-        )
+        self.renderer: Renderer | None = None
+        if not headless or record_path is not None:
+            recorder = None
+            if record_path is not None:
+                recorder = FrameRecorder(get_frame_writer(record_path, fps))
+            self.renderer = Renderer(
+                self.env,
+                trace_path=self.env_config.trace_path,
+                recorder=recorder,
+                large_map=self.env_config.large_map,
+            )
+        self.trajectory: TrajectoryWriter | None = None
+        if trajectory_path is not None:
+            sensor = getattr(self.robot, "sensor", None)
+            sensor_angles = None
+            if isinstance(sensor, BasicProximitySensor):
+                sensor_angles = sensor.angles
+            self.trajectory = TrajectoryWriter(
+                trajectory_path,
+                self.env,
+                robot_radius=self.robot.radius,
+                sensor_angles=sensor_angles,
+            )
         self.summarizer = Summarizer(self, self.robot, self.env)
+        self.metrics = metrics
+        self.stepper: StepController | None = None
+        if env_config.adaptive_step is not None:
+            self.stepper = StepController.from_config(env_config.adaptive_step)
 
         self.path: list[Position] = []
         self.step_idx = 0
@@ -54,24 +220,77 @@ class Sim:
 
     def run(self) -> None:
         self.summarizer.start()
+        run_start = time.perf_counter()
+        dt = 1
         while not self.reached and self.step_idx < self.env_config.max_frames:
-            next_pos, next_angle = self.algorithm.step()
-            if next_pos is None:
-                logger.error("No more moves possible or target reached.")
-                break
-            self.robot.move_to(next_pos)
-            self.robot.rotate_to(next_angle)
-            self.renderer.animate_step_by_step(
-                self, self.step_idx, self.reached
-            )
+            step_start = time.perf_counter()
+            self.env.step_dynamics(dt)
+            if self.stepper is not None:
+                dt = self.stepper.advance(self)
+                if not dt:
+                    logger.error("No more moves possible or target reached.")
+                    break
+            else:
+                next_pos, next_angle = self.algorithm.step()
+                if next_pos is None:
+                    logger.error("No more moves possible or target reached.")
+                    break
+                self.move_robot(next_pos, next_angle)
+            if isinstance(self.robot, SensorRobot):
+                self.robot.sense(self.env)
+                costmap = self.env.costmap
+                if (
+                    costmap is not None
+                    and self.env_config.costmap.sensor_layer
+                ):
+                    costmap.observe(self.robot)
+            self.emit_frame(done=self.reached)
             self.step_idx += 1
             self.reached = self.env.robot_within_reach(
                 self.robot, self.env.target
             )
+            now = time.perf_counter()
+            STEPS.inc()
+            STEP_SECONDS.observe(now - step_start)
+            STEPS_PER_SECOND.set(self.step_idx / max(now - run_start, 1e-9))
+            if self.metrics is not None:
+                self.metrics.maybe_flush()
 
-        self.renderer.animate_step_by_step(self, self.step_idx, True)
+        EPISODES.labels("reached" if self.reached else "failed").inc()
+        self.emit_frame(done=True)
+        if self.renderer is not None:
+            self.renderer.close()
+        if self.trajectory is not None:
+            self.trajectory.close()
+        if self.metrics is not None:
+            self.metrics.flush()
         self.summarizer.end()
         self.summarizer.log_summary()
+        if self.stepper is not None:
+            self.stepper.log_summary()
+
+    def move_robot(self, next_pos: Position, next_angle: float) -> None:
+        """Move the robot toward one position chosen by the algorithm."""
+        prev_pos = self.robot.pos
+        if self.robot.kinematics is not None:
+            self.robot.drive_towards(next_pos, self.env)
+        else:
+            self.robot.move_to(next_pos)
+            self.robot.rotate_to(next_angle)
+        self.env.prefetch(self.robot.pos)
+        self.summarizer.record_movement(
+            euclidean_distance(prev_pos, self.robot.pos)
+        )
+
+    def emit_frame(self, done: bool) -> None:
+        """Hand the current frame to the renderer and trajectory recorder."""
+        if self.renderer is None and self.trajectory is None:
+            return
+        state = FrameState.from_sim(self, self.step_idx, done)
+        if self.renderer is not None:
+            self.renderer.present(state)
+        if self.trajectory is not None:
+            self.trajectory.append(state)
 
     def adjust_robot_start(self, start_pos: Position):
         if self.env.is_obstacle_in_range(start_pos, self.robot.radius):
@@ -14,6 +14,7 @@ setup(
         "pyyaml",
         "pytest",
     ],
+    extras_require={"jit": ["numba"]},
     entry_points={
         "console_scripts": [
             "robo_sim=robo_sim.cli.run:main",
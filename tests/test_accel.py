@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from robo_sim import accel
+from robo_sim.algorithms.path_planning import dstarlite
+from robo_sim.algorithms.path_planning.dstarlite import MOVES_ARRAY
+from robo_sim.components import Env
+from robo_sim.geometry import AABB, Circle
+from robo_sim.utils import Position
+
+
+@pytest.mark.parametrize(
+    "kernel, geometry",
+    [(accel.circle_hits, Circle), (accel.box_hits, AABB)],
+)
+def test_bucket_kernels_match_batch_hits(kernel, geometry):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 20, (500, 2))
+    centers = rng.uniform(0, 20, (40, 2))
+    if geometry is Circle:
+        shapes = [Circle(r) for r in rng.uniform(0.2, 1.5, 40)]
+    else:
+        shapes = [AABB(*half) for half in rng.uniform(0.2, 1.5, (40, 2))]
+    params = np.array([shape.params() for shape in shapes])
+    expected = geometry.batch_hits(
+        points[:, :1] - centers[:, 0],
+        points[:, 1:] - centers[:, 1],
+        params,
+        0.3,
+    ).any(axis=1)
+    np.testing.assert_array_equal(
+        kernel(points, centers, params, 0.3), expected
+    )
+
+
+def test_collision_queries_agree_with_the_kernels(monkeypatch):
+    # Few enough obstacles per shape for the queries to reach the kernels.
+    env = Env(size=(30, 30))
+    for k in range(20):
+        env.add_object("obstacle", Position(k * 1.4, 15), Circle(0.6))
+        env.add_object("obstacle", Position(15, k * 1.4), AABB(0.7, 0.3))
+    points = np.random.default_rng(1).uniform(0, 30, (3000, 2))
+    monkeypatch.setattr(accel, "ENABLED", False)
+    expected = env.points_in_collision(points, 0.3)
+    monkeypatch.setattr(accel, "ENABLED", True)
+    np.testing.assert_array_equal(
+        env.points_in_collision(points, 0.3), expected
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_grid_distances_agree_with_the_kernel(monkeypatch, seed):
+    blocked = np.random.default_rng(seed).random((40, 50)) < 0.3
+    blocked[0, 0] = False
+    monkeypatch.setattr(accel, "ENABLED", False)
+    expected = dstarlite.grid_distances(blocked, 0)
+    assert np.isfinite(expected).sum() > 1
+    monkeypatch.setattr(accel, "ENABLED", True)
+    np.testing.assert_array_equal(
+        dstarlite.grid_distances(blocked, 0), expected
+    )
+    np.testing.assert_array_equal(
+        accel.grid_distances(blocked, 0, MOVES_ARRAY), expected
+    )
+
+
+@pytest.mark.skipif(not accel.HAVE_NUMBA, reason="Numba is not installed.")
+def test_kernels_are_compiled_with_numba():
+    if not accel.COMPILED:
+        pytest.skip("Compilation is disabled with ROBO_SIM_JIT=0.")
+    accel.warmup()
+    for kernel in (*accel.bucket_kernels.values(), accel.grid_distances):
+        assert kernel.signatures
@@ -0,0 +1,89 @@
+import os
+import random
+
+import numpy as np
+
+from robo_sim.cache import ArtifactCache, artifact_key
+from robo_sim.components import Env
+from robo_sim.geometry import AABB, Circle, ConvexPolygon
+from robo_sim.utils import Position
+
+OBSTACLES = [
+    (Position(3, 4), None),
+    (Position(8, 9), Circle(1.5)),
+    (Position(12, 3), AABB(2, 0.5)),
+    (Position(5, 14), ConvexPolygon([(-1, -1), (1, -1), (0, 1)])),
+    (Position(16, 12), ConvexPolygon([(0, -1), (1, 0), (0, 1), (-1, 0)])),
+    (Position(2, 17), Circle(0.7)),
+]
+
+
+def build_env(obstacles=OBSTACLES):
+    env = Env(size=(20, 20))
+    for pos, geometry in obstacles:
+        env.add_object("obstacle", pos, geometry)
+    return env
+
+
+def test_content_hash_ignores_insertion_order():
+    digest = build_env().content_hash()
+    shuffled = OBSTACLES.copy()
+    for seed in range(5):
+        random.Random(seed).shuffle(shuffled)
+        assert build_env(shuffled).content_hash() == digest
+
+
+def test_content_hash_follows_the_map():
+    env = build_env()
+    digest = env.content_hash()
+    assert env.content_hash(2) != digest
+    (circle,) = [obj for obj in env.obstacles if obj.radius == 1.5]
+    env.move_obstacle(circle, Position(8, 10))
+    assert env.content_hash() != digest
+    env.move_obstacle(circle, Position(8, 9))
+    assert env.content_hash() == digest
+
+
+def test_artifact_key_ignores_argument_order():
+    assert artifact_key("a", x=1, y=2) == artifact_key("a", y=2, x=1)
+    assert artifact_key("a", x=1) != artifact_key("b", x=1)
+    assert artifact_key("a", x=1) != artifact_key("a", x=2)
+
+
+def test_artifacts_are_computed_once(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"values": np.arange(10)}
+
+    for _ in range(3):
+        arrays = cache.get_or_compute("key", compute)
+        np.testing.assert_array_equal(arrays["values"], np.arange(10))
+    assert len(calls) == 1
+    # Another cache on the same directory, as in a later run.
+    ArtifactCache(tmp_path).get_or_compute("key", compute)
+    assert len(calls) == 1
+
+
+def test_unreadable_artifacts_are_recomputed(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    cache.path("key").parent.mkdir(parents=True, exist_ok=True)
+    cache.path("key").write_bytes(b"not an npz file")
+    arrays = cache.get_or_compute("key", lambda: {"values": np.ones(3)})
+    np.testing.assert_array_equal(arrays["values"], np.ones(3))
+    np.testing.assert_array_equal(cache.load("key")["values"], np.ones(3))
+
+
+def test_least_recently_used_artifacts_are_evicted(tmp_path):
+    size = 8000
+    cache = ArtifactCache(tmp_path, max_bytes=3 * size + 2000)
+    for k, key in enumerate("abc"):
+        cache.store(key, {"values": np.zeros(size // 8)})
+        # Distinct modification times, oldest first.
+        os.utime(cache.path(key), (k, k))
+    cache.load("a")
+    cache.store("d", {"values": np.zeros(size // 8)})
+    assert cache.load("b") is None
+    assert all(cache.load(key) is not None for key in "acd")
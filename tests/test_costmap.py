@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pytest
+
+from robo_sim.components import Env
+from robo_sim.components.costmap import Costmap, distance_field
+from robo_sim.geometry import Circle, ConvexPolygon
+from robo_sim.utils import Position
+
+
+def brute_distances(grid, max_cells):
+    occupied = np.argwhere(grid)
+    cells = np.indices(grid.shape).reshape(2, -1).T
+    if not len(occupied):
+        return np.full(grid.shape, math.inf)
+    delta = cells[:, None, :] - occupied[None, :, :]
+    distances = np.sqrt((delta**2).sum(axis=2)).min(axis=1)
+    distances[distances > max_cells] = math.inf
+    return distances.reshape(grid.shape)
+
+
+@pytest.mark.parametrize("max_cells", [1, 3, 8])
+def test_distance_field_is_exact(max_cells):
+    rng = np.random.default_rng(0)
+    for density in (0.0, 0.02, 0.2):
+        grid = rng.random((19, 27)) < density
+        expected = brute_distances(grid, max_cells)
+        assert np.array_equal(distance_field(grid, max_cells), expected)
+
+
+def test_costmap_patches_match_full_rebuild():
+    rng = np.random.default_rng(1)
+    obstacles = {
+        Position(int(x), int(y)) for x, y in rng.integers(1, 19, (25, 2))
+    }
+    env = Env(size=(20, 20), obstacles=obstacles)
+    mover = env.add_dynamic_obstacle(Position(10, 10), None)
+    costmap = Costmap(env, resolution=2, max_distance=2.0)
+    costmap.distances()
+
+    for x, y in rng.uniform(1, 19, (10, 2)):
+        env.move_obstacle(mover, Position(float(x), float(y)))
+        patched = costmap.distances()
+        rebuilt = distance_field(costmap.obstacle_grid(), costmap.max_cells)
+        assert np.array_equal(patched, rebuilt / costmap.resolution)
+
+
+def shaped_env():
+    # Shapes whose disc tests are exact; boxes grow by a square instead.
+    env = Env(size=(20, 20))
+    env.add_object("obstacle", Position(6.3, 7.1), Circle(1.6))
+    env.add_object(
+        "obstacle",
+        Position(13, 12),
+        ConvexPolygon(
+            [(-2.5, -0.75), (2.5, -0.75), (2.5, 0.75), (-2.5, 0.75)]
+        ),
+    )
+    env.add_object(
+        "obstacle", Position(9, 15), ConvexPolygon([(-2, -1), (2, 0), (0, 2)])
+    )
+    return env
+
+
+@pytest.mark.parametrize("radius", [0.3, 0.8])
+def test_collisions_err_on_the_safe_side(radius):
+    env = shaped_env()
+    costmap = Costmap(env, resolution=4)
+    points = np.random.default_rng(2).uniform(0, 20, (5000, 2))
+    collides = costmap.collides(points, radius)
+    assert collides[env.points_in_collision(points, radius)].all()
+    # The padding only adds a thin band around each obstacle.
+    padded = env.points_in_collision(points, radius + 3 * costmap.margin)
+    assert not collides[~padded].any()
+
+    # Costs decay with the distance from obstacles, up to `max_distance`.
+    clearance = costmap.clearance_at(points)
+    graded = ~collides & (clearance < costmap.max_distance - costmap.margin)
+    order = np.argsort(clearance[graded])
+    costs = costmap.cost_at(points[graded], radius)[order]
+    assert (np.diff(costs) <= 0).all()
+    capped = costmap.cost_at(points[~collides & ~graded], radius)
+    assert (capped <= costs.min()).all()
+
+
+def test_sensor_marks_block_cells_until_cleared():
+    env = shaped_env()
+    costmap = Costmap(env, resolution=2)
+    point = np.array([[3.0, 16.0]])
+    assert not costmap.collides(point, 0.3)[0]
+    costmap.mark(point)
+    assert costmap.collides(point, 0.3)[0]
+    version = costmap.sensor_version
+    # Marking the same cell again changes nothing.
+    costmap.mark(point)
+    assert costmap.sensor_version == version
+    costmap.clear_sensor_layer()
+    assert not costmap.collides(point, 0.3)[0]
@@ -0,0 +1,103 @@
+import pytest
+
+from robo_sim.distributed import (
+    Lease,
+    LocalRedis,
+    RedisBroker,
+    SQLiteBroker,
+    TaskOutcome,
+)
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def broker(request, tmp_path):
+    if request.param == "sqlite":
+        broker = SQLiteBroker(tmp_path / "broker.db")
+    else:
+        broker = RedisBroker(LocalRedis())
+    yield broker
+    broker.close()
+
+
+def test_claims_run_oldest_first(broker):
+    first, second = broker.submit(["a", "b"])
+    assert broker.claim("w1") == (first, "a")
+    assert broker.claim("w2") == (second, "b")
+    assert broker.claim("w3") is None
+
+
+def test_lease_follows_claim_and_finish(broker):
+    (task_id,) = broker.submit(["a"])
+    broker.claim("w1")
+    lease = broker.leases([task_id])[task_id]
+    assert lease.worker == "w1"
+    assert lease.heartbeat is not None
+
+    broker.complete(task_id, "result")
+    assert broker.leases([task_id]) == {}
+    assert broker.finished([task_id]) == {task_id: TaskOutcome(True, "result")}
+
+
+def test_failure_is_reported(broker):
+    (task_id,) = broker.submit(["a"])
+    broker.claim("w1")
+    broker.fail(task_id, "boom")
+    assert broker.finished([task_id]) == {task_id: TaskOutcome(False, "boom")}
+
+
+def test_requeued_task_is_claimed_again(broker):
+    first, second = broker.submit(["a", "b"])
+    broker.claim("w1")
+    broker.requeue(first)
+    assert broker.leases([first]) == {}
+    assert broker.claim("w2") == (first, "a")
+    assert broker.leases([first])[first].worker == "w2"
+    assert broker.claim("w3") == (second, "b")
+
+
+def test_discarded_task_is_not_claimed(broker):
+    first, second = broker.submit(["a", "b"])
+    broker.discard([first])
+    assert broker.claim("w1") == (second, "b")
+    assert broker.claim("w1") is None
+
+
+def test_discarded_running_task_is_forgotten(broker):
+    first, second = broker.submit(["a", "b"])
+    broker.claim("w1")
+    broker.discard([first, second])
+    assert broker.leases([first, second]) == {}
+    assert broker.claim("w2") is None
+    # The worker that held it finishing late leaves no outcome.
+    broker.complete(first, "result")
+    assert broker.finished([first, second]) == {}
+
+
+def test_only_the_first_outcome_counts(broker):
+    (task_id,) = broker.submit(["a"])
+    broker.claim("w1")
+    broker.requeue(task_id)
+    broker.fail(task_id, "boom")
+    # The requeued copy is not run again.
+    assert broker.claim("w2") is None
+    broker.complete(task_id, "result")
+    assert broker.finished([task_id]) == {task_id: TaskOutcome(False, "boom")}
+
+
+def test_redis_discard_empties_the_lists():
+    client = LocalRedis()
+    broker = RedisBroker(client)
+    first, second = broker.submit(["a", "b"])
+    broker.claim("w1")
+    broker.discard([first, second])
+    assert client.lrange(broker.queue, 0, -1) == []
+    assert client.lrange(broker.claimed, 0, -1) == []
+
+
+def test_redis_lease_of_unleased_claim():
+    client = LocalRedis()
+    broker = RedisBroker(client)
+    (task_id,) = broker.submit(["task"])
+    # A worker has popped the task but not written its lease yet.
+    client.rpoplpush(broker.queue, broker.claimed)
+    assert broker.leases([task_id]) == {task_id: Lease(None, None)}
@@ -0,0 +1,94 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from robo_sim.algorithms.path_planning.dstarlite import (
+    DStarLite,
+    grid_distances,
+)
+from robo_sim.components import Env
+from robo_sim.components.env_objects import Target
+from robo_sim.components.robot import Robot
+from robo_sim.config import DStarLiteConfig
+from robo_sim.geometry import AABB
+from robo_sim.utils import Position
+
+START = Position(2, 2)
+GOAL = Position(27, 27)
+
+
+def build_env(seed=0):
+    env = Env(size=(30, 30), obstacles=90, rng=random.Random(seed))
+    env.add_object("obstacle", Position(15, 15), AABB(6, 0.5))
+    return env
+
+
+def planner(env, pos=START, **kwargs):
+    robot = Robot(pos, 1.0, 0.0, 0.0)
+    return DStarLite(env, robot, pos, Target(GOAL), DStarLiteConfig(**kwargs))
+
+
+def true_cost(env, pos=START):
+    """Reference: Dijkstra from the goal over the fully evaluated map."""
+    fresh = planner(env, pos)
+    blocked = fresh.evaluate_map()["truth"].astype(bool)
+    if blocked.flat[fresh.goal]:
+        return math.inf
+    return grid_distances(blocked, fresh.goal)[fresh.start_idx]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_plan_cost_matches_dijkstra(seed):
+    env = build_env(seed)
+    dstar = planner(env)
+    assert dstar.g[dstar.start_idx] == true_cost(env)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_landmarks_keep_the_plan_optimal(seed):
+    env = build_env(seed)
+    dstar = planner(env, landmarks=4)
+    assert dstar.g[dstar.start_idx] == true_cost(env)
+    plain = planner(env)
+    assert dstar.expansions <= plain.expansions
+
+
+@pytest.mark.parametrize("seed", [0, 1, 3])
+def test_replanning_repairs_only_the_change(seed):
+    env = build_env(seed)
+    dstar = planner(env)
+    # Block the cells the plan is about to follow, a few moves ahead.
+    cells = dstar.plan_cells()
+    i, j = divmod(cells[len(cells) // 2], dstar.cols)
+    env.add_object("obstacle", Position(j, i), AABB(1.5, 1.5))
+
+    before = dstar.expansions
+    dstar.step()
+    repaired = dstar.expansions - before
+    assert dstar.g[dstar.start_idx] == true_cost(env)
+    assert repaired < planner(env).expansions
+
+    # Nothing changed, so nothing is expanded.
+    before = dstar.expansions
+    dstar.step()
+    assert dstar.expansions == before
+
+
+def test_robot_reaches_the_goal_around_new_obstacles():
+    env = build_env()
+    dstar = planner(env)
+    robot = dstar.robot
+    for frame in range(200):
+        if frame == 5:
+            env.add_object("obstacle", Position(10, 10), AABB(4, 0.5))
+        pos, _ = dstar.step()
+        assert pos is not None
+        assert not env.points_in_collision(
+            np.array([[pos.x, pos.y]]), robot.radius
+        )[0]
+        robot.pos = pos
+        if (pos.x, pos.y) == (GOAL.x, GOAL.y):
+            break
+    assert (robot.pos.x, robot.pos.y) == (GOAL.x, GOAL.y)
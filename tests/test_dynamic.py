@@ -0,0 +1,175 @@
+import random
+
+import numpy as np
+import pytest
+
+from robo_sim.components import Env
+from robo_sim.components.motion import BounceMotion, PatrolMotion
+from robo_sim.components.sensors import BasicProximitySensor
+from robo_sim.geometry import Circle, OrientedBox, Quadtree
+from robo_sim.geometry.index import ShapeBucket
+from robo_sim.utils import Position
+
+
+def dynamic_env(quadtree=False):
+    rng = random.Random(1)
+    env = Env(size=(40, 40), obstacles=150, quadtree=quadtree, rng=rng)
+    env.add_object("obstacle", Position(3, 3), Circle(1.3))
+    for geometry in [None, Circle(0.8), OrientedBox(1, 0.4, 30)] * 2:
+        env.add_dynamic_obstacle(
+            Position(rng.uniform(5, 35), rng.uniform(5, 35)),
+            BounceMotion((rng.uniform(-1.5, 1.5), rng.uniform(-1.5, 1.5))),
+            geometry,
+        )
+    env.add_dynamic_obstacle(
+        Position(10, 10),
+        PatrolMotion(
+            [Position(10, 10), Position(30, 10), Position(30, 30)], 1.5
+        ),
+    )
+    return env
+
+
+def test_moves_update_index_cells_in_place(monkeypatch):
+    env = dynamic_env()
+    points = np.random.default_rng(0).uniform(0, 40, (2000, 2))
+    env.points_in_collision(points, 0.3)
+    rebuilt = []
+    build = ShapeBucket.grid
+
+    def grid(bucket):
+        if bucket._grid is None:
+            rebuilt.append(bucket.shape_type)
+        return build(bucket)
+
+    monkeypatch.setattr(ShapeBucket, "grid", grid)
+    for _ in range(40):
+        env.step_dynamics()
+        expected = np.zeros(len(points), dtype=bool)
+        for obj in env.obstacles:
+            geometry = obj.geometry
+            expected |= geometry.batch_hits(
+                points[:, :1] - obj.pos.x,
+                points[:, 1:] - obj.pos.y,
+                geometry.params()[None],
+                0.3,
+            )[:, 0]
+        np.testing.assert_array_equal(
+            env.points_in_collision(points, 0.3), expected
+        )
+    # Obstacles bouncing off the walls may widen a grid a few times, but
+    # moves within it never rebuild it.
+    assert len(rebuilt) <= 6
+
+
+@pytest.mark.parametrize("resolution", [1, 3])
+def test_moves_update_grids_in_place(resolution):
+    env = dynamic_env()
+    grid = env.occupancy_grid(resolution)
+    static = env.occupancy_grid(resolution, static_only=True)
+    points = np.random.default_rng(1).uniform(-1, 41, (3000, 2))
+    for _ in range(30):
+        env.step_dynamics()
+        assert env.occupancy_grid(resolution) is grid
+        np.testing.assert_array_equal(
+            grid, env._rasterize(resolution, False) > 0
+        )
+        np.testing.assert_array_equal(
+            static, env._rasterize(resolution, True) > 0
+        )
+        cells = np.floor(points * resolution + 0.5).astype(int)
+        inside = (
+            (cells >= 0).all(axis=1)
+            & (cells[:, 0] < grid.shape[1])
+            & (cells[:, 1] < grid.shape[0])
+        )
+        expected = np.ones(len(points), dtype=bool)
+        expected[inside] = grid[cells[inside, 1], cells[inside, 0]]
+        np.testing.assert_array_equal(
+            env.occupied_at(points, resolution), expected
+        )
+
+
+@pytest.mark.parametrize("resolution", [1, 2])
+def test_moves_patch_the_quadtree(resolution):
+    env = dynamic_env(quadtree=True)
+    tree = env.quadtree(resolution)
+    for _ in range(25):
+        env.step_dynamics()
+        # The same tree, patched rather than rebuilt.
+        assert env.quadtree(resolution) is tree
+        grid = env._rasterize(resolution, False) > 0
+        np.testing.assert_array_equal(tree.to_grid(), grid)
+        # Patching leaves as few leaves as building the tree afresh.
+        assert len(tree) == len(Quadtree.from_grid(grid))
+
+
+def test_patch_reclassifies_a_box():
+    grid = np.zeros((37, 53), dtype=bool)
+    grid[5:20, 10:40] = True
+    tree = Quadtree.from_grid(grid)
+    grid[8:12, 30:45] = False
+    grid[25:30, 2:6] = True
+    fresh = Quadtree.from_grid(grid)
+    tree.patch(8, 30, 11, 44, lambda *box: fresh_classify(grid, *box))
+    tree.patch(25, 2, 29, 5, lambda *box: fresh_classify(grid, *box))
+    np.testing.assert_array_equal(tree.to_grid(), grid)
+    np.testing.assert_array_equal(tree.codes, fresh.codes)
+
+
+def fresh_classify(grid, i0, j0, i1, j1):
+    states = np.empty(len(i0), dtype=np.int8)
+    for k in range(len(i0)):
+        rows = slice(i0[k], i1[k] + 1)
+        cols = slice(j0[k], j1[k] + 1)
+        block = grid[rows, cols]
+        states[k] = 1 if block.all() else 0 if not block.any() else 2
+    return states
+
+
+def test_dirty_regions_cover_moves():
+    env = dynamic_env()
+    since = env.version
+    before = [(obj.pos.x, obj.pos.y) for obj in env.dynamic_obstacles]
+    moved = env.step_dynamics()
+    regions = env.dirty_regions(since)
+    assert len(regions) == moved == env.version - since
+    for (x, y), obj in zip(before, env.dynamic_obstacles):
+        for px, py in ((x, y), (obj.pos.x, obj.pos.y)):
+            assert any(
+                x0 <= px <= x1 and y0 <= py <= y1 for x0, y0, x1, y1 in regions
+            )
+    assert env.dirty_regions(env.version) == []
+
+
+def test_sensor_recasts_match_a_fresh_scan():
+    env = dynamic_env()
+    sensor = BasicProximitySensor(8, 10)
+    pos = Position(20, 20)
+    for step in range(30):
+        env.step_dynamics()
+        if step % 7 == 0:
+            pos = Position(5 + step % 30, 35 - step % 30)
+        np.testing.assert_array_equal(
+            sensor.sense(env, pos, 0.3),
+            BasicProximitySensor(8, 10).sense(env, pos, 0.3),
+        )
+
+
+def test_motion_models():
+    env = Env(size=(10, 10))
+    bounce = BounceMotion((3.0, -4.0))
+    pos = Position(8, 2)
+    for _ in range(20):
+        pos = bounce.step(pos, 1.0, env)
+        assert 0 <= pos.x <= 10 and 0 <= pos.y <= 10
+    bounce.reset()
+    assert bounce.velocity == (3.0, -4.0)
+
+    patrol = PatrolMotion([Position(0, 0), Position(4, 0)], 3.0)
+    pos = Position(0, 0)
+    steps = []
+    for _ in range(4):
+        pos = patrol.step(pos, 1.0, env)
+        steps.append((pos.x, pos.y))
+    assert steps == [(3.0, 0.0), (2.0, 0.0), (1.0, 0.0), (4.0, 0.0)]
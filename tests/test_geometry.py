@@ -0,0 +1,254 @@
+import numpy as np
+import pytest
+
+from robo_sim.components import Env
+from robo_sim.geometry import (
+    AABB,
+    Circle,
+    ConvexPolygon,
+    GeometryIndex,
+    OrientedBox,
+    Quadtree,
+    intersects,
+    shape_from_dict,
+)
+from robo_sim.utils import Position
+
+SHAPES = [
+    Circle(0.8),
+    AABB(1.2, 0.4),
+    OrientedBox(1.0, 0.3, 35.0),
+    ConvexPolygon([(-1, -0.5), (1, -0.5), (0.2, 1.0)]),
+    ConvexPolygon([(0, -1), (1, 0), (0.5, 1), (-0.5, 1), (-1, 0)]),
+]
+
+
+def random_shapes(rng, count):
+    shapes = []
+    for _ in range(count):
+        kind = rng.integers(4)
+        size = rng.uniform(0.2, 1.0, 2)
+        if kind == 0:
+            shapes.append(Circle(size[0]))
+        elif kind == 1:
+            shapes.append(AABB(*size))
+        elif kind == 2:
+            shapes.append(OrientedBox(*size, rng.uniform(0, 180)))
+        else:
+            sides = rng.integers(3, 7)
+            angles = np.sort(rng.uniform(0, 2 * np.pi, sides))
+            shapes.append(
+                ConvexPolygon(
+                    size[0] * np.column_stack((np.cos(angles), np.sin(angles)))
+                )
+            )
+    return shapes
+
+
+@pytest.mark.parametrize("shape", SHAPES, ids=lambda s: s.kind)
+@pytest.mark.parametrize("radius", [0.0, 0.3])
+def test_batch_kernel_matches_scalar_test(shape, radius):
+    offsets = np.random.default_rng(1).uniform(-2.5, 2.5, (500, 2))
+    batched = shape.batch_hits(
+        offsets[:, :1], offsets[:, 1:], shape.params()[None], radius
+    )[:, 0]
+    scalar = [shape.hits_circle(dx, dy, radius) for dx, dy in offsets]
+    np.testing.assert_array_equal(batched, scalar)
+
+
+@pytest.mark.parametrize("shape", SHAPES[3:], ids=lambda s: s.kind)
+def test_polygon_disc_test_is_exact(shape):
+    radius = 0.3
+    vertices = shape.polygon()
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    t = np.linspace(0, 1, 400)[:, None, None]
+    boundary = (vertices + t * edges).reshape(-1, 2)
+    for dx, dy in np.random.default_rng(2).uniform(-2, 2, (300, 2)):
+        gap = np.hypot(*(boundary - (dx, dy)).T).min()
+        if abs(gap - radius) < 0.02:
+            continue  # Too close to call on the sampled boundary.
+        cross = edges[:, 0] * (dy - vertices[:, 1]) - edges[:, 1] * (
+            dx - vertices[:, 0]
+        )
+        expected = bool((cross >= 0).all() or gap <= radius)
+        assert shape.hits_circle(dx, dy, radius) == expected
+
+
+@pytest.mark.parametrize("shape", SHAPES, ids=lambda s: s.kind)
+def test_shapes_round_trip_through_dicts(shape):
+    copy = shape_from_dict(shape.to_dict())
+    assert type(copy) is type(shape)
+    np.testing.assert_allclose(copy.params(), shape.params())
+
+
+def test_pair_tests_are_symmetric():
+    rng = np.random.default_rng(3)
+    for a in SHAPES:
+        for b in SHAPES:
+            for dx, dy in rng.uniform(-2.5, 2.5, (20, 2)):
+                assert intersects(a, (0, 0), b, (dx, dy)) == intersects(
+                    b, (dx, dy), a, (0, 0)
+                )
+
+
+@pytest.mark.parametrize("count", [30, 400])
+@pytest.mark.parametrize("radius", [0.0, 0.5])
+def test_index_matches_brute_force(count, radius):
+    rng = np.random.default_rng(count)
+    shapes = random_shapes(rng, count)
+    centers = rng.uniform(0, 60, (count, 2))
+    index = GeometryIndex()
+    for shape, (x, y) in zip(shapes, centers):
+        index.add(shape, x, y)
+    # A map-wide query and a local one exercise both culling paths.
+    for points in (
+        rng.uniform(-2, 62, (3000, 2)),
+        rng.uniform(20, 23, (200, 2)),
+    ):
+        # Each shape's own kernel, which matches its scalar test.
+        expected = np.zeros(len(points), dtype=bool)
+        for shape, (x, y) in zip(shapes, centers):
+            expected |= shape.batch_hits(
+                points[:, :1] - x,
+                points[:, 1:] - y,
+                shape.params()[None],
+                radius,
+            )[:, 0]
+        np.testing.assert_array_equal(
+            index.points_hit(points, radius), expected
+        )
+
+
+def swept_disc_hits(env, start, end, radius):
+    """Reference: the segment sampled far more finely than the check."""
+    t = np.linspace(0, 1, 2000)[:, None]
+    points = start + t * (end - start)
+    return env.points_in_collision(points, radius).any()
+
+
+def test_segment_checks_never_miss_a_collision():
+    rng = np.random.default_rng(4)
+    env = Env(size=(30, 30))
+    for shape, (x, y) in zip(
+        random_shapes(rng, 40), rng.uniform(2, 28, (40, 2))
+    ):
+        env.add_object("obstacle", Position(x, y), shape)
+    starts = rng.uniform(1, 29, (60, 2))
+    ends = starts + rng.uniform(-6, 6, (60, 2))
+    ends = np.clip(ends, 0, 30)
+    free = env.segments_collision_free(starts, ends, 0.4)
+    for k in np.flatnonzero(free):
+        assert not swept_disc_hits(env, starts[k], ends[k], 0.4)
+
+    # Each segment's result does not depend on the others in the batch.
+    alone = [
+        env.segments_collision_free(starts[k], ends[k], 0.4)[0]
+        for k in range(len(starts))
+    ]
+    np.testing.assert_array_equal(free, alone)
+
+
+def test_segments_leaving_the_map_are_blocked():
+    env = Env(size=(10, 10))
+    free = env.segments_collision_free(
+        np.array([[5.0, 5.0], [5.0, 5.0]]),
+        np.array([[8.0, 8.0], [11.0, 5.0]]),
+        0.3,
+    )
+    np.testing.assert_array_equal(free, [True, False])
+
+
+def blocky_grid(shape, seed):
+    """Grid of random rectangles, with large uniform regions."""
+    rng = np.random.default_rng(seed)
+    grid = np.zeros(shape, dtype=bool)
+    rows, cols = shape
+    for _ in range(12):
+        i, j = rng.integers(0, rows), rng.integers(0, cols)
+        stop_i, stop_j = (i, j) + rng.integers(1, 9, size=2)
+        grid[i:stop_i, j:stop_j] = True
+    return grid
+
+
+@pytest.mark.parametrize("shape", [(32, 32), (37, 50), (1, 9)])
+def test_quadtree_round_trip(shape):
+    for seed in range(5):
+        grid = blocky_grid(shape, seed)
+        tree = Quadtree.from_grid(grid)
+        assert (tree.to_grid() == grid).all()
+
+
+def test_quadtree_box_occupied():
+    grid = blocky_grid((37, 50), 1)
+    tree = Quadtree.from_grid(grid)
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        i0, i1 = sorted(rng.integers(0, 37, size=2))
+        j0, j1 = sorted(rng.integers(0, 50, size=2))
+        stop_i, stop_j = i1 + 1, j1 + 1
+        expected = grid[i0:stop_i, j0:stop_j].any()
+        assert (
+            tree.box_occupied(int(i0), int(j0), int(i1), int(j1)) == expected
+        )
+    # Cells outside the grid count as occupied.
+    assert tree.box_occupied(-1, 0, 3, 3)
+    assert tree.box_occupied(0, 0, 3, 50)
+
+
+def quadtree_env(size=(40, 30)):
+    """Obstacles within (40, 30), on a map of `size`."""
+    rng = np.random.default_rng(5)
+    env = Env(size=size)
+    for shape, (x, y) in zip(
+        random_shapes(rng, 25), rng.uniform(0, 1, (25, 2)) * (40, 30)
+    ):
+        env.add_object("obstacle", Position(x, y), shape)
+    env.add_object("obstacle", Position(12, 9), AABB(3.2, 1.7))
+    return env
+
+
+@pytest.mark.parametrize("resolution", [1, 3])
+def test_quadtree_from_geometry_matches_the_grid(resolution):
+    env = quadtree_env()
+    grid = env.occupancy_grid(resolution)
+    tree = env.quadtree(resolution)
+    np.testing.assert_array_equal(tree.to_grid(), grid)
+    # As compact as a tree built from the grid itself.
+    np.testing.assert_array_equal(tree.codes, Quadtree.from_grid(grid).codes)
+
+
+def test_quadtree_neighbors_touch_the_leaf():
+    tree = Quadtree.from_grid(blocky_grid((37, 50), 3))
+    ii, jj, sizes = tree.leaf_blocks()
+    rows, cols = tree.shape
+    # Leaves entirely outside the grid are never reached.
+    inside = np.flatnonzero((ii < rows) & (jj < cols))
+    for leaf in inside[::7]:
+        for diagonal in (False, True):
+            # Gaps between the blocks along each axis; blocks touch when
+            # neither gap is positive and they do not overlap.
+            gap_i = np.maximum(ii, ii[leaf]) - np.minimum(
+                ii + sizes, ii[leaf] + sizes[leaf]
+            )
+            gap_j = np.maximum(jj, jj[leaf]) - np.minimum(
+                jj + sizes, jj[leaf] + sizes[leaf]
+            )
+            touching = (
+                (gap_i <= 0) & (gap_j <= 0) & ((gap_i == 0) | (gap_j == 0))
+            )
+            if not diagonal:
+                touching &= (gap_i < 0) | (gap_j < 0)
+            expected = np.intersect1d(np.flatnonzero(touching), inside)
+            np.testing.assert_array_equal(
+                tree.neighbors(leaf, diagonal), expected
+            )
+
+
+def test_quadtree_size_follows_obstacle_boundaries():
+    small = quadtree_env((40, 30)).quadtree(2)
+    # The same obstacles on a map a hundred times the area.
+    large = quadtree_env((400, 300))
+    tree = large.quadtree(2)
+    assert tree.to_grid()[:61, :81].sum() == small.to_grid().sum()
+    assert len(tree) < 1.5 * len(small)
+    assert tree.nbytes < large.grid_shape(2)[0] * large.grid_shape(2)[1] / 50
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from robo_sim.golden import (
+    REFERENCE,
+    Backend,
+    GoldenSet,
+    first_divergence,
+    get_backend,
+)
+from robo_sim.pool import Episode
+
+
+@pytest.fixture
+def cases(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "env.yaml").write_text(
+        "size: [20, 20]\nobstacles: 30\ntarget_pos: [16, 16]\n"
+        "max_frames: 40\n"
+    )
+    (tmp_path / "robot.yaml").write_text("start_pos: [1, 1]\n")
+    (tmp_path / "algorithm.yaml").write_text("name: DStarLite\n")
+    return {
+        f"seed{seed}": Episode(
+            tmp_path / "env.yaml",
+            tmp_path / "robot.yaml",
+            tmp_path / "algorithm.yaml",
+            seed=seed,
+        )
+        for seed in range(2)
+    }
+
+
+def test_record_and_check_round_trip(tmp_path, cases):
+    GoldenSet(tmp_path / "goldens").record(cases)
+
+    # A fresh set reads the cases back from the manifest.
+    golden = GoldenSet(tmp_path / "goldens")
+    assert golden.cases == cases
+    comparisons = golden.check([REFERENCE, get_backend("quadtree")])
+    assert len(comparisons) == 4
+    for comparison in comparisons:
+        assert comparison.equivalent, comparison.divergence
+        assert comparison.frames > 1
+
+
+def test_check_reports_divergence(tmp_path, cases):
+    golden = GoldenSet(tmp_path / "goldens")
+    golden.record(cases)
+    shorter = Backend("shorter", env_overrides={"max_frames": 3})
+    comparison, _ = golden.check([shorter])
+    assert not comparison.equivalent
+    assert comparison.divergence.frame <= 3
+
+
+def test_first_divergence_tolerance():
+    dtype = [("frame", "i4"), ("flags", "u1"), ("x", "f8")]
+    expected = np.array([(0, 0, 1.0), (1, 0, 2.0)], dtype=dtype)
+    actual = expected.copy()
+    actual["x"][1] += 1e-12
+    assert first_divergence(expected, actual, 1e-9) is None
+    actual["x"][1] += 1e-3
+    divergence = first_divergence(expected, actual, 1e-9)
+    assert (divergence.frame, divergence.field) == (1, "x")
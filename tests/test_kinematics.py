@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from robo_sim.config import (
+    DStarLiteConfig,
+    EnvConfig,
+    KinematicsConfig,
+    RobotConfig,
+    RRTStarConfig,
+)
+from robo_sim.sim import Sim
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize(
+    "algorithm", [DStarLiteConfig(), RRTStarConfig(seed=0, max_nodes=2000)]
+)
+def test_bicycle_never_enters_obstacle(tmp_path, monkeypatch, algorithm, seed):
+    monkeypatch.chdir(tmp_path)
+    random.seed(seed)
+    sim = Sim.from_configs(
+        EnvConfig(size=(30, 30), obstacles=80, max_frames=60),
+        RobotConfig(kinematics=KinematicsConfig(model="bicycle")),
+        algorithm,
+        headless=True,
+    )
+    poses = []
+    move_robot = sim.move_robot
+
+    def record(next_pos, next_angle):
+        move_robot(next_pos, next_angle)
+        poses.append(sim.robot.pos)
+
+    monkeypatch.setattr(sim, "move_robot", record)
+    sim.run()
+
+    assert poses
+    for pos in poses:
+        assert not sim.env.is_obstacle_in_range(pos, sim.robot.radius)
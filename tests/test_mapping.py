@@ -0,0 +1,133 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from robo_sim.components.mapping import OccupancyMap, traverse_beams
+from robo_sim.config import (
+    EnvConfig,
+    FrontierExplorationConfig,
+    SensorRobotConfig,
+)
+from robo_sim.sim import Sim
+from robo_sim.utils import Position
+
+
+def sampled_cells(origin, direction, length, resolution):
+    """Cells along a beam found by sampling it finely."""
+    start = np.asarray(origin) * resolution + 0.5
+    t = np.linspace(0, length * resolution, 200_001)
+    mid = (t[1:] + t[:-1]) / 2
+    points = np.floor(start + mid[:, None] * direction).astype(int)
+    cells = points[:, ::-1]
+    keep = np.ones(len(cells), dtype=bool)
+    keep[1:] = (cells[1:] != cells[:-1]).any(axis=1)
+    return cells[keep]
+
+
+@pytest.mark.parametrize("resolution", [1, 2, 4])
+def test_beams_cross_the_sampled_cells(resolution):
+    rng = np.random.default_rng(resolution)
+    angles = rng.uniform(0, 2 * math.pi, 40)
+    # Axis-aligned beams cross no boundary along one axis.
+    angles[:4] = [0, math.pi / 2, math.pi, 3 * math.pi / 2]
+    directions = np.column_stack((np.cos(angles), np.sin(angles)))
+    lengths = rng.uniform(0, 6, 40)
+    origin = Position(10.3, 7.9)
+    cells, valid = traverse_beams(origin, directions, lengths, resolution)
+    for beam in range(40):
+        np.testing.assert_array_equal(
+            cells[beam][valid[beam]],
+            sampled_cells(
+                (origin.x, origin.y),
+                directions[beam],
+                lengths[beam],
+                resolution,
+            ),
+        )
+
+
+def test_scans_update_each_cell_once():
+    belief = OccupancyMap((10, 10), resolution=2)
+    # Two copies of a beam that hits at x = 3, and a longer beam through
+    # that hit cell.
+    directions = np.array([[1.0, 0.0], [1.0, 0.0], [1.0, 0.0]])
+    belief.integrate(Position(1, 1), directions, [2.0, 2.0, 4.0], 5.0)
+    row = belief.log_odds[2]
+    np.testing.assert_allclose(row[2:6], belief.miss)
+    assert row[6] == pytest.approx(belief.hit)
+    np.testing.assert_allclose(row[7:10], belief.miss)
+    assert row[10] == pytest.approx(belief.hit)
+    assert np.count_nonzero(belief.log_odds) == 9
+
+    # Beams reading the full range hit nothing.
+    belief = OccupancyMap((10, 10), resolution=2)
+    belief.integrate(Position(1, 1), directions[:1], [5.0], 5.0)
+    assert (belief.log_odds <= 0).all()
+    for _ in range(50):
+        belief.integrate(Position(1, 1), directions[:1], [2.0], 5.0)
+    assert belief.log_odds.min() == pytest.approx(-belief.clamp)
+    assert belief.log_odds.max() == pytest.approx(belief.clamp)
+    assert belief.scans == 51
+
+
+def test_frontiers_are_free_cells_next_to_unknown_ones():
+    belief = OccupancyMap((15, 10), resolution=2)
+    rng = np.random.default_rng(0)
+    belief.log_odds[:] = rng.choice([-1.0, 0.0, 1.0], belief.shape)
+    free, unknown = belief.free(), belief.unknown()
+    rows, cols = belief.shape
+    expected = np.zeros(belief.shape, dtype=bool)
+    for i, j in zip(*np.nonzero(free)):
+        expected[i, j] = any(
+            unknown[i + di, j + dj]
+            for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1))
+            if 0 <= i + di < rows and 0 <= j + dj < cols
+        )
+    np.testing.assert_array_equal(belief.frontiers(), expected)
+
+
+def test_blocked_cells_pad_the_occupied_ones():
+    belief = OccupancyMap((15, 10), resolution=2)
+    belief.log_odds[:] = -1.0
+    belief.log_odds[10, 12] = 1.0
+    belief.log_odds[0, 0] = 0.0
+    blocked = belief.blocked(0.3)
+    ii, jj = np.indices(belief.shape)
+    reach = 0.3 * 2 + math.sqrt(2)
+    expected = np.hypot(ii - 10, jj - 12) <= reach
+    expected[0, 0] = True
+    np.testing.assert_array_equal(blocked, expected)
+
+
+def run_sim(seed):
+    random.seed(seed)
+    sim = Sim.from_configs(
+        EnvConfig(
+            size=(25, 25), obstacles=40, target_pos=(22, 22), max_frames=400
+        ),
+        SensorRobotConfig(start_pos=(2, 2)),
+        FrontierExplorationConfig(),
+        headless=True,
+    )
+    poses = []
+    move_robot = sim.move_robot
+
+    def record(next_pos, next_angle):
+        move_robot(next_pos, next_angle)
+        poses.append(sim.robot.pos)
+
+    sim.move_robot = record
+    sim.run()
+    return sim, poses
+
+
+# Obstacles next to the target block its own cell with seeds 2 and 3.
+@pytest.mark.parametrize("seed", range(4))
+def test_exploration_reaches_the_target(tmp_path, monkeypatch, seed):
+    monkeypatch.chdir(tmp_path)
+    sim, poses = run_sim(seed)
+    assert sim.reached
+    points = np.array([(pos.x, pos.y) for pos in poses])
+    assert not sim.env.points_in_collision(points, sim.robot.radius).any()
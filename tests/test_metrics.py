@@ -0,0 +1,122 @@
+import json
+import sys
+import urllib.request
+
+import pytest
+
+from robo_sim.cli import run
+from robo_sim.metrics import (
+    MetricsExporter,
+    MetricsRegistry,
+    aggregate_snapshots,
+    write_snapshot,
+)
+
+
+def build_registry():
+    reg = MetricsRegistry()
+    reg.counter("steps", "Steps taken.").labels().inc(3)
+    reg.gauge("rate", "Steps per second.", ("algo",)).labels("DWA").set(2.5)
+    latency = reg.histogram("latency", "Step time.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.labels().observe(value)
+    return reg
+
+
+def test_registry_renders_openmetrics_text():
+    assert build_registry().render().splitlines() == [
+        "# HELP steps Steps taken.",
+        "# TYPE steps counter",
+        "steps_total 3",
+        "# HELP rate Steps per second.",
+        "# TYPE rate gauge",
+        'rate{algo="DWA"} 2.5',
+        "# HELP latency Step time.",
+        "# TYPE latency histogram",
+        'latency_bucket{le="0.1"} 1',
+        'latency_bucket{le="1"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        "latency_count 4",
+        "latency_sum 4.05",
+        "# EOF",
+    ]
+
+
+def test_label_values_are_escaped():
+    reg = MetricsRegistry()
+    reg.counter("runs", "Runs.", ("name",)).labels('a"b\\c\n').inc()
+    assert 'runs_total{name="a\\"b\\\\c\\n"} 1' in reg.render()
+
+
+def test_conflicting_registrations_are_rejected():
+    reg = MetricsRegistry()
+    family = reg.counter("steps", "Steps taken.")
+    assert reg.counter("steps", "Steps taken.") is family
+    with pytest.raises(ValueError):
+        reg.gauge("steps", "Steps taken.")
+    with pytest.raises(ValueError):
+        reg.counter("runs", "Runs.", ("algo",)).labels("a", "b")
+
+
+def test_snapshots_of_worker_processes_add_up(tmp_path):
+    for name in ("1", "2"):
+        path = tmp_path / f"metrics-{name}.json"
+        path.write_text(json.dumps(build_registry().snapshot()))
+    (tmp_path / "metrics-3.json").write_text("{not json")
+    merged = aggregate_snapshots(tmp_path).render()
+    assert "steps_total 6" in merged
+    assert 'rate{algo="DWA"} 5' in merged
+    assert 'latency_bucket{le="1"} 6' in merged
+    assert "latency_sum 8.1" in merged
+
+    path = write_snapshot(tmp_path / "snapshots", build_registry())
+    assert json.loads(path.read_text()) == build_registry().snapshot()
+
+
+def test_exporter_writes_and_serves_the_registry(tmp_path):
+    reg = build_registry()
+    path = tmp_path / "metrics.txt"
+    exporter = MetricsExporter(path=path, port=0, interval=3600.0, reg=reg)
+    try:
+        exporter.maybe_flush()
+        assert not path.exists()
+        port = exporter.server.server_address[1]
+        url = f"http://127.0.0.1:{port}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"].startswith(
+                "application/openmetrics-text"
+            )
+            assert response.read().decode() == reg.render()
+    finally:
+        exporter.close()
+    assert exporter.server is None
+    assert path.read_text() == reg.render()
+
+
+def test_run_closes_the_exporter_when_the_run_fails(tmp_path, monkeypatch):
+    closed = []
+
+    class Exporter(MetricsExporter):
+        def close(self):
+            closed.append(True)
+            super().close()
+
+    class Sim:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def run(self):
+            raise RuntimeError("The run failed.")
+
+    monkeypatch.setattr(run, "MetricsExporter", Exporter)
+    monkeypatch.setattr(run, "Sim", Sim)
+    path = tmp_path / "metrics.txt"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["robo_sim", "--metrics", str(path), "--metrics-port", "0"],
+    )
+    with pytest.raises(RuntimeError):
+        run.main()
+    assert closed == [True]
+    assert path.read_text().endswith("# EOF\n")
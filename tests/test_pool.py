@@ -0,0 +1,65 @@
+import logging
+import random
+
+import pytest
+
+from robo_sim.config import EnvConfig
+from robo_sim.pool import Episode, WarmPool, WorkerState
+
+
+def obstacle_cells(env):
+    return sorted((o.pos.x, o.pos.y) for o in env.obstacles)
+
+
+def test_seeded_env_leaves_global_random_alone():
+    config = EnvConfig(size=(20, 20), obstacles=30)
+    random.seed(123)
+    expected = random.random()
+
+    random.seed(123)
+    first = WorkerState().env(("a",), config, seed=7)
+    assert random.random() == expected
+
+    second = WorkerState().env(("a",), config, seed=7)
+    assert obstacle_cells(first) == obstacle_cells(second)
+    other = WorkerState().env(("a",), config, seed=8)
+    assert obstacle_cells(first) != obstacle_cells(other)
+
+
+@pytest.fixture
+def episodes(tmp_path):
+    (tmp_path / "env.yaml").write_text(
+        "size: [20, 20]\nobstacles: 30\ntarget_pos: [16, 16]\n"
+        "max_frames: 40\n"
+    )
+    (tmp_path / "robot.yaml").write_text("start_pos: [1, 1]\n")
+    (tmp_path / "algorithm.yaml").write_text("name: DStarLite\n")
+    return [
+        Episode(
+            tmp_path / "env.yaml",
+            tmp_path / "robot.yaml",
+            tmp_path / "algorithm.yaml",
+            seed=seed % 2,
+        )
+        for seed in range(4)
+    ]
+
+
+def test_workers_match_in_process_runs(episodes):
+    logger = logging.getLogger("robo_sim.sim")
+    level = logger.level
+    with WarmPool(workers=1) as pool:
+        expected = [
+            (stats.steps_taken, stats.path_length, stats.reached)
+            for stats in pool.run(episodes)
+        ]
+        # Running in-process leaves the caller's logging alone.
+        assert logger.level == level
+        # The second run of a map reuses the environment built for it.
+        assert len(pool.state.envs) == 2
+    with WarmPool(workers=2) as pool:
+        stats = list(pool.run(episodes, batch_size=3))
+    assert [
+        (stats.steps_taken, stats.path_length, stats.reached)
+        for stats in stats
+    ] == expected
@@ -0,0 +1,113 @@
+import random
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from robo_sim.components.recorder import (
+    FFmpegWriter,
+    FrameRecorder,
+    FrameWriter,
+    GifWriter,
+    get_frame_writer,
+)
+from robo_sim.config import DStarLiteConfig, EnvConfig, RobotConfig
+from robo_sim.sim import Sim
+
+
+def frame(value, width=8, height=6):
+    return np.full((height, width, 4), value, dtype=np.uint8)
+
+
+def test_writer_follows_suffix(tmp_path):
+    assert isinstance(get_frame_writer(tmp_path / "a.GIF", 10), GifWriter)
+    assert isinstance(get_frame_writer(tmp_path / "a.mp4", 10), FFmpegWriter)
+
+
+def test_gif_frames_are_streamed_to_disk(tmp_path):
+    path = tmp_path / "out.gif"
+    writer = GifWriter(path, fps=20)
+    writer.open(8, 6)
+    sizes = []
+    for value in (0, 120, 255):
+        writer.write(frame(value))
+        writer.file.flush()
+        sizes.append(path.stat().st_size)
+    writer.close()
+
+    # Every frame reaches the file when it is written, not at close.
+    assert sizes[0] > 0 and sizes[0] < sizes[1] < sizes[2]
+    with Image.open(path) as gif:
+        assert gif.n_frames == 3
+        assert gif.size == (8, 6)
+        assert gif.info["duration"] == 50
+        values = []
+        for index in range(3):
+            gif.seek(index)
+            values.append(np.asarray(gif.convert("RGB"))[0, 0, 0])
+    assert values == pytest.approx([0, 120, 255], abs=2)
+
+
+def test_empty_gif_leaves_no_file(tmp_path):
+    path = tmp_path / "out.gif"
+    writer = GifWriter(path, fps=10)
+    writer.open(8, 6)
+    writer.close()
+    assert not path.exists()
+
+
+class ListWriter(FrameWriter):
+    def open(self, width, height):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame[0, 0, 0])
+
+    def close(self):
+        pass
+
+
+class FailingWriter(ListWriter):
+    def write(self, frame):
+        raise OSError("disk full")
+
+
+def test_recorder_writes_frames_in_order(tmp_path):
+    writer = ListWriter(tmp_path / "out", 10)
+    recorder = FrameRecorder(writer, max_queued_frames=2)
+    recorder.open(8, 6)
+    for value in range(20):
+        recorder.submit(frame(value))
+    recorder.close()
+    assert writer.frames == list(range(20))
+    assert recorder.frames_written == 20
+
+
+def test_recorder_reports_writer_failure(tmp_path):
+    recorder = FrameRecorder(FailingWriter(tmp_path / "out", 10), 2)
+    recorder.open(8, 6)
+    # Failed frames are drained, so submitting more never blocks.
+    for value in range(5):
+        try:
+            recorder.submit(frame(value))
+        except RuntimeError:
+            break
+    with pytest.raises(RuntimeError, match="Frame writer failed"):
+        recorder.close()
+
+
+def test_headless_run_records_every_frame(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    random.seed(0)
+    path = tmp_path / "run.gif"
+    sim = Sim.from_configs(
+        EnvConfig(size=(20, 20), obstacles=10, max_frames=15),
+        RobotConfig(),
+        DStarLiteConfig(),
+        headless=True,
+        record_path=path,
+    )
+    sim.run()
+    with Image.open(path) as gif:
+        assert gif.n_frames == sim.renderer.recorder.frames_written
+    assert gif.n_frames > 1
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from robo_sim.components import Env
+from robo_sim.components.recorder import FrameRecorder, GifWriter
+from robo_sim.components.renderer import Renderer
+from robo_sim.components.trajectory import FrameState
+from robo_sim.components.world import (
+    TiledWorld,
+    grid_strips,
+    write_tiled_world,
+)
+from robo_sim.geometry import AABB, Circle, OrientedBox
+from robo_sim.utils import Position
+
+
+def world_grid(size=(60, 40), resolution=2):
+    rows, cols = size[1] * resolution + 1, size[0] * resolution + 1
+    grid = np.random.default_rng(0).random((rows, cols)) > 0.97
+    grid[10:30, 40:70] = True
+    return grid
+
+
+def tiled_world(path, size=(60, 40), resolution=2, tile_size=16):
+    grid = world_grid(size, resolution)
+    write_tiled_world(
+        path, size, resolution, grid_strips(grid, tile_size), tile_size
+    )
+    return TiledWorld(path, max_tiles=4)
+
+
+def full_grid(resolution, static_only=False):
+    """Reference grid of `build_env` on the tiled world, from the world's
+    grid, which has twice the resolution, and the obstacles alone."""
+    step = 2 // resolution
+    objects = build_env().occupancy_grid(resolution, static_only)
+    return world_grid()[::step, ::step] | objects
+
+
+def build_env(world=None):
+    env = Env(size=(60, 40), world=world)
+    env.add_object("obstacle", Position(5, 5))
+    env.add_object("obstacle", Position(20.3, 12.7), Circle(2.4))
+    env.add_object("obstacle", Position(40, 30), AABB(3.5, 1.25))
+    env.add_object("obstacle", Position(33, 8), OrientedBox(2, 1, 0.6))
+    env.add_dynamic_obstacle(Position(50, 20), None, Circle(1.5))
+    return env
+
+
+@pytest.mark.parametrize("static_only", [False, True])
+@pytest.mark.parametrize("resolution", [1, 2])
+@pytest.mark.parametrize(
+    "rows, cols",
+    [
+        (slice(None), slice(None)),
+        (slice(7, 52), slice(13, 96)),
+        (slice(3, None, 3), slice(None, 90, 4)),
+    ],
+)
+def test_window_matches_full_grid(
+    tmp_path, static_only, resolution, rows, cols
+):
+    env = build_env(tiled_world(tmp_path))
+    window = env.occupancy_window(rows, cols, resolution, static_only)
+    grid = full_grid(resolution, static_only)
+    np.testing.assert_array_equal(window, grid[rows, cols])
+
+
+def test_window_rejects_reversed_slices():
+    with pytest.raises(ValueError):
+        build_env().occupancy_window(slice(None, None, -1), slice(None))
+
+
+def offscreen(env, path, **kwargs):
+    """Renderer drawing on an Agg canvas, which needs no display."""
+    recorder = FrameRecorder(GifWriter(path / "frames.gif", 10))
+    return Renderer(env, recorder=recorder, large_map=True, **kwargs)
+
+
+def frame_state(pos=Position(10, 10)):
+    return FrameState(
+        frame=0,
+        robot_pos=pos,
+        robot_radius=0.5,
+        orientation=0.0,
+        target=Position(55, 35),
+        reached=False,
+        done=False,
+    )
+
+
+def test_large_map_rasters_only_the_view(tmp_path):
+    env = build_env(tiled_world(tmp_path))
+    renderer = offscreen(env, tmp_path, raster_resolution=2)
+    renderer.render(frame_state())
+    image = renderer.lod_artists["obstacles"].get_array()
+    assert image.shape[0] <= renderer.ax.bbox.height
+    assert image.shape[1] <= renderer.ax.bbox.width
+
+    # Zooming in rasters the new view at full resolution.
+    renderer.ax.set_xlim(10, 20)
+    renderer.ax.set_ylim(5, 15)
+    renderer.render(frame_state())
+    image = renderer.lod_artists["obstacles"].get_array()
+    expected = full_grid(2, static_only=True)
+    np.testing.assert_array_equal(~image.mask, expected[10:31, 20:41])
+    assert renderer.ax.get_xlim() == (10, 20)
+
+
+def test_traced_path_keeps_one_vertex_per_pixel(tmp_path):
+    renderer = offscreen(build_env(), tmp_path, trace_path=True)
+    x_min, x_max = renderer.ax.get_xlim()
+    px = (x_max - x_min) / renderer.ax.bbox.width
+    for x in np.linspace(1, 2, 200):
+        path_x, path_y = renderer.decimated_path(Position(x, 1.0))
+    assert len(path_x) <= 1 / px + 3
+    assert (path_x[-1], path_y[-1]) == (2.0, 1.0)
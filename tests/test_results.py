@@ -0,0 +1,135 @@
+from dataclasses import replace
+
+import pytest
+
+from robo_sim.components.summarizer import SimStats
+from robo_sim.config import DStarLiteConfig, EnvConfig, RobotConfig
+from robo_sim.pool import Episode, EpisodeRunner, WarmPool
+from robo_sim.results import EpisodeResult, ResultsStore, config_hash
+
+
+def stats(steps):
+    return SimStats(0.1, steps, 2.0, None, path_length=3.0, reached=True)
+
+
+def result(key, seed, steps=5, **params):
+    return EpisodeResult(
+        config_hash=key,
+        seed=seed,
+        scenario="env.yaml",
+        algorithm="DStarLite",
+        stats=stats(steps),
+        params={"algorithm": params},
+    )
+
+
+def test_equal_configs_share_a_hash():
+    key = config_hash(
+        EnvConfig(size=(20, 20), obstacles=10),
+        RobotConfig(start_pos=(1, 1)),
+        DStarLiteConfig(),
+    )
+    assert key == config_hash(
+        EnvConfig(obstacles=10, size=[20, 20]),
+        RobotConfig(start_pos=[1, 1]),
+        DStarLiteConfig(),
+    )
+    assert key != config_hash(
+        EnvConfig(size=(20, 20), obstacles=11),
+        RobotConfig(start_pos=(1, 1)),
+        DStarLiteConfig(),
+    )
+
+
+def test_store_keeps_one_result_per_pair(tmp_path):
+    path = tmp_path / "results.db"
+    with ResultsStore(path, batch_size=3) as store:
+        store.add(result("a", 0, num_samples=10))
+        store.add(result("a", None))
+        assert store.completed() == {("a", 0), ("a", None)}
+        # Nothing is written before a batch is full.
+        assert not store.conn.execute("SELECT * FROM episodes").fetchall()
+        store.add(result("b", 0, num_samples=20))
+        assert not store.pending
+        store.add(result("a", 0, steps=9, num_samples=10))
+        store.add(result("a", None, steps=9))
+    with ResultsStore(path) as store:
+        assert len(store) == 3
+        steps = {
+            (r.config_hash, r.seed): r.stats.steps_taken
+            for r in store.results()
+        }
+        assert steps == {("a", 0): 9, ("a", None): 9, ("b", 0): 5}
+        matched = list(store.results(params={"algorithm.num_samples": 20}))
+        assert [r.config_hash for r in matched] == ["b"]
+        assert store.aggregate(algorithm="DStarLite").to_dict()
+
+
+class RecordingRunner(EpisodeRunner):
+    """Runs nothing, and fails after `fail_after` episodes if set."""
+
+    def __init__(self, fail_after=None):
+        self.ran = []
+        self.fail_after = fail_after
+
+    def run(self, episodes, batch_size=8):
+        for episode in episodes:
+            if len(self.ran) == self.fail_after:
+                raise RuntimeError("The sweep was interrupted.")
+            self.ran.append((episode.seed, episode.algorithm_overrides))
+            yield stats(len(self.ran))
+
+
+@pytest.fixture
+def episodes(tmp_path):
+    (tmp_path / "env.yaml").write_text(
+        "size: [20, 20]\nobstacles: 30\ntarget_pos: [16, 16]\n"
+        "max_frames: 40\n"
+    )
+    (tmp_path / "robot.yaml").write_text("start_pos: [1, 1]\n")
+    (tmp_path / "algorithm.yaml").write_text("name: DStarLite\n")
+    return [
+        Episode(
+            tmp_path / "env.yaml",
+            tmp_path / "robot.yaml",
+            tmp_path / "algorithm.yaml",
+            algorithm_overrides=overrides,
+            seed=seed,
+        )
+        for overrides in ({}, {"tile_size": 8})
+        for seed in range(3)
+    ]
+
+
+def test_resumed_sweeps_skip_only_stored_episodes(tmp_path, episodes):
+    path = tmp_path / "results.db"
+    runner = RecordingRunner(fail_after=4)
+    with ResultsStore(path, batch_size=2) as store:
+        with pytest.raises(RuntimeError):
+            runner.sweep(episodes, store)
+    with ResultsStore(path) as store:
+        # What finished before the interruption was kept.
+        assert len(store) == 4
+        runner = RecordingRunner()
+        assert runner.sweep(episodes, store) == 2
+        weighted = {"tile_size": 8}
+        assert runner.ran == [(1, weighted), (2, weighted)]
+        assert len(store) == 6
+        # Repeated episodes run once.
+        runner = RecordingRunner()
+        assert runner.sweep(episodes + episodes, store) == 0
+        extra = replace(episodes[0], seed=3)
+        assert runner.sweep([*episodes, extra, extra], store) == 1
+        assert runner.ran == [(3, {})]
+
+
+def test_sweep_stores_what_the_pool_runs(tmp_path, episodes):
+    with WarmPool(workers=1) as pool:
+        expected = [s.steps_taken for s in pool.run(episodes[:3])]
+        with ResultsStore(tmp_path / "results.db") as store:
+            assert pool.sweep(episodes[:3], store) == 3
+            stored = sorted(store.results(), key=lambda r: r.seed)
+    assert [r.stats.steps_taken for r in stored] == expected
+    assert [r.seed for r in stored] == [0, 1, 2]
+    assert {r.algorithm for r in stored} == {"DStarLite"}
+    assert stored[0].params == {"env": {}, "robot": {}, "algorithm": {}}
@@ -0,0 +1,127 @@
+import math
+
+import numpy as np
+import pytest
+
+from robo_sim.algorithms.path_planning.prm import PRM
+from robo_sim.algorithms.path_planning.rrtstar import RRTStar
+from robo_sim.components import Env
+from robo_sim.components.env_objects import Target
+from robo_sim.components.robot import Robot
+from robo_sim.config import PRMConfig, RRTStarConfig
+from robo_sim.geometry import AABB, Circle, KDTree
+from robo_sim.utils import Position
+
+START = Position(2, 2)
+GOAL = Position(27, 27)
+
+
+def build_env():
+    # Two staggered walls, so no path runs straight to the goal.
+    env = Env(size=(30, 30))
+    env.add_object("obstacle", Position(11, 10), AABB(11, 0.5))
+    env.add_object("obstacle", Position(19, 20), AABB(11, 0.5))
+    env.add_object("obstacle", Position(24, 8), Circle(2))
+    env.add_object("obstacle", Position(6, 24), Circle(2))
+    return env
+
+
+def planner(cls, env, params):
+    robot = Robot(START, 1.0, 0.0, 0.0)
+    return cls(env, robot, START, Target(GOAL), params)
+
+
+def assert_collision_free(env, path, radius):
+    points = np.array([(pos.x, pos.y) for pos in path])
+    assert not env.points_in_collision(points, radius).any()
+    assert env.segments_collision_free(points[:-1], points[1:], radius).all()
+
+
+@pytest.mark.parametrize("leaf_size", [4, 32])
+def test_kdtree_matches_brute_force(leaf_size):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 50, (3000, 2))
+    # Repeated points must not keep a leaf splitting forever.
+    points[100:200] = points[100]
+    tree = KDTree(leaf_size=leaf_size, capacity=16)
+    for x, y in points:
+        tree.insert(x, y)
+    np.testing.assert_array_equal(tree.points[: len(tree)], points)
+    for x, y in rng.uniform(-5, 55, (200, 2)):
+        dists = np.hypot(points[:, 0] - x, points[:, 1] - y)
+        nearest, _ = tree.nearest(x, y)
+        assert dists[nearest] == dists.min()
+        np.testing.assert_array_equal(
+            np.sort(tree.within(x, y, 4.0)), np.flatnonzero(dists <= 4.0)
+        )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rrt_star_path_reaches_the_goal_without_collisions(seed):
+    env = build_env()
+    rrt = planner(RRTStar, env, RRTStarConfig(seed=seed, max_nodes=3000))
+    path = rrt.plan()
+    assert path is not None
+    assert (path[0].x, path[0].y) == (START.x, START.y)
+    assert (path[-1].x, path[-1].y) == (GOAL.x, GOAL.y)
+    assert_collision_free(env, path, rrt.robot.radius)
+
+    # Rewiring keeps every node's cost that of its path to the root.
+    size = len(rrt.tree)
+    points = rrt.tree.points[:size]
+    parents = rrt.parents[:size]
+    lengths = np.hypot(*(points[1:] - points[parents[1:]]).T)
+    np.testing.assert_allclose(
+        rrt.costs[1:size], rrt.costs[parents[1:]] + lengths
+    )
+
+
+def test_rrt_star_path_improves_with_more_nodes():
+    costs = []
+    for max_nodes in (3000, 6000):
+        rrt = planner(
+            RRTStar, build_env(), RRTStarConfig(seed=1, max_nodes=max_nodes)
+        )
+        path = rrt.plan()
+        assert path is not None
+        costs.append(
+            sum(
+                math.hypot(b.x - a.x, b.y - a.y)
+                for a, b in zip(path, path[1:])
+            )
+        )
+    assert costs[1] <= costs[0]
+
+
+def test_prm_path_reaches_the_goal_without_collisions():
+    env = build_env()
+    prm = planner(PRM, env, PRMConfig(num_samples=1500))
+    path = prm.plan()
+    assert path is not None
+    assert (path[0].x, path[0].y) == (START.x, START.y)
+    assert (path[-1].x, path[-1].y) == (GOAL.x, GOAL.y)
+    assert_collision_free(env, path, prm.robot.radius)
+    nodes, edges = prm.roadmap.nodes, prm.roadmap.edges
+    assert env.segments_collision_free(
+        nodes[edges[:, 0]], nodes[edges[:, 1]], prm.robot.radius
+    ).all()
+
+
+def test_prm_roadmap_is_cached_per_map(tmp_path, monkeypatch):
+    params = PRMConfig(num_samples=500, cache_dir=tmp_path)
+    first = planner(PRM, build_env(), params)
+    first.plan()
+
+    def rebuild(self):
+        raise AssertionError("The roadmap was rebuilt.")
+
+    monkeypatch.setattr(PRM, "build_roadmap", rebuild)
+    second = planner(PRM, build_env(), params)
+    second.plan()
+    np.testing.assert_array_equal(second.roadmap.edges, first.roadmap.edges)
+
+    # A different map needs its own roadmap.
+    env = build_env()
+    env.add_object("obstacle", Position(15, 15))
+    with pytest.raises(AssertionError, match="rebuilt"):
+        planner(PRM, env, params).plan()
@@ -0,0 +1,105 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from robo_sim.config import ScenarioConfig
+from robo_sim.scenarios import ensure_connected, get_generator
+from robo_sim.scenarios.connectivity import is_connected, label_components
+from robo_sim.scenarios.suite import (
+    KINDS,
+    ScenarioSuite,
+    endpoints,
+    generate_scenario,
+    generate_suite,
+)
+
+
+@pytest.mark.parametrize("size", [(30, 30), (31, 31), (64, 48)])
+@pytest.mark.parametrize("corridor_width", [1, 2, 3])
+def test_maze_endpoints_need_no_carving(size, corridor_width):
+    config = ScenarioConfig(
+        kind="maze", size=size, corridor_width=corridor_width
+    )
+    start, target = endpoints(config)
+    for seed in range(5):
+        grid = get_generator("maze")(config, np.random.default_rng(seed))
+        assert not ensure_connected(grid, start, target)
+
+
+@pytest.mark.parametrize("density", [0.2, 0.5, 0.8])
+def test_corridors_carve_one_minus_density(density):
+    config = ScenarioConfig(kind="corridors", size=(64, 64), density=density)
+    generate = get_generator("corridors")
+    free = [
+        1 - generate(config, np.random.default_rng(seed)).mean()
+        for seed in range(10)
+    ]
+    assert np.mean(free) == pytest.approx(1 - density, abs=0.05)
+
+
+def bfs_components(free):
+    """Reference labels from one breadth-first search per component."""
+    labels = np.zeros(free.shape, dtype=int)
+    rows, cols = free.shape
+    count = 0
+    for start in zip(*np.nonzero(free)):
+        if labels[start]:
+            continue
+        count += 1
+        labels[start] = count
+        queue = deque([start])
+        while queue:
+            i, j = queue.popleft()
+            for n in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+                if (
+                    0 <= n[0] < rows
+                    and 0 <= n[1] < cols
+                    and free[n]
+                    and not labels[n]
+                ):
+                    labels[n] = count
+                    queue.append(n)
+    return labels
+
+
+@pytest.mark.parametrize("density", [0.3, 0.45, 0.6])
+def test_label_components_matches_bfs(density):
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        free = rng.random((23, 31)) > density
+        labels = label_components(free)
+        expected = bfs_components(free)
+        assert ((labels == 0) == ~free).all()
+        # Same partition of the free cells, whatever the label values.
+        pairs = np.unique(np.stack((labels[free], expected[free])), axis=1)
+        assert len(np.unique(pairs[0])) == pairs.shape[1]
+        assert len(np.unique(pairs[1])) == pairs.shape[1]
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_every_scenario_connects_its_endpoints(kind):
+    config = ScenarioConfig(kind=kind, size=(32, 24), density=0.45)
+    for seed in range(5):
+        scenario = generate_scenario(config, seed)
+        assert scenario.grid.shape == (24, 32)
+        assert is_connected(scenario.grid, scenario.start, scenario.target)
+
+
+def test_suite_does_not_depend_on_workers(tmp_path):
+    config = ScenarioConfig(kind="rooms", size=(20, 16), seed=7)
+    serial = generate_suite(config, 9, workers=1, batch_size=4)
+    parallel = generate_suite(config, 9, workers=2, batch_size=2)
+    np.testing.assert_array_equal(serial.packed, parallel.packed)
+
+    path = tmp_path / "suite.npz"
+    serial.save(path)
+    loaded = ScenarioSuite.load(path)
+    assert len(loaded) == 9
+    for idx in (0, 8):
+        expected = generate_scenario(config, config.seed + idx)
+        scenario = loaded[idx]
+        assert (scenario.kind, scenario.seed) == ("rooms", 7 + idx)
+        np.testing.assert_array_equal(scenario.grid, expected.grid)
+        assert scenario.start == expected.start
+        assert scenario.target == expected.target
@@ -0,0 +1,316 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from robo_sim.components import Env, get_robot, sensors
+from robo_sim.components.robot import SensorRobot
+from robo_sim.components.sensors import (
+    BasicProximitySensor,
+    BumpSensor,
+    GPSSensor,
+    LidarSensor,
+    RaySensor,
+    SensingPipeline,
+    SonarSensor,
+    run_probes,
+)
+from robo_sim.config import (
+    BumpSensorConfig,
+    GPSSensorConfig,
+    LidarSensorConfig,
+    SensorRobotConfig,
+    SonarSensorConfig,
+)
+from robo_sim.geometry import AABB, Circle
+from robo_sim.utils import Position
+
+
+def build_env(seed=0):
+    env = Env(size=(25, 25), obstacles=60, rng=random.Random(seed))
+    env.add_object("obstacle", Position(12.5, 6.2), Circle(1.7))
+    env.add_object("obstacle", Position(7.3, 17.1), AABB(2.5, 0.4))
+    return env
+
+
+def reference_readings(env, pos, sensor_range, granularity, radius):
+    """The per-angle scalar sensor the vectorized one replaced."""
+    readings = []
+    for angle in range(0, 360, granularity):
+        rad = math.radians(angle)
+        reading = float(sensor_range)
+        for r in range(1, sensor_range + 1):
+            dx = int(r * math.cos(rad))
+            dy = int(r * math.sin(rad))
+            check = pos + (dx, dy)
+            if not env.is_within_bounds(check) or env.is_obstacle_in_range(
+                check, radius
+            ):
+                reading = math.sqrt(dx**2 + dy**2)
+                break
+        readings.append(reading)
+    return np.array(readings)
+
+
+def poses(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        Position(rng.uniform(0, 25), rng.uniform(0, 25)) for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("granularity", [5, 45, 7])
+@pytest.mark.parametrize("sensor_range", [1, 6])
+def test_readings_match_the_scalar_sensor(granularity, sensor_range):
+    env = build_env()
+    sensor = BasicProximitySensor(sensor_range, granularity)
+    for pos in poses(40):
+        np.testing.assert_allclose(
+            sensor.sense(env, pos, 0.3),
+            reference_readings(env, pos, sensor_range, granularity, 0.3),
+        )
+
+
+@pytest.mark.parametrize("early_exit", [False, True])
+def test_best_beam_is_the_first_longest_reading(early_exit):
+    env = build_env(1)
+    sensor = BasicProximitySensor(6, 5, early_exit=early_exit)
+    for pos in poses(60, seed=1):
+        expected = reference_readings(env, pos, 6, 5, 0.3)
+        beam = sensor.best_beam(env, pos, 0.3)
+        # `max` over the old dict of readings picked the first longest.
+        assert beam == int(expected.argmax())
+
+
+def test_beam_tables_are_shared_and_read_only():
+    a = BasicProximitySensor(6, 5)
+    b = BasicProximitySensor(6, 5)
+    assert a.table is b.table
+    assert BasicProximitySensor(6, 10).table is not a.table
+    with pytest.raises(ValueError):
+        a.table.offsets[0, 0, 0] = 1.0
+
+
+def test_decide_move_heads_along_the_longest_beam():
+    env = build_env(2)
+    for pos in poses(30, seed=2):
+        robot = SensorRobot(pos, 0.5, 0.0, 0.0, BasicProximitySensor(6, 10))
+        expected = reference_readings(env, pos, 6, 10, robot.radius)
+        rad = math.radians(10 * int(expected.argmax()))
+        target = robot.decide_move(env)
+        assert target.x == pytest.approx(pos.x + 0.5 * math.cos(rad))
+        assert target.y == pytest.approx(pos.y + 0.5 * math.sin(rad))
+
+
+def test_readings_reuse_one_array():
+    env = build_env()
+    sensor = BasicProximitySensor(6, 5)
+    first = sensor.sense(env, Position(3, 3), 0.3)
+    second = sensor.sense(env, Position(20, 20), 0.3)
+    assert first is second
+
+
+def ray_entries(pos, angles, centers, radii, min_chord=0.0):
+    """Distance along each ray to where it first enters any of the circles
+    for a chord of at least `min_chord`, computed exactly."""
+    rad = np.radians(angles)[:, None]
+    dx, dy = np.cos(rad), np.sin(rad)
+    ox, oy = centers[:, 0] - pos.x, centers[:, 1] - pos.y
+    along = dx * ox + dy * oy
+    half = np.sqrt(np.maximum(radii**2 - (ox**2 + oy**2) + along**2, 0))
+    crosses = (radii**2 - (ox**2 + oy**2) + along**2 > 0) & (
+        2 * half >= min_chord
+    )
+    entries = np.where(crosses & (along + half > 0), along - half, np.inf)
+    return entries.min(axis=1)
+
+
+def wall_exits(pos, angles, size, wall):
+    """Distance along each ray to where it leaves the map grown by
+    `wall`."""
+    rad = np.radians(angles)
+    exits = np.full(len(angles), np.inf)
+    for start, direction, limit in (
+        (pos.x, np.cos(rad), size[0]),
+        (pos.y, np.sin(rad), size[1]),
+    ):
+        with np.errstate(divide="ignore"):
+            exits = np.minimum(
+                exits,
+                np.where(
+                    direction > 0,
+                    (limit + wall - start) / direction,
+                    np.where(
+                        direction < 0, (-wall - start) / direction, np.inf
+                    ),
+                ),
+            )
+    return exits
+
+
+@pytest.mark.parametrize("resolution", [2, 4])
+def test_lidar_readings_bracket_the_true_ranges(resolution):
+    rng = np.random.default_rng(resolution)
+    centers = rng.uniform(2, 23, (25, 2))
+    radii = rng.uniform(0.5, 2, 25)
+    env = Env(size=(25, 25))
+    for (x, y), radius in zip(centers, radii):
+        env.add_object("obstacle", Position(x, y), Circle(radius))
+    lidar = LidarSensor(num_beams=1000, max_range=8.0, resolution=resolution)
+    # A cell is occupied when an obstacle covers its center, which is at
+    # most half a diagonal from any point of the cell, and cells end half
+    # a cell beyond the map.
+    slack = math.sqrt(0.5) / resolution
+    spacing = 0.5 / resolution
+    errors = []
+    for pos in poses(20, seed=3):
+        if env.points_in_collision(np.array([[pos.x, pos.y]]), slack)[0]:
+            continue
+        readings = lidar.sense(env, pos, 0.3, orientation=30.0)
+        assert readings.shape == (1000,)
+        angles = lidar.ray_angles + 30.0
+        # No sample is blocked before the ray comes within `slack` of an
+        # obstacle or leaves the map, and some sample is blocked once the
+        # ray runs deeper than `slack` into an obstacle, or off the grid,
+        # for a sample step.
+        earliest = np.minimum(
+            ray_entries(pos, angles, centers, radii + slack),
+            wall_exits(pos, angles, env.size, 0.0),
+        )
+        latest = np.minimum(
+            ray_entries(pos, angles, centers, radii - slack, spacing),
+            wall_exits(pos, angles, env.size, spacing),
+        )
+        assert (readings >= np.minimum(earliest, 8.0)).all()
+        assert (readings <= np.minimum(latest + spacing, 8.0)).all()
+        exact = np.minimum(
+            ray_entries(pos, angles, centers, radii),
+            wall_exits(pos, angles, env.size, 0.0),
+        )
+        errors.append(np.abs(readings - np.minimum(exact, 8.0)))
+    assert np.median(np.concatenate(errors)) <= 2 * spacing
+
+
+def test_sonar_cones_read_their_nearest_ray():
+    env = build_env()
+    sonar = SonarSensor(num_cones=6, cone_width=40, rays_per_cone=7)
+    rays = RaySensor(sonar.ray_angles, sonar.max_range, sonar.resolution)
+    for pos in poses(20, seed=4):
+        cones = sonar.sense(env, pos, 0.3, orientation=15.0)
+        expected = rays.sense(env, pos, 0.3, orientation=15.0)
+        np.testing.assert_array_equal(cones, expected.reshape(6, 7).min(1))
+
+
+def test_bump_sectors_press_toward_contacts():
+    env = Env(size=(10, 10))
+    env.add_object("obstacle", Position(5, 5), Circle(1))
+    bump = BumpSensor(num_sectors=4, margin=0.05)
+    # Just short of the obstacle on the robot's right, heading along +y.
+    pressed = bump.sense(env, Position(3.67, 5), 0.3, orientation=90.0)
+    np.testing.assert_array_equal(pressed, [False, False, False, True])
+    pressed = bump.sense(env, Position(2, 8), 0.3, orientation=90.0)
+    assert not pressed.any()
+    # The walls press too.
+    pressed = bump.sense(env, Position(9.7, 2), 0.3, orientation=0.0)
+    np.testing.assert_array_equal(pressed, [True, False, False, False])
+
+
+def test_gps_noise_comes_from_the_robot_generator():
+    env = build_env()
+    pos = Position(10, 10)
+    fixes = [
+        GPSSensor(0.5).sense(env, pos, 0.3, rng=np.random.default_rng(7))
+        for _ in range(2)
+    ]
+    assert (fixes[0].x, fixes[0].y) == (fixes[1].x, fixes[1].y)
+    exact = GPSSensor(0.0).sense(env, pos, 0.3)
+    assert (exact.x, exact.y) == (10, 10)
+
+    rng = np.random.default_rng(8)
+    gps = GPSSensor(0.5)
+    errors = np.array(
+        [
+            (fix.x - 10, fix.y - 10)
+            for fix in (gps.sense(env, pos, 0.3, rng=rng) for _ in range(4000))
+        ]
+    )
+    np.testing.assert_allclose(errors.std(axis=0), 0.5, rtol=0.1)
+    np.testing.assert_allclose(errors.mean(axis=0), 0.0, atol=0.05)
+
+
+def mounted_sensors():
+    return [
+        BasicProximitySensor(6, 10),
+        LidarSensor(num_beams=360, max_range=6.0),
+        SonarSensor(),
+        BumpSensor(period=2),
+        GPSSensor(0.0, period=3),
+    ]
+
+
+def test_pipeline_shares_one_query_per_probe_kind(monkeypatch):
+    env = build_env()
+    calls = []
+
+    def counted(env, key, points):
+        calls.append(key[0])
+        return run_probes(env, key, points)
+
+    monkeypatch.setattr(sensors, "run_probes", counted)
+    pipeline = SensingPipeline(mounted_sensors(), np.random.default_rng(0))
+    pos = Position(11, 9)
+    readings = pipeline.step(env, pos, 20.0, 0.3)
+    assert sorted(calls) == ["disc", "grid"]
+
+    # Each sensor reads what it would on its own.
+    monkeypatch.setattr(sensors, "run_probes", run_probes)
+    for sensor, reading in zip(mounted_sensors(), readings.values()):
+        expected = sensor.sense(env, pos, 0.3, orientation=20.0)
+        if isinstance(expected, Position):
+            assert (reading.x, reading.y) == (expected.x, expected.y)
+        else:
+            np.testing.assert_array_equal(reading, expected)
+
+
+def test_sensors_update_at_their_own_rates():
+    env = build_env()
+    mounted = mounted_sensors()
+    pipeline = SensingPipeline(mounted, np.random.default_rng(0))
+    for step in range(7):
+        pipeline.step(env, Position(3 + step, 9), 0.0, 0.3)
+    counts = [sensor.sensor_readings_count for sensor in mounted]
+    assert counts == [36 * 7, 360 * 7, 8 * 7, 4 * 4, 1 * 3]
+    gps = pipeline.step(env, Position(20, 20), 0.0, 0.3)["GPSSensor"]
+    # Step 7 is not due for the GPS, which keeps its step 6 fix.
+    assert (gps.x, gps.y) == (9, 9)
+
+
+def test_sensor_names_must_be_unique():
+    with pytest.raises(ValueError):
+        SensingPipeline([GPSSensor(), GPSSensor()], np.random.default_rng())
+    SensingPipeline(
+        [GPSSensor(), GPSSensor(name="backup")], np.random.default_rng()
+    )
+
+
+def test_robot_mounts_the_configured_sensors():
+    config = SensorRobotConfig(
+        sensors=[
+            LidarSensorConfig(num_beams=1200),
+            SonarSensorConfig(),
+            BumpSensorConfig(),
+            GPSSensorConfig(name="gps", period=4),
+        ],
+        seed=5,
+    )
+    robot = get_robot(config).create()
+    observations = robot.sense(build_env())
+    assert list(observations) == [
+        "BasicProximitySensor",
+        "LidarSensor",
+        "SonarSensor",
+        "BumpSensor",
+        "gps",
+    ]
+    assert observations["LidarSensor"].shape == (1200,)
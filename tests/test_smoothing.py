@@ -0,0 +1,155 @@
+import logging
+import math
+import random
+
+import numpy as np
+import pytest
+
+from robo_sim.algorithms.path_planning.dstarlite import DStarLite
+from robo_sim.algorithms.smoothing import (
+    corner_arcs,
+    round_corners,
+    smooth_path,
+)
+from robo_sim.components import Env
+from robo_sim.components.env_objects import Target
+from robo_sim.components.robot import Robot
+from robo_sim.config import (
+    DStarLiteConfig,
+    EnvConfig,
+    PathSmoothingConfig,
+    RobotConfig,
+)
+from robo_sim.sim import Sim
+from robo_sim.utils import Position
+
+
+def always_clear(start, end):
+    return np.ones(len(start), dtype=bool)
+
+
+def never_clear(start, end):
+    return np.zeros(len(start), dtype=bool)
+
+
+def curvatures(points):
+    """Curvature of the circle through every three consecutive points."""
+    a, b, c = points[:-2], points[1:-1], points[2:]
+    cross = (b - a)[:, 0] * (c - a)[:, 1] - (b - a)[:, 1] * (c - a)[:, 0]
+    sides = np.hypot(*(b - a).T) * np.hypot(*(c - b).T) * np.hypot(*(c - a).T)
+    return 2 * np.abs(cross) / sides
+
+
+def zigzag(seed, count=30):
+    """Path with turns of up to 90 degrees and segments long enough for
+    arcs of radius 1."""
+    rng = np.random.default_rng(seed)
+    headings = np.cumsum(rng.uniform(-math.pi / 2, math.pi / 2, count))
+    steps = rng.uniform(3, 8, count)[:, None] * np.column_stack(
+        (np.cos(headings), np.sin(headings))
+    )
+    return np.vstack(([0.0, 0.0], np.cumsum(steps, axis=0)))
+
+
+def test_corner_arcs_report_fitted_curvature():
+    points = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 1.0], [0.0, 1.0]])
+    _, _, curvature = corner_arcs(points, np.full(2, 5.0), 0.1)
+    # The short middle segment forces both arcs well under radius 5.
+    assert (curvature > 1 / 5).all()
+    straight = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]])
+    _, _, curvature = corner_arcs(straight, np.full(1, 5.0), 0.1)
+    assert curvature[0] == 0.0
+
+
+def distances_to_path(points, path):
+    """Distance from each of `points` to the polyline `path`."""
+    start, end = path[:-1], path[1:]
+    along = end - start
+    t = ((points[:, None] - start) * along).sum(axis=2) / (along**2).sum(
+        axis=1
+    )
+    nearest = start + np.clip(t, 0, 1)[..., None] * along
+    return np.hypot(*(points[:, None] - nearest).T).min(axis=0)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rounded_paths_stay_within_the_bound(seed):
+    points = zigzag(seed)
+    config = PathSmoothingConfig(shortcut=False, max_curvature=1.0)
+    path = smooth_path(points, config, always_clear, 0.1)
+    assert len(path) > len(points)
+    np.testing.assert_array_equal(path[[0, -1]], points[[0, -1]])
+    assert curvatures(path).max() <= 1.0 + 1e-6
+
+    # Resampling only picks points along the rounded path.
+    resampled = smooth_path(points, config, always_clear, 0.1, step=0.3)
+    np.testing.assert_array_equal(resampled[[0, -1]], points[[0, -1]])
+    steps = np.hypot(*np.diff(resampled, axis=0).T)
+    assert steps.max() <= 0.3 + 1e-9
+    assert distances_to_path(resampled, path).max() <= 1e-9
+
+
+def test_corners_without_room_stay_sharp(caplog):
+    config = PathSmoothingConfig(shortcut=False, max_curvature=1.0)
+    # A U-turn too narrow for arcs of radius 1.
+    narrow = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 1.0], [0.0, 1.0]])
+    assert round_corners(narrow, 1.0, always_clear, 0.1) is None
+    with caplog.at_level(logging.INFO):
+        path = smooth_path(narrow, config, always_clear, 0.1)
+    np.testing.assert_array_equal(path, narrow)
+    assert "left sharp" in caplog.text
+
+    # Arcs that collide.
+    points = zigzag(0)
+    assert round_corners(points, 1.0, never_clear, 0.1) is None
+    path = smooth_path(points, config, never_clear, 0.1)
+    np.testing.assert_array_equal(path, points)
+
+
+def run_sim(seed):
+    random.seed(seed)
+    sim = Sim.from_configs(
+        EnvConfig(
+            size=(30, 30), obstacles=40, target_pos=(27, 27), max_frames=300
+        ),
+        RobotConfig(start_pos=(2, 2), init_vel=0.5),
+        DStarLiteConfig(smoothing=PathSmoothingConfig(max_curvature=1.0)),
+        headless=True,
+    )
+    poses = [sim.robot.pos]
+    move_robot = sim.move_robot
+
+    def record(next_pos, next_angle):
+        move_robot(next_pos, next_angle)
+        poses.append(sim.robot.pos)
+
+    sim.move_robot = record
+    sim.run()
+    return sim, np.array([(pos.x, pos.y) for pos in poses])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 3])
+def test_smoothed_dstarlite_moves_at_init_vel(tmp_path, monkeypatch, seed):
+    monkeypatch.chdir(tmp_path)
+    sim, poses = run_sim(seed)
+    assert sim.reached
+    steps = np.hypot(*np.diff(poses, axis=0).T)
+    assert steps.max() <= 0.5 + 1e-9
+    assert not sim.env.points_in_collision(poses, sim.robot.radius).any()
+
+
+def test_smoothing_a_one_cell_plan_stays_put(monkeypatch):
+    env = Env(size=(10, 10))
+    robot = Robot(Position(2.2, 2.1), 0.5, 0.0, 0.0)
+    planner = DStarLite(
+        env,
+        robot,
+        robot.pos,
+        Target(Position(8, 8)),
+        DStarLiteConfig(smoothing=PathSmoothingConfig()),
+    )
+    # A plan that stops at the robot's cell when the next is unsettled.
+    monkeypatch.setattr(planner, "plan_cells", lambda: [planner.start_idx])
+    path = planner.smoothed_path()
+    assert [(p.x, p.y) for p in path] == [(2.2, 2.1)]
+    assert planner.pace == 0.5
@@ -0,0 +1,116 @@
+import random
+
+import numpy as np
+import pytest
+
+from robo_sim.components import Env, StepController
+from robo_sim.components.robot import Robot
+from robo_sim.config import (
+    AdaptiveStepConfig,
+    DStarLiteConfig,
+    EnvConfig,
+    RobotConfig,
+)
+from robo_sim.geometry import Circle
+from robo_sim.sim import Sim
+from robo_sim.utils import Position
+
+
+def build_env():
+    env = Env(size=(20, 20))
+    env.add_object("obstacle", Position(10, 10), Circle(2))
+    return env
+
+
+def controller():
+    return StepController(
+        max_steps_per_frame=8,
+        clearance=0.25,
+        error_bound=0.1,
+        slowdown_radius=1.0,
+    )
+
+
+def collides(env, pos, radius):
+    return env.points_in_collision(np.array([[pos.x, pos.y]]), radius)[0]
+
+
+def test_open_space_needs_room_for_the_whole_step():
+    env, stepper = build_env(), controller()
+    robot = Robot(Position(3, 3), 1.0, 0.0, 0.0)
+    assert stepper.in_open_space(env, robot, Position(4, 3))
+    robot.pos = Position(6.5, 10)
+    assert not stepper.in_open_space(env, robot, Position(7.5, 10))
+    robot.pos = Position(19.5, 3)
+    assert not stepper.in_open_space(env, robot, Position(20.5, 3))
+
+
+def test_refined_moves_stop_before_obstacles_and_walls():
+    env, stepper = build_env(), controller()
+    robot = Robot(Position(5, 10), 1.0, 0.0, 0.0)
+    end = Position(15, 10)
+    stop = stepper.clear_until(env, robot, end)
+    assert 7.6 <= stop.x <= 7.7 and stop.y == 10
+    assert not collides(env, stop, robot.radius)
+
+    free = Position(5, 15)
+    assert stepper.clear_until(env, robot, free) is free
+    robot.pos = Position(19, 3)
+    stop = stepper.clear_until(env, robot, Position(21, 3))
+    assert stop.x <= 20
+
+
+def test_colliding_robots_only_move_to_free_samples():
+    env, stepper = build_env(), controller()
+    robot = Robot(Position(10, 11.5), 1.0, 0.0, 0.0)
+    for end in (Position(10, 15), Position(10, 5), Position(13, 13)):
+        stop = stepper.clear_until(env, robot, end)
+        assert not collides(env, stop, robot.radius)
+        # The first free sample, just out of the obstacle.
+        distance = np.hypot(stop.x - 10, stop.y - 10)
+        assert 2.3 <= distance < 2.3 + stepper.error_bound
+    # Nowhere to go.
+    env.add_object("obstacle", Position(10, 14), Circle(2))
+    stop = stepper.clear_until(env, robot, Position(10, 14))
+    assert (stop.x, stop.y) == (10, 11.5)
+
+
+def run_sim(adaptive_step, seed):
+    random.seed(seed)
+    sim = Sim.from_configs(
+        EnvConfig(
+            size=(40, 40),
+            obstacles=30,
+            target_pos=(37, 37),
+            max_frames=200,
+            adaptive_step=adaptive_step,
+        ),
+        RobotConfig(start_pos=(2, 2)),
+        DStarLiteConfig(),
+        headless=True,
+    )
+    poses = []
+    move_robot = sim.move_robot
+
+    def record(next_pos, next_angle):
+        move_robot(next_pos, next_angle)
+        poses.append(sim.robot.pos)
+
+    sim.move_robot = record
+    sim.run()
+    return sim, poses
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_merged_frames_follow_the_same_moves(tmp_path, monkeypatch, seed):
+    monkeypatch.chdir(tmp_path)
+    plain, expected = run_sim(None, seed)
+    sim, poses = run_sim(AdaptiveStepConfig(), seed)
+    stats = sim.stepper.stats
+    assert sim.reached == plain.reached
+    assert stats.steps == len(poses) == len(expected)
+    assert stats.frames == sim.step_idx < stats.steps
+    assert stats.max_steps_per_frame <= 8
+    for pos, reference in zip(poses, expected):
+        assert (pos.x, pos.y) == (reference.x, reference.y)
+        assert not collides(sim.env, pos, sim.robot.radius)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from robo_sim.components.summarizer import (
+    EpisodeAggregator,
+    RunningStats,
+    SimStats,
+)
+
+
+def stats_of(values, capacity, seed):
+    stats = RunningStats(capacity, np.random.default_rng(seed))
+    for value in values:
+        stats.add(float(value))
+    return stats
+
+
+@pytest.mark.parametrize("split", [0, 1, 37, 500])
+def test_merge_matches_single_stream(split):
+    values = np.random.default_rng(0).normal(3.0, 2.0, 500)
+    merged = stats_of(values[:split], 64, 1)
+    merged.merge(stats_of(values[split:], 64, 2))
+
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.variance == pytest.approx(values.var(ddof=1))
+    assert merged.min == values.min()
+    assert merged.max == values.max()
+    assert len(merged.sample) == 64
+    assert set(merged.sample) <= set(values.tolist())
+
+
+def test_merge_keeps_small_samples_whole():
+    merged = stats_of([1.0, 2.0], 8, 0)
+    merged.merge(stats_of([3.0, 4.0, 5.0], 8, 1))
+    assert sorted(merged.sample) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert merged.variance == pytest.approx(2.5)
+
+
+def episode(k):
+    return SimStats(
+        execution_time=0.1 * k,
+        steps_taken=k,
+        total_displacement=float(k),
+        sensor_readings_count=None,
+        path_length=2.0 * k,
+        reached=k % 3 == 0,
+    )
+
+
+def test_aggregators_merge_across_processes():
+    whole = EpisodeAggregator(capacity=16, seed=0)
+    parts = [EpisodeAggregator(capacity=16, seed=k) for k in range(3)]
+    for k in range(300):
+        whole.add(episode(k))
+        parts[k % 3].add(episode(k))
+    merged = EpisodeAggregator.from_dict(parts[0].to_dict(), seed=3)
+    for part in parts[1:]:
+        merged.merge(EpisodeAggregator.from_dict(part.to_dict()))
+
+    assert merged.episodes == 300
+    assert merged.success_rate == whole.success_rate == 1 / 3
+    for field, running in merged.stats.items():
+        expected = whole.stats[field]
+        assert running.count == expected.count
+        assert running.mean == pytest.approx(expected.mean)
+        assert running.variance == pytest.approx(expected.variance)
+        assert (running.min, running.max) == (expected.min, expected.max)
+        assert len(running.sample) == 16
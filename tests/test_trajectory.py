@@ -0,0 +1,138 @@
+import random
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from robo_sim.cli import replay
+from robo_sim.components import Env
+from robo_sim.components.trajectory import (
+    FrameState,
+    TrajectoryReader,
+    TrajectoryWriter,
+)
+from robo_sim.config import DStarLiteConfig, EnvConfig, RobotConfig
+from robo_sim.geometry import AABB, Circle
+from robo_sim.sim import Sim
+from robo_sim.utils import Position
+
+ANGLES = np.array([0.0, 90.0, 180.0, 270.0])
+
+
+def xy(pos):
+    return pos.x, pos.y
+
+
+def build_env():
+    env = Env(size=(20, 15))
+    env.add_object("obstacle", Position(3, 4))
+    env.add_object("obstacle", Position(8, 9), Circle(1.5))
+    env.add_object("obstacle", Position(12, 3), AABB(2, 0.5))
+    env.add_dynamic_obstacle(Position(15, 10), None, Circle(0.75))
+    env.set_target(Position(18, 13))
+    return env
+
+
+def state(frame, frames):
+    return FrameState(
+        frame=frame,
+        robot_pos=Position(0.1 * frame, 0.05 * frame),
+        robot_radius=0.5,
+        orientation=0.01 * frame,
+        target=Position(18, 13),
+        reached=frame == frames - 1,
+        done=frame == frames - 1,
+        sensor_angles=ANGLES,
+        sensor_readings=None if frame % 7 == 0 else ANGLES / 90 + frame,
+        dynamic_obstacles=np.array([[15 + 0.01 * frame, 10.0]]),
+    )
+
+
+def write(path, frames, batch_size=16):
+    writer = TrajectoryWriter(path, build_env(), 0.5, ANGLES, batch_size)
+    for frame in range(frames):
+        writer.append(state(frame, frames))
+    writer.close()
+
+
+@pytest.mark.parametrize("chunk_size", [5, 4096])
+def test_frames_read_back_in_any_order(tmp_path, chunk_size):
+    path = tmp_path / "run.traj"
+    write(path, 100)
+    reader = TrajectoryReader(path, chunk_size=chunk_size)
+    assert len(reader) == 100
+    for frame in [99, 0, 53, 54, 4, 5, -1]:
+        expected = state(frame % 100, 100)
+        got = reader[frame]
+        assert got.frame == expected.frame
+        assert xy(got.robot_pos) == xy(expected.robot_pos)
+        assert got.orientation == expected.orientation
+        assert (got.reached, got.done) == (expected.reached, expected.done)
+        np.testing.assert_array_equal(
+            got.dynamic_obstacles, expected.dynamic_obstacles
+        )
+        if expected.sensor_readings is None:
+            assert got.sensor_readings is None
+        else:
+            np.testing.assert_allclose(
+                got.sensor_readings, expected.sensor_readings
+            )
+    with pytest.raises(IndexError):
+        reader[100]
+
+
+def test_positions_are_strided_but_end_at_the_last_frame(tmp_path):
+    path = tmp_path / "run.traj"
+    write(path, 100)
+    reader = TrajectoryReader(path)
+    assert len(reader.positions(50)) == 50
+    points = reader.positions(50, max_points=8)
+    assert len(points) <= 9
+    np.testing.assert_array_equal(points[-1], (4.9, 2.45))
+
+
+def test_partial_trailing_record_is_ignored(tmp_path):
+    path = tmp_path / "run.traj"
+    write(path, 10)
+    with path.open("ab") as f:
+        f.write(b"\0" * 5)
+    assert len(TrajectoryReader(path)) == 10
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "run.traj"
+    path.write_bytes(b"not a trajectory")
+    with pytest.raises(ValueError):
+        TrajectoryReader(path)
+
+
+def test_recorded_env_is_rebuilt(tmp_path):
+    path = tmp_path / "run.traj"
+    write(path, 1)
+    env = TrajectoryReader(path).build_env()
+    original = build_env()
+    assert env.content_hash() == original.content_hash()
+    assert xy(env.get_target()) == xy(original.get_target())
+
+
+def test_sim_run_is_recorded_and_replayed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    random.seed(3)
+    path = tmp_path / "run.traj"
+    sim = Sim.from_configs(
+        EnvConfig(size=(15, 15), obstacles=10, max_frames=20),
+        RobotConfig(),
+        DStarLiteConfig(),
+        headless=True,
+        trajectory_path=path,
+    )
+    sim.run()
+    reader = TrajectoryReader(path)
+    assert len(reader) > 1
+    assert reader[-1].done
+    assert xy(reader[-1].robot_pos) == xy(sim.robot.pos)
+
+    gif = tmp_path / "replay.gif"
+    replay.main([str(path), "--record", str(gif), "--stride", "2"])
+    with Image.open(gif) as image:
+        assert image.n_frames == (len(reader) + 1) // 2
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from robo_sim.algorithms.path_planning.dstarlite import DStarLite
+from robo_sim.components import Env, TiledWorld, write_tiled_world
+from robo_sim.components.costmap import Costmap
+from robo_sim.components.env_objects import Target
+from robo_sim.components.robot import Robot
+from robo_sim.components.world import grid_strips
+from robo_sim.config import DStarLiteConfig
+from robo_sim.geometry import Circle
+from robo_sim.utils import Position
+
+SIZE = (50, 30)
+RESOLUTION = 2
+TILE_SIZE = 8
+
+
+def world_grid():
+    rows = SIZE[1] * RESOLUTION + 1
+    cols = SIZE[0] * RESOLUTION + 1
+    grid = np.random.default_rng(0).random((rows, cols)) > 0.95
+    # Whole tiles, free and full, are only recorded in the index.
+    grid[:24, :24] = False
+    grid[32:48, 40:64] = True
+    return grid
+
+
+def tiled_world(path, max_tiles=64):
+    write_tiled_world(
+        path, SIZE, RESOLUTION, grid_strips(world_grid(), TILE_SIZE), TILE_SIZE
+    )
+    return TiledWorld(path, max_tiles=max_tiles)
+
+
+def test_world_reads_back_the_grid(tmp_path):
+    world = tiled_world(tmp_path)
+    grid = world_grid()
+    stored = (world.index >= 0).sum()
+    assert world.tiles is not None and len(world.tiles) == stored
+    assert stored < world.index.size - 9
+
+    ii, jj = np.indices(grid.shape).reshape(2, -1)
+    np.testing.assert_array_equal(world.occupied_cells(ii, jj), grid.ravel())
+
+    # Points look up their nearest cell center; outside points count as
+    # occupied.
+    points = np.random.default_rng(1).uniform(-2, 52, (4000, 2))
+    cells = np.floor(points * RESOLUTION + 0.5).astype(int)
+    inside = (
+        (cells >= 0).all(axis=1)
+        & (cells[:, 0] < grid.shape[1])
+        & (cells[:, 1] < grid.shape[0])
+    )
+    expected = np.ones(len(points), dtype=bool)
+    expected[inside] = grid[cells[inside, 1], cells[inside, 0]]
+    np.testing.assert_array_equal(world.occupied_at(points), expected)
+
+
+def test_strips_must_cover_the_grid(tmp_path):
+    grid = world_grid()
+    with pytest.raises(ValueError):
+        write_tiled_world(
+            tmp_path, SIZE, RESOLUTION, grid_strips(grid[:-1], 8), 8
+        )
+    with pytest.raises(ValueError):
+        write_tiled_world(
+            tmp_path, SIZE, RESOLUTION, grid_strips(grid[:, :-1], 8), 8
+        )
+
+
+@pytest.mark.parametrize("radius", [0.0, 0.3, 1.1])
+def test_disc_hits_match_cell_squares(tmp_path, radius):
+    world = tiled_world(tmp_path)
+    ii, jj = np.nonzero(world_grid())
+    centers = np.column_stack((jj, ii)) / RESOLUTION
+    points = np.random.default_rng(2).uniform(0, 30, (500, 2))
+    # Distance from each point to each occupied cell's square.
+    gap = np.abs(points[:, None, :] - centers) - 0.5 / RESOLUTION
+    gap = np.maximum(gap, 0)
+    expected = (np.hypot(gap[..., 0], gap[..., 1]) <= radius).any(axis=1)
+    np.testing.assert_array_equal(world.disc_hits(points, radius), expected)
+
+
+def test_env_queries_combine_world_and_obstacles(tmp_path):
+    env = Env(world=tiled_world(tmp_path))
+    assert env.size == SIZE
+    env.add_object("obstacle", Position(10, 10), Circle(1.5))
+    points = np.random.default_rng(3).uniform(0, 30, (2000, 2))
+    plain = Env(size=SIZE)
+    plain.add_object("obstacle", Position(10, 10), Circle(1.5))
+    # Obstacle objects are tested by their geometry rather than by cells.
+    np.testing.assert_array_equal(
+        env.occupied_at(points),
+        env.world.occupied_at(points) | plain.points_in_collision(points, 0),
+    )
+    np.testing.assert_array_equal(
+        env.points_in_collision(points, 0.3),
+        env.world.disc_hits(points, 0.3)
+        | plain.points_in_collision(points, 0.3),
+    )
+
+
+def test_resident_tiles_stay_within_the_cache(tmp_path):
+    world = tiled_world(tmp_path, max_tiles=3)
+    points = np.random.default_rng(4).uniform(0, 50, (3000, 2))
+    world.occupied_at(points)
+    assert len(world.resident) == 3
+
+    world = tiled_world(tmp_path, max_tiles=64)
+    world.prefetch(40, 20, radius=3.0)
+    reads = world.tile_reads
+    assert 0 < reads <= len(world.resident) <= 9
+    # Queries around the prefetched position read nothing more.
+    near = np.random.default_rng(5).uniform(-2.5, 2.5, (200, 2)) + (40, 20)
+    world.occupied_at(near)
+    world.disc_hits(near, 0.3)
+    assert world.tile_reads == reads
+
+
+def test_whole_map_consumers_are_rejected(tmp_path):
+    world = tiled_world(tmp_path)
+    env = Env(world=world)
+    with pytest.raises(ValueError):
+        env.occupancy_grid(2)
+    with pytest.raises(ValueError):
+        env.quadtree(2)
+    with pytest.raises(ValueError):
+        Env(world=world, quadtree=True)
+    with pytest.raises(ValueError):
+        Costmap(env)
+    robot = Robot(Position(1, 1), 1.0, 0.0, 0.0)
+    with pytest.raises(ValueError):
+        DStarLite(
+            env,
+            robot,
+            robot.pos,
+            Target(Position(40, 20)),
+            DStarLiteConfig(),
+        )
+    # A window reads only the tiles it covers.
+    window = env.occupancy_window(slice(0, 20), slice(0, 20), RESOLUTION)
+    np.testing.assert_array_equal(window, world_grid()[:20, :20])
+    assert world.tile_reads <= 9